@@ -0,0 +1,51 @@
+"""
+Product assistant: answers shopper questions from the catalogue, not from the model's memory.
+question -> embedding -> top-k products from the local index -> prompt listing only those
+products -> OllamaClient.chat. The products are returned alongside the answer so the
+frontend can render them as cards.
+"""
+
+from fastapi import APIRouter, Depends
+
+from app.ai.ollama import response_cleaner
+from app.ai.ollama_client import OllamaClient
+from app.ai.product_index import ProductIndexer
+from app.db.mongodb import products_collection
+from app.deps.rate_limit import rate_limit
+from app.models.product_model import ProductAskRequest, ProductCardResponse
+from app.repo.ai_index_helpers import get_visible_cards
+from app.repo.product_helpers import LISTING_CARD_PROJECTION
+
+router = APIRouter(tags=["AI product assistant"])
+
+ASSISTANT_OPTIONS = {"temperature": 0.2, "num_predict": 300, "top_k": 3}
+NO_MATCH_ANSWER = "I couldn't find any products matching that in our catalogue."
+
+
+def build_prompt(question: str, products: list[dict]) -> str:
+    lines = [
+        f"{i}. {p['name']} by {p.get('brand', 'Generic')} — ₹{p['price']} "
+        f"({p.get('discount_percent', 0)}% off), {p['category']}, rated {p.get('avg_rating', 0):.1f}, "
+        f"{'in stock' if p.get('stock', 0) > 0 else 'out of stock'}"
+        for i, p in enumerate(products, 1)
+    ]
+    return (
+        "You are Anozon's shopping assistant. Answer the customer's question using ONLY the products "
+        "listed below; refer to them by name. If none of them fit, say so. Be brief.\n\n"
+        "Products:\n" + "\n".join(lines) + f"\n\nQuestion: {question}"
+    )
+
+
+@router.post("/ai/products/ask", dependencies=[Depends(rate_limit("ai_products_ask", 10, 60))])
+async def ask_about_products(body: ProductAskRequest):
+    hits = await ProductIndexer.search(body.question, body.k)
+    products = await get_visible_cards(products_collection(), [pid for pid, _ in hits], LISTING_CARD_PROJECTION)
+    if not products:
+        return {"answer": NO_MATCH_ANSWER, "products": [], "model": None}
+
+    result = response_cleaner(await OllamaClient.chat(build_prompt(body.question, products), options=ASSISTANT_OPTIONS))
+    return {
+        "answer": result["response"],
+        "products": [ProductCardResponse(**p).model_dump() for p in products],
+        "model": result["model"],
+    }
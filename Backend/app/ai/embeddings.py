@@ -0,0 +1,73 @@
+"""
+Text embedders for the product index. Both return L2-normalised float32 rows, so a dot product
+is cosine similarity.
+- OllamaEmbedder:  Ollama's /api/embed (OLLAMA_EMBED_MODEL), through the shared OllamaClient
+- HashingEmbedder: feature-hashed bag of words; no model, deterministic — tests, benchmarks, offline
+"""
+
+import asyncio
+import hashlib
+import re
+
+import numpy as np
+
+from app.ai.ollama_client import OllamaClient
+from app.core.config import settings
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32, copy=False)
+
+
+def product_text(product: dict) -> str:
+    """The text a product is retrieved by: name, brand, categories, tags, description."""
+    parts = [
+        product.get("name", ""),
+        product.get("brand", ""),
+        product.get("category", ""),
+        product.get("sub_category") or "",
+        " ".join(product.get("tags") or []),
+        " ".join(product.get("search_keywords") or []),
+        product.get("description", ""),
+    ]
+    return ". ".join(p for p in parts if p)[:2000]
+
+
+class HashingEmbedder:
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _embed_one(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in _TOKEN.findall(text.lower()):
+            digest = hashlib.blake2b(token.encode(), digest_size=8).digest()
+            h = int.from_bytes(digest, "little")
+            vector[h % self.dim] += 1.0 if (h >> 63) else -1.0
+        return vector
+
+    def _embed_many(self, texts: list[str]) -> np.ndarray:
+        return normalize_rows(np.stack([self._embed_one(t) for t in texts]))
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        # Pure-Python hashing of up to a batch of descriptions: keep it off the event loop
+        return await asyncio.to_thread(self._embed_many, texts)
+
+
+class OllamaEmbedder:
+    def __init__(self, model: str):
+        self.name = f"ollama-{model}"
+        self.model = model
+
+    async def embed(self, texts: list[str]) -> np.ndarray:
+        return normalize_rows(np.asarray(await OllamaClient.embed(texts, self.model), dtype=np.float32))
+
+
+def get_embedder():
+    if settings.AI_EMBEDDER == "hashing":
+        return HashingEmbedder()
+    return OllamaEmbedder(settings.OLLAMA_EMBED_MODEL)
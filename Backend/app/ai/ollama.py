@@ -1,49 +1,43 @@
-from app.core.config import settings
 from fastapi import APIRouter, Query, HTTPException, Depends
+from fastapi.responses import StreamingResponse
+from app.ai.ollama_client import OllamaClient
 from app.deps.roles import get_current_user
-import httpx
-
-API_KEY = settings.OLLAMA_API_URL
-OLLAMA_URL = settings.OLLAMA_URL
+from app.deps.rate_limit import rate_limit
+import json
 
 router = APIRouter(tags=["Ollama AI routes"])
 
-@router.get("/ollama/ai/chat")
+@router.get("/ollama/ai/chat", dependencies=[Depends(rate_limit("ollama_chat", 10, 60))])
 async def ask_ollama_ai(message: str = Query(..., description="Enter a prompt...") ):
 
     if not message:
         raise HTTPException(status_code=400, detail="Message cannot be empty")
 
-    try:
-        async with httpx.AsyncClient(timeout=60) as client:
-            response = await client.post(
-                f"{OLLAMA_URL}/chat",
-                headers={
-                    "Authorization": f"Bearer {API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "qwen3-coder:480b-cloud",
-                    "messages": [
-                        {"role": "user",
-                        "content": message}
-                    ],
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.7,
-                        "num_predict": 100,
-                        "top_k": 3
-                    }})
-            response.raise_for_status()
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail={"error": str(e)})
-    
-    return response_cleaner(response.json())
+    return response_cleaner(await OllamaClient.chat(message))
+
+
+@router.get("/ollama/ai/chat/stream", dependencies=[Depends(rate_limit("ollama_chat", 10, 60))])
+async def stream_ollama_ai(message: str = Query(..., description="Enter a prompt...")):
+    """Server-sent events: one `data: {"token": ...}` per chunk, then `event: done` with timings."""
+    if not message:
+        raise HTTPException(status_code=400, detail="Message cannot be empty")
+
+    async def events():
+        try:
+            async for chunk in OllamaClient.stream_chat(message):
+                if chunk.get("done"):
+                    yield f"event: done\ndata: {json.dumps(response_cleaner(chunk))}\n\n"
+                else:
+                    yield f"data: {json.dumps({'token': chunk.get('message', {}).get('content', '')})}\n\n"
+        except HTTPException as e:
+            # Headers are already sent; report the failure in-band
+            yield f"event: error\ndata: {json.dumps({'status': e.status_code, 'detail': e.detail})}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 def response_cleaner(response_json: dict) -> dict:
     return {
-        "response": response_json["message"]["content"],
+        "response": response_json.get("message", {}).get("content", ""),
         "total_duration_ms": round(response_json.get("total_duration", 0) / 1e6, 2),
         "model": response_json.get("model"),
     }
@@ -0,0 +1,194 @@
+"""
+Shared Ollama client.
+- one pooled httpx.AsyncClient per process, opened/closed by the app lifespan
+- at most OLLAMA_MAX_CONCURRENCY upstream calls in flight; others wait up to
+  OLLAMA_QUEUE_TIMEOUT_SECONDS for a slot, then get 503
+- non-streamed answers are cached in Redis for OLLAMA_CACHE_TTL_SECONDS (0 disables),
+  keyed by (model, normalized prompt, options)
+- Ollama's timing fields are accumulated in STATS
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import httpx
+from fastapi import HTTPException
+from opentelemetry.propagate import inject
+from opentelemetry.trace import SpanKind
+
+from app.core.config import settings
+from app.core.metrics import record_cache
+from app.core.tracing import REQUEST_ID_HEADER, current_request_id, tracer
+from app.db import redis as redis_db
+from app.db.redis import REDIS_ERRORS
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = "ollama:cache:{digest}"
+DEFAULT_OPTIONS = {"temperature": 0.7, "num_predict": 100, "top_k": 3}
+
+# requests, cache_hits, queue_timeouts, upstream_errors, in_flight, waiting,
+# total_duration_ms, load_duration_ms, prompt_eval_count, eval_count, eval_duration_ms
+STATS: Counter = Counter()
+
+
+def normalize_prompt(prompt: str) -> str:
+    return " ".join(prompt.split()).casefold()
+
+
+def cache_key(model: str, prompt: str, options: dict) -> str:
+    raw = json.dumps([model, normalize_prompt(prompt), options], sort_keys=True)
+    return CACHE_KEY.format(digest=hashlib.sha256(raw.encode()).hexdigest())
+
+
+def record_timings(response_json: dict):
+    """Fold one response's timing fields (nanoseconds from Ollama) into STATS."""
+    STATS["total_duration_ms"] += response_json.get("total_duration", 0) / 1e6
+    STATS["load_duration_ms"] += response_json.get("load_duration", 0) / 1e6
+    STATS["eval_duration_ms"] += response_json.get("eval_duration", 0) / 1e6
+    STATS["prompt_eval_count"] += response_json.get("prompt_eval_count", 0)
+    STATS["eval_count"] += response_json.get("eval_count", 0)
+
+
+async def _propagate_trace(request: httpx.Request):
+    """httpx request hook: carry traceparent and the request id upstream."""
+    inject(request.headers)
+    request.headers[REQUEST_ID_HEADER] = current_request_id()
+
+
+class OllamaClient:
+    _client: httpx.AsyncClient | None = None
+    _semaphore: asyncio.Semaphore | None = None
+
+    @staticmethod
+    def start(transport: httpx.AsyncBaseTransport | None = None):
+        """Open the shared client. `transport` lets tests point it at the stub app."""
+        if OllamaClient._client is not None:
+            return
+        limit = settings.OLLAMA_MAX_CONCURRENCY
+        OllamaClient._semaphore = asyncio.Semaphore(limit)
+        OllamaClient._client = httpx.AsyncClient(
+            base_url=settings.OLLAMA_URL,
+            headers={"Authorization": f"Bearer {settings.OLLAMA_API_URL}"},
+            timeout=httpx.Timeout(settings.OLLAMA_TIMEOUT_SECONDS, connect=5.0),
+            limits=httpx.Limits(max_connections=limit, max_keepalive_connections=limit),
+            transport=transport,
+            event_hooks={"request": [_propagate_trace]},
+        )
+
+    @staticmethod
+    async def stop():
+        client, OllamaClient._client = OllamaClient._client, None
+        if client:
+            await client.aclose()
+
+    @staticmethod
+    @asynccontextmanager
+    async def _slot(operation: str):
+        if OllamaClient._client is None:
+            OllamaClient.start()
+        # The span covers the wait for a slot and the whole upstream call (including a streamed body)
+        with tracer.start_as_current_span(f"ollama {operation}", kind=SpanKind.CLIENT) as span:
+            STATS["waiting"] += 1
+            queued = time.perf_counter()
+            try:
+                await asyncio.wait_for(OllamaClient._semaphore.acquire(), settings.OLLAMA_QUEUE_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                STATS["queue_timeouts"] += 1
+                raise HTTPException(status_code=503, detail="AI service is busy, please retry shortly")
+            finally:
+                STATS["waiting"] -= 1
+            span.set_attribute("ollama.queue_wait_ms", (time.perf_counter() - queued) * 1000)
+            STATS["in_flight"] += 1
+            try:
+                yield OllamaClient._client
+            finally:
+                STATS["in_flight"] -= 1
+                OllamaClient._semaphore.release()
+
+    @staticmethod
+    def _payload(message: str, model: str, options: dict, stream: bool) -> dict:
+        return {"model": model, "messages": [{"role": "user", "content": message}], "stream": stream, "options": options}
+
+    @staticmethod
+    async def _cache_get(key: str) -> dict | None:
+        if settings.OLLAMA_CACHE_TTL_SECONDS <= 0:
+            return None
+        try:
+            cached = await redis_db.redis_client.get(key)
+        except REDIS_ERRORS as e:
+            logger.warning("Ollama cache read skipped: %s", e)
+            return None
+        return json.loads(cached) if cached else None
+
+    @staticmethod
+    async def _cache_put(key: str, response_json: dict):
+        if settings.OLLAMA_CACHE_TTL_SECONDS <= 0:
+            return
+        try:
+            await redis_db.redis_client.set(key, json.dumps(response_json), ex=settings.OLLAMA_CACHE_TTL_SECONDS)
+        except REDIS_ERRORS as e:
+            logger.warning("Ollama cache write skipped: %s", e)
+
+    @staticmethod
+    async def chat(message: str, model: str | None = None, options: dict | None = None) -> dict:
+        """Full (non-streamed) chat completion; returns Ollama's response JSON."""
+        model, options = model or settings.OLLAMA_MODEL, options or DEFAULT_OPTIONS
+        STATS["requests"] += 1
+        key = cache_key(model, message, options)
+        cached = await OllamaClient._cache_get(key)
+        record_cache("ollama", bool(cached))
+        if cached:
+            STATS["cache_hits"] += 1
+            return cached
+
+        async with OllamaClient._slot("chat") as client:
+            try:
+                response = await client.post("/chat", json=OllamaClient._payload(message, model, options, False))
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                STATS["upstream_errors"] += 1
+                raise HTTPException(status_code=500, detail={"error": str(e)})
+
+        response_json = response.json()
+        record_timings(response_json)
+        await OllamaClient._cache_put(key, response_json)
+        return response_json
+
+    @staticmethod
+    async def stream_chat(message: str, model: str | None = None, options: dict | None = None) -> AsyncIterator[dict]:
+        """Yield Ollama's NDJSON chunks as they arrive; the last one has done=True and the timings."""
+        model, options = model or settings.OLLAMA_MODEL, options or DEFAULT_OPTIONS
+        STATS["requests"] += 1
+        async with OllamaClient._slot("chat stream") as client:
+            try:
+                async with client.stream("POST", "/chat", json=OllamaClient._payload(message, model, options, True)) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if not line.strip():
+                            continue
+                        chunk = json.loads(line)
+                        if chunk.get("done"):
+                            record_timings(chunk)
+                        yield chunk
+            except httpx.HTTPError as e:
+                STATS["upstream_errors"] += 1
+                raise HTTPException(status_code=500, detail={"error": str(e)})
+
+    @staticmethod
+    async def embed(texts: list[str], model: str) -> list[list[float]]:
+        """Embeddings for a batch of texts via /api/embed (one upstream call)."""
+        async with OllamaClient._slot("embed") as client:
+            try:
+                response = await client.post("/embed", json={"model": model, "input": texts})
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                STATS["upstream_errors"] += 1
+                raise HTTPException(status_code=500, detail={"error": str(e)})
+        return response.json()["embeddings"]
@@ -0,0 +1,88 @@
+"""
+Minimal stand-in for Ollama's POST /api/chat and /api/embed, for tests, benchmarks and offline
+development. Replies "stub reply: <prompt>" word by word, with Ollama-shaped timing fields;
+embeddings come from HashingEmbedder.
+
+In-process:  OllamaClient.start(transport=httpx.ASGITransport(app=create_stub_app()))
+Standalone:  python -m app.ai.ollama_stub --port 11435 --delay 0.05
+             then OLLAMA_URL=http://127.0.0.1:11435/api
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.ai.embeddings import HashingEmbedder
+
+
+def create_stub_app(delay: float = 0.0) -> FastAPI:
+    """delay: seconds per generated token."""
+    app = FastAPI()
+    app.state.calls = 0
+    app.state.active = 0
+    app.state.max_active = 0   # peak concurrent requests, to check client-side limits
+
+    @app.post("/api/chat")
+    async def chat(request: Request):
+        app.state.calls += 1
+        app.state.active += 1
+        app.state.max_active = max(app.state.max_active, app.state.active)
+        try:
+            return await _chat(request)
+        finally:
+            app.state.active -= 1
+
+    async def _chat(request: Request):
+        body = await request.json()
+        prompt = body["messages"][-1]["content"]
+        tokens = ["stub", " reply:"] + [f" {word}" for word in prompt.split()]
+        started = time.perf_counter_ns()
+
+        def final(content: str) -> dict:
+            elapsed = time.perf_counter_ns() - started
+            return {
+                "model": body.get("model"), "message": {"role": "assistant", "content": content}, "done": True,
+                "total_duration": elapsed, "load_duration": 0, "eval_duration": elapsed,
+                "prompt_eval_count": len(prompt.split()), "eval_count": len(tokens),
+            }
+
+        if not body.get("stream"):
+            await asyncio.sleep(delay * len(tokens))
+            return JSONResponse(final("".join(tokens)))
+
+        async def lines():
+            for token in tokens:
+                await asyncio.sleep(delay)
+                yield json.dumps({"model": body.get("model"), "message": {"role": "assistant", "content": token}, "done": False}) + "\n"
+            yield json.dumps(final("")) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    embedder = HashingEmbedder()
+
+    @app.post("/api/embed")
+    async def embed(request: Request):
+        body = await request.json()
+        texts = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        vectors = await embedder.embed(texts)
+        return {"model": body.get("model"), "embeddings": vectors.tolist()}
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--delay", type=float, default=0.0)
+    args = parser.parse_args()
+    uvicorn.run(create_stub_app(args.delay), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Keeps the on-disk VectorIndex in step with the catalogue.
+- product writes call mark_dirty(); the id lands in a Redis set (in-process set if Redis is down)
+- one worker holds the ai:index:writer lock and, every AI_INDEX_SYNC_INTERVAL_SECONDS, re-embeds
+  dirty products (visible ones upserted, the rest removed) and commits
+- the lease is re-checked (and extended) before every write and commit; a worker that lost it
+  stops writing, drops its uncommitted generation and hands its dirty ids back to Redis
+- the index is rebuilt from Mongo when it is missing or was built with a different embedder
+- every worker searches the same files through its own read-only mapping
+Memmap writes, flushes and searches run in threads so the event loop keeps serving requests.
+"""
+
+import asyncio
+import logging
+import uuid
+
+from app.ai.embeddings import get_embedder, product_text
+from app.ai.vector_index import VectorIndex
+from app.core.config import settings
+from app.db.mongodb import products_collection
+from app.db.redis import REDIS_ERRORS
+from app.repo import ai_index_helpers
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 256
+
+
+class WriterLeaseLost(Exception):
+    """Another worker holds ai:index:writer; this one must not touch the index files."""
+
+
+class ProductIndexer:
+    _embedder = None
+    _index: VectorIndex | None = None     # read-only mapping used by search()
+    _writer: VectorIndex | None = None    # writable mapping, only while this worker holds the lock
+    _local_dirty: set[str] = set()
+    _owner = uuid.uuid4().hex
+    _lease_ttl = 30
+    _task: asyncio.Task | None = None
+    _stopping = False
+
+    @staticmethod
+    def embedder():
+        if ProductIndexer._embedder is None:
+            ProductIndexer._embedder = get_embedder()
+        return ProductIndexer._embedder
+
+    @staticmethod
+    async def mark_dirty(product_id: str):
+        """Queue a product for re-embedding. Never raises — indexing must not break product writes."""
+        try:
+            await ai_index_helpers.mark_dirty(product_id)
+        except REDIS_ERRORS as e:
+            logger.warning("AI index dirty mark kept in-process (non-fatal): %s", e)
+            ProductIndexer._local_dirty.add(product_id)
+
+    # ── Writer ───────────────────────────────────────────────────────────────
+
+    @staticmethod
+    async def _fence():
+        """Extend the writer lease before touching the files; raise if another worker took it."""
+        try:
+            held = await ai_index_helpers.extend_writer(ProductIndexer._owner, ProductIndexer._lease_ttl)
+        except REDIS_ERRORS as e:
+            raise WriterLeaseLost(f"writer lease unverifiable: {e}") from e
+        if not held:
+            raise WriterLeaseLost("writer lease taken by another worker")
+
+    @staticmethod
+    async def _embed_products(products: list[dict]):
+        return await ProductIndexer.embedder().embed([product_text(p) for p in products])
+
+    @staticmethod
+    async def rebuild() -> int:
+        """Embed every visible product into a new generation and publish it. Returns its size."""
+        embedder = ProductIndexer.embedder()
+        # Writes from here on are re-marked and picked up by the next sync
+        try:
+            await ai_index_helpers.clear_dirty()
+        except REDIS_ERRORS as e:
+            logger.warning("AI index dirty set not cleared: %s", e)
+        ProductIndexer._local_dirty.clear()
+        dim = (await embedder.embed(["probe"])).shape[1]
+        index = await asyncio.to_thread(VectorIndex.create, settings.AI_INDEX_DIR, embedder.name, dim)
+        try:
+            async for batch in ai_index_helpers.iter_indexable_products(products_collection(), BATCH_SIZE):
+                vectors = await ProductIndexer._embed_products(batch)
+                await ProductIndexer._fence()
+                await asyncio.to_thread(index.upsert, [str(p["_id"]) for p in batch], vectors)
+            await ProductIndexer._fence()
+            await asyncio.to_thread(index.commit)
+        except Exception:
+            ProductIndexer._writer = None
+            await asyncio.to_thread(index.discard)
+            raise
+        ProductIndexer._writer = index
+        logger.info("AI product index rebuilt: %s products (%s)", len(index), embedder.name)
+        return len(index)
+
+    @staticmethod
+    async def _take_dirty(count: int) -> list[str]:
+        ids = [ProductIndexer._local_dirty.pop() for _ in range(min(count, len(ProductIndexer._local_dirty)))]
+        if len(ids) < count:
+            try:
+                ids += await ai_index_helpers.pop_dirty(count - len(ids))
+            except REDIS_ERRORS as e:
+                logger.warning("AI index dirty set unavailable: %s", e)
+        return ids
+
+    @staticmethod
+    async def sync_dirty() -> int:
+        """Apply queued product changes to the writable index. Returns the number of ids processed."""
+        index, processed = ProductIndexer._writer, 0
+        while ids := await ProductIndexer._take_dirty(BATCH_SIZE):
+            try:
+                products = await ai_index_helpers.get_indexable_products(products_collection(), ids)
+                vectors = await ProductIndexer._embed_products(products) if products else None
+                await ProductIndexer._fence()
+                if products:
+                    await asyncio.to_thread(index.upsert, [str(p["_id"]) for p in products], vectors)
+                visible = {str(p["_id"]) for p in products}
+                await asyncio.to_thread(index.remove, [pid for pid in ids if pid not in visible])
+                await ProductIndexer._fence()
+                await asyncio.to_thread(index.commit)
+            except Exception:
+                ProductIndexer._local_dirty.update(ids)   # retried next interval, or handed back if the lease is gone
+                raise
+            processed += len(ids)
+        return processed
+
+    @staticmethod
+    async def _hold_writer_lock(ttl: int) -> bool:
+        try:
+            return await ai_index_helpers.acquire_writer(ProductIndexer._owner, ttl)
+        except REDIS_ERRORS as e:
+            # Without the lock every worker would write the same files; pause indexing until Redis is back
+            logger.warning("AI index writer lock unavailable, skipping index sync: %s", e)
+            return False
+
+    @staticmethod
+    async def _requeue_local_dirty():
+        """Hand ids this worker could not apply back to the shared set, for whichever worker writes."""
+        ids = list(ProductIndexer._local_dirty)
+        if not ids:
+            return
+        try:
+            await ai_index_helpers.mark_dirty(*ids)
+        except REDIS_ERRORS as e:
+            logger.warning("AI index dirty ids kept in-process until Redis is back: %s", e)
+            return
+        ProductIndexer._local_dirty.difference_update(ids)
+
+    @staticmethod
+    async def sync():
+        """One writer pass: rebuild if needed, then apply dirty products."""
+        if ProductIndexer._writer is None:
+            ProductIndexer._writer = await asyncio.to_thread(VectorIndex.open, settings.AI_INDEX_DIR, writable=True)
+        writer = ProductIndexer._writer
+        if writer is None or writer.embedder != ProductIndexer.embedder().name:
+            await ProductIndexer.rebuild()
+        await ProductIndexer.sync_dirty()
+
+    @staticmethod
+    async def _sync_loop(interval: float):
+        ttl = ProductIndexer._lease_ttl = max(30, int(interval * 3))
+        while True:
+            try:
+                if await ProductIndexer._hold_writer_lock(ttl):
+                    await ProductIndexer.sync()
+                else:
+                    ProductIndexer._writer = None   # another worker writes; reopen if we take over
+                    await ProductIndexer._requeue_local_dirty()
+            except WriterLeaseLost as e:
+                ProductIndexer._writer = None
+                logger.warning("AI index writer lease lost, handing work back: %s", e)
+                await ProductIndexer._requeue_local_dirty()
+            except Exception as e:
+                logger.error("AI product index sync failed, will retry next interval: %s", e)
+            if ProductIndexer._stopping:
+                return   # httpx can turn a cancel mid-connect into a ConnectError, swallowing it
+            await asyncio.sleep(interval)
+
+    # ── Search ───────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _reader() -> VectorIndex | None:
+        if ProductIndexer._index is None:
+            ProductIndexer._index = VectorIndex.open(settings.AI_INDEX_DIR)
+        else:
+            ProductIndexer._index.refresh()
+        return ProductIndexer._index
+
+    @staticmethod
+    async def search(question: str, k: int = 5) -> list[tuple[str, float]]:
+        """Top-k (product_id, score) for a free-text question; [] until the index is built."""
+        index, embedder = ProductIndexer._reader(), ProductIndexer.embedder()
+        if index is None or len(index) == 0 or index.embedder != embedder.name:
+            return []
+        query = (await embedder.embed([question]))[0]
+        return await asyncio.to_thread(index.search, query, k)
+
+    # ── Lifecycle ────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def start(interval: float | None = None):
+        """Start the index sync loop (called from app lifespan)."""
+        if ProductIndexer._task is None or ProductIndexer._task.done():
+            interval = interval or settings.AI_INDEX_SYNC_INTERVAL_SECONDS
+            ProductIndexer._stopping = False
+            ProductIndexer._task = asyncio.create_task(ProductIndexer._sync_loop(interval))
+            logger.info("AI product index sync started (every %ss)", interval)
+
+    @staticmethod
+    async def stop():
+        task, ProductIndexer._task = ProductIndexer._task, None
+        if task:
+            ProductIndexer._stopping = True
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if ProductIndexer._writer is not None:
+            try:
+                await ai_index_helpers.release_writer(ProductIndexer._owner)
+            except REDIS_ERRORS:
+                pass
+            ProductIndexer._writer = None
@@ -0,0 +1,235 @@
+"""
+Brute-force cosine index over memory-mapped files, shared by every worker on the host.
+
+<dir>/meta.json           embedder, dim, count, capacity, free, generation, file names
+<dir>/vectors-<gen>-<tag>.f32   float32 [capacity, dim], L2-normalised rows
+<dir>/ids-<gen>-<tag>.bin       S24 [capacity], product id per row; b"" marks a free row
+
+One writer process (see ProductIndexer) updates rows in place and publishes with commit(),
+which atomically replaces meta.json. Readers map the files read-only and remap when
+meta.json changes, so a search never waits on the writer. Growing or rebuilding writes a
+new generation of files; old ones are unlinked once meta points elsewhere. The random tag
+keeps a writer that lost its lock mid-rebuild from sharing files with the one that took over.
+
+Search is one float32 matmul (chunked for large query batches) plus argpartition, which at
+100k x 384 is a few milliseconds — no ANN structure needed at this catalogue size.
+"""
+
+import json
+import os
+
+import numpy as np
+
+META_FILE = "meta.json"
+ID_DTYPE = "S24"   # ObjectId hex
+MIN_CAPACITY = 1024
+QUERY_CHUNK = 64   # queries per matmul in search_many, bounds the [chunk, count] score matrix
+
+
+class VectorIndex:
+    def __init__(self, path: str, meta: dict, writable: bool):
+        self.path = path
+        self.writable = writable
+        self._meta_mtime = None
+        self._stale_files: list[str] = []
+        self._load(meta)
+
+    # ── Opening ──────────────────────────────────────────────────────────────
+
+    @classmethod
+    def open(cls, path: str, writable: bool = False) -> "VectorIndex | None":
+        """Map an existing index; None if nothing has been published at `path` yet."""
+        meta = cls._read_meta(path)
+        if meta is None:
+            return None
+        index = cls(path, meta, writable)
+        index._meta_mtime = os.stat(os.path.join(path, META_FILE)).st_mtime_ns
+        return index
+
+    @classmethod
+    def create(cls, path: str, embedder: str, dim: int, capacity: int = MIN_CAPACITY) -> "VectorIndex":
+        """Start a new, empty generation. Readers keep the old one until commit()."""
+        os.makedirs(path, exist_ok=True)
+        previous = cls._read_meta(path)
+        generation = (previous["generation"] + 1) if previous else 1
+        meta = cls._new_files(path, embedder, dim, max(capacity, MIN_CAPACITY), generation)
+        index = cls(path, meta, writable=True)
+        if previous:
+            index._stale_files = [previous["vectors"], previous["ids"]]
+        return index
+
+    @staticmethod
+    def _read_meta(path: str) -> dict | None:
+        try:
+            with open(os.path.join(path, META_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _new_files(path: str, embedder: str, dim: int, capacity: int, generation: int) -> dict:
+        tag = os.urandom(4).hex()
+        meta = {
+            "embedder": embedder, "dim": dim, "count": 0, "free": 0, "capacity": capacity,
+            "generation": generation, "vectors": f"vectors-{generation}-{tag}.f32", "ids": f"ids-{generation}-{tag}.bin",
+        }
+        np.memmap(os.path.join(path, meta["vectors"]), dtype=np.float32, mode="w+", shape=(capacity, dim)).flush()
+        np.memmap(os.path.join(path, meta["ids"]), dtype=ID_DTYPE, mode="w+", shape=(capacity,)).flush()
+        return meta
+
+    def _load(self, meta: dict):
+        self.meta = meta
+        mode = "r+" if self.writable else "r"
+        shape = (meta["capacity"], meta["dim"])
+        self._vectors = np.memmap(os.path.join(self.path, meta["vectors"]), dtype=np.float32, mode=mode, shape=shape)
+        self._ids = np.memmap(os.path.join(self.path, meta["ids"]), dtype=ID_DTYPE, mode=mode, shape=(meta["capacity"],))
+        if self.writable:
+            count = meta["count"]
+            ids = self._ids[:count]
+            self._rows = {pid.decode(): row for row, pid in enumerate(ids) if pid}
+            self._free = [row for row in range(count) if not ids[row]]
+
+    def refresh(self) -> bool:
+        """Reader side: pick up the writer's last commit. Returns True if anything changed."""
+        try:
+            mtime = os.stat(os.path.join(self.path, META_FILE)).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime == self._meta_mtime:
+            return False
+        meta = self._read_meta(self.path)
+        if meta["vectors"] != self.meta["vectors"] or meta["capacity"] != self.meta["capacity"]:
+            self._load(meta)
+        else:
+            self.meta = meta
+        self._meta_mtime = mtime
+        return True
+
+    # ── Properties ───────────────────────────────────────────────────────────
+
+    @property
+    def embedder(self) -> str:
+        return self.meta["embedder"]
+
+    @property
+    def dim(self) -> int:
+        return self.meta["dim"]
+
+    def __len__(self) -> int:
+        return self.meta["count"] - self.meta["free"]
+
+    def __contains__(self, product_id: str) -> bool:
+        return product_id in self._rows
+
+    # ── Writer ───────────────────────────────────────────────────────────────
+
+    def upsert(self, ids: list[str], vectors: np.ndarray):
+        """Insert or overwrite rows; vectors must already be L2-normalised."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.shape != (len(ids), self.dim):
+            raise ValueError(f"Expected vectors of shape ({len(ids)}, {self.dim}), got {vectors.shape}")
+        new = sum(1 for pid in set(ids) if pid not in self._rows)
+        self._reserve(self.meta["count"] + new - min(new, len(self._free)))
+        for pid, vector in zip(ids, vectors):
+            row = self._rows.get(pid)
+            if row is None:
+                row = self._free.pop() if self._free else self._next_row()
+                self._rows[pid] = row
+            # vector before id: a concurrent reader sees either the old row or the whole new one
+            self._vectors[row] = vector
+            self._ids[row] = pid.encode()
+
+    def remove(self, ids: list[str]) -> int:
+        removed = 0
+        for pid in ids:
+            row = self._rows.pop(pid, None)
+            if row is None:
+                continue
+            self._ids[row] = b""
+            self._vectors[row] = 0.0
+            self._free.append(row)
+            removed += 1
+        return removed
+
+    def _next_row(self) -> int:
+        row = self.meta["count"]
+        self.meta["count"] += 1
+        return row
+
+    def _reserve(self, count: int):
+        capacity = self.meta["capacity"]
+        if count <= capacity:
+            return
+        while capacity < count:
+            capacity *= 2
+        # Copy into a larger next generation; rows keep their positions, so _rows/_free stay valid
+        old, used = self.meta, self.meta["count"]
+        vectors, ids = self._vectors[:used], self._ids[:used]
+        meta = self._new_files(self.path, old["embedder"], old["dim"], capacity, old["generation"] + 1)
+        meta["count"] = used
+        rows, free = self._rows, self._free
+        self._load(meta)
+        self._vectors[:used] = vectors
+        self._ids[:used] = ids
+        self._rows, self._free = rows, free
+        self._stale_files += [old["vectors"], old["ids"]]
+
+    def commit(self):
+        """Flush rows and publish meta.json atomically; readers remap on their next search."""
+        self.meta["free"] = len(self._free)
+        self._vectors.flush()
+        self._ids.flush()
+        tmp = os.path.join(self.path, f"{META_FILE}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, os.path.join(self.path, META_FILE))
+        self._meta_mtime = os.stat(os.path.join(self.path, META_FILE)).st_mtime_ns
+        for name in self._stale_files:
+            try:
+                os.remove(os.path.join(self.path, name))
+            except OSError:
+                pass   # still mapped elsewhere (Windows) or already gone
+        self._stale_files = []
+
+    def discard(self):
+        """Drop an uncommitted generation: unlink the files this writer made that meta.json does not use."""
+        published = self._read_meta(self.path) or {}
+        keep = {published.get("vectors"), published.get("ids")}
+        names = [self.meta["vectors"], self.meta["ids"], *self._stale_files]
+        self._vectors = self._ids = None
+        for name in names:
+            if name in keep:
+                continue
+            try:
+                os.remove(os.path.join(self.path, name))
+            except OSError:
+                pass
+        self._stale_files = []
+
+    # ── Search ───────────────────────────────────────────────────────────────
+
+    def search(self, query: np.ndarray, k: int = 5) -> list[tuple[str, float]]:
+        """Top-k (product_id, cosine score), best first."""
+        return self.search_many(np.asarray(query, dtype=np.float32)[None, :], k)[0]
+
+    def search_many(self, queries: np.ndarray, k: int = 5) -> list[list[tuple[str, float]]]:
+        """Top-k for a batch of queries; rows are scored QUERY_CHUNK queries per matmul."""
+        count = self.meta["count"]
+        queries = np.asarray(queries, dtype=np.float32)
+        if count == 0 or k <= 0:
+            return [[] for _ in range(len(queries))]
+        vectors, ids = self._vectors[:count], self._ids[:count]
+        # Free rows score 0 and are dropped afterwards, so over-fetch by the number of them
+        take = min(count, k + self.meta["free"])
+        results = []
+        for start in range(0, len(queries), QUERY_CHUNK):
+            scores = queries[start:start + QUERY_CHUNK] @ vectors.T
+            if take < count:
+                top = np.argpartition(-scores, take - 1, axis=1)[:, :take]
+            else:
+                top = np.broadcast_to(np.arange(count), scores.shape)
+            for row_scores, candidates in zip(scores, top):
+                ranked = candidates[np.argsort(-row_scores[candidates], kind="stable")]
+                hits = [(ids[i].decode(), float(row_scores[i])) for i in ranked if ids[i]]
+                results.append(hits[:k])
+        return results
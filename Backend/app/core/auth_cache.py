@@ -0,0 +1,72 @@
+"""
+In-process structures for the auth hot path.
+TokenCache:  bounded LRU of verified access-token claims, keyed by SHA-256 of the token
+             so raw bearer tokens are never held in memory longer than the request.
+BloomFilter: local pre-check for the Redis revocation denylist — a miss means "definitely
+             not revoked" and costs no network round trip.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+def token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+class TokenCache:
+    def __init__(self, max_size: int = 10_000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        key = token_digest(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        exp, claims = entry
+        if exp <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return claims
+
+    def put(self, token: str, claims: Dict[str, Any]):
+        exp = claims.get("exp")
+        if not exp or self.max_size <= 0:
+            return
+        key = token_digest(token)
+        self._entries[key] = (float(exp), claims)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class BloomFilter:
+    """Fixed-size bloom filter (double hashing over one SHA-256)."""
+
+    def __init__(self, size_bits: int = 1 << 20, hashes: int = 7):
+        self.size_bits = size_bits
+        self.hashes = hashes
+        self._bits = bytearray(size_bits // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.sha256(item.encode()).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        return ((h1 + i * h2) % self.size_bits for i in range(self.hashes))
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
@@ -0,0 +1,169 @@
+"""
+Response compression.
+- CompressionMiddleware compresses complete (non-streamed) responses whose content type is in
+  COMPRESSIBLE_TYPES and whose body is at least COMPRESSION_MIN_BYTES, with the encoding from
+  COMPRESSION_ENCODINGS the client accepts first. zstd and br need the optional zstandard and
+  brotli packages; without them those encodings are skipped and gzip (stdlib) is used.
+- Responses that already carry Content-Encoding pass through untouched, so cached bodies can be
+  compressed once with precompress() and served by variant_response() on every hit.
+On-the-fly compression uses fast levels; precompress() uses the strongest levels since it runs
+once per cache fill (off the event loop).
+"""
+
+import asyncio
+import gzip
+from collections import Counter
+from functools import lru_cache
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:   # optional: pip install brotli
+    brotli = None
+try:
+    import zstandard
+except ImportError:   # optional: pip install zstandard
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json", "application/problem+json", "application/javascript", "application/xml",
+    "image/svg+xml", "text/",
+)
+# Bodies this large are compressed in a thread so the event loop keeps serving
+_OFFLOAD_BYTES = 256 * 1024
+
+ENCODERS = {"gzip": lambda body, level: gzip.compress(body, compresslevel=level, mtime=0)}
+if brotli is not None:
+    ENCODERS["br"] = lambda body, level: brotli.compress(body, quality=level)
+if zstandard is not None:
+    ENCODERS["zstd"] = lambda body, level: zstandard.ZstdCompressor(level=level).compress(body)
+# encoding -> (per-response level, precompress level)
+LEVELS = {"gzip": (6, 9), "br": (4, 11), "zstd": (3, 19)}
+
+# responses / bytes_in / bytes_out per encoding, exported by StatsExporter
+COMPRESSION_STATS: Counter = Counter()
+
+
+def enabled_encodings() -> tuple[str, ...]:
+    """COMPRESSION_ENCODINGS that are installed, in preference order."""
+    return tuple(name for name in (e.strip() for e in settings.COMPRESSION_ENCODINGS.split(",")) if name in ENCODERS)
+
+
+@lru_cache(maxsize=256)
+def negotiate(accept_encoding: str, available: tuple[str, ...]) -> str | None:
+    """The first of `available` with the highest q-value in Accept-Encoding; None for identity."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compressible(headers: Headers, status: int) -> bool:
+    if status < 200 or status in (204, 206, 304) or "content-encoding" in headers:
+        return False
+    if "no-transform" in headers.get("cache-control", ""):
+        return False
+    media_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+    return media_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def precompress(body: bytes) -> dict[str, bytes]:
+    """{"identity": body, <encoding>: compressed, ...} for every enabled encoding. CPU heavy: call via to_thread."""
+    variants = {"identity": body}
+    if len(body) >= settings.COMPRESSION_MIN_BYTES:
+        for encoding in enabled_encodings():
+            variants[encoding] = ENCODERS[encoding](body, LEVELS[encoding][1])
+    return variants
+
+
+def variant_response(variants: dict[str, bytes], accept_encoding: str, media_type: str = "application/json") -> Response:
+    """Serve the best precompressed variant the client accepts (identity otherwise)."""
+    encoding = negotiate(accept_encoding, tuple(e for e in enabled_encodings() if e in variants))
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(variants[encoding or "identity"], media_type=media_type, headers=headers)
+
+
+async def _compress(encoding: str, body: bytes) -> bytes:
+    level = LEVELS[encoding][0]
+    if len(body) >= _OFFLOAD_BYTES:
+        return await asyncio.to_thread(ENCODERS[encoding], body, level)
+    return ENCODERS[encoding](body, level)
+
+
+class CompressionMiddleware:
+    """Pure ASGI. Holds back http.response.start until the first body chunk shows whether the
+    response is complete; streamed responses (more_body) are passed through uncompressed."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = next((value for key, value in scope["headers"] if key == b"accept-encoding"), b"")
+        encoding = negotiate(accept.decode("latin-1"), enabled_encodings()) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        pending = None
+
+        async def send_compressed(message):
+            nonlocal pending
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if compressible(headers, message["status"]):
+                    MutableHeaders(scope=message).add_vary_header("Accept-Encoding")
+                    pending = message
+                    return
+                await send(message)
+                return
+            if pending is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            start, pending = pending, None
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < settings.COMPRESSION_MIN_BYTES:
+                await send(start)
+                await send(message)
+                return
+            compressed = await _compress(encoding, body)
+            if len(compressed) >= len(body):
+                await send(start)
+                await send(message)
+                return
+            headers = MutableHeaders(scope=start)
+            headers["content-encoding"] = encoding
+            headers["content-length"] = str(len(compressed))
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["etag"] = f"W/{etag}"   # different bytes than the identity body
+            COMPRESSION_STATS[f"{encoding}_responses"] += 1
+            COMPRESSION_STATS[f"{encoding}_bytes_in"] += len(body)
+            COMPRESSION_STATS[f"{encoding}_bytes_out"] += len(compressed)
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
@@ -5,6 +5,53 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     MONGO_URL: str = Field(..., env="MONGO_URL")
     DB_NAME: str = Field(..., env="DB_NAME")
+    # Motor pool, per worker process: size it so workers x MONGO_MAX_POOL_SIZE stays under the server's limit
+    MONGO_MAX_POOL_SIZE: int = Field(100, env="MONGO_MAX_POOL_SIZE")
+    MONGO_MIN_POOL_SIZE: int = Field(0, env="MONGO_MIN_POOL_SIZE")
+    MONGO_MAX_IDLE_TIME_MS: int = Field(300_000, env="MONGO_MAX_IDLE_TIME_MS")
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = Field(5_000, env="MONGO_WAIT_QUEUE_TIMEOUT_MS")
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = Field(10_000, env="MONGO_SERVER_SELECTION_TIMEOUT_MS")
+    # Comma-separated wire compressors, e.g. "zstd,snappy,zlib" (zstd/snappy need pymongo[zstd,snappy])
+    MONGO_COMPRESSORS: str = Field("", env="MONGO_COMPRESSORS")
+    # Read preference for dashboard/facet reads that tolerate replica lag; checkout paths stay on primary
+    MONGO_ANALYTICS_READ_PREFERENCE: str = Field("secondaryPreferred", env="MONGO_ANALYTICS_READ_PREFERENCE")
+    # Explain and log commands slower than this (0 = off); see app/services/slow_command_service.py
+    MONGO_SLOW_COMMAND_MS: int = Field(200, env="MONGO_SLOW_COMMAND_MS")
+    # Apply pending schema migrations at startup; turn off in production and run `python migrate.py` on deploy
+    AUTO_MIGRATE: bool = Field(True, env="AUTO_MIGRATE")
+
+    # Production server (server.py with ENVIRONMENT=production): 0 workers = one per available CPU
+    SERVER_PORT: int = Field(8000, env="SERVER_PORT")
+    WEB_CONCURRENCY: int = Field(0, env="WEB_CONCURRENCY")
+    # Recycle a worker after this many requests (0 = never); jitter staggers the restarts
+    SERVER_MAX_REQUESTS: int = Field(0, env="SERVER_MAX_REQUESTS")
+    SERVER_MAX_REQUESTS_JITTER: int = Field(0, env="SERVER_MAX_REQUESTS_JITTER")
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: int = Field(30, env="SERVER_GRACEFUL_TIMEOUT_SECONDS")
+
+    # Tracing: "none" (request ids only), "otlp" (OTEL_EXPORTER_OTLP_ENDPOINT) or "json" (TRACING_JSON_PATH)
+    TRACING_EXPORTER: str = Field("none", env="TRACING_EXPORTER")
+    TRACING_JSON_PATH: str = Field("data/traces.jsonl", env="TRACING_JSON_PATH")
+    TRACING_SAMPLE_RATIO: float = Field(1.0, env="TRACING_SAMPLE_RATIO")
+    TRACING_SERVICE_NAME: str = Field("anozon-backend", env="TRACING_SERVICE_NAME")
+
+    # Logging: "json" lines or "text"; records are written by a background thread from a queue of LOG_QUEUE_SIZE
+    LOG_LEVEL: str = Field("INFO", env="LOG_LEVEL")
+    LOG_FORMAT: str = Field("json", env="LOG_FORMAT")
+    LOG_QUEUE_SIZE: int = Field(10_000, env="LOG_QUEUE_SIZE")
+    # Keep only a fraction of DEBUG/INFO records per logger prefix, e.g. "app.services.product_service=0.1"
+    LOG_SAMPLING: str = Field("", env="LOG_SAMPLING")
+
+    # Profiling (app/core/profiling.py): fraction of requests run under cProfile, kept if slower than PROFILE_SLOW_MS
+    PROFILE_SAMPLE_RATE: float = Field(0.0, env="PROFILE_SAMPLE_RATE")
+    PROFILE_SLOW_MS: int = Field(1000, env="PROFILE_SLOW_MS")
+    PROFILE_BUFFER_SIZE: int = Field(20, env="PROFILE_BUFFER_SIZE")
+    PROFILE_TOKEN_TTL_MINUTES: int = Field(10, env="PROFILE_TOKEN_TTL_MINUTES")
+
+    # Response compression (app/core/compression.py), in preference order; zstd/br need the zstandard/brotli
+    # packages and are skipped without them. Empty disables compression.
+    COMPRESSION_ENCODINGS: str = Field("zstd,br,gzip", env="COMPRESSION_ENCODINGS")
+    COMPRESSION_MIN_BYTES: int = Field(1024, env="COMPRESSION_MIN_BYTES")
+
     ALLOWED_ORIGIN: str = Field("http://localhost:3000", env="ALLOWED_ORIGIN")
     PREVIEW_ORIGIN: str = Field("http://localhost:3000", env="PREVIEW_ORIGIN")
 
@@ -21,6 +68,50 @@ class Settings(BaseSettings):
     
     OLLAMA_API_URL: str = Field(..., env="OLLAMA_API_URL")
     OLLAMA_URL: str = Field(..., env="OLLAMA_URL")
+    OLLAMA_MODEL: str = Field("qwen3-coder:480b-cloud", env="OLLAMA_MODEL")
+    OLLAMA_TIMEOUT_SECONDS: float = Field(60.0, env="OLLAMA_TIMEOUT_SECONDS")
+    # Upstream calls in flight per worker; extra requests queue up to OLLAMA_QUEUE_TIMEOUT_SECONDS, then 503
+    OLLAMA_MAX_CONCURRENCY: int = Field(4, env="OLLAMA_MAX_CONCURRENCY")
+    OLLAMA_QUEUE_TIMEOUT_SECONDS: float = Field(10.0, env="OLLAMA_QUEUE_TIMEOUT_SECONDS")
+    OLLAMA_CACHE_TTL_SECONDS: int = Field(3600, env="OLLAMA_CACHE_TTL_SECONDS")
+
+    # Product assistant: "ollama" embeds with OLLAMA_EMBED_MODEL, "hashing" needs no model
+    AI_EMBEDDER: str = Field("ollama", env="AI_EMBEDDER")
+    OLLAMA_EMBED_MODEL: str = Field("nomic-embed-text", env="OLLAMA_EMBED_MODEL")
+    AI_INDEX_DIR: str = Field("data/ai_index", env="AI_INDEX_DIR")
+    AI_INDEX_SYNC_INTERVAL_SECONDS: float = Field(10.0, env="AI_INDEX_SYNC_INTERVAL_SECONDS")
+
+    # bcrypt thread pool size (0 = min(4, CPU count))
+    PASSWORD_HASH_WORKERS: int = Field(0, env="PASSWORD_HASH_WORKERS")
+
+    # Auth hot path: verified-JWT LRU size and denylist bloom-filter refresh interval
+    AUTH_TOKEN_CACHE_SIZE: int = Field(10000, env="AUTH_TOKEN_CACHE_SIZE")
+    DENYLIST_SYNC_INTERVAL_SECONDS: float = Field(5.0, env="DENYLIST_SYNC_INTERVAL_SECONDS")
+
+    # Redis rate limiter. Fails open when Redis is down. Only trust X-Forwarded-For behind a proxy you control.
+    RATE_LIMIT_ENABLED: bool = Field(True, env="RATE_LIMIT_ENABLED")
+    RATE_LIMIT_TRUST_FORWARDED: bool = Field(False, env="RATE_LIMIT_TRUST_FORWARDED")
+
+    # Background email delivery ("brevo", or "fake" to log nothing and send nothing)
+    EMAIL_PROVIDER: str = Field("brevo", env="EMAIL_PROVIDER")
+    EMAIL_WORKERS: int = Field(2, env="EMAIL_WORKERS")
+    EMAIL_BATCH_SIZE: int = Field(50, env="EMAIL_BATCH_SIZE")
+    EMAIL_MAX_ATTEMPTS: int = Field(5, env="EMAIL_MAX_ATTEMPTS")
+    EMAIL_RETRY_BASE_SECONDS: float = Field(2.0, env="EMAIL_RETRY_BASE_SECONDS")
+    EMAIL_DEDUPE_TTL_SECONDS: int = Field(300, env="EMAIL_DEDUPE_TTL_SECONDS")
+
+    # Write-behind product counters (view_count, product_likes)
+    COUNTER_FLUSH_INTERVAL_SECONDS: float = Field(5.0, env="COUNTER_FLUSH_INTERVAL_SECONDS")
+
+    # Audit log writer: one insert_many per AUDIT_BATCH_SIZE events or AUDIT_FLUSH_INTERVAL_MS
+    AUDIT_BATCH_SIZE: int = Field(100, env="AUDIT_BATCH_SIZE")
+    AUDIT_FLUSH_INTERVAL_MS: int = Field(250, env="AUDIT_FLUSH_INTERVAL_MS")
+    AUDIT_USER_CACHE_TTL_SECONDS: float = Field(60.0, env="AUDIT_USER_CACHE_TTL_SECONDS")
+    # Logs older than AUDIT_RETENTION_DAYS move to monthly gzip JSONL files (0 keeps everything in Mongo).
+    # Opt-in: archival also needs AUDIT_ARCHIVE_DIR on persistent storage shared by every instance.
+    AUDIT_RETENTION_DAYS: int = Field(0, env="AUDIT_RETENTION_DAYS")
+    AUDIT_ARCHIVE_DIR: str = Field("", env="AUDIT_ARCHIVE_DIR")
+    AUDIT_ARCHIVE_INTERVAL_HOURS: float = Field(24.0, env="AUDIT_ARCHIVE_INTERVAL_HOURS")
 
     class Config:
         env_file = ".env"
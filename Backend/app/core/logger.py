@@ -1,25 +1,158 @@
+"""
+Logging.
+Every module logs through logging.getLogger(__name__), i.e. a child of the "app" logger;
+configure_logging() (app lifespan) sets that logger up once per worker:
+- handlers only put records on a bounded queue; a QueueListener thread formats and writes them,
+  so a stdout that applies backpressure never blocks the event loop (a full queue drops records)
+- LOG_FORMAT=json writes one JSON object per line (with request_id); "text" keeps the old layout
+- LOG_SAMPLING keeps a fraction of DEBUG/INFO records for noisy modules; warnings always pass
+- uvicorn's own loggers (startup, errors, access log) go through the same queue
+Log with %-style args, logger.info("Cart updated for %s", user_id): the message is only built
+for records that pass the level and sampling checks.
+"""
+
+import copy
+import json
 import logging
+import queue
+import random
 import sys
+from collections import Counter
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+import app.core.tracing  # noqa: F401  (installs the record factory that sets request_id)
+from app.core.config import settings
+
+APP_LOGGER = "app"
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.access")
+
+TEXT_FORMAT = "%(asctime)s | %(levelname)s | %(request_id)s | %(module)s:%(funcName)s:%(lineno)d | %(message)s"
+TEXT_DATEFMT = "%Y-%m-%d %H:%M:%S"
+
+# dropped: queue full; sampled_out: skipped by LOG_SAMPLING (exported on /metrics)
+LOG_STATS = Counter()
+
+_listener: QueueListener | None = None
+_uvicorn_handlers: dict[str, list[logging.Handler]] = {}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+            "where": f"{record.module}:{record.funcName}:{record.lineno}",
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps `rate` of the DEBUG/INFO records of a logger, by longest matching name prefix."""
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._by_logger: dict[str, float] = {}
+
+    def _rate_for(self, name: str) -> float:
+        matches = [prefix for prefix in self.rates if name == prefix or name.startswith(prefix + ".")]
+        return self.rates[max(matches, key=len)] if matches else 1.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        rate = self._by_logger.get(record.name)
+        if rate is None:
+            rate = self._by_logger[record.name] = self._rate_for(record.name)
+        if rate >= 1 or random.random() < rate:
+            return True
+        LOG_STATS["sampled_out"] += 1
+        return False
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Resolves the message on the calling thread (args may change later); everything else runs on the listener."""
+
+    _tracebacks = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = self._tracebacks.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_STATS["dropped"] += 1
+
+
+def parse_sampling(spec: str) -> dict[str, float]:
+    """Parse LOG_SAMPLING, e.g. "app.services.product_service=0.1,app.repo.cart_helpers=0.25"."""
+    rates = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        name, sep, rate = entry.partition("=")
+        try:
+            value = float(rate)
+        except ValueError:
+            value = -1.0
+        if not sep or not name.strip() or not 0 <= value <= 1:
+            raise ValueError(f"LOG_SAMPLING entry {entry!r} must look like logger.name=0.1")
+        rates[name.strip()] = value
+    return rates
+
+
+def _formatter() -> logging.Formatter:
+    if settings.LOG_FORMAT == "text":
+        return logging.Formatter(fmt=TEXT_FORMAT, datefmt=TEXT_DATEFMT)
+    return JsonFormatter()
 
-# Create a custom logger
-logger = logging.getLogger("anozon_logger")
 
-# Set level (DEBUG for dev, INFO for prod)
-logger.setLevel(logging.DEBUG)
+def configure_logging(stream=None):
+    """Start the queue listener and route the app and uvicorn loggers through it (once per process)."""
+    global _listener
+    if _listener is not None:
+        return
 
-# Create a handler that writes to the console (Standard Output)
-handler = logging.StreamHandler(sys.stdout)
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(_formatter())
+    handler = NonBlockingQueueHandler(queue.Queue(settings.LOG_QUEUE_SIZE))
+    handler.addFilter(SamplingFilter(parse_sampling(settings.LOG_SAMPLING)))
 
-# Define the format (JSON-like structure is best for Cloud)
-# DevOps Tip: "correlation_id" allows you to trace one user request across multiple services
-formatter = logging.Formatter(
-    fmt='%(asctime)s | %(levelname)s | %(module)s:%(funcName)s:%(lineno)d | %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+    # Still propagates, so a root handler (pytest's caplog, migrate.py's basicConfig) sees app records too
+    app_logger = logging.getLogger(APP_LOGGER)
+    app_logger.setLevel(settings.LOG_LEVEL.upper())
+    app_logger.addHandler(handler)
+    for name in UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        _uvicorn_handlers[name] = uvicorn_logger.handlers
+        uvicorn_logger.handlers = [handler]
 
-handler.setFormatter(formatter)
-logger.addHandler(handler)
+    _listener = QueueListener(handler.queue, output, respect_handler_level=True)
+    _listener.start()
 
-# Prevent duplicate logs from uvicorn
-logger.propagate = True
 
+def shutdown_logging():
+    """Write out what is still queued and give uvicorn its handlers back."""
+    global _listener
+    if _listener is None:
+        return
+    app_logger = logging.getLogger(APP_LOGGER)
+    for handler in [h for h in app_logger.handlers if isinstance(h, NonBlockingQueueHandler)]:
+        app_logger.removeHandler(handler)
+    for name, handlers in _uvicorn_handlers.items():
+        logging.getLogger(name).handlers = handlers
+    _uvicorn_handlers.clear()
+    _listener.stop()
+    _listener = None
@@ -0,0 +1,196 @@
+"""
+Prometheus metrics.
+- MetricsMiddleware: request count / latency per route *template* (e.g. /products/{product_id}),
+  so raw URLs never become label values; requests that match no route share "unmatched"
+- Mongo command latency comes from a pymongo CommandListener (app/db/mongodb.py), Redis command
+  latency from InstrumentedRedis (app/db/redis.py)
+- record_cache() counts hits/misses for the in-process and Redis caches
+- LoopLagMonitor samples how late the event loop wakes up
+- StatsExporter mirrors the plain Counter stats kept by individual modules into Prometheus
+  counters and gauges, periodically in every worker and again at scrape time
+With PROMETHEUS_MULTIPROC_DIR set (multi-worker server) every metric, module stats included, is
+summed across workers (gauges over live workers only).
+"""
+
+import asyncio
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+from starlette.requests import Request
+from starlette.responses import Response
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests", ["method", "route", "status"])
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency", ["method", "route"])
+MONGO_LATENCY = Histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency", ["collection", "command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+MONGO_FAILURES = Counter("mongo_command_failures_total", "Failed MongoDB commands", ["collection", "command"])
+REDIS_LATENCY = Histogram(
+    "redis_command_duration_seconds", "Redis command latency", ["command"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5),
+)
+CACHE_LOOKUPS = Counter("cache_lookups_total", "Cache lookups", ["cache", "result"])
+LOOP_LAG = Histogram(
+    "event_loop_lag_seconds", "How late the event loop ran a scheduled wake-up",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware; the router stores the matched route in scope["route"]."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or UNMATCHED_ROUTE
+            HTTP_LATENCY.labels(scope["method"], template).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(scope["method"], template, str(status)).inc()
+
+
+class LoopLagMonitor:
+    _task: asyncio.Task | None = None
+
+    @staticmethod
+    async def _sample_loop(interval: float):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            LOOP_LAG.observe(max(0.0, loop.time() - expected))
+
+    @staticmethod
+    def start(interval: float = 0.5):
+        if LoopLagMonitor._task is None or LoopLagMonitor._task.done():
+            LoopLagMonitor._task = asyncio.create_task(LoopLagMonitor._sample_loop(interval))
+
+    @staticmethod
+    async def stop():
+        task, LoopLagMonitor._task = LoopLagMonitor._task, None
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+
+class StatsExporter:
+    """
+    Copies the module-level Counter stats into real metrics. They are created on first sight
+    (names depend on what has been counted so far); counters are advanced by the change since
+    the last sync, gauges are set.
+    """
+
+    # Keys that go up and down
+    OLLAMA_GAUGES = {"in_flight", "waiting"}
+    POOL_GAUGES = {"checked_out", "connections_open"}
+
+    _metrics: dict[str, Counter | Gauge] = {}
+    _synced: dict[tuple[str, str], float] = {}   # (metric, label value) -> counter value already exported
+    _task: asyncio.Task | None = None
+
+    @staticmethod
+    def _sources():
+        """(name, help, is_gauge, label, {label value or "": value}) per metric."""
+        # Imported here: these modules import app.core.metrics themselves
+        from app.ai.ollama_client import STATS as OLLAMA_STATS
+        from app.core.compression import COMPRESSION_STATS
+        from app.core.logger import LOG_STATS
+        from app.db.mongodb import POOL_STATS
+        from app.services.rate_limit_service import FAIL_OPEN, THROTTLED
+
+        yield "rate_limit_throttled", "Requests rejected with 429", False, "scope", dict(THROTTLED)
+        yield "rate_limit_fail_open", "Checks allowed because Redis was down", False, "scope", dict(FAIL_OPEN)
+        for prefix, stats, gauges in (
+            ("ollama", OLLAMA_STATS, StatsExporter.OLLAMA_GAUGES),
+            ("mongo_pool", POOL_STATS, StatsExporter.POOL_GAUGES),
+            ("log_records", LOG_STATS, set()),
+            ("compression", COMPRESSION_STATS, set()),
+        ):
+            for key, value in sorted(stats.items()):
+                yield f"{prefix}_{key}", f"{prefix} {key}", key in gauges, None, {"": value}
+
+    @staticmethod
+    def _metric(name: str, documentation: str, gauge: bool, label: str | None):
+        metric = StatsExporter._metrics.get(name)
+        if metric is None:
+            labels = [label] if label else []
+            metric = (Gauge(name, documentation, labels, multiprocess_mode="livesum") if gauge
+                      else Counter(name, documentation, labels))
+            StatsExporter._metrics[name] = metric
+        return metric
+
+    @staticmethod
+    def sync():
+        for name, documentation, gauge, label, values in StatsExporter._sources():
+            metric = StatsExporter._metric(name, documentation, gauge, label)
+            for label_value, value in values.items():
+                child = metric.labels(label_value) if label else metric
+                if gauge:
+                    child.set(value)
+                    continue
+                delta = value - StatsExporter._synced.get((name, label_value), 0)
+                if delta > 0:
+                    child.inc(delta)
+                StatsExporter._synced[(name, label_value)] = value
+
+    @staticmethod
+    async def _sync_loop(interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            StatsExporter.sync()
+
+    @staticmethod
+    def start(interval: float = 5.0):
+        if StatsExporter._task is None or StatsExporter._task.done():
+            StatsExporter._task = asyncio.create_task(StatsExporter._sync_loop(interval))
+
+    @staticmethod
+    async def stop():
+        task, StatsExporter._task = StatsExporter._task, None
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        StatsExporter.sync()   # last values into this worker's multiprocess files
+
+
+def metrics_response(request: Request) -> Response:
+    """GET /metrics."""
+    StatsExporter.sync()
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
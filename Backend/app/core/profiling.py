@@ -0,0 +1,138 @@
+"""
+Request profiling for super admins.
+- ProfilingMiddleware runs cProfile for a request when it carries a valid X-Debug-Profile token
+  (minted by POST /super-admin/debug/profile-token), or for a PROFILE_SAMPLE_RATE fraction of
+  requests. Sampled profiles are kept only if the request took PROFILE_SLOW_MS or longer.
+- Profiles live in a per-worker ring buffer of PROFILE_BUFFER_SIZE entries and can be downloaded
+  as text (top functions by cumulative time) or as a .prof file for snakeviz / pstats.
+- Any request slower than PROFILE_SLOW_MS is logged, profiled or not.
+cProfile sees the whole event-loop thread, so a profile also contains whatever other requests
+ran concurrently; one profile runs at a time per worker.
+"""
+
+import cProfile
+import io
+import logging
+import marshal
+import pstats
+import random
+import time
+import uuid
+from collections import deque
+from datetime import timedelta
+
+from jose import JWTError, jwt
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.core.time_utils import utc_now
+from app.core.tracing import current_request_id
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-debug-profile"
+_TOKEN_AUDIENCE = "Anozon-debug"
+_TOKEN_SCOPE = "debug:profile"
+
+PROFILES: deque = deque(maxlen=settings.PROFILE_BUFFER_SIZE)
+_active = False
+
+
+def create_profile_token(admin_id: str) -> str:
+    """Short-lived token for the X-Debug-Profile header; not accepted as an access token."""
+    return create_access_token(
+        {"sub": admin_id, "scope": _TOKEN_SCOPE, "iss": "Anozon", "aud": _TOKEN_AUDIENCE, "iat": utc_now()},
+        timedelta(minutes=settings.PROFILE_TOKEN_TTL_MINUTES),
+    )
+
+
+def verify_profile_token(token: str) -> bool:
+    try:
+        claims = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM],
+                            audience=_TOKEN_AUDIENCE, issuer="Anozon")
+    except JWTError:
+        return False
+    return claims.get("scope") == _TOKEN_SCOPE
+
+
+def profile_summaries() -> list[dict]:
+    """Newest first, without the profile data."""
+    return [{key: value for key, value in entry.items() if key != "profile"} for entry in reversed(PROFILES)]
+
+
+def find_profile(profile_id: str) -> dict | None:
+    return next((entry for entry in PROFILES if entry["id"] == profile_id), None)
+
+
+def profile_text(entry: dict, limit: int = 40) -> str:
+    stream = io.StringIO()
+    # Stats(profiler) would take the profiler's table and leave it empty; work on a copy instead
+    stats = pstats.Stats(stream=stream)
+    stats.stats = dict(entry["profile"])
+    stats.get_top_level_stats()
+    stats.sort_stats("cumulative").print_stats(limit)
+    return stream.getvalue()
+
+
+def profile_dump(entry: dict) -> bytes:
+    """pstats file contents (what Profile.dump_stats writes)."""
+    return marshal.dumps(entry["profile"])
+
+
+class ProfilingMiddleware:
+    """Pure ASGI; sits inside TracingMiddleware so profiles carry the request id."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _active
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = next((value for key, value in scope["headers"] if key == PROFILE_HEADER.encode()), None)
+        requested = token is not None and verify_profile_token(token.decode("latin-1"))
+        sampled = not requested and settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE
+        profiler = cProfile.Profile() if (requested or sampled) and not _active else None
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        if profiler is not None:
+            try:
+                profiler.enable()
+                _active = True
+            except ValueError:   # another profiler (debugger, coverage) owns the thread
+                profiler = None
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                _active = False
+            duration_ms = (time.perf_counter() - started) * 1000
+            route = getattr(scope.get("route"), "path", None) or scope["path"]
+            slow = duration_ms >= settings.PROFILE_SLOW_MS
+            if slow:
+                logger.warning("Slow request %s %s took %.0f ms (status %s)", scope["method"], route, duration_ms, status)
+            if profiler is not None and (requested or slow):
+                profiler.create_stats()
+                PROFILES.append({
+                    "id": uuid.uuid4().hex[:12],
+                    "created_at": utc_now(),
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": route,
+                    "status": status,
+                    "duration_ms": round(duration_ms, 1),
+                    "reason": "requested" if requested else "slow",
+                    "request_id": current_request_id(),
+                    "profile": profiler.stats,
+                })
@@ -1,12 +1,21 @@
+import asyncio
+import hashlib
+import hmac
+import os
+import secrets
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
 from typing import Optional, Dict, Any
 from jose import jwt, JWTError
 from passlib.context import CryptContext
+from app.core.auth_cache import TokenCache
 from app.core.config import settings
+from app.core.metrics import record_cache
 from app.core.time_utils import utc_now
 import logging
 
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -16,19 +25,64 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+
+# bcrypt costs ~100-300 ms of CPU per call. Run it on a bounded pool (bcrypt releases the GIL)
+# so a login burst queues behind PASSWORD_HASH_WORKERS threads instead of stalling the event loop.
+_hash_pool: Optional[ThreadPoolExecutor] = None
+
+def _get_hash_pool() -> ThreadPoolExecutor:
+    global _hash_pool
+    if _hash_pool is None:
+        workers = settings.PASSWORD_HASH_WORKERS or min(4, os.cpu_count() or 1)
+        _hash_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+    return _hash_pool
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_get_hash_pool(), hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await asyncio.get_running_loop().run_in_executor(_get_hash_pool(), verify_password, plain_password, hashed_password)
+
+def shutdown_hash_pool():
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=False, cancel_futures=True)
+        _hash_pool = None
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = utc_now() + (expires_delta or timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
+    to_encode.setdefault("jti", uuid.uuid4().hex)  # lets a single token be revoked via the denylist
     encoded = jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
     return encoded
 
-def create_refresh_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
-    to_encode = data.copy()
-    expire = utc_now() + (expires_delta or timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS))
-    to_encode.update({"exp": expire})
-    encoded = jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
-    return encoded
+# Refresh tokens are opaque "<session_id>.<secret>" strings. The secret is 256 bits of
+# randomness, so a keyed SHA-256 (not a slow KDF) is enough to store it safely.
+# Session ids are "<user_id>:<random>", so a refresh knows whose session index to touch
+# without reading the session first (sessions from before this have no owner prefix).
+def create_refresh_token(session_id: Optional[str] = None, user_id: Optional[str] = None) -> str:
+    """New refresh token; pass the current session_id to rotate within the same device session,
+    or the owner's user_id to start a new one."""
+    if not session_id:
+        session_id = secrets.token_urlsafe(16)
+        if user_id:
+            session_id = f"{user_id}:{session_id}"
+    return f"{session_id}.{secrets.token_urlsafe(32)}"
+
+def session_owner(session_id: str) -> Optional[str]:
+    """User id a session id was issued to; None for ids without the owner prefix."""
+    owner, sep, _ = session_id.partition(":")
+    return owner if sep and owner else None
+
+def split_refresh_token(token: str) -> Optional[tuple[str, str]]:
+    session_id, sep, secret = (token or "").partition(".")
+    if not sep or not session_id or not secret:
+        return None
+    return session_id, secret
+
+def refresh_token_digest(secret: str) -> str:
+    return hmac.new(settings.JWT_SECRET.encode(), secret.encode(), hashlib.sha256).hexdigest()
 
 def verify_token(token: str) -> Optional[Dict[str, Any]]:
     try:
@@ -42,8 +96,19 @@ def verify_token(token: str) -> Optional[Dict[str, Any]]:
         return payload
     
     except JWTError as e:
-        logger.error(f"JWT Verification Failed: {e}")
+        logger.error("JWT Verification Failed: %s", e)
         return None
 
-    
 
+# Verified access-token claims, keyed by the token's SHA-256. Entries drop out at their exp.
+_token_cache = TokenCache(settings.AUTH_TOKEN_CACHE_SIZE)
+
+def verify_token_cached(token: str) -> Optional[Dict[str, Any]]:
+    """verify_token with a bounded LRU in front; failed verifications are never cached."""
+    claims = _token_cache.get(token)
+    record_cache("auth_token", claims is not None)
+    if claims is None:
+        claims = verify_token(token)
+        if claims:
+            _token_cache.put(token, claims)
+    return claims
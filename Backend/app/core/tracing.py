@@ -0,0 +1,164 @@
+"""
+Request ids and OpenTelemetry tracing.
+- TracingMiddleware opens one server span per request and sets request_id_var: an incoming
+  X-Request-ID (if sane), else the trace id, else a random id. It is echoed back as X-Request-ID
+  and an incoming W3C traceparent is honoured.
+- Every log record gets a `request_id` attribute ("-" outside a request) via the record factory.
+- Client spans: Mongo commands (app/db/mongodb.py), Redis commands (app/db/redis.py), Ollama
+  calls (app/ai/ollama_client.py) and email batches (app/services/email_queue.py).
+- TRACING_EXPORTER: "none" (API no-ops, ids still assigned), "otlp" (OTLP/HTTP; endpoint from
+  OTEL_EXPORTER_OTLP_ENDPOINT) or "json" (one span per line in TRACING_JSON_PATH).
+"""
+
+import logging
+import os
+import re
+import threading
+import uuid
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Sequence
+
+from opentelemetry import trace
+from opentelemetry.propagate import extract
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+from opentelemetry.trace import SpanKind, Status, StatusCode
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+tracer = trace.get_tracer("anozon")
+
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+REQUEST_ID_HEADER = "x-request-id"
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+_provider: TracerProvider | None = None
+
+
+def current_request_id() -> str:
+    return request_id_var.get()
+
+
+# ── Log correlation ──────────────────────────────────────────────────────────
+
+_default_record_factory = logging.getLogRecordFactory()
+
+
+def _record_factory(*args, **kwargs):
+    record = _default_record_factory(*args, **kwargs)
+    record.request_id = request_id_var.get()
+    return record
+
+
+logging.setLogRecordFactory(_record_factory)
+
+
+# ── Exporters ────────────────────────────────────────────────────────────────
+
+class JsonFileSpanExporter(SpanExporter):
+    """Appends finished spans as JSON lines. Runs on the batch processor's thread, not the loop."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = "".join(span.to_json(indent=None) + "\n" for span in spans)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+        return SpanExportResult.SUCCESS
+
+
+def _exporter() -> SpanExporter | None:
+    if settings.TRACING_EXPORTER == "json":
+        return JsonFileSpanExporter(settings.TRACING_JSON_PATH)
+    if settings.TRACING_EXPORTER == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter()
+    return None
+
+
+def configure_tracing(exporter: SpanExporter | None = None):
+    """Install the tracer provider once per process (called from the app lifespan)."""
+    global _provider
+    exporter = exporter or _exporter()
+    if _provider is not None or exporter is None:
+        return
+    _provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.TRACING_SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO)),
+    )
+    _provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(_provider)
+    logger.info("Tracing enabled (%s, sample ratio %s)", settings.TRACING_EXPORTER, settings.TRACING_SAMPLE_RATIO)
+
+
+def shutdown_tracing():
+    """Flush buffered spans."""
+    if _provider is not None:
+        _provider.force_flush()
+
+
+def record_error(span, exc: BaseException):
+    span.record_exception(exc)
+    span.set_status(Status(StatusCode.ERROR, str(exc)))
+
+
+# ── Middleware ───────────────────────────────────────────────────────────────
+
+def _server_span(scope, headers: dict):
+    # Newer FastAPI releases open their own server span (honouring traceparent) as soon as a
+    # tracer provider is installed; reuse it rather than starting a second, unrelated trace
+    current = trace.get_current_span()
+    if current.is_recording():
+        return nullcontext(current)
+    return tracer.start_as_current_span(
+        f"{scope['method']} request", context=extract(headers), kind=SpanKind.SERVER,
+        attributes={"http.request.method": scope["method"], "url.path": scope["path"]},
+    )
+
+
+class TracingMiddleware:
+    """Pure ASGI; outermost, so the request span parents everything the request awaits."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        with _server_span(scope, headers) as span:
+            request_id = headers.get(REQUEST_ID_HEADER, "")
+            if not _VALID_REQUEST_ID.match(request_id):
+                trace_id = span.get_span_context().trace_id
+                request_id = format(trace_id, "032x") if trace_id else uuid.uuid4().hex
+            # Not reset on the way out: each request runs in its own task, and Starlette's
+            # ServerErrorMiddleware (outside this one) still needs the id for the 500 handler
+            request_id_var.set(request_id)
+            span.set_attribute("app.request_id", request_id)
+
+            async def send_with_id(message):
+                if message["type"] == "http.response.start":
+                    message.setdefault("headers", [])
+                    message["headers"] = [*message["headers"], (b"x-request-id", request_id.encode())]
+                    span.set_attribute("http.response.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.set_status(Status(StatusCode.ERROR))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_id)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    span.update_name(f"{scope['method']} {route}")
+                    span.set_attribute("http.route", route)
@@ -0,0 +1,23 @@
+"""
+Copies Product.seller_id onto reviews written before it was denormalized, so seller and
+admin review feeds can filter on Reviews.seller_id directly. Safe to re-run.
+Usage (from Backend/): python -m app.db.backfill_review_sellers
+`python migrate.py` applies this once as a schema migration; this script is for manual re-runs.
+"""
+
+import asyncio
+from app.db.mongodb import connect_to_mongo, close_mongo_connection, products_collection, reviews_collection
+from app.repo.review_helpers import backfill_review_seller_ids
+
+
+async def main():
+    await connect_to_mongo()
+    try:
+        result = await backfill_review_seller_ids(reviews_collection(), products_collection())
+        print(f"Backfilled seller_id on {result['reviews']} reviews across {result['products']} products")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
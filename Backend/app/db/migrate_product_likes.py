@@ -0,0 +1,24 @@
+"""
+Moves legacy Product.liked_by arrays into the ProductLikes collection.
+Safe to re-run. Usage (from Backend/): python -m app.db.migrate_product_likes
+`python migrate.py` applies this once as a schema migration; this script is for manual re-runs.
+"""
+
+import asyncio
+from app.db.mongodb import connect_to_mongo, close_mongo_connection, products_collection, product_likes_collection
+from app.repo.product_helpers import migrate_liked_by_arrays
+
+
+async def main():
+    await connect_to_mongo()
+    try:
+        # The unique index must exist before upserting, or concurrent likes could duplicate
+        await product_likes_collection().create_index([("product_id", 1), ("user_id", 1)], unique=True)
+        result = await migrate_liked_by_arrays(products_collection(), product_likes_collection())
+        print(f"Migrated {result['likes']} likes across {result['products']} products")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,199 @@
+"""
+Versioned schema migrations.
+MIGRATIONS is append-only: never edit an applied entry, add a new version instead. Every
+migration must be idempotent — a crash records nothing, so the version simply reruns.
+Apply from Backend/ with `python migrate.py`; app startup only compares the recorded version
+(and applies pending ones itself when AUTO_MIGRATE is on).
+"""
+
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import Awaitable, Callable, NamedTuple
+
+from pymongo import ASCENDING as ASC, DESCENDING as DESC, IndexModel
+
+from app.core.config import settings
+from app.core.time_utils import utc_now
+from app.db.mongodb import (
+    db_instance, product_likes_collection, products_collection, reviews_collection,
+    schema_migrations_collection,
+)
+from app.repo.migration_helpers import (
+    claim_version, get_migration_records, get_schema_version, mark_applied, release_version,
+)
+from app.repo.product_helpers import migrate_liked_by_arrays
+from app.repo.review_helpers import backfill_review_seller_ids, recompute_product_ratings
+
+logger = logging.getLogger(__name__)
+
+# A "running" claim this old belongs to a runner that died mid-migration
+STALE_CLAIM = timedelta(hours=1)
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    apply: Callable[[], Awaitable[object]]
+
+
+# Collection -> indexes. One createIndexes command per collection, all collections in parallel.
+INDEXES: dict[str, list[IndexModel]] = {
+    "Users": [
+        IndexModel("email", unique=True),
+        IndexModel("username", unique=True),
+    ],
+    # Profiles & Cart — one-to-one
+    "Profiles": [IndexModel("user_id", unique=True)],
+    "Cart": [IndexModel("user_id", unique=True)],
+    "Products": [
+        IndexModel("slug", unique=True),
+        IndexModel("category"),
+        # Seller's product list sorted by created_at
+        IndexModel([("seller_id", ASC), ("created_at", DESC)]),
+        # Public product listing base filter
+        IndexModel([("is_approved", ASC), ("is_active", ASC), ("is_deleted", ASC)]),
+        # Full-text search on name + description
+        IndexModel([("name", "text"), ("description", "text")],
+                   weights={"name": 5, "description": 2}, name="name_text_description_text"),
+        # Landing: flash deals, top rated, featured
+        IndexModel([("discount_percent", DESC), ("is_approved", ASC), ("is_active", ASC)]),
+        IndexModel([("avg_rating", DESC), ("review_count", DESC)]),
+        IndexModel([("is_featured", ASC), ("is_approved", ASC), ("is_active", ASC)]),
+        # Facets: brand / sub_category within filtered sets
+        IndexModel([("category", ASC), ("brand", ASC)]),
+        IndexModel([("category", ASC), ("sub_category", ASC)]),
+    ],
+    # One doc per (product, user); keeps Product docs constant-size
+    "ProductLikes": [IndexModel([("product_id", ASC), ("user_id", ASC)], unique=True)],
+    "Sellers": [
+        IndexModel("user_id", unique=True),
+        IndexModel("application_status"),
+    ],
+    "Reviews": [
+        # One review per user per product
+        IndexModel([("product_id", ASC), ("user_id", ASC)], unique=True),
+        # Keyset feeds: equality prefix + (reviewed_at, _id) so every page is a bounded index scan
+        IndexModel([("product_id", ASC), ("reviewed_at", DESC), ("_id", DESC)]),
+        IndexModel([("product_id", ASC), ("rating", ASC), ("reviewed_at", DESC), ("_id", DESC)]),
+        IndexModel([("seller_id", ASC), ("reviewed_at", DESC), ("_id", DESC)]),
+        IndexModel([("reviewed_at", DESC), ("_id", DESC)]),
+        # Admin comment search
+        IndexModel([("comment", "text")]),
+    ],
+    "Orders": [
+        # User's order list sorted by date, and filtered by status
+        IndexModel([("user_id", ASC), ("created_at", DESC)]),
+        IndexModel([("user_id", ASC), ("order_status", ASC)]),
+        # Seller's order view — matches on embedded items.seller_id
+        IndexModel("items.seller_id"),
+        # Global date range queries (admin)
+        IndexModel("created_at"),
+    ],
+    # Feed order is (timestamp, _id) desc; each filter gets an equality prefix on that order
+    "AuditLogs": [
+        IndexModel([("timestamp", DESC), ("_id", DESC)]),
+        *(IndexModel([(field, ASC), ("timestamp", DESC), ("_id", DESC)])
+          for field in ("module", "action", "performed_by.email", "target.email")),
+    ],
+    "Banners": [IndexModel([("is_active", ASC), ("priority", ASC)])],
+}
+
+# Indexes replaced by the ones above; databases created before migrations may still have them
+SUPERSEDED_INDEXES = {
+    "AuditLogs": ["timestamp_1", "action_1", "module_1", "performed_by.email_1", "target.email_1"],
+    # Pre-keyset product feed; a prefix of (product_id, reviewed_at, _id)
+    "Reviews": ["product_id_1_reviewed_at_-1"],
+}
+
+
+async def _drop_indexes(collection, names: list[str]):
+    """Drop superseded indexes; missing ones are fine (fresh databases never had them)."""
+    existing = await collection.index_information()
+    for name in names:
+        if name in existing:
+            await collection.drop_index(name)
+
+
+async def drop_superseded_indexes():
+    db = db_instance.client[settings.DB_NAME]
+    await asyncio.gather(*(_drop_indexes(db[name], names) for name, names in SUPERSEDED_INDEXES.items()))
+
+
+async def create_indexes():
+    db = db_instance.client[settings.DB_NAME]
+    await drop_superseded_indexes()
+    await asyncio.gather(*(db[name].create_indexes(models) for name, models in INDEXES.items()))
+
+
+async def migrate_product_likes():
+    return await migrate_liked_by_arrays(products_collection(), product_likes_collection())
+
+
+async def backfill_review_sellers():
+    return await backfill_review_seller_ids(reviews_collection(), products_collection())
+
+
+async def seed_product_ratings():
+    return await recompute_product_ratings(reviews_collection(), products_collection())
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "baseline indexes", create_indexes),
+    Migration(2, "move Product.liked_by into ProductLikes", migrate_product_likes),
+    Migration(3, "copy Product.seller_id onto reviews", backfill_review_sellers),
+    Migration(4, "seed product rating aggregates from reviews", seed_product_ratings),
+    # Version 1 already ran on existing databases, so newly superseded indexes are dropped here
+    Migration(5, "drop superseded indexes", drop_superseded_indexes),
+]
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+async def apply_migrations(target: int | None = None) -> list[int]:
+    """
+    Apply pending migrations in order, up to `target` (default: all). Stops at the first
+    version another runner holds. Returns the versions applied by this call.
+    """
+    collection = schema_migrations_collection()
+    records = await get_migration_records(collection)
+    applied = []
+    for migration in MIGRATIONS:
+        if target is not None and migration.version > target:
+            break
+        if records.get(migration.version, {}).get("status") == "applied":
+            continue
+        now = utc_now()
+        if not await claim_version(collection, migration.version, migration.name, now, now - STALE_CLAIM):
+            logger.info("Migration %s is being applied elsewhere; stopping here", migration.version)
+            break
+        logger.info("Applying migration %s: %s", migration.version, migration.name)
+        started = time.perf_counter()
+        try:
+            result = await migration.apply()
+        except BaseException:
+            await release_version(collection, migration.version)
+            raise
+        duration_ms = (time.perf_counter() - started) * 1000
+        await mark_applied(collection, migration.version, utc_now(), duration_ms)
+        logger.info("Applied migration %s in %.0f ms%s", migration.version, duration_ms, f": {result}" if result else "")
+        applied.append(migration.version)
+    return applied
+
+
+async def migration_status() -> list[dict]:
+    """Every known migration with its record (None when pending)."""
+    records = await get_migration_records(schema_migrations_collection())
+    return [{"version": m.version, "name": m.name, "record": records.get(m.version)} for m in MIGRATIONS]
+
+
+async def ensure_schema():
+    """Startup check: one indexed read when up to date; applies or warns when behind."""
+    version = await get_schema_version(schema_migrations_collection())
+    if version >= LATEST_VERSION:
+        return
+    if settings.AUTO_MIGRATE:
+        await apply_migrations()
+    else:
+        logger.warning("Database schema is at version %s, code expects %s: run `python migrate.py`",
+                       version, LATEST_VERSION)
@@ -1,134 +1,210 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+from collections import Counter, deque
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+from pymongo import monitoring
+from pymongo.read_preferences import make_read_preference, read_pref_mode_from_name
 from app.core.config import settings
+from app.core.metrics import MONGO_FAILURES, MONGO_LATENCY
+from app.core.tracing import current_request_id, tracer
+from app.repo.explain_helpers import EXPLAINABLE_COMMANDS
+from opentelemetry.trace import SpanKind, Status, StatusCode
 import logging
 
 # Setup Logger (Critical for Cloud Debugging)
-logger = logging.getLogger("uvicorn")
+logger = logging.getLogger(__name__)
+
+COLLECTIONS = ("Users", "Profiles", "Sellers", "AuditLogs", "Reviews", "Cart", "Orders",
+               "Products", "Banners", "ProductLikes", "SchemaMigrations")
+
+# checkouts, checkout_failures, checkout_wait_ms, checked_out, connections_open, pool_cleared
+POOL_STATS: Counter = Counter()
+
+# Commands slower than MONGO_SLOW_COMMAND_MS, appended from driver threads; SlowCommandExplainer drains it
+SLOW_COMMANDS: deque = deque(maxlen=200)
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Counts pool checkouts and the time spent waiting for a connection into POOL_STATS."""
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_checked_out(self, event):
+        POOL_STATS["checkouts"] += 1
+        POOL_STATS["checkout_wait_ms"] += event.duration * 1000
+        POOL_STATS["checked_out"] += 1
+
+    def connection_check_out_failed(self, event):
+        POOL_STATS["checkout_failures"] += 1
+        POOL_STATS["checkout_wait_ms"] += event.duration * 1000
+
+    def connection_checked_in(self, event):
+        POOL_STATS["checked_out"] -= 1
+
+    def connection_created(self, event):
+        POOL_STATS["connections_open"] += 1
+
+    def connection_closed(self, event):
+        POOL_STATS["connections_open"] -= 1
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        POOL_STATS["pool_cleared"] += 1
+
+    def pool_closed(self, event):
+        pass
+
+
+class CommandLatencyListener(monitoring.CommandListener):
+    """
+    Per-collection, per-command latency into Prometheus plus a client span per command.
+    Motor runs pymongo on executor threads with the caller's context copied, so the span
+    opened in started() is a child of the request that issued the command.
+    Explainable commands slower than MONGO_SLOW_COMMAND_MS are queued on SLOW_COMMANDS.
+    """
+
+    def __init__(self):
+        self._pending: dict[tuple, tuple] = {}
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        if not isinstance(target, str):   # getMore carries a cursor id; the collection is separate
+            target = event.command.get("collection", "")
+        span = tracer.start_span(
+            f"mongo {event.command_name} {target}".rstrip(), kind=SpanKind.CLIENT,
+            attributes={"db.system": "mongodb", "db.collection.name": target, "db.operation.name": event.command_name},
+        )
+        # Only a reference to the driver's document, dropped when the command finishes
+        command = event.command if settings.MONGO_SLOW_COMMAND_MS and event.command_name in EXPLAINABLE_COMMANDS else None
+        self._pending[(event.request_id, event.connection_id)] = (target, span, command, event.database_name)
+
+    def _finish(self, event):
+        collection, span, command, database = self._pending.pop((event.request_id, event.connection_id), ("", None, None, ""))
+        MONGO_LATENCY.labels(collection, event.command_name).observe(event.duration_micros / 1e6)
+        duration_ms = event.duration_micros / 1000
+        if command is not None and duration_ms >= settings.MONGO_SLOW_COMMAND_MS:
+            SLOW_COMMANDS.append({
+                "database": database, "collection": collection, "command_name": event.command_name,
+                "command": command, "duration_ms": duration_ms, "request_id": current_request_id(),
+            })
+        return collection, span
+
+    def succeeded(self, event):
+        _, span = self._finish(event)
+        if span is not None:
+            span.end()
+
+    def failed(self, event):
+        collection, span = self._finish(event)
+        MONGO_FAILURES.labels(collection, event.command_name).inc()
+        if span is not None:
+            span.set_status(Status(StatusCode.ERROR, str(event.failure.get("errmsg", ""))))
+            span.end()
+
 
 class Database:
     client: AsyncIOMotorClient = None
+    # Collection handles built once in connect_to_mongo; `analytics` ones use the analytics read preference
+    collections: dict = {}
+    analytics: dict = {}
 
 db_instance = Database()
 
 def get_database_client():
     return db_instance.client
 
-# --- Collections Helper Functions ---
-# Note: These will fail if called before "connect_to_mongo" runs
-def get_users_collection():
-    return db_instance.client[settings.DB_NAME]['Users']
 
-def profiles_collection():
-    return db_instance.client[settings.DB_NAME]['Profiles']
+def client_options() -> dict:
+    """Pool and driver options for AsyncIOMotorClient, from settings."""
+    options = {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS or None,
+        "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS or None,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "event_listeners": [PoolStatsListener(), CommandLatencyListener()],
+    }
+    if settings.MONGO_COMPRESSORS.strip():
+        options["compressors"] = settings.MONGO_COMPRESSORS.replace(" ", "")
+    return options
+
 
-def sellers_collection():
-    return db_instance.client[settings.DB_NAME]['Sellers']
+def _cache_collections():
+    db = db_instance.client[settings.DB_NAME]
+    analytics_db = db_instance.client.get_database(
+        settings.DB_NAME,
+        read_preference=make_read_preference(read_pref_mode_from_name(settings.MONGO_ANALYTICS_READ_PREFERENCE), None),
+    )
+    db_instance.collections = {name: db[name] for name in COLLECTIONS}
+    db_instance.analytics = {name: analytics_db[name] for name in COLLECTIONS}
 
-def audit_logs_collection():
-    return db_instance.client[settings.DB_NAME]['AuditLogs']
 
-def reviews_collection():
-    return db_instance.client[settings.DB_NAME]['Reviews']
+def _collection(name: str, analytics: bool) -> AsyncIOMotorCollection:
+    return (db_instance.analytics if analytics else db_instance.collections)[name]
 
-def cart_collection():
-    return db_instance.client[settings.DB_NAME]['Cart']
 
-def orders_collection():
-    return db_instance.client[settings.DB_NAME]['Orders']
+# --- Collections Helper Functions ---
+# Note: These will fail if called before "connect_to_mongo" runs.
+# analytics=True is for reads that tolerate replica lag (dashboards, facets); never for writes or checkout.
+def get_users_collection(analytics: bool = False):
+    return _collection('Users', analytics)
 
-def products_collection():
-    return db_instance.client[settings.DB_NAME]['Products']
+def profiles_collection(analytics: bool = False):
+    return _collection('Profiles', analytics)
 
-def banners_collection():
-    return db_instance.client[settings.DB_NAME]['Banners']
+def sellers_collection(analytics: bool = False):
+    return _collection('Sellers', analytics)
 
-async def create_indexes():
-    """Create all MongoDB indexes. Called once during app startup."""
-    db = db_instance.client[settings.DB_NAME]
+def audit_logs_collection(analytics: bool = False):
+    return _collection('AuditLogs', analytics)
 
-    # ── Users ──
-    await db.Users.create_index("email", unique=True)
-    await db.Users.create_index("username", unique=True)
-
-    # ── Profiles & Cart — one-to-one ──
-    await db.Profiles.create_index("user_id", unique=True)
-    await db.Cart.create_index("user_id", unique=True)
-
-    # ── Products ──
-    await db.Products.create_index("slug", unique=True)
-    await db.Products.create_index("category")
-    # Compound: seller's product list sorted by created_at (replaces standalone seller_id)
-    await db.Products.create_index([("seller_id", 1), ("created_at", -1)])
-    # Compound: public product listing base filter (replaces standalone is_approved)
-    await db.Products.create_index([("is_approved", 1), ("is_active", 1), ("is_deleted", 1)])
-    # Full-text search on name + description
-    await db.Products.create_index(
-        [("name", "text"), ("description", "text")],
-        weights={"name": 5, "description": 2},
-        name="name_text_description_text"
-    )
+def reviews_collection(analytics: bool = False):
+    return _collection('Reviews', analytics)
 
-    # ── Sellers — was completely missing ──
-    await db.Sellers.create_index("user_id", unique=True)
-    await db.Sellers.create_index("application_status")
+def cart_collection(analytics: bool = False):
+    return _collection('Cart', analytics)
 
-    # ── Reviews ──
-    # Compound unique: one review per user per product
-    await db.Reviews.create_index(
-        [("product_id", 1), ("user_id", 1)], unique=True
-    )
-    # Compound: product reviews sorted by reviewed_at (replaces standalone product_id)
-    await db.Reviews.create_index([("product_id", 1), ("reviewed_at", -1)])
-
-    # ── Orders ──
-    # Compound: user's order list sorted by date (replaces standalone user_id)
-    await db.Orders.create_index([("user_id", 1), ("created_at", -1)])
-    # Compound: user's orders filtered by status
-    await db.Orders.create_index([("user_id", 1), ("order_status", 1)])
-    # Seller's order view — matches on embedded items.seller_id
-    await db.Orders.create_index("items.seller_id")
-    # Global date range queries (admin)
-    await db.Orders.create_index("created_at")
-
-    # ── Audit Logs ──
-    await db.AuditLogs.create_index("timestamp")
-    await db.AuditLogs.create_index("action")
-    await db.AuditLogs.create_index("module")
-    await db.AuditLogs.create_index("performed_by.email")
-    await db.AuditLogs.create_index("target.email")
-
-    # ── Landing: Flash deals (discount sort with approval filter) ──
-    await db.Products.create_index([("discount_percent", -1), ("is_approved", 1), ("is_active", 1)])
-    # ── Landing: Top products (rating sort) ──
-    await db.Products.create_index([("avg_rating", -1), ("review_count", -1)])
-    # ── Landing: Featured products ──
-    await db.Products.create_index([("is_featured", 1), ("is_approved", 1), ("is_active", 1)])
-    # ── Facets: brand within filtered sets ──
-    await db.Products.create_index([("category", 1), ("brand", 1)])
-    # ── Facets: sub_category within filtered sets ──
-    await db.Products.create_index([("category", 1), ("sub_category", 1)])
-    # ── Banners ──
-    await db.Banners.create_index([("is_active", 1), ("priority", 1)])
-
-    logger.info("✅ All MongoDB indexes created")
+def orders_collection(analytics: bool = False):
+    return _collection('Orders', analytics)
+
+def products_collection(analytics: bool = False):
+    return _collection('Products', analytics)
+
+def banners_collection(analytics: bool = False):
+    return _collection('Banners', analytics)
+
+def product_likes_collection(analytics: bool = False):
+    return _collection('ProductLikes', analytics)
 
+def schema_migrations_collection():
+    return _collection('SchemaMigrations', False)
 
 # --- Connection Logic ---
 async def connect_to_mongo():
     try:
         logger.info("⏳ Connecting to MongoDB...")
-        db_instance.client = AsyncIOMotorClient(settings.MONGO_URL)
+        db_instance.client = AsyncIOMotorClient(settings.MONGO_URL, **client_options())
+        _cache_collections()
         
         # THE PING TEST (Crucial for Cloud)
         await db_instance.client.admin.command('ping')
         logger.info("✅ MongoDB Connected Successfully!")
         
     except Exception as e:
-        logger.error(f"❌ MongoDB Connection Failed: {e}")
+        logger.error("❌ MongoDB Connection Failed: %s", e)
         raise e
 
 
 async def close_mongo_connection():
     if db_instance.client:
         db_instance.client.close()
+        db_instance.collections, db_instance.analytics = {}, {}
         logger.info("🔒 MongoDB connection closed.")
\ No newline at end of file
@@ -0,0 +1,22 @@
+"""
+Rebuilds product rating aggregates (rating_sum, review_count, rating_histogram, avg_rating)
+from the Reviews collection. Migration 4 seeds them on deploy; run this any time they are
+suspected to have drifted. Safe to re-run. Usage (from Backend/): python -m app.db.recompute_ratings
+"""
+
+import asyncio
+from app.db.mongodb import connect_to_mongo, close_mongo_connection, products_collection, reviews_collection
+from app.repo.review_helpers import recompute_product_ratings
+
+
+async def main():
+    await connect_to_mongo()
+    try:
+        result = await recompute_product_ratings(reviews_collection(), products_collection())
+        print(f"Recomputed {result['reviews']} reviews, updated {result['products']} products")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
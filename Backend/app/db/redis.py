@@ -1,19 +1,63 @@
+import time
+from contextlib import contextmanager
+
 import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import RedisError
 from app.core.config import settings
+from app.core.metrics import REDIS_LATENCY
+from app.core.tracing import tracer
+from opentelemetry.trace import SpanKind
 import logging
 
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
 
 redis_client = None
 
+# What a Redis-backed call can raise: server/connection errors, or AttributeError while
+# redis_client is still None (not connected)
+REDIS_ERRORS = (RedisError, AttributeError)
+
+
+@contextmanager
+def _instrumented(command: str, **attributes):
+    started = time.perf_counter()
+    with tracer.start_as_current_span(f"redis {command}", kind=SpanKind.CLIENT,
+                                      attributes={"db.system": "redis", "db.operation.name": command, **attributes}):
+        try:
+            yield
+        finally:
+            REDIS_LATENCY.labels(command).observe(time.perf_counter() - started)
+
+
+class InstrumentedPipeline(Pipeline):
+    """One span and latency sample per round trip, as MULTI (transaction) or PIPELINE."""
+
+    async def execute(self, raise_on_error: bool = True):
+        command = "MULTI" if self.is_transaction or self.explicit_transaction else "PIPELINE"
+        with _instrumented(command, **{"db.operation.batch.size": len(self.command_stack)}):
+            return await super().execute(raise_on_error)
+
+
+class InstrumentedRedis(redis.Redis):
+    """Records per-command latency and a client span. Scripts show up as EVALSHA, pipelines as MULTI/PIPELINE."""
+
+    async def execute_command(self, *args, **options):
+        with _instrumented(str(args[0]).upper()):
+            return await super().execute_command(*args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> InstrumentedPipeline:
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
 async def connect_redis():
     global redis_client
     try:
-        redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        redis_client = InstrumentedRedis.from_url(settings.REDIS_URL, decode_responses=True)
         await redis_client.ping()  # Force actual connection test (from_url is lazy)
         logger.info("Redis connected successfully")
     except Exception as e:
-        logger.error(f"Redis connection error: {e}")
+        logger.error("Redis connection error: %s", e)
         raise RuntimeError(f"Failed to connect to Redis: {e}")
 
 async def close_redis():
@@ -22,7 +66,7 @@ async def close_redis():
             await redis_client.close()
             logger.info("Redis connection closed")
     except Exception as e:
-        logger.error(f"Redis connection close error: {e}")
+        logger.error("Redis connection close error: %s", e)
         # Don't raise during shutdown — no request context exists
 
 
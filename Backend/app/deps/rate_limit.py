@@ -0,0 +1,70 @@
+from fastapi import HTTPException, Request, Response, status
+from app.core.config import settings
+from app.core.security import verify_token_cached
+from app.services import rate_limit_service
+import math
+
+
+def client_ip(request: Request) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+async def _user_identity(request: Request) -> str:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    payload = verify_token_cached(token) if scheme.lower() == "bearer" and token else None
+    if payload and payload.get("_id"):
+        return f"user:{payload['_id']}"
+    return f"ip:{client_ip(request)}"
+
+
+async def _email_identity(request: Request) -> str:
+    # FastAPI has already read the body by the time dependencies run, so this is a cache hit
+    email = None
+    if request.headers.get("content-type", "").startswith(("application/x-www-form-urlencoded", "multipart/form-data")):
+        form = await request.form()
+        email = form.get("username") or form.get("email")
+    else:
+        try:
+            body = await request.json()
+            email = body.get("email") if isinstance(body, dict) else None
+        except ValueError:
+            pass
+    if isinstance(email, str) and email.strip():
+        return f"email:{email.strip().lower()}"
+    return f"ip:{client_ip(request)}"
+
+
+async def _ip_identity(request: Request) -> str:
+    return f"ip:{client_ip(request)}"
+
+
+IDENTITY_RESOLVERS = {
+    "ip": _ip_identity,
+    "user": _user_identity,
+    "email": _email_identity,
+}
+
+
+def rate_limit(scope: str, limit: int, window: float, per: str = "ip"):
+    """
+    Sliding-window limit of `limit` requests per `window` seconds for each identity.
+    per: "ip", "user" (bearer token's user, else IP) or "email" (login/OTP body, else IP).
+    Example: dependencies=[Depends(rate_limit("products_search", 60, 60))]
+    """
+    resolve_identity = IDENTITY_RESOLVERS[per]
+
+    async def limiter(request: Request, response: Response):
+        result = await rate_limit_service.check(scope, await resolve_identity(request), limit, window)
+        if not result.allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests. Please try again later.",
+                headers={"Retry-After": str(max(1, math.ceil(result.retry_after)))}
+            )
+        response.headers["X-RateLimit-Limit"] = str(limit)
+        response.headers["X-RateLimit-Remaining"] = str(result.remaining)
+    return limiter
@@ -1,15 +1,17 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from app.core.security import verify_token
+from app.core.security import verify_token_cached
+from app.services.denylist_service import TokenDenylist
 import logging
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
 
 
 async def get_current_user(token: str = Depends(oauth2_scheme)):
 
-    payload = verify_token(token)
+    # Repeat tokens skip signature verification (LRU keyed by token digest, honours exp)
+    payload = verify_token_cached(token)
 
     if not payload:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
@@ -18,11 +20,15 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     if not user_id or not email or not role:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
 
+    # Local bloom filter first; Redis is only consulted on a possible hit
+    if await TokenDenylist.is_revoked(payload):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has been revoked")
+
     return {"_id": str(user_id), "email": email, "role": role}
 
 
 ROLE_PERMISSIONS = {
-    "super_admin": {
+    "super_admin": frozenset({
         "admin:create", "admin:demote",
         "seller:approve", "seller:reject", "seller:suspend",
         "user:ban", "user:view",
@@ -30,23 +36,23 @@ ROLE_PERMISSIONS = {
         "order:any",
         "system:settings",
         "audit:view"
-    },
-    "admin": {
+    }),
+    "admin": frozenset({
         "seller:approve", "seller:reject", "seller:suspend",
         "user:ban", "user:view",
         "product:any", "product:approve",
         "order:any",
         "audit:view"
-    },
-    "seller": {
+    }),
+    "seller": frozenset({
         "product:own:write",
         "product:own:delete",
         "product:own:toggle",
         "order:own:view",
         "order:own:status:update",
         "seller_profile:own:write"
-    },
-    "user": {
+    }),
+    "user": frozenset({
         "product:read",
         "cart:write",
         "order:own:create",
@@ -55,11 +61,15 @@ ROLE_PERMISSIONS = {
         "review:own:write",
         "profile:own:write",
         "seller:apply"
-    }
+    })
 }  
 
-def get_user_permissions(role: str) -> set[str]:
-    return ROLE_PERMISSIONS.get(role, set())
+def get_user_permissions(role: str) -> frozenset[str]:
+    return ROLE_PERMISSIONS.get(role, frozenset())
+
+
+def roles_with_permission(permission: str) -> frozenset[str]:
+    return frozenset(role for role, permissions in ROLE_PERMISSIONS.items() if permission in permissions)
 
 
 # ── Step 3: two dependency factories ──────────────────────────────────────
@@ -70,6 +80,8 @@ def require_role(*allowed_roles: str):
     Example: Depends(require_role("super_admin"))
              Depends(require_role("admin", "super_admin"))
     """
+    allowed_roles = frozenset(allowed_roles)
+
     async def checker(current_user: dict = Depends(get_current_user)):
         if current_user.get("role") not in allowed_roles:
             raise HTTPException(
@@ -85,11 +97,11 @@ def require_permission(permission: str):
     Example: Depends(require_permission("product:any"))
              Depends(require_permission("seller:approve"))
     """
-    async def checker(current_user: dict = Depends(get_current_user)):
-        role = current_user.get("role", "user")
-        permissions = get_user_permissions(role)
+    # Resolved once per route at import time; each request is a single frozenset lookup
+    allowed_roles = roles_with_permission(permission)
 
-        if permission not in permissions:
+    async def checker(current_user: dict = Depends(get_current_user)):
+        if current_user.get("role", "user") not in allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You don't have permission to access this resource"
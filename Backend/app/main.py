@@ -1,26 +1,68 @@
+import logging
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 from starlette.requests import Request
 from app.routes import auth_user,secure, product_routes, admin_routes, user_routes, seller_routes, super_admin_routes, review_routes, landing_routes
-from app.ai import ollama 
+from app.ai import ollama, assistant
 from contextlib import asynccontextmanager
 from starlette.middleware.cors import CORSMiddleware
-from app.db.mongodb import connect_to_mongo, create_indexes, close_mongo_connection
+from app.db.mongodb import connect_to_mongo, close_mongo_connection
+from app.db.migrations import ensure_schema
 from app.db.redis import connect_redis, close_redis
-from app.core.logger import logger
+from app.core.compression import CompressionMiddleware
+from app.core.logger import configure_logging, shutdown_logging
 from app.core.config import settings
+from app.core.metrics import LoopLagMonitor, MetricsMiddleware, StatsExporter, metrics_response
+from app.core.profiling import ProfilingMiddleware
+from app.core.tracing import TracingMiddleware, configure_tracing, current_request_id, shutdown_tracing
+from app.services.counter_service import ProductCounters
+from app.services.denylist_service import TokenDenylist
+from app.services.email_queue import EmailQueue
+from app.services.audit_service import AuditWriter
+from app.services.audit_archive import AuditArchiver
+from app.services.slow_command_service import SlowCommandExplainer
+from app.ai.ollama_client import OllamaClient
+from app.ai.product_index import ProductIndexer
+from app.core.security import shutdown_hash_pool
+
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    configure_logging()
+    configure_tracing()
     # Startup: Connect to MongoDB
     await connect_to_mongo()
     await connect_redis()
-    await create_indexes()
+    await ensure_schema()
+    LoopLagMonitor.start()
+    StatsExporter.start()
+    SlowCommandExplainer.start()
+    ProductCounters.start()
+    TokenDenylist.start()
+    AuditWriter.start()
+    AuditArchiver.start()
+    await EmailQueue.start()
+    OllamaClient.start()
+    ProductIndexer.start()
     yield
-    # Shutdown: Close MongoDB Connection
+    # Shutdown: flush buffered counters, then close MongoDB Connection
+    await ProductCounters.stop()
+    await TokenDenylist.stop()
+    await AuditArchiver.stop()
+    await AuditWriter.stop()
+    await EmailQueue.stop()
+    await ProductIndexer.stop()
+    await OllamaClient.stop()
+    await SlowCommandExplainer.stop()
+    await LoopLagMonitor.stop()
+    await StatsExporter.stop()
     await close_mongo_connection()
     await close_redis()
+    shutdown_hash_pool()
+    shutdown_tracing()
+    shutdown_logging()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -28,12 +70,13 @@ app = FastAPI(lifespan=lifespan)
 async def global_exception_handler(request: Request, exc: Exception):
     # 1. LOG THE CRASH (Critical for DevOps)
     # We log the URL path, the method (GET/POST), and the actual error
-    logger.critical(f"🔥 UNHANDLED CRASH: {request.method} {request.url} | Error: {exc}", exc_info=True)
+    logger.critical("🔥 UNHANDLED CRASH: %s %s | Error: %s", request.method, request.url, exc, exc_info=True)
     
-    # 2. Return a safe message to the user (Don't expose raw stack traces)
+    # 2. Return a safe message to the user (Don't expose raw stack traces);
+    #    the request id lets support find the log lines and the trace
     return JSONResponse(
         status_code=500,
-        content={"message": "Internal Server Error. Our team has been notified."}
+        content={"message": "Internal Server Error. Our team has been notified.", "request_id": current_request_id()}
     )
 @app.get("/")
 def landing_page():
@@ -44,6 +87,9 @@ def landing_page():
 async def health_check():
     return {"status": "ok"}
 
+# Prometheus scrape target; keep it off the public internet at the proxy
+app.add_api_route("/metrics", metrics_response, methods=["GET"], include_in_schema=False)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -57,6 +103,13 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Compression sits outside CORS (whose headers it keeps) and inside the timing middlewares
+app.add_middleware(CompressionMiddleware)
+# Added last so they are outermost: metrics time the whole stack, and the request span and
+# request id wrap everything, metrics and profiling included
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
 
 
 app.include_router(auth_user.router)
@@ -69,3 +122,4 @@ app.include_router(seller_routes.router)
 app.include_router(review_routes.router)
 app.include_router(super_admin_routes.router)
 app.include_router(ollama.router)  # Ollama AI routes
+app.include_router(assistant.router)
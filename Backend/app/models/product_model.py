@@ -78,6 +78,8 @@ class ProductInDB(ProductBase):
     is_deleted: bool = Field(default=False)
     avg_rating: float = Field(default=0.0)
     review_count: int = Field(default=0)
+    rating_sum: float = Field(default=0.0)
+    rating_histogram: dict[str, int] = Field(default_factory=dict)  # {"1".."5": count}
     product_likes: int = Field(default=0)
     created_at: datetime = Field(default_factory=utc_now)
     updated_at: datetime = Field(default_factory=utc_now) 
@@ -100,6 +102,7 @@ class ProductResponse(ProductBase):
     is_deleted: bool
     avg_rating: float
     review_count: int
+    rating_histogram: dict[str, int] = {}
     product_likes: int
     recent_reviews: list["ReviewPublicResponse"] = []
     seller_details: Optional["SellerMinimalResponse"] = None
@@ -118,6 +121,36 @@ class ProductStockUpdate(BaseModel):
 class ProductToggleRequest(BaseModel):
     is_active: bool = Field(...)
 
+class ProductCardResponse(BaseModel):
+    """Compact listing card — only what a product grid renders.
+    Returned by /products, /products/search and /categories/{category} unless view=full."""
+    id: PyObjectId = Field(alias="_id")
+    name: str
+    slug: str
+    image_urls: list[str] = []             # First image only (projected with $slice)
+    price: int
+    actual_price: int
+    discount_percent: int = 0
+    avg_rating: float = 0.0
+    review_count: int = 0
+    product_likes: int = 0
+    brand: str = "Generic"
+    category: str
+    sub_category: Optional[str] = None
+    is_featured: bool = False
+    stock: int = 0
+
+    model_config = {
+        "populate_by_name": True,
+    }
+
+class PaginatedProductCardResponse(BaseModel):
+    items: list[ProductCardResponse]
+    total: int
+    page: int
+    limit: int
+    pages: int
+
 class PaginatedProductResponse(BaseModel):
     items: list[ProductResponse]
     total: int
@@ -127,3 +160,7 @@ class PaginatedProductResponse(BaseModel):
 
 class ProductRejectRequest(BaseModel):
     rejection_reason: str = Field(..., min_length=5)
+
+class ProductAskRequest(BaseModel):
+    question: str = Field(..., min_length=2, max_length=500)
+    k: int = Field(5, ge=1, le=10)
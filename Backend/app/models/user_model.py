@@ -53,7 +53,6 @@ class UserInDB(UserBase):
     role: UserRole = UserRole.user
     is_verified: bool = False
     is_banned: bool = False
-    refresh_token_hashed: Optional[str] = None
     
     # Optional: Timestamps (Good for auditing)
     # created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -11,8 +11,9 @@ from bson import ObjectId
 from datetime import datetime
 from app.core.time_utils import utc_now
 from typing import Optional
+from app.repo.review_helpers import apply_rating_delta, fetch_review_page, REVIEW_FEED_SORT
 
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
 
 
 # ── Seller Helpers ────────────────────────────────────────────────────────────
@@ -21,7 +22,7 @@ async def get_seller_by_user_id(collection, user_id: str):
     try:
         return await collection.find_one({"user_id": user_id})
     except PyMongoError as e:
-        logger.error(f"DB Error fetching seller for user {user_id}: {e}")
+        logger.error("DB Error fetching seller for user %s: %s", user_id, e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def insert_seller(collection, profile_data: dict):
@@ -29,7 +30,7 @@ async def insert_seller(collection, profile_data: dict):
         result = await collection.insert_one(profile_data)
         return result
     except PyMongoError as e:
-        logger.error(f"DB Error inserting seller: {e}")
+        logger.error("DB Error inserting seller: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def update_seller_by_user_id(collection, user_id: str, update_data: dict):
@@ -40,7 +41,7 @@ async def update_seller_by_user_id(collection, user_id: str, update_data: dict):
         )
         return result
     except PyMongoError as e:
-        logger.error(f"DB Error updating seller {user_id}: {e}")
+        logger.error("DB Error updating seller %s: %s", user_id, e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def update_seller_by_object_id(collection, object_id, update_data: dict):
@@ -51,7 +52,7 @@ async def update_seller_by_object_id(collection, object_id, update_data: dict):
         )
         return result
     except PyMongoError as e:
-        logger.error(f"DB Error updating seller by doc ID {object_id}: {e}")
+        logger.error("DB Error updating seller by doc ID %s: %s", object_id, e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def get_pending_sellers(collection, limit: int = 50, skip: int = 0):
@@ -59,7 +60,7 @@ async def get_pending_sellers(collection, limit: int = 50, skip: int = 0):
         cursor = collection.find({"application_status": "pending"}).skip(skip).limit(limit)
         return await cursor.to_list(length=limit)
     except PyMongoError as e:
-        logger.error(f"DB Error fetching pending sellers: {e}")
+        logger.error("DB Error fetching pending sellers: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 
@@ -70,7 +71,7 @@ async def get_pending_products(collection, limit: int = 50, skip: int = 0):
         cursor = collection.find({"is_approved": False, "is_deleted": False}).skip(skip).limit(limit)
         return await cursor.to_list(length=limit)
     except PyMongoError as e:
-        logger.error(f"DB Error fetching pending products: {e}")
+        logger.error("DB Error fetching pending products: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def update_product_approval_status(collection, product_id: str, is_approved: bool, admin_id: str, reason: str = None):
@@ -90,7 +91,7 @@ async def update_product_approval_status(collection, product_id: str, is_approve
         )
         return result.modified_count > 0
     except PyMongoError as e:
-        logger.error(f"DB Error updating product approval {product_id}: {e}")
+        logger.error("DB Error updating product approval %s: %s", product_id, e)
         raise HTTPException(status_code=500, detail="Database error")
 
 
@@ -129,7 +130,7 @@ async def get_dashboard_stats(users_col, sellers_col, products_col, orders_col):
             "banned_users": banned_users,
         }
     except PyMongoError as e:
-        logger.error(f"DB Error computing dashboard stats: {e}")
+        logger.error("DB Error computing dashboard stats: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 
@@ -173,7 +174,7 @@ async def get_all_users(
 
         return {"users": users, "total": total}
     except PyMongoError as e:
-        logger.error(f"DB Error fetching users: {e}")
+        logger.error("DB Error fetching users: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 
@@ -185,7 +186,7 @@ async def get_user_detail(collection, user_id: str):
             user["_id"] = str(user["_id"])
         return user
     except PyMongoError as e:
-        logger.error(f"DB Error fetching user detail {user_id}: {e}")
+        logger.error("DB Error fetching user detail %s: %s", user_id, e)
         raise HTTPException(status_code=500, detail="Database error")
 
 
@@ -225,7 +226,7 @@ async def get_all_sellers(
 
         return {"sellers": sellers, "total": total}
     except PyMongoError as e:
-        logger.error(f"DB Error fetching sellers: {e}")
+        logger.error("DB Error fetching sellers: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 
@@ -237,7 +238,7 @@ async def get_seller_detail(collection, user_id: str):
             seller["_id"] = str(seller["_id"])
         return seller
     except PyMongoError as e:
-        logger.error(f"DB Error fetching seller detail {user_id}: {e}")
+        logger.error("DB Error fetching seller detail %s: %s", user_id, e)
         raise HTTPException(status_code=500, detail="Database error")
 
 
@@ -278,7 +279,7 @@ async def get_all_products(
 
         return {"products": products, "total": total}
     except PyMongoError as e:
-        logger.error(f"DB Error fetching products: {e}")
+        logger.error("DB Error fetching products: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 
@@ -286,7 +287,6 @@ async def get_all_products(
 
 async def get_all_reviews(
     collection,
-    products_col=None,
     limit: int = 20,
     skip: int = 0,
     search: Optional[str] = None,
@@ -295,89 +295,69 @@ async def get_all_reviews(
     min_rating: Optional[float] = None,
     max_rating: Optional[float] = None,
     sort_rating: Optional[str] = None,
+    cursor: Optional[str] = None,
 ):
-    """Fetch all reviews with optional filters for admin moderation."""
+    """
+    Fetch all reviews with optional filters for admin moderation.
+    seller_id is denormalized on reviews, so the seller filter is one index scan.
+    With a cursor the page is keyset-paginated and the total count is skipped.
+    """
+    query: dict = {}
+
+    if search:
+        # Served by the text index on comment (word match, not substring)
+        query["$text"] = {"$search": search}
+
+    if product_id:
+        query["product_id"] = product_id
+
+    if seller_id:
+        query["seller_id"] = seller_id
+
+    if min_rating is not None or max_rating is not None:
+        query["rating"] = {}
+        if min_rating is not None:
+            query["rating"]["$gte"] = min_rating
+        if max_rating is not None:
+            query["rating"]["$lte"] = max_rating
+
+    sort_field = REVIEW_FEED_SORT
+    if sort_rating == "asc":
+        sort_field = [("rating", 1), *REVIEW_FEED_SORT]
+    elif sort_rating == "desc":
+        sort_field = [("rating", -1), *REVIEW_FEED_SORT]
+
+    reviews, next_cursor = await fetch_review_page(
+        collection, query, limit=limit, cursor=cursor, skip=skip, sort=sort_field
+    )
     try:
-        query: dict = {}
-
-        if search:
-            query["comment"] = {"$regex": search, "$options": "i"}
-
-        if product_id:
-            query["product_id"] = product_id
-
-        # Filter by seller: find all product_ids belonging to this seller
-        if seller_id and products_col is not None:
-            seller_products = await products_col.find(
-                {"seller_id": seller_id, "is_deleted": False},
-                {"_id": 1}
-            ).to_list(length=1000)
-            product_ids = [str(p["_id"]) for p in seller_products]
-            if product_ids:
-                query["product_id"] = {"$in": product_ids}
-            else:
-                return {"reviews": [], "total": 0}
-
-        if min_rating is not None or max_rating is not None:
-            query["rating"] = {}
-            if min_rating is not None:
-                query["rating"]["$gte"] = min_rating
-            if max_rating is not None:
-                query["rating"]["$lte"] = max_rating
-
-        sort_field = [("reviewed_at", -1)]
-        if sort_rating == "asc":
-            sort_field = [("rating", 1), ("reviewed_at", -1)]
-        elif sort_rating == "desc":
-            sort_field = [("rating", -1), ("reviewed_at", -1)]
-
-        cursor = collection.find(query).sort(sort_field).skip(skip).limit(limit)
-        reviews = await cursor.to_list(length=limit)
-        total = await collection.count_documents(query)
-
-        for r in reviews:
-            r["_id"] = str(r["_id"])
-
-        return {"reviews": reviews, "total": total}
+        total = None if cursor else await collection.count_documents(query)
     except PyMongoError as e:
-        logger.error(f"DB Error fetching reviews: {e}")
+        logger.error("DB Error counting reviews: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
+    for r in reviews:
+        r["_id"] = str(r["_id"])
+
+    return {"reviews": reviews, "total": total, "next_cursor": next_cursor}
+
 
 async def delete_review_by_id(reviews_col, products_col, review_id: str):
-    """Hard-delete a review and recalculate product rating."""
+    """Hard-delete a review and remove its rating from the product aggregates."""
     try:
-        review = await reviews_col.find_one({"_id": ObjectId(review_id)})
+        # find_one_and_delete: two concurrent deletes can't both reverse the same rating
+        review = await reviews_col.find_one_and_delete({"_id": ObjectId(review_id)})
         if not review:
             return False
 
         product_id = review.get("product_id")
-        rating = review.get("rating", 0)
-
-        # Delete the review
-        await reviews_col.delete_one({"_id": ObjectId(review_id)})
-
-        # Recalculate product avg_rating
-        if product_id:
-            product = await products_col.find_one({"_id": ObjectId(product_id)})
-            if product:
-                old_avg = float(product.get("avg_rating", 0))
-                old_count = int(product.get("review_count", 0))
-                if old_count <= 1:
-                    new_avg = 0.0
-                    new_count = 0
-                else:
-                    new_count = old_count - 1
-                    new_avg = round((old_avg * old_count - rating) / new_count, 2)
-
-                await products_col.update_one(
-                    {"_id": ObjectId(product_id)},
-                    {"$set": {"avg_rating": new_avg, "review_count": new_count}}
-                )
+        if product_id and ObjectId.is_valid(str(product_id)):
+            await apply_rating_delta(products_col, str(product_id), review.get("rating", 0), direction=-1,
+                                     reviews_col=reviews_col)
 
         return True
     except PyMongoError as e:
-        logger.error(f"DB Error deleting review {review_id}: {e}")
+        logger.error("DB Error deleting review %s: %s", review_id, e)
         raise HTTPException(status_code=500, detail="Database error")
 
 
@@ -392,7 +372,7 @@ async def unban_user_db(collection, user_id: str):
         )
         return result.modified_count > 0
     except PyMongoError as e:
-        logger.error(f"DB Error unbanning user {user_id}: {e}")
+        logger.error("DB Error unbanning user %s: %s", user_id, e)
         raise HTTPException(status_code=500, detail="Database error")
 
 
@@ -410,7 +390,7 @@ async def get_all_admins(collection):
             a["_id"] = str(a["_id"])
         return admins
     except PyMongoError as e:
-        logger.error(f"DB Error fetching admins: {e}")
+        logger.error("DB Error fetching admins: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 
@@ -429,7 +409,7 @@ async def get_recent_pending_sellers(collection, limit: int = 3):
             s["_id"] = str(s["_id"])
         return sellers
     except PyMongoError as e:
-        logger.error(f"DB Error fetching recent pending sellers: {e}")
+        logger.error("DB Error fetching recent pending sellers: %s", e)
         return []
 
 
@@ -446,7 +426,7 @@ async def get_recent_pending_products(collection, limit: int = 3):
             p["_id"] = str(p["_id"])
         return products
     except PyMongoError as e:
-        logger.error(f"DB Error fetching recent pending products: {e}")
+        logger.error("DB Error fetching recent pending products: %s", e)
         return []
 
 
@@ -494,7 +474,7 @@ async def get_seller_performance(products_col, sellers_col, top_n: int = 5):
 
         return {"top_sellers": top_sellers, "worst_sellers": worst_sellers}
     except PyMongoError as e:
-        logger.error(f"DB Error computing seller performance: {e}")
+        logger.error("DB Error computing seller performance: %s", e)
         return {"top_sellers": [], "worst_sellers": []}
 
 
@@ -512,5 +492,5 @@ async def get_approved_sellers_list(collection):
             s["_id"] = str(s["_id"])
         return sellers
     except PyMongoError as e:
-        logger.error(f"DB Error fetching sellers list: {e}")
+        logger.error("DB Error fetching sellers list: %s", e)
         return []
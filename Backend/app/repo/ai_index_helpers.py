@@ -0,0 +1,123 @@
+"""
+Storage for the AI product index job.
+ai:index:dirty   set     product ids written since the last sync (any worker adds, the writer pops)
+ai:index:writer  string  owner token of the one worker allowed to write the index files (SET NX EX)
+Mongo side: the products the assistant may recommend (visible ones) with the fields that are embedded.
+"""
+
+import logging
+from bson import ObjectId
+from pymongo.errors import PyMongoError
+from fastapi import HTTPException
+from app.db import redis as redis_db
+
+logger = logging.getLogger(__name__)
+
+DIRTY_KEY = "ai:index:dirty"
+WRITER_KEY = "ai:index:writer"
+
+VISIBLE_FILTER = {"is_active": True, "is_deleted": False, "is_approved": True}
+INDEX_PROJECTION = {
+    "_id": 1, "name": 1, "brand": 1, "category": 1, "sub_category": 1,
+    "tags": 1, "search_keywords": 1, "description": 1,
+}
+
+# Take the writer role if it is free, or extend it if we already hold it.
+ACQUIRE_WRITER_LUA = """
+local owner = redis.call('GET', KEYS[1])
+if owner == ARGV[1] then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+    return 1
+end
+if not owner then
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+    return 1
+end
+return 0
+"""
+
+# Fencing check before a write: extend the lease only if we still hold it, never take a free one.
+EXTEND_WRITER_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_WRITER_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+async def mark_dirty(*product_ids: str):
+    await redis_db.redis_client.sadd(DIRTY_KEY, *product_ids)
+
+
+async def pop_dirty(count: int) -> list[str]:
+    return await redis_db.redis_client.spop(DIRTY_KEY, count) or []
+
+
+async def clear_dirty():
+    await redis_db.redis_client.delete(DIRTY_KEY)
+
+
+async def acquire_writer(owner: str, ttl: int) -> bool:
+    script = redis_db.redis_client.register_script(ACQUIRE_WRITER_LUA)
+    return bool(await script(keys=[WRITER_KEY], args=[owner, ttl]))
+
+
+async def extend_writer(owner: str, ttl: int) -> bool:
+    script = redis_db.redis_client.register_script(EXTEND_WRITER_LUA)
+    return bool(await script(keys=[WRITER_KEY], args=[owner, ttl]))
+
+
+async def release_writer(owner: str):
+    script = redis_db.redis_client.register_script(RELEASE_WRITER_LUA)
+    await script(keys=[WRITER_KEY], args=[owner])
+
+
+async def get_indexable_products(collection, product_ids: list[str]) -> list[dict]:
+    """Visible products among `product_ids`; ids missing from the result should leave the index."""
+    object_ids = [ObjectId(pid) for pid in product_ids if ObjectId.is_valid(pid)]
+    if not object_ids:
+        return []
+    try:
+        return await collection.find({"_id": {"$in": object_ids}, **VISIBLE_FILTER}, INDEX_PROJECTION).to_list(None)
+    except PyMongoError as e:
+        logger.error("Database error in get_indexable_products: %s", e)
+        raise HTTPException(status_code=500, detail="Database error")
+
+
+async def iter_indexable_products(collection, batch_size: int):
+    """All visible products in _id order, `batch_size` at a time (for full rebuilds)."""
+    last_id = None
+    while True:
+        query = dict(VISIBLE_FILTER)
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        try:
+            batch = await collection.find(query, INDEX_PROJECTION).sort("_id", 1).limit(batch_size).to_list(None)
+        except PyMongoError as e:
+            logger.error("Database error in iter_indexable_products: %s", e)
+            raise HTTPException(status_code=500, detail="Database error")
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1]["_id"]
+
+
+async def get_visible_cards(collection, product_ids: list[str], projection: dict) -> list[dict]:
+    """Cards for retrieved ids, in the given order, skipping any that stopped being visible."""
+    object_ids = [ObjectId(pid) for pid in product_ids if ObjectId.is_valid(pid)]
+    if not object_ids:
+        return []
+    try:
+        docs = await collection.find({"_id": {"$in": object_ids}, **VISIBLE_FILTER}, projection).to_list(None)
+    except PyMongoError as e:
+        logger.error("Database error in get_visible_cards: %s", e)
+        raise HTTPException(status_code=500, detail="Database error")
+    by_id = {str(d["_id"]): d for d in docs}
+    return [by_id[pid] for pid in product_ids if pid in by_id]
@@ -0,0 +1,165 @@
+"""
+Monthly audit-log archive files.
+<AUDIT_ARCHIVE_DIR>/audit-YYYY-MM.jsonl.gz   one Extended-JSON document per line, gzip members appended
+Archiving appends then deletes from Mongo, so a crash in between can repeat documents;
+readers dedupe by _id. Parsed months are cached per (file, mtime); only the few months a
+page reads are kept. Totals come from per-month counts by filter field (built once per file
+version); only the months a date bound cuts through are scanned.
+"""
+
+import gzip
+import os
+import re
+from collections import Counter
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Callable, Iterable, Optional
+
+from bson import json_util
+
+MONTH_FILE = "audit-{month}.jsonl.gz"
+# Filterable fields (audit_service.get_all_logs filters) counted per month for totals
+SUMMARY_FIELDS = ("module", "action", "performed_by.email", "target.email")
+_MONTH_FILE_RE = re.compile(r"^audit-(\d{4}-\d{2})\.jsonl\.gz$")
+
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Mongo and json_util hand back naive UTC datetimes; bring query bounds to the same form."""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def month_of(timestamp: datetime) -> str:
+    return naive_utc(timestamp).strftime("%Y-%m")
+
+
+def list_months(directory: str) -> list[str]:
+    """Archived months, newest first."""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    return sorted((m.group(1) for name in names if (m := _MONTH_FILE_RE.match(name))), reverse=True)
+
+
+def append_month(directory: str, month: str, docs: Iterable[dict]):
+    """Append docs to a month file and fsync before the caller deletes them from Mongo."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, MONTH_FILE.format(month=month))
+    with open(path, "ab") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="ab") as gz:
+            for doc in docs:
+                gz.write(json_util.dumps(doc).encode() + b"\n")
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+def _iter_month(path: str):
+    """Docs of a month file in file order, crash-replay duplicates dropped."""
+    seen = set()
+    with gzip.open(path, "rt") as f:
+        for line in f:
+            doc = json_util.loads(line)
+            if doc["_id"] not in seen:
+                seen.add(doc["_id"])
+                yield doc
+
+
+@lru_cache(maxsize=4)
+def _read_month(path: str, mtime_ns: int) -> tuple[dict, ...]:
+    docs = list(_iter_month(path))
+    docs.sort(key=lambda d: (d["timestamp"], d["_id"]), reverse=True)
+    return tuple(docs)
+
+
+@lru_cache(maxsize=1024)
+def _month_summary(path: str, mtime_ns: int) -> Counter:
+    return Counter(tuple(_field(doc, field) for field in SUMMARY_FIELDS) for doc in _iter_month(path))
+
+
+def _month_path(directory: str, month: str) -> str:
+    return os.path.join(directory, MONTH_FILE.format(month=month))
+
+
+def read_month(directory: str, month: str) -> tuple[dict, ...]:
+    """All docs of one month, newest first."""
+    path = _month_path(directory, month)
+    try:
+        return _read_month(path, os.stat(path).st_mtime_ns)
+    except FileNotFoundError:
+        return ()
+
+
+def month_summary(directory: str, month: str) -> Counter:
+    """{(module, action, performer email, target email): count} for one month."""
+    path = _month_path(directory, month)
+    try:
+        return _month_summary(path, os.stat(path).st_mtime_ns)
+    except FileNotFoundError:
+        return Counter()
+
+
+def _field(doc: dict, dotted: str):
+    for part in dotted.split("."):
+        doc = doc.get(part) if isinstance(doc, dict) else None
+    return doc
+
+
+def matcher(filters: dict, date_from: Optional[datetime] = None, date_to: Optional[datetime] = None) -> Callable[[dict], bool]:
+    """Python equivalent of audit_helpers.build_audit_query for archived docs."""
+    filters = {field: value for field, value in filters.items() if value}
+    date_from, date_to = naive_utc(date_from), naive_utc(date_to)
+
+    def match(doc: dict) -> bool:
+        ts = doc["timestamp"]
+        if (date_from and ts < date_from) or (date_to and ts > date_to):
+            return False
+        return all(_field(doc, field) == value for field, value in filters.items())
+
+    return match
+
+
+def _months_in_range(directory: str, date_from: Optional[datetime], date_to: Optional[datetime]) -> list[str]:
+    low = month_of(date_from) if date_from else None
+    high = month_of(date_to) if date_to else None
+    return [m for m in list_months(directory) if (low is None or m >= low) and (high is None or m <= high)]
+
+
+def query_archive(directory: str, match: Callable[[dict], bool], limit: int, skip: int = 0,
+                  after: Optional[list] = None, date_from: Optional[datetime] = None,
+                  date_to: Optional[datetime] = None) -> list[dict]:
+    """Up to `limit` matching archived docs, newest first, strictly after the (timestamp, _id) cursor."""
+    after_key = (naive_utc(after[0]), after[1]) if after else None
+    results = []
+    for month in _months_in_range(directory, date_from, date_to):
+        if after_key and month > month_of(after_key[0]):
+            continue
+        for doc in read_month(directory, month):
+            if after_key and (doc["timestamp"], doc["_id"]) >= after_key:
+                continue
+            if not match(doc):
+                continue
+            if skip:
+                skip -= 1
+                continue
+            results.append(dict(doc))   # callers stringify _id; keep the cached copy intact
+            if len(results) >= limit:
+                return results
+    return results
+
+
+def count_archive(directory: str, filters: dict, date_from: Optional[datetime] = None,
+                  date_to: Optional[datetime] = None) -> int:
+    """Archived docs matching filters/date range. Only the months a date bound falls in are scanned."""
+    match = matcher(filters, date_from, date_to)
+    wanted = [(i, value) for i, field in enumerate(SUMMARY_FIELDS) if (value := filters.get(field))]
+    edges = {month_of(bound) for bound in (date_from, date_to) if bound}
+    total = 0
+    for month in _months_in_range(directory, date_from, date_to):
+        if month in edges:
+            total += sum(1 for doc in read_month(directory, month) if match(doc))
+        else:
+            total += sum(count for key, count in month_summary(directory, month).items()
+                         if all(key[i] == value for i, value in wanted))
+    return total
@@ -1,59 +1,116 @@
 import logging
-from pymongo.errors import PyMongoError
+from bson import ObjectId
+from pymongo.errors import PyMongoError, BulkWriteError
 from fastapi import HTTPException
 from typing import Optional
 from datetime import datetime
+from app.db import redis as redis_db
+from app.utils.cursor import keyset_filter
 
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
 
+ARCHIVE_LOCK_KEY = "audit:archive:lock"
 
-async def insert_audit_log(collection, log_data: dict):
+
+async def insert_audit_logs(collection, docs: list[dict]) -> int:
+    """
+    insert_many for a buffered batch. Docs carry their own _id, so re-sending a batch after a
+    partial failure only trips duplicate-key errors, which are treated as already written.
+    """
+    if not docs:
+        return 0
     try:
-        result = await collection.insert_one(log_data)
-        return result
+        result = await collection.insert_many(docs, ordered=False)
+        return len(result.inserted_ids)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if errors and all(err.get("code") == 11000 for err in errors):
+            return e.details.get("nInserted", 0)
+        logger.error("DB Error inserting audit log batch: %s", e)
+        raise
     except PyMongoError as e:
-        logger.error(f"DB Error inserting audit log: {e}")
-        # Audit failures should not crash the main operation
-        # So we log but don't raise
-
-
-async def fetch_audit_logs(
-    collection,
-    module: Optional[str] = None,
-    action: Optional[str] = None,
-    performed_by_email: Optional[str] = None,
-    target_email: Optional[str] = None,
-    date_from: Optional[datetime] = None,
-    date_to: Optional[datetime] = None,
-    skip: int = 0,
-    limit: int = 20
-) -> list:
-    """Fetch audit logs with optional filters."""
+        logger.error("DB Error inserting audit log batch: %s", e)
+        raise
+
+
+async def fetch_user_contexts(collection, user_ids: list[str]) -> dict[str, dict]:
+    """{user_id: user doc (username, email, role)} for one batch of audit events — one query."""
+    object_ids = [ObjectId(uid) for uid in user_ids if ObjectId.is_valid(uid)]
+    if not object_ids:
+        return {}
+    try:
+        users = await collection.find(
+            {"_id": {"$in": object_ids}}, {"username": 1, "email": 1, "role": 1}
+        ).to_list(None)
+    except PyMongoError as e:
+        logger.error("DB Error resolving audit user context: %s", e)
+        return {}
+    return {str(u["_id"]): u for u in users}
+
+
+AUDIT_SORT = [("timestamp", -1), ("_id", -1)]
+
+# Filterable fields; each has a compound (field, timestamp, _id) index so filter + sort is one index scan
+AUDIT_FILTER_FIELDS = ("module", "action", "performed_by.email", "target.email")
+
+
+def build_audit_query(filters: dict, date_from: Optional[datetime] = None, date_to: Optional[datetime] = None) -> dict:
+    """Mongo query for equality `filters` (keys from AUDIT_FILTER_FIELDS) and a timestamp range."""
+    query = {field: value for field, value in filters.items() if value}
+    if date_from or date_to:
+        query["timestamp"] = {}
+        if date_from:
+            query["timestamp"]["$gte"] = date_from
+        if date_to:
+            query["timestamp"]["$lte"] = date_to
+    return query
+
+
+async def fetch_audit_logs(collection, query: dict, limit: int = 20, skip: int = 0,
+                           after: Optional[list] = None) -> list:
+    """
+    Up to `limit` logs matching `query`, newest first. `after` is a decoded (timestamp, _id)
+    cursor: the page starts right after it, so deep pages cost the same as the first.
+    """
+    if after:
+        query = {"$and": [query, keyset_filter(AUDIT_SORT, after)]}
+        skip = 0
     try:
-        query = {}
-
-        if module:
-            query["module"] = module
-        if action:
-            query["action"] = action
-        if performed_by_email:
-            query["performed_by.email"] = performed_by_email
-        if target_email:
-            query["target.email"] = target_email
-        if date_from or date_to:
-            query["timestamp"] = {}
-            if date_from:
-                query["timestamp"]["$gte"] = date_from
-            if date_to:
-                query["timestamp"]["$lte"] = date_to
-
-        cursor = collection.find(query).sort("timestamp", -1).skip(skip).limit(limit)
-        logs = await cursor.to_list(length=limit)
-
-        # Get total count for pagination
-        total = await collection.count_documents(query)
-
-        return {"logs": logs, "total": total}
+        find = collection.find(query).sort(AUDIT_SORT)
+        if skip:
+            find = find.skip(skip)
+        return await find.limit(limit).to_list(length=limit)
     except PyMongoError as e:
-        logger.error(f"DB Error fetching audit logs: {e}")
+        logger.error("DB Error fetching audit logs: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
+
+
+async def count_audit_logs(collection, query: dict) -> int:
+    try:
+        return await collection.count_documents(query)
+    except PyMongoError as e:
+        logger.error("DB Error counting audit logs: %s", e)
+        raise HTTPException(status_code=500, detail="Database error")
+
+
+async def fetch_audit_logs_before(collection, cutoff: datetime, limit: int) -> list:
+    """Oldest logs with timestamp < cutoff (archival batches)."""
+    try:
+        return await collection.find({"timestamp": {"$lt": cutoff}}).sort([("timestamp", 1), ("_id", 1)]).limit(limit).to_list(length=limit)
+    except PyMongoError as e:
+        logger.error("DB Error fetching audit logs to archive: %s", e)
+        raise
+
+
+async def delete_audit_logs(collection, ids: list) -> int:
+    try:
+        result = await collection.delete_many({"_id": {"$in": ids}})
+        return result.deleted_count
+    except PyMongoError as e:
+        logger.error("DB Error deleting archived audit logs: %s", e)
+        raise
+
+
+async def claim_archive_run(ttl_seconds: int) -> bool:
+    """One archival pass per interval across workers: SET NX on a key that expires with the interval."""
+    return bool(await redis_db.redis_client.set(ARCHIVE_LOCK_KEY, "1", nx=True, ex=ttl_seconds))
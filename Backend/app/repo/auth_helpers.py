@@ -5,7 +5,7 @@ from app.core.time_utils import utc_now
 from fastapi import HTTPException
 import logging
 
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
 
 
 # Helper functions
@@ -13,18 +13,18 @@ async def get_user_by_email(collection, email: str):
     try:
         return await collection.find_one({"email": email})
     except PyMongoError as e:
-        logger.error(f"DB Error fetching user {email}: {e}")
+        logger.error("DB Error fetching user %s: %s", email, e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def generate_tokens(id: str, email: str, role: str, user_col):
     try: 
         access_token = create_access_token({"_id": str(id), "email": email, "role": role, "iss": "Anozon", "aud": "Anozon", "iat": utc_now() })
-        refresh_token = create_refresh_token({"_id": str(id), "email": email, "role": role, "iss": "Anozon", "aud": "Anozon", "iat": utc_now()})
+        refresh_token = create_refresh_token(user_id=str(id))
         
         return access_token, refresh_token
 
     except Exception as e:
-        logger.error(f"Token generation error: {e}")
+        logger.error("Token generation error: %s", e)
         raise HTTPException(status_code=500, detail="Token generation failed")
 
 async def count_users(collection):
@@ -32,7 +32,7 @@ async def count_users(collection):
         count = await collection.count_documents({})
         return count
     except PyMongoError as e:
-        logger.error(f"DB Error counting users: {e}")
+        logger.error("DB Error counting users: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def insert_user(collection, user_data: dict):
@@ -40,7 +40,7 @@ async def insert_user(collection, user_data: dict):
         result = await collection.insert_one(user_data)
         return result
     except PyMongoError as e:
-        logger.error(f"DB Error inserting user: {e}")
+        logger.error("DB Error inserting user: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def update_user(collection, user_id: str, update_data: dict):
@@ -48,7 +48,7 @@ async def update_user(collection, user_id: str, update_data: dict):
         result = await collection.update_one({"_id": ObjectId(user_id)}, {"$set": update_data})
         return result
     except PyMongoError as e:
-        logger.error(f"DB Error updating user: {e}")
+        logger.error("DB Error updating user: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def delete_user(collection, user_id: str):
@@ -56,7 +56,7 @@ async def delete_user(collection, user_id: str):
         result = await collection.delete_one({"_id": ObjectId(user_id)})
         return result
     except PyMongoError as e:
-        logger.error(f"DB Error deleting user: {e}")
+        logger.error("DB Error deleting user: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def update_user_by_email(collection, email: str, update_data: dict):
@@ -64,5 +64,5 @@ async def update_user_by_email(collection, email: str, update_data: dict):
         result = await collection.update_one({"email": email}, {"$set": update_data})
         return result
     except PyMongoError as e:
-        logger.error(f"DB Error updating user by email: {e}")
+        logger.error("DB Error updating user by email: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
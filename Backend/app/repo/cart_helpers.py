@@ -4,7 +4,7 @@ from pymongo.errors import PyMongoError
 from app.core.time_utils import utc_now
 import logging
 
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
 
 def cart_to_db(user_id: str) -> dict:
     """Structure for a new cart document."""
@@ -22,7 +22,7 @@ async def create_empty_cart(collection, user_id: str):
         result = await collection.insert_one(cart_data)
         return result
     except PyMongoError as e:
-        logger.error(f"Error creating cart for user {user_id}: {e}")
+        logger.error("Error creating cart for user %s: %s", user_id, e)
         raise e
 
 async def get_cart_by_user(collection, user_id: str):
@@ -30,7 +30,7 @@ async def get_cart_by_user(collection, user_id: str):
     try:
         return await collection.find_one({"user_id": ObjectId(user_id)})
     except PyMongoError as e:
-        logger.error(f"Error fetching cart for user {user_id}: {e}")
+        logger.error("Error fetching cart for user %s: %s", user_id, e)
         raise e
 
 async def add_item_to_cart(collection, user_id: str, product_id: str, quantity: int):
@@ -52,7 +52,7 @@ async def add_item_to_cart(collection, user_id: str, product_id: str, quantity:
             )
         return result
     except PyMongoError as e:
-        logger.error(f"Error adding item to cart for user {user_id}: {e}")
+        logger.error("Error adding item to cart for user %s: %s", user_id, e)
         raise e
 
 async def remove_item_from_cart(collection, user_id: str, product_id: str):
@@ -64,7 +64,7 @@ async def remove_item_from_cart(collection, user_id: str, product_id: str):
         )
         return result
     except PyMongoError as e:
-        logger.error(f"Error removing item from cart for user {user_id}: {e}")
+        logger.error("Error removing item from cart for user %s: %s", user_id, e)
         raise e
 
 async def update_item_quantity(collection, user_id: str, product_id: str, quantity: int):
@@ -76,7 +76,7 @@ async def update_item_quantity(collection, user_id: str, product_id: str, quanti
         )
         return result
     except PyMongoError as e:
-        logger.error(f"Error updating item quantity for user {user_id}: {e}")
+        logger.error("Error updating item quantity for user %s: %s", user_id, e)
         raise e
 
 async def clear_user_cart(collection, user_id: str):
@@ -88,7 +88,7 @@ async def clear_user_cart(collection, user_id: str):
         )
         return result
     except PyMongoError as e:
-        logger.error(f"Error clearing cart for user {user_id}: {e}")
+        logger.error("Error clearing cart for user %s: %s", user_id, e)
         raise e
 
 async def update_user_wishlist(collection, user_id: str, product_id: str, action: str):
@@ -114,6 +114,6 @@ async def update_user_wishlist(collection, user_id: str, product_id: str, action
             )
             return result.modified_count > 0
     except PyMongoError as e:
-        logger.error(f"Error updating wishlist for user {user_id}: {e}")
+        logger.error("Error updating wishlist for user %s: %s", user_id, e)
         raise e
 
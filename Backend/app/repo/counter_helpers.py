@@ -0,0 +1,117 @@
+"""
+Write-behind counter storage.
+Increments accumulate in a Redis hash per counter field and are flushed to Mongo in
+batches. Each flush claims the pending hash atomically (Lua) under a batch id; every
+product remembers the last APPLIED_BATCHES_KEPT batch ids it applied, so replaying a batch
+after a crash, or a slow worker applying it after newer batches landed, is a no-op.
+"""
+
+import logging
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+from app.db import redis as redis_db
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = "counters:pending:{field}"
+FLUSHING_KEY = "counters:flushing:{field}"
+BATCH_FIELD = "__batch__"
+# Per product and field; a worker stalled for more flushes than this could still double count
+APPLIED_BATCHES_KEPT = 16
+
+# Move pending → flushing (only if no batch is already in flight) and tag it with a batch id.
+# An existing flushing hash means a previous flush crashed or is still running: return it as-is
+# so it is retried under its original batch id.
+CLAIM_BATCH_LUA = """
+local pending, flushing = KEYS[1], KEYS[2]
+if redis.call('EXISTS', flushing) == 0 then
+    if redis.call('EXISTS', pending) == 0 then
+        return {}
+    end
+    redis.call('RENAME', pending, flushing)
+    redis.call('HSET', flushing, ARGV[1], ARGV[2])
+end
+return redis.call('HGETALL', flushing)
+"""
+
+# Delete the flushing hash only if it is still the batch the caller applied. Two workers can
+# claim the same in-flight batch; the slower one must not delete a newer batch claimed since
+# (its late Mongo writes are already skipped by the applied-batch list).
+RELEASE_BATCH_LUA = """
+if redis.call('HGET', KEYS[1], ARGV[1]) == ARGV[2] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+async def incr_pending_counter(field: str, product_id: str, amount: int = 1) -> int | None:
+    """HINCRBY the pending counter for one product. Returns None if Redis is not connected."""
+    if redis_db.redis_client is None:
+        return None
+    return await redis_db.redis_client.hincrby(PENDING_KEY.format(field=field), product_id, amount)
+
+
+async def claim_counter_batch(field: str, batch_id: str) -> tuple[str | None, dict[str, int]]:
+    """Atomically claim the pending increments for a field. Returns (batch_id, {product_id: delta})."""
+    if redis_db.redis_client is None:
+        return None, {}
+    script = redis_db.redis_client.register_script(CLAIM_BATCH_LUA)
+    raw = await script(
+        keys=[PENDING_KEY.format(field=field), FLUSHING_KEY.format(field=field)],
+        args=[BATCH_FIELD, batch_id]
+    )
+    if not raw:
+        return None, {}
+
+    data = dict(zip(raw[0::2], raw[1::2]))
+    claimed_batch = data.pop(BATCH_FIELD, batch_id)
+    return claimed_batch, {pid: int(delta) for pid, delta in data.items() if int(delta) != 0}
+
+
+async def release_counter_batch(field: str, batch_id: str) -> bool:
+    """Drop the flushing hash once batch_id's increments are durable in Mongo. False if another batch is in flight."""
+    script = redis_db.redis_client.register_script(RELEASE_BATCH_LUA)
+    return bool(await script(keys=[FLUSHING_KEY.format(field=field)], args=[BATCH_FIELD, batch_id]))
+
+
+def _batched_increment(field: str, delta: int, batch_id: str) -> list[dict]:
+    """Update pipeline: add delta and append batch_id to the product's bounded applied-batch list."""
+    applied = f"$counter_batches.{field}"
+    return [{"$set": {
+        field: {"$add": [{"$ifNull": [f"${field}", 0]}, delta]},
+        f"counter_batches.{field}": {"$slice": [{"$concatArrays": [
+            # Older documents hold a single batch id string instead of the list
+            {"$cond": [{"$isArray": applied}, applied,
+                       {"$cond": [{"$eq": [{"$type": applied}, "string"]}, [applied], []]}]},
+            [{"$literal": batch_id}],
+        ]}, -APPLIED_BATCHES_KEPT]},
+    }}]
+
+
+async def apply_counter_deltas(collection, field: str, deltas: dict[str, int], batch_id: str | None = None) -> int:
+    """
+    bulk_write one increment per product. With a batch_id, each update only applies if the
+    batch is not among the product's recently applied ones for this field (idempotent replay).
+    Returns the number of modified documents.
+    """
+    ops = []
+    for product_id, delta in deltas.items():
+        if not ObjectId.is_valid(product_id):
+            continue
+        query = {"_id": ObjectId(product_id)}
+        if batch_id:
+            query[f"counter_batches.{field}"] = {"$nin": [batch_id]}
+            ops.append(UpdateOne(query, _batched_increment(field, delta, batch_id)))
+        else:
+            ops.append(UpdateOne(query, {"$inc": {field: delta}}))
+
+    if not ops:
+        return 0
+    try:
+        result = await collection.bulk_write(ops, ordered=False)
+        return result.modified_count
+    except PyMongoError as e:
+        logger.error("DB Error flushing %s counters: %s", field, e)
+        raise
@@ -0,0 +1,48 @@
+"""
+Redis denylist for access tokens that must die before their exp.
+auth:denylist        zset  member -> expiry timestamp   ("jti:<jti>" or "user:<user_id>")
+auth:denylist:users  hash  user_id -> revoked-before timestamp (tokens issued at or before it are void)
+Entries only need to live as long as the tokens they revoke.
+"""
+
+import time
+from app.db import redis as redis_db
+
+DENYLIST_KEY = "auth:denylist"
+USER_CUTOFF_KEY = "auth:denylist:users"
+
+
+async def add_jti(jti: str, exp: float):
+    await redis_db.redis_client.zadd(DENYLIST_KEY, {f"jti:{jti}": exp})
+
+
+async def add_user_cutoff(user_id: str, cutoff: float, expires_at: float):
+    async with redis_db.redis_client.pipeline(transaction=True) as pipe:
+        pipe.hset(USER_CUTOFF_KEY, user_id, cutoff)
+        pipe.zadd(DENYLIST_KEY, {f"user:{user_id}": expires_at})
+        await pipe.execute()
+
+
+async def is_jti_denied(jti: str) -> bool:
+    score = await redis_db.redis_client.zscore(DENYLIST_KEY, f"jti:{jti}")
+    return score is not None and score > time.time()
+
+
+async def get_user_cutoff(user_id: str) -> float | None:
+    value = await redis_db.redis_client.hget(USER_CUTOFF_KEY, user_id)
+    return float(value) if value is not None else None
+
+
+async def get_active_entries() -> list[str]:
+    """Prune expired entries and return the live ones (used to rebuild local bloom filters)."""
+    now = time.time()
+    async with redis_db.redis_client.pipeline(transaction=True) as pipe:
+        pipe.zrangebyscore(DENYLIST_KEY, "-inf", now)
+        pipe.zremrangebyscore(DENYLIST_KEY, "-inf", now)
+        pipe.zrangebyscore(DENYLIST_KEY, now, "+inf")
+        expired, _, active = await pipe.execute()
+
+    expired_users = [m.split(":", 1)[1] for m in expired if m.startswith("user:")]
+    if expired_users:
+        await redis_db.redis_client.hdel(USER_CUTOFF_KEY, *expired_users)
+    return active
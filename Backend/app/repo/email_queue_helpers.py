@@ -0,0 +1,98 @@
+"""
+Durable outbound email queue.
+email:jobs      stream, consumer group "email-workers"; fields: job (JSON)
+email:retry     zset  job JSON -> due timestamp (backoff before re-entering the stream)
+email:dead      list  jobs that exhausted their attempts (newest first, capped)
+email:dedupe:{key}  string with TTL; a second enqueue with the same key is dropped
+A job stays pending in the group until acked, so a worker that dies mid-send leaves it to be
+reclaimed by another worker after CLAIM_IDLE_MS.
+"""
+
+import json
+import time
+from redis.exceptions import ResponseError
+from app.db import redis as redis_db
+
+JOBS_STREAM = "email:jobs"
+RETRY_KEY = "email:retry"
+DEAD_KEY = "email:dead"
+DEDUPE_KEY = "email:dedupe:{key}"
+GROUP = "email-workers"
+CLAIM_IDLE_MS = 60_000
+DEAD_LETTER_MAX = 1000
+
+# KEYS: dedupe key, stream. ARGV: dedupe ttl, job json. Returns stream id, or false if duplicate.
+ENQUEUE_LUA = """
+if redis.call('SET', KEYS[1], '1', 'NX', 'EX', ARGV[1]) then
+    return redis.call('XADD', KEYS[2], '*', 'job', ARGV[2])
+end
+return false
+"""
+
+# KEYS: retry zset, stream. ARGV: now, max. Moves due retries back onto the stream.
+PROMOTE_RETRIES_LUA = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, job in ipairs(due) do
+    redis.call('ZREM', KEYS[1], job)
+    redis.call('XADD', KEYS[2], '*', 'job', job)
+end
+return #due
+"""
+
+
+async def ensure_group():
+    try:
+        await redis_db.redis_client.xgroup_create(JOBS_STREAM, GROUP, id="0", mkstream=True)
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+async def enqueue_job(job: dict, dedupe_key: str, dedupe_ttl: int) -> str | None:
+    """Append a job unless one with the same dedupe key was queued within dedupe_ttl."""
+    script = redis_db.redis_client.register_script(ENQUEUE_LUA)
+    return await script(keys=[DEDUPE_KEY.format(key=dedupe_key), JOBS_STREAM], args=[dedupe_ttl, json.dumps(job)])
+
+
+def _decode(entries) -> list[tuple[str, dict]]:
+    return [(entry_id, json.loads(fields["job"])) for entry_id, fields in entries if fields]
+
+
+async def read_jobs(consumer: str, count: int, block_ms: int) -> list[tuple[str, dict]]:
+    """New jobs for this consumer, after first reclaiming any left pending by a dead worker."""
+    _, claimed, *_ = await redis_db.redis_client.xautoclaim(
+        JOBS_STREAM, GROUP, consumer, min_idle_time=CLAIM_IDLE_MS, start_id="0-0", count=count
+    )
+    if claimed:
+        return _decode(claimed)
+    response = await redis_db.redis_client.xreadgroup(GROUP, consumer, {JOBS_STREAM: ">"}, count=count, block=block_ms)
+    return _decode(response[0][1]) if response else []
+
+
+async def ack_jobs(entry_ids: list[str]):
+    if not entry_ids:
+        return
+    async with redis_db.redis_client.pipeline(transaction=True) as pipe:
+        pipe.xack(JOBS_STREAM, GROUP, *entry_ids)
+        pipe.xdel(JOBS_STREAM, *entry_ids)
+        await pipe.execute()
+
+
+async def schedule_retries(jobs: list[tuple[dict, float]]):
+    """jobs: (job, due_at). The originals must be acked separately."""
+    if jobs:
+        await redis_db.redis_client.zadd(RETRY_KEY, {json.dumps(job): due for job, due in jobs})
+
+
+async def promote_due_retries(limit: int = 500) -> int:
+    script = redis_db.redis_client.register_script(PROMOTE_RETRIES_LUA)
+    return await script(keys=[RETRY_KEY, JOBS_STREAM], args=[time.time(), limit])
+
+
+async def dead_letter(jobs: list[dict]):
+    if not jobs:
+        return
+    async with redis_db.redis_client.pipeline(transaction=True) as pipe:
+        pipe.lpush(DEAD_KEY, *(json.dumps(job) for job in jobs))
+        pipe.ltrim(DEAD_KEY, 0, DEAD_LETTER_MAX - 1)
+        await pipe.execute()
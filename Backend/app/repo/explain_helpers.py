@@ -0,0 +1,68 @@
+"""
+explain() for raw command documents and a compact summary of the winning plan.
+Works for find/count/distinct/update/delete/findAndModify and aggregate (plan under $cursor).
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+EXPLAINABLE_COMMANDS = frozenset({"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"})
+
+# Session / routing fields the driver adds; explain rejects or ignores them
+_DRIVER_FIELDS = frozenset({"lsid", "txnNumber", "$clusterTime", "$db", "$readPreference", "readConcern", "writeConcern"})
+
+
+async def explain_command(client, database: str, command: dict, verbosity: str = "queryPlanner") -> dict:
+    """Run explain for a command document as the driver sent it."""
+    try:
+        clean = {key: value for key, value in command.items() if key not in _DRIVER_FIELDS}
+        return await client[database].command({"explain": clean, "verbosity": verbosity})
+    except Exception as e:
+        logger.error("DB Error explaining %s: %s", next(iter(command), "?"), e)
+        raise
+
+
+def _walk(stage: dict):
+    yield stage
+    if "inputStage" in stage:
+        yield from _walk(stage["inputStage"])
+    for child in stage.get("inputStages", []):
+        yield from _walk(child)
+
+
+def _planners(explain: dict):
+    if "queryPlanner" in explain:
+        yield explain["queryPlanner"], explain.get("executionStats")
+    for stage in explain.get("stages", []):
+        cursor = stage.get("$cursor")
+        if cursor and "queryPlanner" in cursor:
+            yield cursor["queryPlanner"], cursor.get("executionStats")
+
+
+def plan_summary(explain: dict) -> dict:
+    """
+    {"plan": "FETCH > IXSCAN", "indexes": [...], "collscan": bool, "in_memory_sort": bool,
+     "docs_examined", "keys_examined", "returned"} (the counts only with executionStats).
+    """
+    stages, indexes = [], []
+    examined = {"docs_examined": None, "keys_examined": None, "returned": None}
+    for planner, stats in _planners(explain):
+        plan = planner.get("winningPlan", {})
+        for stage in _walk(plan.get("queryPlan", plan)):
+            stages.append(stage.get("stage", "?"))
+            if stage.get("indexName"):
+                indexes.append(stage["indexName"])
+        if stats:
+            for key, field in (("docs_examined", "totalDocsExamined"), ("keys_examined", "totalKeysExamined"),
+                               ("returned", "nReturned")):
+                examined[key] = (examined[key] or 0) + stats.get(field, 0)
+    # A $sort the planner could not push into the query runs in memory after the cursor
+    pipeline_sort = any("$sort" in stage for stage in explain.get("stages", []))
+    return {
+        "plan": " > ".join(stages) or "?",
+        "indexes": indexes,
+        "collscan": "COLLSCAN" in stages,
+        "in_memory_sort": "SORT" in stages or pipeline_sort,
+        **examined,
+    }
@@ -10,7 +10,7 @@ from fastapi import HTTPException
 from bson import ObjectId
 from app.repo.product_helpers import CARD_PROJECTION
 
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
 
 # ── Shared constants ──────────────────────────────────────────────────────────
 
@@ -46,7 +46,7 @@ async def fetch_categories_with_subcategories(collection) -> list[dict]:
             cat["sub_categories"] = [s for s in cat.get("sub_categories", []) if s]
         return results
     except PyMongoError as e:
-        logger.error(f"DB Error fetching categories with subcategories: {e}")
+        logger.error("DB Error fetching categories with subcategories: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 
@@ -59,7 +59,7 @@ async def fetch_flash_deals(collection, min_discount: int = 30, limit: int = 12)
         ).limit(limit)
         return await cursor.to_list(length=limit)
     except PyMongoError as e:
-        logger.error(f"DB Error fetching flash deals: {e}")
+        logger.error("DB Error fetching flash deals: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 
@@ -72,7 +72,7 @@ async def fetch_top_products(collection, limit: int = 12) -> list[dict]:
         ).limit(limit)
         return await cursor.to_list(length=limit)
     except PyMongoError as e:
-        logger.error(f"DB Error fetching top products: {e}")
+        logger.error("DB Error fetching top products: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 
@@ -85,7 +85,7 @@ async def fetch_new_arrivals(collection, limit: int = 12) -> list[dict]:
         ).limit(limit)
         return await cursor.to_list(length=limit)
     except PyMongoError as e:
-        logger.error(f"DB Error fetching new arrivals: {e}")
+        logger.error("DB Error fetching new arrivals: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 
@@ -98,7 +98,7 @@ async def fetch_featured_products(collection, limit: int = 8) -> list[dict]:
         ).limit(limit)
         return await cursor.to_list(length=limit)
     except PyMongoError as e:
-        logger.error(f"DB Error fetching featured products: {e}")
+        logger.error("DB Error fetching featured products: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 
@@ -112,7 +112,7 @@ async def fetch_active_banners(collection) -> list[dict]:
         ).sort("priority", -1)
         return await cursor.to_list(length=20)
     except PyMongoError as e:
-        logger.error(f"DB Error fetching banners: {e}")
+        logger.error("DB Error fetching banners: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 
@@ -122,7 +122,7 @@ async def fetch_all_banners(collection) -> list[dict]:
         cursor = collection.find().sort("priority", -1)
         return await cursor.to_list(length=100)
     except PyMongoError as e:
-        logger.error(f"DB Error fetching all banners: {e}")
+        logger.error("DB Error fetching all banners: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 
@@ -133,7 +133,7 @@ async def insert_banner(collection, banner_data: dict) -> dict:
         banner_data["_id"] = result.inserted_id
         return banner_data
     except PyMongoError as e:
-        logger.error(f"DB Error inserting banner: {e}")
+        logger.error("DB Error inserting banner: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 
@@ -151,7 +151,7 @@ async def update_banner_by_id(collection, banner_id: str, update_data: dict) ->
             raise HTTPException(status_code=404, detail="Banner not found")
         return result
     except PyMongoError as e:
-        logger.error(f"DB Error updating banner {banner_id}: {e}")
+        logger.error("DB Error updating banner %s: %s", banner_id, e)
         raise HTTPException(status_code=500, detail="Database error")
 
 
@@ -165,5 +165,5 @@ async def delete_banner_by_id(collection, banner_id: str) -> bool:
             raise HTTPException(status_code=404, detail="Banner not found")
         return True
     except PyMongoError as e:
-        logger.error(f"DB Error deleting banner {banner_id}: {e}")
+        logger.error("DB Error deleting banner %s: %s", banner_id, e)
         raise HTTPException(status_code=500, detail="Database error")
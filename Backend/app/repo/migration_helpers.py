@@ -0,0 +1,69 @@
+"""
+SchemaMigrations bookkeeping: one doc per version
+{_id: version, name, status: "running" | "applied", started_at, applied_at, duration_ms}.
+Inserting the "running" doc is the claim, so two runners never apply the same version.
+Errors are logged and re-raised: these run at startup and from the CLI, not in requests.
+"""
+
+import logging
+from datetime import datetime
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+
+async def get_schema_version(collection) -> int:
+    """Highest applied version, 0 for a fresh database."""
+    try:
+        doc = await collection.find_one({"status": "applied"}, {"_id": 1}, sort=[("_id", -1)])
+        return doc["_id"] if doc else 0
+    except PyMongoError as e:
+        logger.error("DB Error reading schema version: %s", e)
+        raise
+
+
+async def get_migration_records(collection) -> dict[int, dict]:
+    try:
+        return {doc["_id"]: doc async for doc in collection.find({}).sort("_id", 1)}
+    except PyMongoError as e:
+        logger.error("DB Error listing schema migrations: %s", e)
+        raise
+
+
+async def claim_version(collection, version: int, name: str, now: datetime, stale_before: datetime) -> bool:
+    """
+    Mark `version` as running. False if it is already applied or another runner holds it;
+    a "running" claim older than `stale_before` (crashed runner) is taken over.
+    """
+    try:
+        await collection.insert_one({"_id": version, "name": name, "status": "running", "started_at": now})
+        return True
+    except DuplicateKeyError:
+        result = await collection.update_one(
+            {"_id": version, "status": "running", "started_at": {"$lt": stale_before}},
+            {"$set": {"name": name, "started_at": now}},
+        )
+        return result.modified_count == 1
+    except PyMongoError as e:
+        logger.error("DB Error claiming migration %s: %s", version, e)
+        raise
+
+
+async def mark_applied(collection, version: int, applied_at: datetime, duration_ms: float):
+    try:
+        await collection.update_one(
+            {"_id": version},
+            {"$set": {"status": "applied", "applied_at": applied_at, "duration_ms": round(duration_ms, 1)}},
+        )
+    except PyMongoError as e:
+        logger.error("DB Error recording migration %s: %s", version, e)
+        raise
+
+
+async def release_version(collection, version: int):
+    """Drop a failed run's claim so the next runner retries it."""
+    try:
+        await collection.delete_one({"_id": version, "status": "running"})
+    except PyMongoError as e:
+        logger.error("DB Error releasing migration %s: %s", version, e)
+        raise
@@ -5,7 +5,7 @@ from app.core.time_utils import utc_now
 import logging
 from typing import Optional
 
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
 
 
 async def create_order_in_db(orders_collection, order_data: dict) -> str:
@@ -16,7 +16,7 @@ async def create_order_in_db(orders_collection, order_data: dict) -> str:
         result = await orders_collection.insert_one(order_data)
         return str(result.inserted_id)
     except PyMongoError as e:
-        logger.error(f"Error creating order: {e}")
+        logger.error("Error creating order: %s", e)
         raise e
 
 async def get_user_orders_from_db(
@@ -46,7 +46,7 @@ async def get_user_orders_from_db(
         orders = await cursor.to_list(length=limit)
         return orders, total_count
     except PyMongoError as e:
-        logger.error(f"Error fetching orders for user {user_id}: {e}")
+        logger.error("Error fetching orders for user %s: %s", user_id, e)
         raise e
 
 async def get_order_by_id_db(orders_collection, order_id: str, user_id: str) -> Optional[dict]:
@@ -54,7 +54,7 @@ async def get_order_by_id_db(orders_collection, order_id: str, user_id: str) ->
     try:
         return await orders_collection.find_one({"_id": ObjectId(order_id), "user_id": ObjectId(user_id)})
     except PyMongoError as e:
-        logger.error(f"Error fetching order {order_id}: {e}")
+        logger.error("Error fetching order %s: %s", order_id, e)
         raise e
 
 async def update_order_status_db(orders_collection, order_id: str, user_id: str, new_status: str) -> bool:
@@ -66,6 +66,6 @@ async def update_order_status_db(orders_collection, order_id: str, user_id: str,
         )
         return result.modified_count > 0
     except PyMongoError as e:
-        logger.error(f"Error updating order status for {order_id}: {e}")
+        logger.error("Error updating order status for %s: %s", order_id, e)
         raise e
 
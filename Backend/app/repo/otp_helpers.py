@@ -1,5 +1,9 @@
 import json
+import time
+import uuid
+from typing import NamedTuple
 from app.db import redis as redis_db
+from app.repo import rate_limit_helpers
 
 expiry_time = 300
 MAX_ATTEMPTS = 5
@@ -12,60 +16,122 @@ RESET_MAX_SENDS = 3            # stricter than OTP — email link doesn't need 5
 RESET_BLOCK_TIME = 1800        # block 30 min after 3 attempts
 RESET_RESEND_COOLDOWN = 120    # must wait 2 min between sends (longer than OTP)
 
-# OTP Data (otp_token -> email & otp)
-async def set_otp_data(otp_token: str, email: str, otp: str):
-    key = f"otp_data:{otp_token}"
-    data = json.dumps({"email": email, "otp": otp})
-    await redis_db.redis_client.set(key, data, ex=expiry_time)
-
-async def get_otp_data(otp_token: str):
-    key = f"otp_data:{otp_token}"
-    data = await redis_db.redis_client.get(key)
-    if data:
-        return json.loads(data)
-    return None
-
-async def delete_otp_data(otp_token: str):
-    key = f"otp_data:{otp_token}"
-    await redis_db.redis_client.delete(key)
-
-# Cooldown (preventing spam resend)
-async def set_cooldown(email: str):
-    key = f"otp_cooldown:{email}"
-    await redis_db.redis_client.set(key, "1", ex=RESEND_COOLDOWN)
-
-async def is_cooldown(email: str) -> bool:
-    key = f"otp_cooldown:{email}"
-    return await redis_db.redis_client.exists(key)
-
-# Blocking (max attempts)
-async def increment_attempts(email: str) -> int:
-    key = f"otp_attempts:{email}"
-    attempts = await redis_db.redis_client.incr(key)
-    if attempts == 1:
-        await redis_db.redis_client.expire(key, expiry_time)
-    return attempts
-
-async def reset_attempts(email: str):
-    key = f"otp_attempts:{email}"
-    await redis_db.redis_client.delete(key)
-
-async def block_email(email: str):
-    key = f"otp_blocked:{email}"
-    await redis_db.redis_client.set(key, "1", ex=BLOCKTIME)
-
-async def is_blocked(email: str) -> bool:
-    key = f"otp_blocked:{email}"
-    return await redis_db.redis_client.exists(key)
-
-# Resend tracking
-async def increment_resend_attempts(email: str) -> int:
-    key = f"otp_resend_attempts:{email}"
-    attempts = await redis_db.redis_client.incr(key)
-    if attempts == 1:
-        # Keep track of resends for the block time duration to prevent abuse
-        await redis_db.redis_client.expire(key, BLOCKTIME)
-    return attempts
+# Key layout (per email): otp_blocked:{email} string with TTL, plus the limiter windows
+# ratelimit:otp_cooldown / otp_resend / otp_attempts:{email}. OTP payload: otp_data:{otp_token}.
+OTP_DATA_KEY = "otp_data:{otp_token}"
+OTP_BLOCKED_KEY = "otp_blocked:{email}"
+
+# Each OTP operation is one script: the checks and the writes they guard can't interleave with
+# a concurrent request for the same email.
+
+# KEYS: blocked, cooldown window, resend window, otp data
+# ARGV: now_ms, cooldown_ms, resend_window_ms, max_resends, block_ms, payload, otp_ttl, hit_id
+# Returns {status, retry_after_ms}; status: ok | blocked | cooldown | resend_limit
+ISSUE_OTP_LUA = rate_limit_helpers.SLIDING_WINDOW_FN + """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return {'blocked', redis.call('PTTL', KEYS[1])}
+end
+local now = tonumber(ARGV[1])
+local allowed, _, retry = sliding_window_hit(KEYS[2], now, tonumber(ARGV[2]), 1, 0, ARGV[8])
+if allowed == 0 then
+    return {'cooldown', retry}
+end
+allowed = sliding_window_hit(KEYS[3], now, tonumber(ARGV[3]), tonumber(ARGV[4]), 1, ARGV[8])
+if allowed == 0 then
+    redis.call('SET', KEYS[1], '1', 'PX', ARGV[5])
+    return {'resend_limit', tonumber(ARGV[5])}
+end
+sliding_window_hit(KEYS[2], now, tonumber(ARGV[2]), 1, 1, ARGV[8])
+redis.call('SET', KEYS[4], ARGV[6], 'EX', ARGV[7])
+return {'ok', 0}
+"""
+
+# KEYS: otp data, blocked, attempts window (named after the email verify_otp read from the record)
+# ARGV: user_otp, now_ms, attempts_window_ms, max_attempts, block_ms, hit_id, email
+# Returns {status, email, remaining}; status: ok | invalid | blocked | wrong | locked
+VERIFY_OTP_LUA = rate_limit_helpers.SLIDING_WINDOW_FN + """
+local raw = redis.call('GET', KEYS[1])
+if not raw then
+    return {'invalid', '', 0}
+end
+local data = cjson.decode(raw)
+local email = data['email']
+if email ~= ARGV[7] then
+    return {'invalid', '', 0}
+end
+local blocked_key = KEYS[2]
+local attempts_key = KEYS[3]
+if redis.call('EXISTS', blocked_key) == 1 then
+    return {'blocked', email, 0}
+end
+if data['otp'] == ARGV[1] then
+    redis.call('DEL', KEYS[1], attempts_key)
+    return {'ok', email, 0}
+end
+local allowed, remaining = sliding_window_hit(attempts_key, tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4]), 1, ARGV[6])
+if allowed == 0 or remaining == 0 then
+    redis.call('SET', blocked_key, '1', 'PX', ARGV[5])
+    redis.call('DEL', KEYS[1])
+    return {'locked', email, 0}
+end
+return {'wrong', email, remaining}
+"""
+
+
+class OtpIssueResult(NamedTuple):
+    status: str
+    retry_after: float   # seconds; for blocked / cooldown / resend_limit
+
+
+class OtpVerifyResult(NamedTuple):
+    status: str
+    email: str
+    remaining: int       # attempts left; for wrong
+
+
+async def issue_otp(email: str, otp_token: str, otp: str) -> OtpIssueResult:
+    """Check block / cooldown / resend limit and, if clear, store the OTP and start the cooldown."""
+    script = redis_db.redis_client.register_script(ISSUE_OTP_LUA)
+    status, retry_ms = await script(
+        keys=[
+            OTP_BLOCKED_KEY.format(email=email),
+            rate_limit_helpers.rate_limit_key("otp_cooldown", email),
+            rate_limit_helpers.rate_limit_key("otp_resend", email),
+            OTP_DATA_KEY.format(otp_token=otp_token),
+        ],
+        args=[
+            int(time.time() * 1000), RESEND_COOLDOWN * 1000, BLOCKTIME * 1000, MAX_RESEND_ATTEMPTS,
+            BLOCKTIME * 1000, json.dumps({"email": email, "otp": otp}), expiry_time, uuid.uuid4().hex,
+        ],
+    )
+    return OtpIssueResult(status, max(int(retry_ms), 0) / 1000)
+
+
+async def discard_otp(email: str, otp_token: str):
+    """Undo issue_otp when the email could not be sent, so the user isn't left in cooldown."""
+    async with redis_db.redis_client.pipeline(transaction=True) as pipe:
+        pipe.delete(OTP_DATA_KEY.format(otp_token=otp_token))
+        pipe.delete(rate_limit_helpers.rate_limit_key("otp_cooldown", email))
+        await pipe.execute()
+
+
+async def verify_otp(otp_token: str, user_otp: str) -> OtpVerifyResult:
+    """Check the OTP and count the attempt; blocks the email on the MAX_ATTEMPTS-th failure."""
+    data_key = OTP_DATA_KEY.format(otp_token=otp_token)
+    # The per-email keys must be declared in KEYS, so read the email first; the script re-checks it
+    raw = await redis_db.redis_client.get(data_key)
+    if raw is None:
+        return OtpVerifyResult("invalid", "", 0)
+    email = json.loads(raw)["email"]
+    script = redis_db.redis_client.register_script(VERIFY_OTP_LUA)
+    status, email, remaining = await script(
+        keys=[data_key, OTP_BLOCKED_KEY.format(email=email), rate_limit_helpers.rate_limit_key("otp_attempts", email)],
+        args=[
+            user_otp, int(time.time() * 1000), expiry_time * 1000, MAX_ATTEMPTS, BLOCKTIME * 1000,
+            uuid.uuid4().hex, email,
+        ],
+    )
+    return OtpVerifyResult(status, email, int(remaining))
 
 
 async def set_temp_password_token(email: str, token: str | None):
@@ -84,29 +150,14 @@ async def get_temp_password_token(email: str):
 # ── new rate limiting ────────────────────────────────────────────────────────
 
 async def is_reset_blocked(email: str) -> bool:
-    return bool(await redis_db.redis_client.exists(f"reset_blocked:{email}"))
+    return not (await rate_limit_helpers.peek("reset_send", email, RESET_MAX_SENDS, RESET_BLOCK_TIME)).allowed
 
 
 async def is_reset_on_cooldown(email: str) -> bool:
-    return bool(await redis_db.redis_client.exists(f"reset_cooldown:{email}"))
+    return not (await rate_limit_helpers.peek("reset_cooldown", email, 1, RESET_RESEND_COOLDOWN)).allowed
 
 
 async def increment_reset_send_count(email: str):
-    count_key = f"reset_send_count:{email}"
-    count = await redis_db.redis_client.incr(count_key)
-
-    if count == 1:
-        # Start the window on first request
-        await redis_db.redis_client.expire(count_key, RESET_BLOCK_TIME)
-
-    if count >= RESET_MAX_SENDS:
-        await redis_db.redis_client.set(
-            f"reset_blocked:{email}", "1", ex=RESET_BLOCK_TIME
-        )
-
-    await redis_db.redis_client.set(
-        f"reset_cooldown:{email}", "1", ex=RESET_RESEND_COOLDOWN
-    )
-
-
-
+    # RESET_MAX_SENDS per RESET_BLOCK_TIME (sliding), and one per RESET_RESEND_COOLDOWN
+    await rate_limit_helpers.hit("reset_send", email, RESET_MAX_SENDS, RESET_BLOCK_TIME)
+    await rate_limit_helpers.hit("reset_cooldown", email, 1, RESET_RESEND_COOLDOWN)
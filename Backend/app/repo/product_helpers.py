@@ -1,11 +1,13 @@
 import logging
 import re
 from bson import ObjectId
-from pymongo.errors import PyMongoError
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError, DuplicateKeyError
 from fastapi import HTTPException
 from typing import Optional
+from app.core.time_utils import utc_now
 
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
 
 # ── Shared lightweight projection for product cards ──────────────────────────
 CARD_PROJECTION = {
@@ -15,6 +17,13 @@ CARD_PROJECTION = {
     "category": 1, "sub_category": 1, "is_featured": 1, "stock": 1
 }
 
+# ── Listing/search grid cards: first image only, plus the like counter ───────
+LISTING_CARD_PROJECTION = {
+    **CARD_PROJECTION,
+    "image_urls": {"$slice": 1},
+    "product_likes": 1
+}
+
 def build_product_query(
     category: Optional[str] = None,
     min_price: Optional[float] = None,
@@ -116,14 +125,14 @@ async def fetch_products(collection, query: dict, sort_by: str, sort_order: int,
         cursor = collection.find(query, projection).sort(sort_by, sort_order).skip(skip).limit(limit)
         return await cursor.to_list(length=limit)
     except PyMongoError as e:
-        logger.error(f"DB Error fetching products: {e}")
+        logger.error("DB Error fetching products: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def count_products(collection, query: dict) -> int:
     try:
         return await collection.count_documents(query)
     except PyMongoError as e:
-        logger.error(f"DB Error counting products: {e}")
+        logger.error("DB Error counting products: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def fetch_product_by_id(collection, product_id: str, only_approved: bool = True):
@@ -136,7 +145,7 @@ async def fetch_product_by_id(collection, product_id: str, only_approved: bool =
             query["is_active"] = True
         return await collection.find_one(query)
     except PyMongoError as e:
-        logger.error(f"DB Error fetching product {product_id}: {e}")
+        logger.error("DB Error fetching product %s: %s", product_id, e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def fetch_product_by_slug(collection, slug: str, only_approved: bool = True):
@@ -147,7 +156,7 @@ async def fetch_product_by_slug(collection, slug: str, only_approved: bool = Tru
             query["is_active"] = True
         return await collection.find_one(query)
     except PyMongoError as e:
-        logger.error(f"DB Error fetching product by slug {slug}: {e}")
+        logger.error("DB Error fetching product by slug %s: %s", slug, e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def fetch_categories(collection):
@@ -155,7 +164,7 @@ async def fetch_categories(collection):
         categories = await collection.distinct("category")
         return sorted(categories, key=str.lower)
     except PyMongoError as e:
-        logger.error(f"DB Error fetching categories: {e}")
+        logger.error("DB Error fetching categories: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 
@@ -233,52 +242,79 @@ async def fetch_product_facets(collection, base_query: dict) -> dict:
             "total_count": total_count
         }
     except PyMongoError as e:
-        logger.error(f"DB Error fetching product facets: {e}")
+        logger.error("DB Error fetching product facets: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
-async def update_product_likes(collection, product_id: str, user_id: str, action: str):
+async def update_product_likes(likes_collection, product_id: str, user_id: str, action: str) -> bool:
     """
     action: "like" or "unlike"
+    Likes live in the ProductLikes collection — one document per (product_id, user_id),
+    guarded by a unique index — so the Product document size stays constant.
+    Returns True only on a real state change; the caller then records the
+    product_likes delta through the write-behind counter buffer.
     """
-    if not ObjectId.is_valid(product_id):
-        raise HTTPException(status_code=400, detail="Invalid Product ID format")
-        
+    if not ObjectId.is_valid(product_id) or not ObjectId.is_valid(user_id):
+        raise HTTPException(status_code=400, detail="Invalid ID format")
+
+    like_key = {"product_id": ObjectId(product_id), "user_id": ObjectId(user_id)}
     try:
         if action == "like":
-            # Initialize fields if they don't exist separately
-            await collection.update_one(
-                {"_id": ObjectId(product_id), "liked_by": {"$exists": False}},
-                {"$set": {"liked_by": []}}
+            result = await likes_collection.update_one(
+                like_key,
+                {"$setOnInsert": {"liked_at": utc_now()}},
+                upsert=True
             )
-            await collection.update_one(
-                {"_id": ObjectId(product_id), "product_likes": {"$exists": False}},
-                {"$set": {"product_likes": 0}}
-            )
-            # Add user and increment
-            result = await collection.update_one(
-                {"_id": ObjectId(product_id)},
-                {"$addToSet": {"liked_by": user_id}}
-            )
-            if result.modified_count > 0:
-                await collection.update_one(
-                    {"_id": ObjectId(product_id)},
-                    {"$inc": {"product_likes": 1}}
-                )
+            return result.upserted_id is not None
         elif action == "unlike":
-            # Remove user and decrement
-            result = await collection.update_one(
-                {"_id": ObjectId(product_id)},
-                {"$pull": {"liked_by": user_id}}
-            )
-            if result.modified_count > 0:
-                await collection.update_one(
-                    {"_id": ObjectId(product_id), "product_likes": {"$gt": 0}},
-                    {"$inc": {"product_likes": -1}}
-                )
+            result = await likes_collection.delete_one(like_key)
+            return result.deleted_count > 0
+        return False
+    except DuplicateKeyError:
+        # Concurrent like for the same (product, user) — the other request recorded it
+        return False
     except PyMongoError as e:
-        logger.error(f"DB Error updating product likes {product_id}: {e}")
+        logger.error("DB Error updating product likes %s: %s", product_id, e)
         raise HTTPException(status_code=500, detail="Database error")
 
+async def migrate_liked_by_arrays(collection, likes_collection, batch_size: int = 1000) -> dict:
+    """
+    One-off data migration: move legacy Product.liked_by arrays into ProductLikes.
+    Idempotent — likes are upserted, product_likes is recounted from ProductLikes
+    and liked_by is unset, so re-running after a partial failure is safe.
+    """
+    migrated_products = 0
+    migrated_likes = 0
+    try:
+        cursor = collection.find({"liked_by": {"$exists": True}}, {"liked_by": 1})
+        async for product in cursor:
+            product_id = product["_id"]
+            user_ids = [u for u in (product.get("liked_by") or []) if ObjectId.is_valid(str(u))]
+            now = utc_now()
+            ops = [
+                UpdateOne(
+                    {"product_id": product_id, "user_id": ObjectId(str(u))},
+                    {"$setOnInsert": {"liked_at": now}},
+                    upsert=True
+                )
+                for u in user_ids
+            ]
+            for i in range(0, len(ops), batch_size):
+                await likes_collection.bulk_write(ops[i:i + batch_size], ordered=False)
+
+            like_count = await likes_collection.count_documents({"product_id": product_id})
+            await collection.update_one(
+                {"_id": product_id},
+                {"$set": {"product_likes": like_count}, "$unset": {"liked_by": ""}}
+            )
+            migrated_products += 1
+            migrated_likes += len(user_ids)
+
+        logger.info("Migrated %s likes from %s products into ProductLikes", migrated_likes, migrated_products)
+        return {"products": migrated_products, "likes": migrated_likes}
+    except PyMongoError as e:
+        logger.error("DB Error migrating liked_by arrays: %s", e)
+        raise
+
 async def decrement_product_stock(collection, product_id: str, quantity: int) -> bool:
     try:
         result = await collection.update_one(
@@ -287,7 +323,7 @@ async def decrement_product_stock(collection, product_id: str, quantity: int) ->
         )
         return result.modified_count > 0
     except PyMongoError as e:
-        logger.error(f"DB Error decrementing stock for {product_id}: {e}")
+        logger.error("DB Error decrementing stock for %s: %s", product_id, e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def increment_product_stock(collection, product_id: str, quantity: int) -> bool:
@@ -298,5 +334,5 @@ async def increment_product_stock(collection, product_id: str, quantity: int) ->
         )
         return result.modified_count > 0
     except PyMongoError as e:
-        logger.error(f"DB Error incrementing stock for {product_id}: {e}")
+        logger.error("DB Error incrementing stock for %s: %s", product_id, e)
         raise HTTPException(status_code=500, detail="Database error")
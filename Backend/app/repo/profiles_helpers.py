@@ -6,7 +6,7 @@ from pymongo.errors import PyMongoError
 from app.core.time_utils import utc_now
 import logging
 
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
 
 def profile_to_db(user_id: str, email: str) -> dict:
     """Empty profile document to insert on user verification."""
@@ -32,14 +32,14 @@ async def create_empty_profile(collection, user_id: str, email: str):
     try:
         await collection.insert_one(profile_to_db(user_id, email))
     except PyMongoError as e:
-        logger.error(f"DB Error creating profile for {user_id}: {e}")
+        logger.error("DB Error creating profile for %s: %s", user_id, e)
         # We don't raise error here, just log it. Auth should succeed anyway.
 
 async def get_profile_by_user_id(collection, user_id: str) -> Optional[dict]:
     try:
         return await collection.find_one({"user_id": ObjectId(user_id)})
     except PyMongoError as e:
-        logger.error(f"DB Error fetching profile {user_id}: {e}")
+        logger.error("DB Error fetching profile %s: %s", user_id, e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def update_profile_db(collection, user_id: str, update_data: dict) -> bool:
@@ -51,7 +51,7 @@ async def update_profile_db(collection, user_id: str, update_data: dict) -> bool
         )
         return result.modified_count > 0
     except PyMongoError as e:
-        logger.error(f"DB Error updating profile {user_id}: {e}")
+        logger.error("DB Error updating profile %s: %s", user_id, e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def add_address_to_profile(collection, user_id: str, address_data: dict) -> bool:
@@ -63,7 +63,7 @@ async def add_address_to_profile(collection, user_id: str, address_data: dict) -
         )
         return result.modified_count > 0
     except PyMongoError as e:
-        logger.error(f"DB Error adding address to {user_id}: {e}")
+        logger.error("DB Error adding address to %s: %s", user_id, e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def update_address_in_profile(collection, user_id: str, address_id: str, address_data: dict) -> bool:
@@ -79,7 +79,7 @@ async def update_address_in_profile(collection, user_id: str, address_id: str, a
         )
         return result.modified_count > 0
     except PyMongoError as e:
-        logger.error(f"DB Error updating address in {user_id}: {e}")
+        logger.error("DB Error updating address in %s: %s", user_id, e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def delete_address_from_profile(collection, user_id: str, address_id: str) -> bool:
@@ -90,5 +90,5 @@ async def delete_address_from_profile(collection, user_id: str, address_id: str)
         )
         return result.modified_count > 0
     except PyMongoError as e:
-        logger.error(f"DB Error deleting address from {user_id}: {e}")
+        logger.error("DB Error deleting address from %s: %s", user_id, e)
         raise HTTPException(status_code=500, detail="Database error")
@@ -0,0 +1,72 @@
+"""
+Sliding-window rate limiter: one zset per (scope, identity), one Lua call per check.
+ratelimit:{scope}:{identity}   zset  hit id -> hit time (ms)
+Hits older than the window are trimmed on every call, so the key never holds more than `limit`
+members and expires on its own once the identity goes quiet.
+"""
+
+import time
+import uuid
+from typing import NamedTuple
+from app.db import redis as redis_db
+
+RATE_LIMIT_KEY = "ratelimit:{scope}:{identity}"
+
+# Shared Lua function so other scripts (e.g. the OTP flows) can apply a window atomically
+# alongside their own writes. cost=0 peeks without consuming.
+# Returns allowed (1/0), remaining, retry_after_ms
+SLIDING_WINDOW_FN = """
+local function sliding_window_hit(key, now, window, limit, cost, hit_id)
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    local used = redis.call('ZCARD', key)
+    if used + math.max(cost, 1) > limit then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        local retry = window
+        if oldest[2] then
+            retry = tonumber(oldest[2]) + window - now
+        end
+        return 0, math.max(limit - used, 0), retry
+    end
+    for i = 1, cost do
+        redis.call('ZADD', key, now, hit_id .. ':' .. i)
+    end
+    if cost > 0 then
+        redis.call('PEXPIRE', key, window)
+    end
+    return 1, limit - used - cost, 0
+end
+"""
+
+# ARGV: now_ms, window_ms, limit, cost, hit_id
+SLIDING_WINDOW_LUA = SLIDING_WINDOW_FN + """
+return {sliding_window_hit(KEYS[1], tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4]), ARGV[5])}
+"""
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    remaining: int
+    retry_after: float   # seconds until the next hit would be allowed (0 when allowed)
+
+
+def rate_limit_key(scope: str, identity: str) -> str:
+    return RATE_LIMIT_KEY.format(scope=scope, identity=identity)
+
+
+async def hit(scope: str, identity: str, limit: int, window: float, cost: int = 1) -> RateLimitResult:
+    """Record `cost` hits if they fit in the window; otherwise record nothing."""
+    script = redis_db.redis_client.register_script(SLIDING_WINDOW_LUA)
+    allowed, remaining, retry_ms = await script(
+        keys=[rate_limit_key(scope, identity)],
+        args=[int(time.time() * 1000), int(window * 1000), limit, cost, uuid.uuid4().hex],
+    )
+    return RateLimitResult(bool(allowed), int(remaining), max(int(retry_ms), 0) / 1000)
+
+
+async def peek(scope: str, identity: str, limit: int, window: float) -> RateLimitResult:
+    """Would one more hit be allowed? Consumes nothing."""
+    return await hit(scope, identity, limit, window, cost=0)
+
+
+async def reset(scope: str, identity: str):
+    await redis_db.redis_client.delete(rate_limit_key(scope, identity))
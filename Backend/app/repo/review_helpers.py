@@ -1,9 +1,12 @@
 from bson import ObjectId
+from pymongo import UpdateOne, UpdateMany
 from pymongo.errors import PyMongoError, DuplicateKeyError
 from fastapi import HTTPException
+from typing import Optional
 import logging
+from app.utils.cursor import encode_cursor, decode_cursor, keyset_filter
 
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
 
 
 async def insert_review(collection, review_data: dict) -> str:
@@ -15,31 +18,114 @@ async def insert_review(collection, review_data: dict) -> str:
     except DuplicateKeyError:
         raise HTTPException(status_code=409, detail="You have already reviewed this product")
     except PyMongoError as e:
-        logger.error(f"DB Error inserting review: {e}")
+        logger.error("DB Error inserting review: %s", e)
         raise HTTPException(status_code=500, detail="Failed to submit review")
 
 
-async def get_reviews_by_product(collection, product_id: str, skip: int = 0, limit: int = 20) -> list:
-    """Fetch reviews for a product, newest first."""
+# Newest first; _id breaks ties so keyset pages never skip or repeat a review.
+# Served by (product_id, reviewed_at, _id), (product_id, rating, reviewed_at, _id),
+# (seller_id, reviewed_at, _id) and (reviewed_at, _id) — equality prefix + this sort. A star
+# filter is a rating range, so (product_id, rating, ...) bounds the scan to that star's reviews.
+REVIEW_FEED_SORT = [("reviewed_at", -1), ("_id", -1)]
+
+
+async def fetch_review_page(
+    collection,
+    query: dict,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    sort: list[tuple[str, int]] = REVIEW_FEED_SORT,
+    projection: Optional[dict] = None,
+) -> tuple[list, Optional[str]]:
+    """
+    One page of reviews matching `query` in `sort` order. With a cursor the page starts
+    right after it (keyset — cost independent of depth); `skip` is only for legacy page=N.
+    Returns (reviews, next_cursor); next_cursor is None on the last page.
+    """
+    if cursor:
+        query = {"$and": [query, keyset_filter(sort, decode_cursor(cursor, sort))]}
+        skip = 0
     try:
-        cursor = collection.find(
-            {"product_id": product_id}
-        ).sort("reviewed_at", -1).skip(skip).limit(limit)
-        return await cursor.to_list(length=limit)
+        find = collection.find(query, projection).sort(sort)
+        if skip:
+            find = find.skip(skip)
+        reviews = await find.limit(limit + 1).to_list(length=limit + 1)
     except PyMongoError as e:
-        logger.error(f"DB Error fetching reviews for product {product_id}: {e}")
+        logger.error("DB Error fetching review page: %s", e)
         raise HTTPException(status_code=500, detail="Failed to fetch reviews")
 
+    next_cursor = None
+    if len(reviews) > limit:
+        reviews = reviews[:limit]
+        next_cursor = encode_cursor(reviews[-1], sort)
+    return reviews, next_cursor
+
+
+async def get_reviews_by_product(collection, product_id: str, skip: int = 0, limit: int = 20,
+                                 cursor: Optional[str] = None, rating: Optional[float] = None) -> tuple[list, Optional[str]]:
+    """Fetch reviews for a product, newest first, optionally for one histogram star (see rating_star)."""
+    query = {"product_id": product_id}
+    if rating is not None:
+        query["rating"] = rating_star_range(rating)
+    return await fetch_review_page(collection, query, limit=limit, cursor=cursor, skip=skip)
+
 
 async def get_review_count_by_product(collection, product_id: str) -> int:
     """Count total reviews for a product."""
     try:
         return await collection.count_documents({"product_id": product_id})
     except PyMongoError as e:
-        logger.error(f"DB Error counting reviews for product {product_id}: {e}")
+        logger.error("DB Error counting reviews for product %s: %s", product_id, e)
         return 0
 
 
+async def get_review_totals(products_col, product_id: str) -> dict:
+    """review_count and rating_histogram from the product document (maintained by apply_rating_delta)."""
+    try:
+        product = await products_col.find_one(
+            {"_id": ObjectId(product_id)}, {"review_count": 1, "rating_histogram": 1}
+        )
+    except PyMongoError as e:
+        logger.error("DB Error fetching review totals for product %s: %s", product_id, e)
+        raise HTTPException(status_code=500, detail="Failed to fetch reviews")
+    product = product or {}
+    return {"review_count": product.get("review_count", 0), "rating_histogram": product.get("rating_histogram", {})}
+
+
+async def backfill_review_seller_ids(reviews_col, products_col, batch_size: int = 500) -> dict:
+    """
+    Copy each product's seller_id onto its reviews that predate the denormalized field.
+    Safe to re-run. Returns {"products": <products touched>, "reviews": <reviews updated>}.
+    """
+    pipeline = [
+        {"$match": {"seller_id": {"$exists": False}}},
+        {"$group": {"_id": "$product_id"}},
+    ]
+    products, updated = 0, 0
+    try:
+        product_ids = [row["_id"] async for row in reviews_col.aggregate(pipeline) if ObjectId.is_valid(str(row["_id"]))]
+        for i in range(0, len(product_ids), batch_size):
+            chunk = product_ids[i:i + batch_size]
+            owners = await products_col.find(
+                {"_id": {"$in": [ObjectId(pid) for pid in chunk]}}, {"seller_id": 1}
+            ).to_list(length=len(chunk))
+            ops = [
+                UpdateMany(
+                    {"product_id": str(p["_id"]), "seller_id": {"$exists": False}},
+                    {"$set": {"seller_id": str(p["seller_id"])}}
+                )
+                for p in owners if p.get("seller_id")
+            ]
+            if ops:
+                products += len(ops)
+                updated += (await reviews_col.bulk_write(ops, ordered=False)).modified_count
+        return {"products": products, "reviews": updated}
+    except PyMongoError as e:
+        logger.error("DB Error backfilling review seller ids: %s", e)
+        raise
+
+
 async def check_existing_review(collection, product_id: str, user_id: str) -> bool:
     """Check if a user has already reviewed a product."""
     try:
@@ -49,5 +135,124 @@ async def check_existing_review(collection, product_id: str, user_id: str) -> bo
         })
         return existing is not None
     except PyMongoError as e:
-        logger.error(f"DB Error checking existing review: {e}")
+        logger.error("DB Error checking existing review: %s", e)
         return False
+
+
+# ── Product rating aggregates ────────────────────────────────────────────────
+# Products store rating_sum, review_count and rating_histogram ({"1".."5": n}); all
+# three only ever move by $inc, so concurrent reviews can't lose updates. avg_rating
+# is derived from them server-side (pipeline update) so it never accumulates rounding drift.
+
+RATING_STARS = ("1", "2", "3", "4", "5")
+
+AVG_RATING_PIPELINE = [
+    {"$set": {"avg_rating": {"$cond": [
+        {"$gt": ["$review_count", 0]},
+        {"$round": [{"$divide": ["$rating_sum", "$review_count"]}, 2]},
+        0.0
+    ]}}}
+]
+
+
+def rating_star(rating: float) -> str:
+    """Histogram bucket for a (possibly fractional) rating: 4.5 -> "5", 4.4 -> "4"."""
+    return str(min(5, max(1, int(float(rating) + 0.5))))
+
+
+def rating_star_range(star: int) -> dict:
+    """Rating filter for the reviews counted in histogram bucket `star`: [star - 0.5, star + 0.5), open at 1 and 5."""
+    star = min(5, max(1, int(star)))
+    bounds = {}
+    if star > 1:
+        bounds["$gte"] = star - 0.5
+    if star < 5:
+        bounds["$lt"] = star + 0.5
+    return bounds
+
+
+async def apply_rating_delta(collection, product_id: str, rating: float, direction: int = 1, reviews_col=None):
+    """
+    Add (direction=1) or remove (direction=-1) one review's rating from a product's aggregates.
+    Call after the review is written/deleted. A product whose aggregates were never seeded
+    (no rating_sum) is not $inc'ed from zero — it is recomputed from reviews_col instead.
+    """
+    query = {"_id": ObjectId(product_id)}
+    try:
+        result = await collection.update_one({**query, "rating_sum": {"$exists": True}}, {"$inc": {
+            "rating_sum": rating * direction,
+            "review_count": direction,
+            f"rating_histogram.{rating_star(rating)}": direction,
+        }})
+        if not result.matched_count:
+            if reviews_col is not None:
+                await recompute_product_ratings(reviews_col, collection, product_ids=[product_id])
+            return
+        # Recomputed from the stored totals, so the last refresh to run always sees every $inc
+        await collection.update_one(query, AVG_RATING_PIPELINE)
+    except PyMongoError as e:
+        logger.error("DB Error updating rating aggregates for product %s: %s", product_id, e)
+        raise HTTPException(status_code=500, detail="Database error")
+
+
+async def recompute_product_ratings(reviews_col, products_col, batch_size: int = 500,
+                                    product_ids: Optional[list[str]] = None) -> dict:
+    """
+    Rebuild rating_sum / review_count / rating_histogram / avg_rating for every product
+    (or only `product_ids`) from the Reviews collection. Products that no longer have
+    reviews are zeroed. Returns {"products": <updated>, "reviews": <counted>}.
+    """
+    star_expr = {"$toString": {"$min": [5, {"$max": [1, {"$floor": {"$add": ["$rating", 0.5]}}]}]}}
+    review_match = {"product_id": {"$in": product_ids}} if product_ids is not None else {}
+    product_match = {"_id": {"$in": [ObjectId(pid) for pid in product_ids]}} if product_ids is not None else {}
+    pipeline = [
+        *([{"$match": review_match}] if review_match else []),
+        {"$group": {
+            "_id": "$product_id",
+            "rating_sum": {"$sum": "$rating"},
+            "review_count": {"$sum": 1},
+            **{f"star_{s}": {"$sum": {"$cond": [{"$eq": [star_expr, s]}, 1, 0]}} for s in RATING_STARS},
+        }}
+    ]
+
+    def aggregate_update(rating_sum, review_count, histogram):
+        return {"$set": {
+            "rating_sum": rating_sum,
+            "review_count": review_count,
+            "rating_histogram": histogram,
+            "avg_rating": round(rating_sum / review_count, 2) if review_count else 0.0,
+        }}
+
+    seen = set()
+    ops, updated, reviews = [], 0, 0
+    try:
+        async for row in reviews_col.aggregate(pipeline):
+            if not row["_id"] or not ObjectId.is_valid(str(row["_id"])):
+                continue
+            product_oid = ObjectId(str(row["_id"]))
+            seen.add(product_oid)
+            reviews += row["review_count"]
+            histogram = {s: row[f"star_{s}"] for s in RATING_STARS}
+            ops.append(UpdateOne({"_id": product_oid}, aggregate_update(row["rating_sum"], row["review_count"], histogram)))
+            if len(ops) >= batch_size:
+                updated += (await products_col.bulk_write(ops, ordered=False)).modified_count
+                ops = []
+
+        # Products whose aggregates say they have reviews but the Reviews collection disagrees
+        empty_histogram = {s: 0 for s in RATING_STARS}
+        async for product in products_col.find(
+            {**product_match, "$or": [{"review_count": {"$ne": 0}}, {"rating_sum": {"$exists": False}}]}, {"_id": 1}
+        ):
+            if product["_id"] in seen:
+                continue
+            ops.append(UpdateOne({"_id": product["_id"]}, aggregate_update(0, 0, empty_histogram)))
+            if len(ops) >= batch_size:
+                updated += (await products_col.bulk_write(ops, ordered=False)).modified_count
+                ops = []
+
+        if ops:
+            updated += (await products_col.bulk_write(ops, ordered=False)).modified_count
+        return {"products": updated, "reviews": reviews}
+    except PyMongoError as e:
+        logger.error("DB Error recomputing product ratings: %s", e)
+        raise
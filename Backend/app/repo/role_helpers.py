@@ -3,13 +3,13 @@ from pymongo.errors import PyMongoError
 from fastapi import HTTPException
 from bson import ObjectId
 
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
 
 async def get_user_by_id(collection, user_id: str):
     try:
         return await collection.find_one({"_id": ObjectId(user_id)})
     except PyMongoError as e:
-        logger.error(f"DB Error fetching user by ID {user_id}: {e}")
+        logger.error("DB Error fetching user by ID %s: %s", user_id, e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def update_user_role(collection, user_id: str, new_role: str, is_banned: bool = None):
@@ -24,5 +24,5 @@ async def update_user_role(collection, user_id: str, new_role: str, is_banned: b
         )
         return result
     except PyMongoError as e:
-        logger.error(f"DB Error updating user role {user_id}: {e}")
+        logger.error("DB Error updating user role %s: %s", user_id, e)
         raise HTTPException(status_code=500, detail="Database error")
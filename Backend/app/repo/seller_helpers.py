@@ -6,7 +6,7 @@ from datetime import datetime, timedelta, timezone
 from app.core.time_utils import utc_now
 from app.utils.order_utils import compute_order_status
 
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
 
 async def insert_seller_product(collection, product_data: dict) -> dict:
     try:
@@ -14,7 +14,7 @@ async def insert_seller_product(collection, product_data: dict) -> dict:
         product_data["_id"] = result.inserted_id
         return product_data
     except PyMongoError as e:
-        logger.error(f"DB Error inserting product: {e}")
+        logger.error("DB Error inserting product: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def get_seller_products(collection, seller_id: str, filters: dict = None, skip: int = 0, limit: int = 10):
@@ -27,7 +27,7 @@ async def get_seller_products(collection, seller_id: str, filters: dict = None,
         total = await collection.count_documents(query)
         return items, total
     except PyMongoError as e:
-        logger.error(f"DB Error fetching seller products: {e}")
+        logger.error("DB Error fetching seller products: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def get_seller_product_by_id(collection, product_id: str, seller_id: str):
@@ -35,7 +35,7 @@ async def get_seller_product_by_id(collection, product_id: str, seller_id: str):
         product = await collection.find_one({"_id": ObjectId(product_id), "seller_id": seller_id, "is_deleted": False})
         return product
     except PyMongoError as e:
-        logger.error(f"DB Error fetching seller product: {e}")
+        logger.error("DB Error fetching seller product: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def update_seller_product(collection, product_id: str, seller_id: str, update_data: dict):
@@ -47,7 +47,7 @@ async def update_seller_product(collection, product_id: str, seller_id: str, upd
         )
         return result.modified_count > 0
     except PyMongoError as e:
-        logger.error(f"DB Error updating seller product: {e}")
+        logger.error("DB Error updating seller product: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def soft_delete_seller_product(collection, product_id: str, seller_id: str):
@@ -58,14 +58,14 @@ async def soft_delete_seller_product(collection, product_id: str, seller_id: str
         )
         return result.modified_count > 0
     except PyMongoError as e:
-        logger.error(f"DB Error deleting seller product: {e}")
+        logger.error("DB Error deleting seller product: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def get_product_by_slug(collection, seller_id: str, slug: str):
     try:
         return await collection.find_one({"seller_id": seller_id, "slug": slug})
     except PyMongoError as e:
-        logger.error(f"DB Error fetching product by slug: {e}")
+        logger.error("DB Error fetching product by slug: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def get_seller_orders(collection, seller_id: str, skip: int = 0, limit: int = 10, status: str = None, year: int = None, month: int = None):
@@ -122,7 +122,7 @@ async def get_seller_orders(collection, seller_id: str, skip: int = 0, limit: in
         
         return items, total
     except PyMongoError as e:
-        logger.error(f"DB Error fetching seller orders: {e}")
+        logger.error("DB Error fetching seller orders: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def get_full_order_by_id(collection, order_id: str):
@@ -130,7 +130,7 @@ async def get_full_order_by_id(collection, order_id: str):
     try:
         return await collection.find_one({"_id": ObjectId(order_id)})
     except PyMongoError as e:
-        logger.error(f"DB Error fetching full order by id: {e}")
+        logger.error("DB Error fetching full order by id: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def get_seller_order_by_id(collection, order_id: str, seller_id: str):
@@ -151,7 +151,7 @@ async def get_seller_order_by_id(collection, order_id: str, seller_id: str):
         result = await cursor.to_list(length=1)
         return result[0] if result else None
     except PyMongoError as e:
-        logger.error(f"DB Error fetching seller order by id: {e}")
+        logger.error("DB Error fetching seller order by id: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def update_seller_order_item_status(collection, order_id: str, seller_id: str, new_status: str):
@@ -168,7 +168,7 @@ async def update_seller_order_item_status(collection, order_id: str, seller_id:
         )
         return result.modified_count > 0
     except PyMongoError as e:
-        logger.error(f"DB Error updating seller order status: {e}")
+        logger.error("DB Error updating seller order status: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def update_seller_order_item_status_by_product(collection, order_id: str, seller_id: str, product_id: str, new_status: str) -> bool:
@@ -186,7 +186,7 @@ async def update_seller_order_item_status_by_product(collection, order_id: str,
         )
         return result.modified_count > 0
     except PyMongoError as e:
-        logger.error(f"DB Error updating order item status by product: {e}")
+        logger.error("DB Error updating order item status by product: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def update_order_status(collection, order_id: str, new_status: str):
@@ -202,7 +202,7 @@ async def update_order_status(collection, order_id: str, new_status: str):
         )
         return result.modified_count > 0
     except PyMongoError as e:
-        logger.error(f"DB Error updating seller order status: {e}")
+        logger.error("DB Error updating seller order status: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def get_seller_dashboard_stats(product_collection, order_collection, sellers_collection, seller_id: str):
@@ -410,10 +410,10 @@ async def get_seller_dashboard_stats(product_collection, order_collection, selle
             },
         }
     except PyMongoError as e:
-        logger.error(f"DB Error fetching dashboard stats: {e}")
+        logger.error("DB Error fetching dashboard stats: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
     except Exception as e:
-        logger.error(f"Unexpected error in dashboard stats: {e}", exc_info=True)
+        logger.error("Unexpected error in dashboard stats: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Dashboard error: {str(e)}")
 
 # --- Restored Admin/Profile Helpers ---
@@ -422,7 +422,7 @@ async def get_seller_by_user_id(collection, user_id: str):
     try:
         return await collection.find_one({"user_id": user_id})
     except PyMongoError as e:
-        logger.error(f"DB Error fetching seller by user id: {e}")
+        logger.error("DB Error fetching seller by user id: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def insert_seller(collection, data: dict):
@@ -431,7 +431,7 @@ async def insert_seller(collection, data: dict):
         data["_id"] = result.inserted_id
         return data
     except PyMongoError as e:
-        logger.error(f"DB Error inserting seller: {e}")
+        logger.error("DB Error inserting seller: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def update_seller_by_user_id(collection, user_id: str, data: dict):
@@ -442,7 +442,7 @@ async def update_seller_by_user_id(collection, user_id: str, data: dict):
         )
         return result.modified_count > 0
     except PyMongoError as e:
-        logger.error(f"DB Error updating seller by user id: {e}")
+        logger.error("DB Error updating seller by user id: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def update_seller_by_object_id(collection, obj_id, data: dict):
@@ -453,7 +453,7 @@ async def update_seller_by_object_id(collection, obj_id, data: dict):
         )
         return result.modified_count > 0
     except PyMongoError as e:
-        logger.error(f"DB Error updating seller by obj id: {e}")
+        logger.error("DB Error updating seller by obj id: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
 
 async def get_pending_sellers(collection, limit: int, skip: int):
@@ -464,5 +464,5 @@ async def get_pending_sellers(collection, limit: int, skip: int):
             item["_id"] = str(item["_id"])
         return items
     except PyMongoError as e:
-        logger.error(f"DB Error fetching pending sellers: {e}")
+        logger.error("DB Error fetching pending sellers: %s", e)
         raise HTTPException(status_code=500, detail="Database error")
@@ -0,0 +1,124 @@
+"""
+Redis-backed refresh-token sessions (one per device).
+session:{session_id}       hash: user_id, email, role, digest, prev_digest, device, created_at, rotated_at
+user_sessions:{user_id}    set of the user's session ids
+Only HMAC digests of refresh secrets are stored, never the secrets themselves.
+"""
+
+import time
+from app.db import redis as redis_db
+
+SESSION_KEY = "session:{session_id}"
+USER_SESSIONS_KEY = "user_sessions:{user_id}"
+REUSE_GRACE_SECONDS = 10       # two tabs refreshing with the same cookie is a race, not theft
+
+# Compare-and-swap rotation. KEYS: session, owner's user_sessions index.
+# ARGV: presented digest, new digest, ttl, now, reuse grace, user_id, session_id. Returns:
+#   {1, user_id, email, role}  presented digest was current → rotated
+#   {-1, user_id}              presented digest was the previous one → reuse, session revoked
+#   {0}                        unknown session / digest, or a benign concurrent refresh
+# A rotation extends the index to max(its TTL, ttl) so revoke-all still finds a session that
+# has outlived the login that created the index.
+ROTATE_SESSION_LUA = """
+local key, index = KEYS[1], KEYS[2]
+local s = redis.call('HMGET', key, 'digest', 'prev_digest', 'rotated_at', 'user_id', 'email', 'role')
+if not s[1] or s[4] ~= ARGV[6] then
+    return {0}
+end
+if s[1] == ARGV[1] then
+    local ttl = tonumber(ARGV[3])
+    redis.call('HSET', key, 'prev_digest', s[1], 'digest', ARGV[2], 'rotated_at', ARGV[4])
+    redis.call('EXPIRE', key, ttl)
+    local index_ttl = redis.call('TTL', index)
+    redis.call('SADD', index, ARGV[7])
+    if index_ttl == -2 or (index_ttl >= 0 and index_ttl < ttl) then
+        redis.call('EXPIRE', index, ttl)
+    end
+    return {1, s[4], s[5], s[6]}
+end
+if s[2] and s[2] == ARGV[1] then
+    if tonumber(ARGV[4]) - tonumber(s[3] or 0) <= tonumber(ARGV[5]) then
+        return {0}
+    end
+    redis.call('DEL', key)
+    redis.call('SREM', index, ARGV[7])
+    return {-1, s[4]}
+end
+return {0}
+"""
+
+# Update role on the sessions that still exist (HSET on an expired key would resurrect it)
+SET_ROLE_LUA = """
+for i, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        redis.call('HSET', key, 'role', ARGV[1])
+    end
+end
+return 1
+"""
+
+
+async def create_session(session_id: str, user_id: str, email: str, role: str, digest: str, ttl: int, device: str | None = None):
+    now = int(time.time())
+    key = SESSION_KEY.format(session_id=session_id)
+    user_key = USER_SESSIONS_KEY.format(user_id=user_id)
+    async with redis_db.redis_client.pipeline(transaction=True) as pipe:
+        pipe.hset(key, mapping={
+            "user_id": user_id, "email": email, "role": role, "digest": digest,
+            "device": (device or "")[:200], "created_at": now, "rotated_at": now,
+        })
+        pipe.expire(key, ttl)
+        pipe.sadd(user_key, session_id)
+        pipe.expire(user_key, ttl)
+        await pipe.execute()
+
+
+async def rotate_session(session_id: str, presented_digest: str, new_digest: str, ttl: int,
+                         user_id: str | None = None) -> list:
+    """One EVALSHA when the owner is known from the session id; the script rejects a wrong owner."""
+    key = SESSION_KEY.format(session_id=session_id)
+    if user_id is None:
+        # Session ids issued before they carried the owner: look it up first
+        user_id = await redis_db.redis_client.hget(key, "user_id")
+        if not user_id:
+            return [0]
+    script = redis_db.redis_client.register_script(ROTATE_SESSION_LUA)
+    return await script(
+        keys=[key, USER_SESSIONS_KEY.format(user_id=user_id)],
+        args=[presented_digest, new_digest, ttl, int(time.time()), REUSE_GRACE_SECONDS, user_id, session_id]
+    )
+
+
+async def get_session(session_id: str) -> dict:
+    return await redis_db.redis_client.hgetall(SESSION_KEY.format(session_id=session_id))
+
+
+async def delete_session(session_id: str, user_id: str | None = None):
+    key = SESSION_KEY.format(session_id=session_id)
+    if user_id is None:
+        user_id = await redis_db.redis_client.hget(key, "user_id")
+    async with redis_db.redis_client.pipeline(transaction=True) as pipe:
+        pipe.delete(key)
+        if user_id:
+            pipe.srem(USER_SESSIONS_KEY.format(user_id=user_id), session_id)
+        await pipe.execute()
+
+
+async def get_user_session_ids(user_id: str) -> set:
+    return await redis_db.redis_client.smembers(USER_SESSIONS_KEY.format(user_id=user_id))
+
+
+async def delete_user_sessions(user_id: str) -> int:
+    session_ids = await get_user_session_ids(user_id)
+    keys = [SESSION_KEY.format(session_id=sid) for sid in session_ids]
+    keys.append(USER_SESSIONS_KEY.format(user_id=user_id))
+    await redis_db.redis_client.delete(*keys)
+    return len(session_ids)
+
+
+async def set_user_sessions_role(user_id: str, role: str):
+    session_ids = await get_user_session_ids(user_id)
+    if not session_ids:
+        return
+    script = redis_db.redis_client.register_script(SET_ROLE_LUA)
+    await script(keys=[SESSION_KEY.format(session_id=sid) for sid in session_ids], args=[role])
@@ -2,13 +2,13 @@ from bson import ObjectId
 from pymongo.errors import PyMongoError
 import logging
 
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
 
 async def get_user_by_id(collection, user_id: str):
     try:
         return await collection.find_one({"_id": ObjectId(user_id)})
     except PyMongoError as e:
-        logger.error(f"Error fetching user by ID {user_id}: {e}")
+        logger.error("Error fetching user by ID %s: %s", user_id, e)
         raise e
 
 
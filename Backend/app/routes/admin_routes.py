@@ -226,6 +226,7 @@ async def list_reviews(
     min_rating: Optional[float] = Query(None, ge=1, le=5),
     max_rating: Optional[float] = Query(None, ge=1, le=5),
     sort_rating: Optional[str] = Query(None, description="Sort by rating: asc or desc"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (skips the total count)"),
     current_user: dict = Depends(require_permission("product:approve"))
 ):
     """List all platform reviews with optional filters for moderation."""
@@ -233,7 +234,7 @@ async def list_reviews(
         page=page, limit=limit, search=search,
         product_id=product_id, seller_id=seller_id,
         min_rating=min_rating, max_rating=max_rating,
-        sort_rating=sort_rating
+        sort_rating=sort_rating, cursor=cursor
     )
 
 
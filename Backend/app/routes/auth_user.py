@@ -4,9 +4,12 @@ from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
 import logging
 from app.models.user_model import *
 from app.services.auth_service import AuthService
+from app.services import session_service
+from app.deps.roles import get_current_user
+from app.deps.rate_limit import rate_limit
 from app.db.mongodb import get_users_collection
 
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
@@ -17,8 +20,8 @@ async def signup(user: UserRegister, users_col=Depends(get_users_collection)):
     return await AuthService.signup(user, users_col)
 
 @router.post("/verify-otp", status_code=status.HTTP_200_OK)
-async def verify_otp(request: OTPVerifyRequest, response: Response, users_col=Depends(get_users_collection)):
-    result = await AuthService.verify_otp(request.otp_token, request.otp, users_col)
+async def verify_otp(request: OTPVerifyRequest, http_request: Request, response: Response, users_col=Depends(get_users_collection)):
+    result = await AuthService.verify_otp(request.otp_token, request.otp, users_col, device=http_request.headers.get("user-agent"))
     set_refresh_cookie(response, result["refresh_token"])
     return result
 
@@ -27,9 +30,12 @@ async def resend_otp(request: ResendOTPRequest, users_col=Depends(get_users_coll
     return await AuthService.resend_otp(request.email, users_col)
 
 # LOGIN (returns access + refresh tokens)
-@router.post("/login", response_model=TokenResponse)
-async def login(response: Response, form_data: OAuth2PasswordRequestForm = Depends(), users_col=Depends(get_users_collection)):
-    result = await AuthService.login(form_data.username, form_data.password, users_col)
+@router.post("/login", response_model=TokenResponse, dependencies=[
+    Depends(rate_limit("login_ip", 30, 60)),
+    Depends(rate_limit("login_email", 10, 300, per="email")),
+])
+async def login(request: Request, response: Response, form_data: OAuth2PasswordRequestForm = Depends(), users_col=Depends(get_users_collection)):
+    result = await AuthService.login(form_data.username, form_data.password, users_col, device=request.headers.get("user-agent"))
     set_refresh_cookie(response, result["refresh_token"])
     return result
 
@@ -55,9 +61,22 @@ async def forgot_password(request: ForgotPasswordRequest, users_col=Depends(get_
 async def reset_password(response: Response, request: ResetPasswordRequest, users_col=Depends(get_users_collection)):
     return await AuthService.reset_password(request.email, request.otp_token, request.new_password, users_col, response)
 
-# LOGOUT — revoke refresh token (remove from DB)
+# LOGOUT — revoke this device's session (all sessions if no refresh cookie)
 @router.post("/logout")
-async def logout(response: Response, token: str = Depends(oauth2_scheme), users_col=Depends(get_users_collection)):
+async def logout(response: Response, token: str = Depends(oauth2_scheme), refresh_token: str | None = Cookie(default=None), users_col=Depends(get_users_collection)):
     clear_refresh_cookie(response)
-    result = await AuthService.logout(token, users_col)
-    return result
+    try:
+        return await AuthService.logout(token, users_col, refresh_token=refresh_token)
+    except HTTPException as e:
+        # Still drop a stale cookie when its session is rejected
+        e.headers = {**(e.headers or {}), "set-cookie": response.headers["set-cookie"]}
+        raise
+
+# SESSIONS — list / revoke the current user's device sessions
+@router.get("/sessions")
+async def list_sessions(refresh_token: str | None = Cookie(default=None), current_user: dict = Depends(get_current_user)):
+    return await session_service.list_sessions(current_user["_id"], refresh_token)
+
+@router.delete("/sessions/{session_id}")
+async def revoke_session(session_id: str, current_user: dict = Depends(get_current_user)):
+    return await session_service.revoke_user_session(current_user["_id"], session_id)
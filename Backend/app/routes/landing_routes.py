@@ -4,7 +4,8 @@ Landing page & Banner management routes.
 - Admin Banner CRUD — Protected by require_permission("product:approve")
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from app.core.compression import variant_response
 from app.deps.roles import require_permission
 from app.models.banner_model import BannerCreate, BannerUpdate
 from app.services.landing_service import LandingService
@@ -15,13 +16,14 @@ router = APIRouter(tags=["Landing Page & Banners"])
 # ── Public Landing Page ───────────────────────────────────────────────────────
 
 @router.get("/landing")
-async def get_landing_page():
+async def get_landing_page(request: Request):
     """
     Single composite endpoint returning all landing page sections:
     banners, categories, flash_deals, top_products, new_arrivals, featured.
-    Responses are cached in Redis for 5 minutes.
+    Responses are cached in Redis for 5 minutes, already compressed.
     """
-    return await LandingService.get_landing_page()
+    variants = await LandingService.get_landing_variants()
+    return variant_response(variants, request.headers.get("accept-encoding", ""))
 
 
 # ── Admin Banner CRUD Management ─────────────────────────────────────────────
@@ -1,11 +1,16 @@
-from fastapi import APIRouter, HTTPException, Query, Path
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Path
+from typing import Optional, Literal
 from app.services.product_service import ProductService
-from app.models.product_model import PaginatedProductResponse, ProductResponse
+from app.deps.rate_limit import rate_limit
+from app.models.product_model import PaginatedProductResponse, PaginatedProductCardResponse, ProductResponse
 
 router = APIRouter(tags=["Public Product Routes"])
 
-@router.get("/products", response_model=PaginatedProductResponse)
+# Listing endpoints return compact cards by default; view=full opts into whole documents
+ListingResponse = PaginatedProductCardResponse | PaginatedProductResponse
+VIEW_QUERY = Query("card", description="Response shape: card (compact grid card) or full (entire product document)")
+
+@router.get("/products", response_model=ListingResponse)
 async def get_products(
     category: Optional[str] = Query(None, description="Comma separated categories"),
     min_price: Optional[float] = Query(None, description="Minimum price"),
@@ -20,7 +25,8 @@ async def get_products(
     sort_by: str = Query("created_at", description="Sort by field: price, avg_rating, created_at, discount_percent"),
     sort_order: int = Query(-1, description="Sort order: 1 (asc) or -1 (desc)"),
     page: int = Query(1, description="Page number"),
-    limit: int = Query(30, description="Items per page")
+    limit: int = Query(30, description="Items per page"),
+    view: Literal["card", "full"] = VIEW_QUERY
 ):
     """
     Get a paginated list of products with comprehensive filtering.
@@ -39,17 +45,19 @@ async def get_products(
         sort_by=sort_by,
         sort_order=sort_order,
         page=page,
-        limit=limit
+        limit=limit,
+        view=view
     )
 
-@router.get("/products/search", response_model=PaginatedProductResponse)
+@router.get("/products/search", response_model=ListingResponse, dependencies=[Depends(rate_limit("products_search", 60, 60))])
 async def search_products_route(
     q: str = Query(..., description="Search query"),
     page: int = Query(1, description="Page number"),
-    limit: int = Query(30, description="Number of products per page")
+    limit: int = Query(30, description="Number of products per page"),
+    view: Literal["card", "full"] = VIEW_QUERY
 ):
     """Search products by name or description"""
-    return await ProductService.search_products(q, page, limit)
+    return await ProductService.search_products(q, page, limit, view)
 
 @router.get("/products/slug/{slug}", response_model=ProductResponse)
 async def get_product_by_slug(slug: str = Path(..., description="The slug of the product to view")):
@@ -59,7 +67,7 @@ async def get_product_by_slug(slug: str = Path(..., description="The slug of the
     return product
 
 
-@router.get("/products/facets")
+@router.get("/products/facets", dependencies=[Depends(rate_limit("products_facets", 60, 60))])
 async def get_product_facets(
     category: Optional[str] = Query(None, description="Filter by category"),
     brand: Optional[str] = Query(None, description="Filter by brand"),
@@ -102,14 +110,15 @@ async def get_categories():
     """Get all categories with subcategories, product counts, and representative images."""
     return await ProductService.get_categories_with_subcategories()
 
-@router.get("/categories/{category}", response_model=PaginatedProductResponse)
+@router.get("/categories/{category}", response_model=ListingResponse)
 async def get_products_by_category(
     category: str = Path(..., description="Category name"),
     page: int = Query(1, description="Page number"),
-    limit: int = Query(30, description="Number of products per page")
+    limit: int = Query(30, description="Number of products per page"),
+    view: Literal["card", "full"] = VIEW_QUERY
 ):
     """Get products by specific category"""
-    products_page = await ProductService.get_product_by_category(category, page, limit)
+    products_page = await ProductService.get_product_by_category(category, page, limit, view)
     if not products_page.items:
         raise HTTPException(status_code=404, detail=f"No products found in category: {category}")
     return products_page
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, Query, Path
+from typing import Optional
 from app.deps.roles import get_current_user
 from app.services.review_service import ReviewService
 from app.models.reviews_model import ReviewCreate
@@ -12,10 +13,12 @@ router = APIRouter(tags=["Reviews"])
 async def get_product_reviews(
     product_id: str = Path(..., description="Product ID"),
     page: int = Query(1, ge=1, description="Page number"),
-    limit: int = Query(20, ge=1, le=50, description="Reviews per page")
+    limit: int = Query(20, ge=1, le=50, description="Reviews per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (preferred over page)"),
+    rating: Optional[int] = Query(None, ge=1, le=5, description="Only reviews with this star rating")
 ):
     """Get public reviews for a product"""
-    return await ReviewService.get_product_reviews(product_id, page, limit)
+    return await ReviewService.get_product_reviews(product_id, page, limit, cursor=cursor, rating=rating)
 
 
 # --- Authenticated: Write Review ---
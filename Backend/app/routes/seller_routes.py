@@ -77,7 +77,7 @@ async def update_order_status(order_id: str, product_id: str, status_data: Order
 
 # --- Reviews (read-only for sellers) ---
 @router.get("/products/{product_id}/reviews", dependencies=[Depends(require_permission("product:own:write"))])
-async def get_product_reviews(product_id: str, page: int = Query(1, ge=1), limit: int = Query(20, ge=1, le=50), user=Depends(get_current_user)):
+async def get_product_reviews(product_id: str, page: int = Query(1, ge=1), limit: int = Query(20, ge=1, le=50), cursor: Optional[str] = Query(None), user=Depends(get_current_user)):
     from app.services.review_service import ReviewService
-    return await ReviewService.get_seller_product_reviews(str(user["_id"]), product_id, page, limit)
+    return await ReviewService.get_seller_product_reviews(str(user["_id"]), product_id, page, limit, cursor=cursor)
 
@@ -1,11 +1,18 @@
 """
 Super Admin API routes.
-Endpoints for admin management (promote/demote), admin listing, and audit logs.
+Endpoints for admin management (promote/demote), admin listing, audit logs and request profiles.
 All routes require super_admin-level permissions.
 """
 
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, Query
-from app.deps.roles import require_permission, get_current_user
+from fastapi.responses import PlainTextResponse, Response
+from app.deps.roles import require_permission, require_role, get_current_user
+from app.core.config import settings
+from app.core.profiling import (
+    PROFILE_HEADER, create_profile_token, find_profile, profile_dump, profile_summaries, profile_text,
+)
+from app.services.slow_command_service import SlowCommandExplainer
 from app.services.role_service import promote_to_admin, demote_user
 from app.services.audit_service import get_all_logs
 from app.repo.admin_helpers import get_all_admins
@@ -59,10 +66,11 @@ async def view_audit_logs(
     date_to: Optional[datetime] = Query(None, description="End date filter (ISO format)"),
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (skips the total count)"),
     current_user: dict = Depends(require_permission("audit:view"))
 ):
     """View audit logs with comprehensive filtering."""
-    skip = (page - 1) * limit
+    skip = 0 if cursor else (page - 1) * limit
     return await get_all_logs(
         module=module,
         action=action,
@@ -71,5 +79,45 @@ async def view_audit_logs(
         date_from=date_from,
         date_to=date_to,
         skip=skip,
-        limit=limit
+        limit=limit,
+        cursor=cursor
     )
+
+
+@router.post("/debug/profile-token")
+async def issue_profile_token(current_user: dict = Depends(require_role("super_admin"))):
+    """Token for the X-Debug-Profile header: requests carrying it are profiled."""
+    return {
+        "token": create_profile_token(current_user["_id"]),
+        "header": PROFILE_HEADER,
+        "expires_in": settings.PROFILE_TOKEN_TTL_MINUTES * 60,
+    }
+
+
+@router.get("/debug/profiles")
+async def list_profiles(current_user: dict = Depends(require_role("super_admin"))):
+    """Profiles captured by this worker (newest first) and recently explained slow Mongo commands."""
+    return {
+        "profiles": profile_summaries(),
+        "slow_commands": list(reversed(SlowCommandExplainer.recent)),
+    }
+
+
+@router.get("/debug/profiles/{profile_id}")
+async def download_profile(
+    profile_id: str,
+    format: str = Query("text", pattern="^(text|pstats)$", description="text summary or a .prof file for pstats/snakeviz"),
+    limit: int = Query(40, ge=1, le=500, description="Functions listed in the text summary"),
+    current_user: dict = Depends(require_role("super_admin"))
+):
+    entry = find_profile(profile_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Profile not found (buffers are per worker and keep the latest few)")
+    # Rendering walks the whole stats table; keep it off the event loop
+    if format == "pstats":
+        return Response(
+            await asyncio.to_thread(profile_dump, entry),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.prof"'},
+        )
+    return PlainTextResponse(await asyncio.to_thread(profile_text, entry, limit))
@@ -5,6 +5,7 @@ from app.services.product_service import ProductService
 from app.services.profile_service import ProfileService
 from app.services.order_service import OrderService
 from app.deps.roles import require_permission, get_current_user
+from app.deps.rate_limit import rate_limit
 from app.models.seller_model import SellerApplicationRequest
 from app.services.admin_service import apply_for_seller
 from app.db.mongodb import get_users_collection, cart_collection
@@ -170,7 +171,7 @@ async def get_order_detail(
     """Single order detail with full tracking"""
     return await OrderService.get_order_by_id(str(current_user["_id"]), order_id)
 
-@router.post("/orders", status_code=status.HTTP_201_CREATED)
+@router.post("/orders", status_code=status.HTTP_201_CREATED, dependencies=[Depends(rate_limit("checkout", 10, 60, per="user"))])
 async def place_order(
     payload: PlaceOrderRequest,
     current_user = Depends(get_current_user)
@@ -182,7 +183,7 @@ async def place_order(
         payload.payment_method
     )
 
-@router.post("/orders/buy-now", status_code=201)
+@router.post("/orders/buy-now", status_code=201, dependencies=[Depends(rate_limit("checkout", 10, 60, per="user"))])
 async def buy_now(
     payload: BuyNowRequest,
     current_user = Depends(get_current_user)
@@ -15,6 +15,8 @@ from app.core.time_utils import utc_now
 from app.models.seller_model import SellerApplicationRequest, SellerProfile, SellerResponse
 from app.services.audit_service import log_action
 from app.repo.role_helpers import get_user_by_id, update_user_role
+from app.services import session_service
+from app.ai.product_index import ProductIndexer
 from app.repo.admin_helpers import (
     get_seller_by_user_id,
     insert_seller,
@@ -46,7 +48,7 @@ from app.models.product_model import ProductResponse
 from typing import Optional
 import logging
 
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
 
 
 # ── Dashboard ─────────────────────────────────────────────────────────────────
@@ -54,10 +56,10 @@ logger = logging.getLogger("uvicorn.error")
 async def get_admin_dashboard():
     """Fetch aggregated dashboard stats + recent pending items + recent audit logs."""
     stats = await get_dashboard_stats(
-        get_users_collection(),
-        sellers_collection(),
-        products_collection(),
-        orders_collection()
+        get_users_collection(analytics=True),
+        sellers_collection(analytics=True),
+        products_collection(analytics=True),
+        orders_collection(analytics=True)
     )
 
     recent_sellers = await get_recent_pending_sellers(sellers_collection(), limit=5)
@@ -65,13 +67,12 @@ async def get_admin_dashboard():
 
     # Fetch recent audit logs for the activity feed
     from app.repo.audit_helpers import fetch_audit_logs
-    audit_result = await fetch_audit_logs(audit_logs_collection(), skip=0, limit=10)
-    recent_activity = audit_result.get("logs", []) if isinstance(audit_result, dict) else []
+    recent_activity = await fetch_audit_logs(audit_logs_collection(), {}, limit=10)
     for log in recent_activity:
         log["_id"] = str(log["_id"])
 
     # Fetch seller performance (top & worst)
-    seller_perf = await get_seller_performance(products_collection(), sellers_collection())
+    seller_perf = await get_seller_performance(products_collection(analytics=True), sellers_collection(analytics=True))
 
     return {
         "metrics": stats,
@@ -123,7 +124,8 @@ async def unban_user(user_id: str, admin_id: str):
         target_user_id=user_id,
         performed_by=admin_id,
         from_role=user.get("role", "user"),
-        to_role=user.get("role", "user")
+        to_role=user.get("role", "user"),
+        target=user
     )
     return {"message": "User unbanned successfully"}
 
@@ -175,21 +177,22 @@ async def fetch_all_reviews(page: int = 1, limit: int = 20, search: Optional[str
                             product_id: Optional[str] = None, seller_id: Optional[str] = None,
                             min_rating: Optional[float] = None,
                             max_rating: Optional[float] = None,
-                            sort_rating: Optional[str] = None):
-    skip = (page - 1) * limit
+                            sort_rating: Optional[str] = None,
+                            cursor: Optional[str] = None):
+    skip = 0 if cursor else (page - 1) * limit
     result = await get_all_reviews(
         reviews_collection(),
-        products_col=products_collection(),
         limit=limit, skip=skip,
         search=search, product_id=product_id, seller_id=seller_id,
         min_rating=min_rating, max_rating=max_rating,
-        sort_rating=sort_rating
+        sort_rating=sort_rating, cursor=cursor
     )
     return {
         "reviews": result["reviews"],
         "total": result["total"],
         "page": page,
         "limit": limit,
+        "next_cursor": result["next_cursor"],
     }
 
 
@@ -270,7 +273,9 @@ async def apply_for_seller(user_id: str, payload: SellerApplicationRequest):
             target_user_id=user_id,
             performed_by=user_id,
             from_role=user.get("role", "user"),
-            to_role=user.get("role", "user")
+            to_role=user.get("role", "user"),
+            performer=user,
+            target=user
         )
         return {"message": "Application resubmitted successfully"}
 
@@ -284,7 +289,7 @@ async def apply_for_seller(user_id: str, payload: SellerApplicationRequest):
         business_address=payload.business_address
     )
     
-    logger.info(f"User {user_id} applied for seller profile")
+    logger.info("User %s applied for seller profile", user_id)
     try:
         await insert_seller(sellers_collection(), profile.model_dump(by_alias=True, exclude={"id"}))
 
@@ -293,11 +298,13 @@ async def apply_for_seller(user_id: str, payload: SellerApplicationRequest):
             target_user_id=user_id,
             performed_by=user_id,
             from_role=user.get("role", "user"),
-            to_role=user.get("role", "user")
+            to_role=user.get("role", "user"),
+            performer=user,
+            target=user
         )
         return {"message": "Seller application submitted successfully"}
     except PyMongoError as e:
-        logger.error(f"Error submitting seller application for user {user_id}: {e}")
+        logger.error("Error submitting seller application for user %s: %s", user_id, e)
         raise HTTPException(status_code=500, detail="Failed to submit application")
 
 
@@ -334,7 +341,7 @@ async def approve_seller(target_user_id: str, admin_id: str):
     user = await get_user_by_id(get_users_collection(), target_user_id)
     old_role = user.get("role", "user") if user else "user"
 
-    logger.info(f"Seller application for {target_user_id} approved by {admin_id}")
+    logger.info("Seller application for %s approved by %s", target_user_id, admin_id)
     try:
         # Update Seller Profile
         await update_seller_by_user_id(
@@ -348,19 +355,21 @@ async def approve_seller(target_user_id: str, admin_id: str):
             }
         )
         
-        # Update User Role
+        # Update User Role (live sessions pick it up on their next refresh)
         await update_user_role(get_users_collection(), target_user_id, "seller")
+        await session_service.sync_session_role(target_user_id, "seller")
         
         await log_action(
             action="seller_approved",
             target_user_id=target_user_id,
             performed_by=admin_id,
             from_role=old_role,
-            to_role="seller"
+            to_role="seller",
+            target=user
         )
         return {"message": "Seller application approved successfully"}
     except PyMongoError as e:
-        logger.error(f"Error approving seller application for {target_user_id}: {e}")
+        logger.error("Error approving seller application for %s: %s", target_user_id, e)
         raise HTTPException(status_code=500, detail="Database update failed")
 
 async def reject_seller(target_user_id: str, admin_id: str, reason: str):
@@ -371,7 +380,7 @@ async def reject_seller(target_user_id: str, admin_id: str, reason: str):
     user = await get_user_by_id(get_users_collection(), target_user_id)
     old_role = user.get("role", "user") if user else "user"
 
-    logger.info(f"Seller application for {target_user_id} rejected by {admin_id}. Reason: {reason}")
+    logger.info("Seller application for %s rejected by %s. Reason: %s", target_user_id, admin_id, reason)
     try:
         await update_seller_by_user_id(
             sellers_collection(),
@@ -391,11 +400,12 @@ async def reject_seller(target_user_id: str, admin_id: str, reason: str):
             performed_by=admin_id,
             from_role=old_role,
             to_role=old_role,
-            reason=reason
+            reason=reason,
+            target=user
         )
         return {"message": "Seller application rejected"}
     except PyMongoError as e:
-        logger.error(f"Error rejecting seller application for {target_user_id}: {e}")
+        logger.error("Error rejecting seller application for %s: %s", target_user_id, e)
         raise HTTPException(status_code=500, detail="Database update failed")
 
 async def suspend_seller(target_user_id: str, admin_id: str, reason: str):
@@ -427,13 +437,14 @@ async def suspend_seller(target_user_id: str, admin_id: str, reason: str):
             target_user_id=target_user_id,
             performed_by=admin_id,
             from_role=old_role,
-            to_role=old_role
+            to_role=old_role,
+            target=user
         )
-        logger.info(f"Seller {target_user_id} suspended by {admin_id}")
+        logger.info("Seller %s suspended by %s", target_user_id, admin_id)
 
         return {"message": "Seller has been suspended"}
     except PyMongoError as e:
-        logger.error(f"Error suspending seller {target_user_id}: {e}")
+        logger.error("Error suspending seller %s: %s", target_user_id, e)
         raise HTTPException(status_code=500, detail="Database update failed")
 
 async def unsuspend_seller(target_user_id: str, admin_id: str, reason: str):
@@ -447,7 +458,7 @@ async def unsuspend_seller(target_user_id: str, admin_id: str, reason: str):
     user = await get_user_by_id(get_users_collection(), target_user_id)
     old_role = user.get("role", "user") if user else "user"
 
-    logger.info(f"Seller {target_user_id} unsuspended by {admin_id}")
+    logger.info("Seller %s unsuspended by %s", target_user_id, admin_id)
     try:
         await update_seller_by_user_id(
             sellers_collection(),
@@ -466,11 +477,12 @@ async def unsuspend_seller(target_user_id: str, admin_id: str, reason: str):
             target_user_id=target_user_id,
             performed_by=admin_id,
             from_role=old_role,
-            to_role=old_role
+            to_role=old_role,
+            target=user
         )
         return {"message": "Seller has been unsuspended"}
     except PyMongoError as e:
-        logger.error(f"Error unsuspending seller {target_user_id}: {e}")
+        logger.error("Error unsuspending seller %s: %s", target_user_id, e)
         raise HTTPException(status_code=500, detail="Database update failed")
 
 async def fetch_pending_products(limit: int = 50, skip: int = 0):
@@ -481,7 +493,8 @@ async def approve_product(product_id: str, admin_id: str):
     success = await update_product_approval_status(products_collection(), product_id, True, admin_id)
     if not success:
         raise HTTPException(status_code=404, detail="Product not found or already approved")
-    
+    await ProductIndexer.mark_dirty(product_id)
+
     await log_action(
         action="product_approved",
         target_user_id=product_id,
@@ -495,7 +508,8 @@ async def reject_product(product_id: str, admin_id: str, reason: str):
     success = await update_product_approval_status(products_collection(), product_id, False, admin_id, reason)
     if not success:
         raise HTTPException(status_code=404, detail="Product not found")
-    
+    await ProductIndexer.mark_dirty(product_id)
+
     await log_action(
         action="product_rejected",
         target_user_id=product_id,
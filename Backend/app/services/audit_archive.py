@@ -0,0 +1,89 @@
+"""
+Audit log archival.
+Every AUDIT_ARCHIVE_INTERVAL_HOURS one worker moves logs older than AUDIT_RETENTION_DAYS out of
+Mongo into monthly gzip JSONL files under AUDIT_ARCHIVE_DIR: append + fsync first, then delete.
+Opt-in: nothing is archived unless both settings are set.
+audit_service.get_all_logs reads those files once live results run out, so the API still
+returns the full history.
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.core.time_utils import utc_now
+from app.db.mongodb import audit_logs_collection
+from app.db.redis import REDIS_ERRORS
+from app.repo.audit_archive_helpers import append_month, month_of
+from app.repo.audit_helpers import claim_archive_run, delete_audit_logs, fetch_audit_logs_before
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_BATCH = 1000
+
+
+class AuditArchiver:
+    _task: asyncio.Task | None = None
+
+    @staticmethod
+    async def archive(cutoff: datetime | None = None) -> int:
+        """Move every log older than `cutoff` to the archive. Returns the number moved."""
+        if not settings.AUDIT_ARCHIVE_DIR:
+            logger.error("AUDIT_ARCHIVE_DIR is not set, refusing to delete audit logs from Mongo")
+            return 0
+        cutoff = cutoff or utc_now() - timedelta(days=settings.AUDIT_RETENTION_DAYS)
+        moved = 0
+        while batch := await fetch_audit_logs_before(audit_logs_collection(), cutoff, ARCHIVE_BATCH):
+            by_month = defaultdict(list)
+            for doc in batch:
+                by_month[month_of(doc["timestamp"])].append(doc)
+            for month, docs in by_month.items():
+                await asyncio.to_thread(append_month, settings.AUDIT_ARCHIVE_DIR, month, docs)
+            moved += await delete_audit_logs(audit_logs_collection(), [doc["_id"] for doc in batch])
+        if moved:
+            logger.info("Archived %s audit logs older than %s", moved, cutoff.date())
+        return moved
+
+    @staticmethod
+    async def _claim(interval: float) -> bool:
+        try:
+            return await claim_archive_run(int(interval))
+        except REDIS_ERRORS as e:
+            # Two unlocked runs would append to the same month file at once; wait for the next interval
+            logger.warning("Audit archive lock unavailable, skipping this run: %s", e)
+            return False
+
+    @staticmethod
+    async def _archive_loop(interval: float):
+        while True:
+            try:
+                if await AuditArchiver._claim(interval):
+                    await AuditArchiver.archive()
+            except Exception as e:
+                logger.error("Audit archival failed, will retry next interval: %s", e)
+            await asyncio.sleep(interval)
+
+    @staticmethod
+    def start():
+        """Start periodic archival (called from app lifespan); no-op unless retention and archive dir are set."""
+        if settings.AUDIT_RETENTION_DAYS <= 0:
+            return
+        if not settings.AUDIT_ARCHIVE_DIR:
+            logger.warning("AUDIT_RETENTION_DAYS is set but AUDIT_ARCHIVE_DIR is not, audit archival disabled")
+            return
+        if AuditArchiver._task is None or AuditArchiver._task.done():
+            interval = settings.AUDIT_ARCHIVE_INTERVAL_HOURS * 3600
+            AuditArchiver._task = asyncio.create_task(AuditArchiver._archive_loop(interval))
+            logger.info("Audit archiver started (retention %s days)", settings.AUDIT_RETENTION_DAYS)
+
+    @staticmethod
+    async def stop():
+        task, AuditArchiver._task = AuditArchiver._task, None
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
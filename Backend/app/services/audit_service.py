@@ -1,29 +1,92 @@
+"""
+Audit logging off the request path.
+log_action() records the event in an in-process buffer and returns; AuditWriter flushes the
+buffer with one insert_many every AUDIT_BATCH_SIZE events or AUDIT_FLUSH_INTERVAL_MS, and
+drains it on shutdown. Performer/target names are resolved at flush time — one $in query per
+batch, behind a short-TTL cache — unless the caller already passed the user document.
+"""
+
+import asyncio
+import contextlib
+import time
+from bson import ObjectId
+from collections import OrderedDict
 from app.db.mongodb import audit_logs_collection, get_users_collection
-from pymongo.errors import PyMongoError
+from app.core.config import settings
+from app.core.metrics import CACHE_LOOKUPS
 from app.models.audit_model import AuditLog, AuditLogResponse, AuditPerformedBy, AuditTarget
-from app.repo.audit_helpers import insert_audit_log, fetch_audit_logs
+from app.repo import audit_archive_helpers
+from app.repo.audit_helpers import (
+    AUDIT_SORT, build_audit_query, count_audit_logs, fetch_audit_logs, fetch_user_contexts, insert_audit_logs
+)
+from app.utils.cursor import decode_cursor, encode_cursor
 from app.core.time_utils import utc_now
 from typing import Optional
 from datetime import datetime
 import logging
 
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
+
+# Actions whose target id is a product or review, not a user — nothing to look up
+NON_USER_TARGETS = {"product_approved", "product_rejected", "review_deleted"}
+MAX_BUFFERED = 10_000   # events kept while Mongo is unreachable; oldest dropped beyond this
+
+
+def user_context(user_id: str, user: Optional[dict]) -> dict:
+    """Audit snapshot of a user document (or placeholders if there is none)."""
+    if not user:
+        return {"user_id": user_id, "name": "Unknown", "email": "unknown", "role": "unknown"}
+    return {
+        "user_id": user_id,
+        "name": user.get("username", "Unknown"),
+        "email": user.get("email", "unknown@email.com"),
+        "role": user.get("role", "user")
+    }
+
+
+class UserContextCache:
+    """Bounded TTL cache of user_id -> audit snapshot. Admins act in bursts; this spares a lookup per event."""
+
+    def __init__(self, ttl: float, max_size: int = 5_000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+
+    def get(self, user_id: str) -> Optional[dict]:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] <= time.monotonic():
+            self._entries.pop(user_id, None)
+            return None
+        return entry[1]
 
+    def put(self, user_id: str, context: dict):
+        if self.ttl <= 0:
+            return
+        self._entries[user_id] = (time.monotonic() + self.ttl, context)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
 
-async def _resolve_user_context(user_id: str) -> dict:
-    """Fetch user name and email for audit snapshot."""
-    try:
-        user = await get_users_collection().find_one({"_id": __import__("bson").ObjectId(user_id)})
-        if user:
-            return {
-                "user_id": user_id,
-                "name": user.get("username", "Unknown"),
-                "email": user.get("email", "unknown@email.com"),
-                "role": user.get("role", "user")
-            }
-    except Exception:
-        pass
-    return {"user_id": user_id, "name": "Unknown", "email": "unknown", "role": "unknown"}
+    def clear(self):
+        self._entries.clear()
+
+
+_user_cache = UserContextCache(settings.AUDIT_USER_CACHE_TTL_SECONDS)
+
+
+async def _resolve_user_contexts(user_ids: set[str]) -> dict[str, dict]:
+    """Snapshots for every id: cache first, then one query for the misses."""
+    contexts = {uid: ctx for uid in user_ids if (ctx := _user_cache.get(uid))}
+    missing = [uid for uid in user_ids if uid not in contexts]
+    CACHE_LOOKUPS.labels("audit_user", "hit").inc(len(contexts))
+    CACHE_LOOKUPS.labels("audit_user", "miss").inc(len(missing))
+    if missing:
+        users = await fetch_user_contexts(get_users_collection(), missing)
+        for uid in missing:
+            contexts[uid] = user_context(uid, users.get(uid))
+            if uid in users:
+                _user_cache.put(uid, contexts[uid])
+    return contexts
 
 
 async def log_action(
@@ -34,44 +97,126 @@ async def log_action(
     to_role: Optional[str] = None, 
     reason: Optional[str] = None,
     module: Optional[str] = None,
-    description: Optional[str] = None
+    description: Optional[str] = None,
+    performer: Optional[dict] = None,
+    target: Optional[dict] = None
 ):
-    """Write an audit log entry with rich context.
-    
-    Auto-resolves performer and target user context from the database.
+    """Queue an audit log entry; it is written by AuditWriter, not awaited here.
+
+    Pass `performer`/`target` user documents when the caller already has them.
     Auto-determines module and description if not provided.
     """
-    # Resolve performer context
-    performer_ctx = await _resolve_user_context(performed_by)
-
-    # Resolve target context
-    target_ctx = await _resolve_user_context(target_user_id)
-    target_ctx["role_before"] = from_role
-    target_ctx["role_after"] = to_role
-
-    # Auto-determine module from action
     if not module:
         module = _infer_module(action)
+    event = {
+        "_id": ObjectId(),
+        "action": action, "module": module, "description": description, "reason": reason,
+        "performed_by": performed_by, "target_user_id": target_user_id,
+        "from_role": from_role, "to_role": to_role, "timestamp": utc_now(),
+        "performer": user_context(performed_by, performer) if performer else None,
+        "target": user_context(target_user_id, target) if target else None,
+    }
+    logger.info("Audit: [%s] %s by %s on %s", module, action, performed_by, target_user_id)
+    AuditWriter.submit(event)
+    if AuditWriter._task is None:
+        # No background writer (scripts, tests): keep the old write-through behaviour
+        await AuditWriter.flush()
 
-    # Auto-generate human-readable description
-    if not description:
-        description = _generate_description(action, performer_ctx, target_ctx, reason)
-
-    audit_log = AuditLog(
-        performed_by=AuditPerformedBy(**performer_ctx),
-        target=AuditTarget(**target_ctx),
-        action=action,
-        module=module,
-        description=description,
-        reason=reason,
-        timestamp=utc_now()
-    )
-    
-    logger.info(f"Audit: [{module}] {action} — {description}")
-    await insert_audit_log(
-        audit_logs_collection(), 
-        audit_log.model_dump(by_alias=True, exclude={"id"})
-    )
+
+async def _build_documents(events: list[dict]) -> list[dict]:
+    lookups = {e["performed_by"] for e in events if not e["performer"]}
+    lookups |= {e["target_user_id"] for e in events if not e["target"] and e["action"] not in NON_USER_TARGETS}
+    contexts = await _resolve_user_contexts(lookups) if lookups else {}
+
+    docs = []
+    for e in events:
+        performer_ctx = e["performer"] or contexts[e["performed_by"]]
+        target_ctx = dict(e["target"] or contexts.get(e["target_user_id"]) or user_context(e["target_user_id"], None))
+        target_ctx["role_before"] = e["from_role"]
+        target_ctx["role_after"] = e["to_role"]
+        audit_log = AuditLog(
+            performed_by=AuditPerformedBy(**performer_ctx),
+            target=AuditTarget(**target_ctx),
+            action=e["action"],
+            module=e["module"],
+            description=e["description"] or _generate_description(e["action"], performer_ctx, target_ctx, e["reason"]),
+            reason=e["reason"],
+            timestamp=e["timestamp"]
+        )
+        docs.append({"_id": e["_id"], **audit_log.model_dump(by_alias=True, exclude={"id"})})
+    return docs
+
+
+class AuditWriter:
+    _buffer: list[dict] = []
+    _wake: asyncio.Event | None = None
+    _lock: asyncio.Lock | None = None
+    _task: asyncio.Task | None = None
+    _stopping = False
+
+    @staticmethod
+    def submit(event: dict):
+        AuditWriter._buffer.append(event)
+        if len(AuditWriter._buffer) > MAX_BUFFERED:
+            dropped = len(AuditWriter._buffer) - MAX_BUFFERED
+            del AuditWriter._buffer[:dropped]
+            logger.error("Audit buffer full, dropped %s oldest events", dropped)
+        if AuditWriter._wake and len(AuditWriter._buffer) >= settings.AUDIT_BATCH_SIZE:
+            AuditWriter._wake.set()
+
+    @staticmethod
+    async def flush() -> int:
+        """Write everything buffered, AUDIT_BATCH_SIZE per insert_many. Failed batches stay buffered."""
+        written = 0
+        async with AuditWriter._lock or contextlib.nullcontext():
+            while AuditWriter._buffer:
+                batch = AuditWriter._buffer[:settings.AUDIT_BATCH_SIZE]
+                del AuditWriter._buffer[:len(batch)]
+                try:
+                    docs = await _build_documents(batch)
+                except Exception as e:
+                    logger.error("Audit events dropped, could not be built: %s", e)   # retrying won't help
+                    continue
+                try:
+                    written += await insert_audit_logs(audit_logs_collection(), docs)
+                except Exception as e:
+                    logger.error("Audit flush failed, %s events kept for retry: %s", len(batch), e)
+                    AuditWriter._buffer[:0] = batch
+                    break
+        return written
+
+    @staticmethod
+    async def _flush_loop(interval: float):
+        while not AuditWriter._stopping:
+            try:
+                await asyncio.wait_for(AuditWriter._wake.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+            AuditWriter._wake.clear()
+            await AuditWriter.flush()
+
+    @staticmethod
+    def start(interval_ms: int | None = None):
+        """Start the periodic audit flusher (called from app lifespan)."""
+        if AuditWriter._task is None or AuditWriter._task.done():
+            interval = (interval_ms or settings.AUDIT_FLUSH_INTERVAL_MS) / 1000
+            AuditWriter._wake, AuditWriter._lock = asyncio.Event(), asyncio.Lock()
+            AuditWriter._stopping = False
+            AuditWriter._task = asyncio.create_task(AuditWriter._flush_loop(interval))
+            logger.info("Audit writer started (every %ss or %s events)", interval, settings.AUDIT_BATCH_SIZE)
+
+    @staticmethod
+    async def stop():
+        """Stop the flusher and drain the buffer. The loop is woken, not cancelled, so no insert is cut off."""
+        task, AuditWriter._task = AuditWriter._task, None
+        if task:
+            AuditWriter._stopping = True
+            AuditWriter._wake.set()
+            await task
+        await AuditWriter.flush()
+        if AuditWriter._buffer:
+            logger.error("Audit writer stopped with %s unwritten events", len(AuditWriter._buffer))
+        AuditWriter._wake = AuditWriter._lock = None
 
 
 def _infer_module(action: str) -> str:
@@ -123,39 +268,51 @@ async def get_all_logs(
     date_from: Optional[datetime] = None,
     date_to: Optional[datetime] = None,
     skip: int = 0,
-    limit: int = 20
+    limit: int = 20,
+    cursor: Optional[str] = None
 ):
-    """Fetch audit logs with optional filters."""
-    logger.info(f"Fetching audit logs (module={module}, action={action}, limit={limit})")
-    try:
-        result = await fetch_audit_logs(
-            audit_logs_collection(),
-            module=module,
-            action=action,
-            performed_by_email=performed_by_email,
-            target_email=target_email,
-            date_from=date_from,
-            date_to=date_to,
-            skip=skip,
-            limit=limit
+    """Fetch audit logs with optional filters, newest first, across Mongo and the monthly archive.
+
+    Archived logs are older than every live one, so the archive is only read once the live
+    results run out. With a cursor the page is keyset-paginated and the total is skipped.
+    """
+    logger.info("Fetching audit logs (module=%s, action=%s, limit=%s)", module, action, limit)
+    filters = {"module": module, "action": action, "performed_by.email": performed_by_email, "target.email": target_email}
+    query = build_audit_query(filters, date_from, date_to)
+    after = decode_cursor(cursor, AUDIT_SORT) if cursor else None
+    if after:
+        skip = 0
+
+    logs = await fetch_audit_logs(audit_logs_collection(), query, limit=limit + 1, skip=skip, after=after)
+    live_total = None if after else await count_audit_logs(audit_logs_collection(), query)
+
+    archive_dir = settings.AUDIT_ARCHIVE_DIR
+    match = audit_archive_helpers.matcher(filters, date_from, date_to)
+    if len(logs) <= limit:
+        archive_skip = max(0, skip - live_total) if skip else 0
+        seen = {log["_id"] for log in logs}
+        archived = await asyncio.to_thread(
+            audit_archive_helpers.query_archive, archive_dir, match, limit + 1 - len(logs),
+            archive_skip, after, date_from, date_to
         )
+        logs += [log for log in archived if log["_id"] not in seen]
 
-        logs = result["logs"]
-        total = result["total"]
-
-        # Serialize ObjectIds
-        formatted_logs = []
-        for log in logs:
-            log["_id"] = str(log["_id"])
-            formatted_logs.append(log)
-
-        return {
-            "logs": formatted_logs,
-            "total": total,
-            "page": (skip // limit) + 1,
-            "limit": limit
-        }
-    except PyMongoError as e:
-        logger.error(f"Error fetching audit logs: {e}")
-        from fastapi import HTTPException
-        raise HTTPException(status_code=500, detail="Database query failed")
+    total = None
+    if live_total is not None:
+        total = live_total + await asyncio.to_thread(audit_archive_helpers.count_archive, archive_dir, filters, date_from, date_to)
+
+    next_cursor = None
+    if len(logs) > limit:
+        logs = logs[:limit]
+        next_cursor = encode_cursor(logs[-1], AUDIT_SORT)
+
+    for log in logs:
+        log["_id"] = str(log["_id"])
+
+    return {
+        "logs": logs,
+        "total": total,
+        "page": (skip // limit) + 1,
+        "limit": limit,
+        "next_cursor": next_cursor
+    }
@@ -1,6 +1,6 @@
 from pymongo.errors import PyMongoError
-from app.core.security import hash_password, verify_password, create_access_token, create_refresh_token, verify_token
-from app.repo.auth_helpers import count_users, insert_user, update_user, get_user_by_email, generate_tokens, update_user_by_email
+from app.core.security import hash_password_async, verify_password_async, verify_token
+from app.repo.auth_helpers import count_users, insert_user, update_user, get_user_by_email, generate_tokens
 from app.utils.email import send_forget_password_email
 from fastapi import HTTPException, status, Response
 from app.utils.cookies import clear_refresh_cookie
@@ -12,8 +12,10 @@ from app.db.mongodb import profiles_collection, cart_collection
 from app.repo.profiles_helpers import create_empty_profile
 from app.repo.cart_helpers import create_empty_cart
 from app.core.time_utils import utc_now
+from app.services import session_service
+from app.services.denylist_service import TokenDenylist
 
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
 
 class AuthService:
 
@@ -29,7 +31,7 @@ class AuthService:
             raise HTTPException(status_code=400, detail="Email already registered")
 
         # 2. Hash Password
-        hashed = hash_password(user.password)
+        hashed = await hash_password_async(user.password)
         
         roles = "super_admin" if await count_users(user_col) == 0 else "user"
         # 3. Prepare Data
@@ -37,7 +39,6 @@ class AuthService:
             "username": user.username,
             "email": user.email, 
             "hashed_password": hashed, 
-            "refresh_token_hashed": None,
             "role": roles, # Explicitly setting default role is safer
             "is_verified": False,
             "is_banned": False,
@@ -50,23 +51,23 @@ class AuthService:
             if not success:
                 raise HTTPException(status_code=400, detail=message)
 
-            logger.info(f"OTP sent to {user.email}")
+            logger.info("OTP sent to %s", user.email)
 
             result = await insert_user(user_col, user_data)
-            logger.info(f"Registered, Now please verify your email ")
+            logger.info("Registered, Now please verify your email ")
             return {"message": "User registered successfully, Please verify your email", "otp_token": otp_token}
 
         except HTTPException:
             raise  # Re-raise HTTP exceptions as-is
         except PyMongoError as e:
-            logger.error(f"Signup DB Error: {e}")
+            logger.error("Signup DB Error: %s", e)
             raise HTTPException(status_code=500, detail="Signup failed due to server error")
         except Exception as e:
-            logger.error(f"Error during signup: {e}")
+            logger.error("Error during signup: %s", e)
             raise HTTPException(status_code=500, detail="Failed to complete registration")
 
     @staticmethod
-    async def verify_otp(otp_token: str, otp: str, user_col):
+    async def verify_otp(otp_token: str, otp: str, user_col, device: str | None = None):
         is_valid, message, email = await verify_user_otp(otp_token, otp)
         if not is_valid:
             raise HTTPException(status_code=400, detail=message)
@@ -80,21 +81,21 @@ class AuthService:
             
         try:
             access_token, refresh_token = await generate_tokens(user["_id"], user["email"], user["role"], user_col)
-            refresh_hash = hash_password(refresh_token)
+            await session_service.start_session(refresh_token, user["_id"], user["email"], user["role"], device)
 
             # 1. Mark user as verified
-            await update_user(user_col, user["_id"], {"is_verified": True, "refresh_token_hashed": refresh_hash})
+            await update_user(user_col, user["_id"], {"is_verified": True})
             
             # 2. Initialize User Data (Profile, Cart)
             user_id_str = str(user["_id"])
             await create_empty_profile(profiles_collection(), user_id_str, email)
             await create_empty_cart(cart_collection(), user_id_str)
 
-            logger.info(f"User {email} verified and data initialized successfully")
+            logger.info("User %s verified and data initialized successfully", email)
             return {"access_token": access_token, "refresh_token": refresh_token, "role": user["role"], "token_type": "bearer"}
 
         except PyMongoError as e:
-            logger.error(f"Verify OTP DB Error: {e}")
+            logger.error("Verify OTP DB Error: %s", e)
             raise HTTPException(status_code=500, detail="Failed to update verification status or initialize data")
 
     @staticmethod
@@ -110,25 +111,25 @@ class AuthService:
         if not success:
             raise HTTPException(status_code=400, detail=message)
             
-        logger.info(f"OTP resent to {email}")
+        logger.info("OTP resent to %s", email)
         return {"message": "OTP sent successfully.", "otp_token": otp_token}
 
     @staticmethod
-    async def login(email: str, password: str, user_col):
+    async def login(email: str, password: str, user_col, device: str | None = None):
         # OAuth2PasswordRequestForm uses form fields "username" and "password"
         user = await get_user_by_email(user_col, email)
         
-        if not user or not verify_password(password, user["hashed_password"]):
-            logger.warning(f"Login failed for user: {email}")
+        if not user or not await verify_password_async(password, user["hashed_password"]):
+            logger.warning("Login failed for user: %s", email)
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
         if not user.get("is_verified", False):
-            logger.warning(f"Login failed: User {email} is not verified")
+            logger.warning("Login failed: User %s is not verified", email)
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Email not verified. Please verify your OTP.")
 
         # Check blocked status
         if user.get("is_banned", False):
-            logger.warning(f"Banned user attempt: {email}")
+            logger.warning("Banned user attempt: %s", email)
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Your account has been banned by the administrator."
@@ -136,62 +137,38 @@ class AuthService:
 
         access_token, refresh_token = await generate_tokens(user["_id"], user["email"], user["role"], user_col)
 
-        # Hash the refresh token before storing (recommended)
-        refresh_hash = hash_password(refresh_token)
-
-        try:
-            await update_user(user_col, user["_id"], {"refresh_token_hashed": refresh_hash})
-            logger.info(f"User {user['email']} logged in successfully")
-
-        except PyMongoError as e:
-            logger.error(f"Login DB Update Error: {e}")
-            raise HTTPException(status_code=500, detail="Login failed")
+        # One session per device; only an HMAC digest of the refresh secret is stored
+        await session_service.start_session(refresh_token, user["_id"], user["email"], user["role"], device)
+        logger.info("User %s logged in successfully", user['email'])
 
         return {"access_token": access_token, "refresh_token": refresh_token, "role": user["role"], "token_type": "bearer"}
 
     @staticmethod
     async def refresh_token(actual_token: str, user_col):
-        payload = verify_token(actual_token)
-        if not payload:
-            raise HTTPException(status_code=401, detail="Invalid token structure")
-
-        email = payload.get("email")
-        user = await get_user_by_email(user_col, email)
-
-        # Validate User and Token
-        if not user or not user.get("refresh_token_hashed"):
-            logger.warning(f"Refresh failed: User {email} has no active token")
-            raise HTTPException(status_code=401, detail="Invalid refresh token")
-
-        if not verify_password(actual_token, user["refresh_token_hashed"]):
-            logger.critical(f"Security Alert: Reused/Invalid refresh token for {email}") # Critical Alert
-            raise HTTPException(status_code=401, detail="Invalid refresh token")
-
-        # Issue New Tokens
-        new_access, new_refresh = await generate_tokens(str(user["_id"]), email, user["role"], user_col)
-        new_refresh_hashed = hash_password(new_refresh)
-
-        try:
-            await update_user(user_col, user["_id"], {"refresh_token_hashed": new_refresh_hashed})
-            return {"access_token": new_access, "refresh_token": new_refresh, "role": user["role"], "token_type": "bearer"}
-        except PyMongoError as e:
-            logger.error(f"Refresh Token DB Update Error for {email}: {e}")
-            raise HTTPException(status_code=500, detail="Token refresh failed")
+        # Redis only: one script rotates the session if the token's digest is current
+        return await session_service.rotate_session(actual_token)
 
     @staticmethod
-    async def logout(token: str, user_col):
+    async def logout(token: str, user_col, refresh_token: str | None = None):
         payload = verify_token(token)
+        # The access token stays valid until exp otherwise (and may sit in a worker's token cache)
+        if payload and payload.get("jti"):
+            await TokenDenylist.revoke_token(payload["jti"], payload["exp"])
+
+        # With a cookie, revoke only that device's session; without one, sign out everywhere
+        if refresh_token:
+            if not await session_service.end_session(refresh_token):
+                raise HTTPException(status_code=401, detail="Invalid refresh token")
+            logger.info("Session logged out")
+            return {"message": "Logged out"}
+
         if not payload:
             return {"message": "Logged out (Token expired)"}
 
         email = payload.get("email")
-        try:
-            await update_user_by_email(user_col, email, {"refresh_token_hashed": None})
-        except PyMongoError as e:
-            logger.error(f"Logout DB Update Error for {email}: {e}")
-            # We still return success since the token is cleared on frontend anyway
-        
-        logger.info(f"User {email} logged out")
+        await session_service.end_all_sessions(payload.get("_id"))
+
+        logger.info("User %s logged out", email)
         return {"message": "Logged out"}
 
     @staticmethod
@@ -214,12 +191,12 @@ class AuthService:
 
         email_sent = await send_forget_password_email(email, token)
         if not email_sent:
-            logger.error(f"Failed to send forget password email to {email}")
+            logger.error("Failed to send forget password email to %s", email)
             raise HTTPException(status_code=500, detail="Failed to send forget password email")
 
         await increment_reset_send_count(email)
 
-        logger.info(f"Forget password email sent to {email}")
+        logger.info("Forget password email sent to %s", email)
         return {"message": "Forget password email sent successfully"}
 
     @staticmethod
@@ -236,15 +213,18 @@ class AuthService:
             raise HTTPException(status_code=400, detail="Invalid or expired reset link")
 
         try:
-            await update_user(user_col, user["_id"], {"hashed_password": hash_password(new_password)})
+            await update_user(user_col, user["_id"], {"hashed_password": await hash_password_async(new_password)})
             await set_temp_password_token(email, None) 
-            
+
+            # A new password invalidates every existing device session
+            await session_service.end_all_sessions(str(user["_id"]))
+            await TokenDenylist.revoke_user(str(user["_id"]))
             clear_refresh_cookie(response)
             
-            logger.info(f"User {email} reset password successfully")
+            logger.info("User %s reset password successfully", email)
             return {"message": "Password reset successful"}
         except PyMongoError as e:
-            logger.error(f"Reset Password DB Update Error for {email}: {e}")
+            logger.error("Reset Password DB Update Error for %s: %s", email, e)
             raise HTTPException(status_code=500, detail="Password reset failed")
     
     
@@ -0,0 +1,92 @@
+"""
+Write-behind product counters (view_count, product_likes).
+Hot paths call incr() — one Redis HINCRBY, no Mongo write. A background task flushes
+the accumulated deltas to Mongo every COUNTER_FLUSH_INTERVAL_SECONDS with bulk_write.
+If Redis is unavailable the increment is buffered in-process instead (lost on crash,
+never double counted).
+"""
+
+import asyncio
+import logging
+import uuid
+from collections import Counter, defaultdict
+
+from app.core.config import settings
+from app.db.mongodb import products_collection
+from app.repo.counter_helpers import (
+    incr_pending_counter,
+    claim_counter_batch,
+    release_counter_batch,
+    apply_counter_deltas,
+)
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FIELDS = ("view_count", "product_likes")
+
+
+class ProductCounters:
+    _local: dict[str, Counter] = defaultdict(Counter)
+    _task: asyncio.Task | None = None
+
+    @staticmethod
+    async def incr(field: str, product_id: str, amount: int = 1):
+        """Record a counter event. Storage errors never propagate — counters must not break the request."""
+        if field not in COUNTER_FIELDS:
+            raise ValueError(f"Unknown counter field: {field}")
+        try:
+            if await incr_pending_counter(field, product_id, amount) is not None:
+                return
+        except Exception as e:
+            logger.warning("Redis counter increment failed, buffering in-process (non-fatal): %s", e)
+        ProductCounters._local[field][product_id] += amount
+
+    @staticmethod
+    async def flush() -> int:
+        """Flush Redis and in-process deltas for every field. Returns modified document count."""
+        modified = 0
+        for field in COUNTER_FIELDS:
+            # 1. Redis batch (idempotent under its batch id)
+            try:
+                batch_id, deltas = await claim_counter_batch(field, uuid.uuid4().hex)
+                if batch_id:
+                    modified += await apply_counter_deltas(products_collection(), field, deltas, batch_id)
+                    await release_counter_batch(field, batch_id)
+            except Exception as e:
+                logger.error("Counter flush failed for %s, will retry next interval: %s", field, e)
+
+            # 2. In-process fallback buffer
+            local = ProductCounters._local.pop(field, None)
+            if local:
+                try:
+                    modified += await apply_counter_deltas(products_collection(), field, dict(local))
+                except Exception as e:
+                    logger.error("In-process counter flush failed for %s: %s", field, e)
+                    ProductCounters._local[field].update(local)
+        return modified
+
+    @staticmethod
+    async def _flush_loop(interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            await ProductCounters.flush()
+
+    @staticmethod
+    def start(interval: float | None = None):
+        """Start the periodic flusher (called from app lifespan)."""
+        if ProductCounters._task is None or ProductCounters._task.done():
+            interval = interval or settings.COUNTER_FLUSH_INTERVAL_SECONDS
+            ProductCounters._task = asyncio.create_task(ProductCounters._flush_loop(interval))
+            logger.info("Product counter flusher started (every %ss)", interval)
+
+    @staticmethod
+    async def stop():
+        """Cancel the flusher and do a final flush so buffered increments aren't lost."""
+        task, ProductCounters._task = ProductCounters._task, None
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await ProductCounters.flush()
@@ -0,0 +1,108 @@
+"""
+Access-token revocation. Revocations are written to Redis and mirrored into a local bloom
+filter; get_current_user only goes to Redis when the bloom filter says "maybe". Each worker
+rebuilds its filter from Redis every DENYLIST_SYNC_INTERVAL_SECONDS, so a revocation made on
+another worker takes effect there within one interval.
+"""
+
+import asyncio
+import logging
+import time
+
+from app.core.auth_cache import BloomFilter
+from app.core.config import settings
+from app.db.redis import REDIS_ERRORS
+from app.repo import denylist_helpers
+
+logger = logging.getLogger(__name__)
+
+LOCAL_ADD_RETENTION_SECONDS = 60
+
+
+class TokenDenylist:
+    _bloom: BloomFilter = BloomFilter()
+    _local_adds: dict[str, float] = {}   # kept across rebuilds so a sync can't race a fresh revocation
+    _task: asyncio.Task | None = None
+
+    @staticmethod
+    def _add_local(entry: str):
+        TokenDenylist._bloom.add(entry)
+        TokenDenylist._local_adds[entry] = time.time()
+
+    @staticmethod
+    async def revoke_token(jti: str, exp: float):
+        """Deny one access token until it expires on its own."""
+        TokenDenylist._add_local(f"jti:{jti}")
+        try:
+            await denylist_helpers.add_jti(jti, exp)
+        except REDIS_ERRORS as e:
+            logger.error("Denylist write failed for token %s (revoked on this worker only): %s", jti, e)
+
+    @staticmethod
+    async def revoke_user(user_id: str):
+        """Deny every access token issued to a user up to now (ban, password reset)."""
+        now = time.time()
+        TokenDenylist._add_local(f"user:{user_id}")
+        try:
+            await denylist_helpers.add_user_cutoff(
+                user_id, now, now + settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60
+            )
+        except REDIS_ERRORS as e:
+            logger.error("Denylist write failed for user %s (revoked on this worker only): %s", user_id, e)
+
+    @staticmethod
+    async def is_revoked(claims: dict) -> bool:
+        jti, user_id = claims.get("jti"), claims.get("_id")
+        jti_maybe = bool(jti) and f"jti:{jti}" in TokenDenylist._bloom
+        user_maybe = bool(user_id) and f"user:{user_id}" in TokenDenylist._bloom
+        if not jti_maybe and not user_maybe:
+            return False
+
+        try:
+            if jti_maybe and await denylist_helpers.is_jti_denied(jti):
+                return True
+            if user_maybe:
+                cutoff = await denylist_helpers.get_user_cutoff(str(user_id))
+                return cutoff is not None and float(claims.get("iat", 0)) <= cutoff
+            return False
+        except REDIS_ERRORS as e:
+            # Bloom filter said "maybe" and we can't confirm — fail closed for this token only
+            logger.warning("Denylist check failed, rejecting token: %s", e)
+            return True
+
+    @staticmethod
+    async def sync():
+        """Rebuild the local bloom filter from the live Redis entries."""
+        try:
+            entries = await denylist_helpers.get_active_entries()
+        except REDIS_ERRORS as e:
+            logger.warning("Denylist sync skipped: %s", e)
+            return
+        cutoff = time.time() - LOCAL_ADD_RETENTION_SECONDS
+        TokenDenylist._local_adds = {e: t for e, t in TokenDenylist._local_adds.items() if t > cutoff}
+        bloom = BloomFilter()
+        for entry in (*entries, *TokenDenylist._local_adds):
+            bloom.add(entry)
+        TokenDenylist._bloom = bloom
+
+    @staticmethod
+    async def _sync_loop(interval: float):
+        while True:
+            await TokenDenylist.sync()
+            await asyncio.sleep(interval)
+
+    @staticmethod
+    def start(interval: float | None = None):
+        if TokenDenylist._task is None or TokenDenylist._task.done():
+            interval = interval or settings.DENYLIST_SYNC_INTERVAL_SECONDS
+            TokenDenylist._task = asyncio.create_task(TokenDenylist._sync_loop(interval))
+
+    @staticmethod
+    async def stop():
+        task, TokenDenylist._task = TokenDenylist._task, None
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
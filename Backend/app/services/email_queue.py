@@ -0,0 +1,148 @@
+"""
+Background email delivery. Request handlers only enqueue a job (one Redis call); EMAIL_WORKERS
+tasks per process drain the stream in batches of up to EMAIL_BATCH_SIZE, one provider call per
+batch. If a batch call fails its messages are resent one by one, so only the jobs that still
+fail are retried with exponential backoff; after EMAIL_MAX_ATTEMPTS a job goes to the
+dead-letter list. If Redis is unavailable, enqueue falls back to sending inline.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import socket
+import time
+import uuid
+
+from app.core.config import settings
+from app.core.tracing import current_request_id, tracer
+from app.db.redis import REDIS_ERRORS
+from app.repo import email_queue_helpers
+from app.utils.email import get_email_provider, render_email
+
+logger = logging.getLogger(__name__)
+
+MAX_BACKOFF_SECONDS = 300
+
+
+def _dedupe_key(template: str, to: str, params: dict) -> str:
+    raw = json.dumps([template, to, params], sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter: base, 2*base, 4*base, ... capped."""
+    delay = min(settings.EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1), MAX_BACKOFF_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+
+class EmailQueue:
+    _tasks: list[asyncio.Task] = []
+
+    @staticmethod
+    async def enqueue(template: str, to: str, params: dict, dedupe_key: str | None = None) -> bool:
+        """Queue an email. Returns False only if it could neither be queued nor sent inline."""
+        job = {"id": uuid.uuid4().hex, "template": template, "to": to, "params": params, "attempts": 0,
+               "request_id": current_request_id()}
+        try:
+            entry_id = await email_queue_helpers.enqueue_job(
+                job, dedupe_key or _dedupe_key(template, to, params), settings.EMAIL_DEDUPE_TTL_SECONDS
+            )
+            if entry_id is None:
+                logger.info("Duplicate %s email to %s dropped", template, to)
+            return True
+        except REDIS_ERRORS as e:
+            logger.warning("Email queue unavailable, sending %s to %s inline: %s", template, to, e)
+            return await get_email_provider().send_batch([render_email(template, to, params)])
+
+    @staticmethod
+    async def process_batch(entries: list[tuple[str, dict]]) -> int:
+        """Send one batch and settle every job in it (ack, retry or dead-letter). Returns sent count."""
+        messages, valid = [], []
+        for entry_id, job in entries:
+            try:
+                messages.append(render_email(job["template"], job["to"], job["params"]))
+                valid.append((entry_id, job))
+            except (KeyError, ValueError) as e:
+                logger.error("Dropping malformed email job %s: %s", job.get('id'), e)
+                await email_queue_helpers.dead_letter([job])
+                await email_queue_helpers.ack_jobs([entry_id])
+
+        if not valid:
+            return 0
+
+        # Workers run outside any request; the span carries the ids of the requests that queued the batch
+        with tracer.start_as_current_span("email batch", attributes={
+            "messaging.batch.message_count": len(valid),
+            "app.request_ids": [job.get("request_id", "-") for _, job in valid],
+        }):
+            failed = await EmailQueue._send(messages, [job for _, job in valid])
+        if failed:
+            retries, dead = [], []
+            for job in failed:
+                job = {**job, "attempts": job["attempts"] + 1}
+                if job["attempts"] >= settings.EMAIL_MAX_ATTEMPTS:
+                    dead.append(job)
+                else:
+                    retries.append((job, time.time() + retry_delay(job["attempts"])))
+            await email_queue_helpers.schedule_retries(retries)
+            await email_queue_helpers.dead_letter(dead)
+            if dead:
+                logger.error("%s email(s) moved to dead letter after %s attempts", len(dead), settings.EMAIL_MAX_ATTEMPTS)
+
+        await email_queue_helpers.ack_jobs([entry_id for entry_id, _ in valid])
+        return len(valid) - len(failed)
+
+    @staticmethod
+    async def _send(messages: list, jobs: list[dict]) -> list[dict]:
+        """One provider call for the batch; if it fails, one call per message. Returns the jobs not sent."""
+        provider = get_email_provider()
+        if await provider.send_batch(messages):
+            return []
+        if len(messages) == 1:
+            return jobs
+        # One bad recipient or template must not hold back (and dead-letter) the rest of the batch
+        logger.warning("Email batch of %s failed, resending individually", len(messages))
+        return [job for message, job in zip(messages, jobs) if not await provider.send_batch([message])]
+
+    @staticmethod
+    async def drain_once(consumer: str, block_ms: int = 1000) -> int:
+        await email_queue_helpers.promote_due_retries()
+        entries = await email_queue_helpers.read_jobs(consumer, settings.EMAIL_BATCH_SIZE, block_ms)
+        return await EmailQueue.process_batch(entries) if entries else 0
+
+    @staticmethod
+    async def _worker(consumer: str):
+        while True:
+            try:
+                await EmailQueue.drain_once(consumer)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Email worker %s error, backing off: %s", consumer, e)
+                await asyncio.sleep(5)
+
+    @staticmethod
+    async def start(workers: int | None = None):
+        if EmailQueue._tasks:
+            return
+        try:
+            await email_queue_helpers.ensure_group()
+        except REDIS_ERRORS as e:
+            logger.warning("Email queue not started (emails will be sent inline): %s", e)
+            return
+        prefix = f"{socket.gethostname()}-{os.getpid()}"
+        EmailQueue._tasks = [
+            asyncio.create_task(EmailQueue._worker(f"{prefix}-{i}"))
+            for i in range(workers or settings.EMAIL_WORKERS)
+        ]
+
+    @staticmethod
+    async def stop():
+        tasks, EmailQueue._tasks = EmailQueue._tasks, []
+        for task in tasks:
+            task.cancel()
+        # Unacked jobs stay pending in the group and are reclaimed after restart
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -8,8 +8,11 @@ import asyncio
 import json
 import logging
 from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
 
-from app.db.redis import redis_client
+from app.db import redis as redis_db
+from app.core.compression import precompress
+from app.core.metrics import record_cache
 from app.db.mongodb import products_collection, banners_collection
 from app.core.time_utils import utc_now
 from app.repo.landing_helpers import (
@@ -25,9 +28,10 @@ from app.repo.landing_helpers import (
     delete_banner_by_id,
 )
 
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
 
-LANDING_CACHE_KEY = "landing:page:data"
+# Redis hash of the serialized page: "identity" (JSON bytes) plus one field per precompressed encoding
+LANDING_CACHE_KEY = "landing:page:variants"
 LANDING_CACHE_TTL = 300  # 5 minutes
 
 
@@ -69,22 +73,45 @@ class LandingService:
     # ── Landing Page (Public) ─────────────────────────────────────────────
 
     @staticmethod
-    async def get_landing_page() -> dict:
+    async def get_landing_variants() -> dict[str, bytes]:
         """
-        Returns all landing page sections in one response.
-        Uses Redis caching with 5-min TTL. On cache miss, runs 6 queries in parallel.
+        The landing page as JSON bytes, precompressed per encoding ({"identity": ..., "gzip": ...}).
+        Uses Redis caching with 5-min TTL; compression runs once per cache fill, not per hit.
         """
-        # 1. Check Redis cache
+        # 1. Check Redis cache (raw bytes: the client otherwise decodes replies as text)
         try:
-            if redis_client:
-                cached = await redis_client.get(LANDING_CACHE_KEY)
+            if redis_db.redis_client:
+                cached = await redis_db.redis_client.execute_command("HGETALL", LANDING_CACHE_KEY, NEVER_DECODE=True)
+                record_cache("landing", bool(cached))
                 if cached:
                     logger.info("Landing page served from Redis cache")
-                    return json.loads(cached)
+                    return {field.decode(): value for field, value in cached.items()}
         except Exception as e:
-            logger.warning(f"Redis cache read failed (non-fatal): {e}")
+            logger.warning("Redis cache read failed (non-fatal): %s", e)
 
-        # 2. Cache miss — run ALL queries in parallel
+        # 2. Cache miss — build, serialize and compress once
+        response = await LandingService.build_landing_page()
+        # Same bytes FastAPI's JSONResponse would send (ISO-8601 datetimes, compact separators)
+        body = json.dumps(jsonable_encoder(response), ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+        variants = await asyncio.to_thread(precompress, body)
+
+        # 3. Cache in Redis (non-blocking — don't let cache failures crash landing)
+        try:
+            if redis_db.redis_client:
+                async with redis_db.redis_client.pipeline(transaction=True) as pipe:
+                    pipe.delete(LANDING_CACHE_KEY)
+                    pipe.hset(LANDING_CACHE_KEY, mapping=variants)
+                    pipe.expire(LANDING_CACHE_KEY, LANDING_CACHE_TTL)
+                    await pipe.execute()
+                logger.info("Landing page cached in Redis")
+        except Exception as e:
+            logger.warning("Redis cache write failed (non-fatal): %s", e)
+
+        return variants
+
+    @staticmethod
+    async def build_landing_page() -> dict:
+        """All landing page sections; runs the 6 queries in parallel."""
         products_col = products_collection()
         banners_col = banners_collection()
 
@@ -97,8 +124,7 @@ class LandingService:
             fetch_featured_products(products_col),
         )
 
-        # 3. Build response
-        response = {
+        return {
             "banners": _serialize_list(results[0]),
             "categories": results[1],          # Already projected by aggregation
             "flash_deals": _serialize_cards(results[2]),
@@ -107,31 +133,17 @@ class LandingService:
             "featured": _serialize_cards(results[5]),
         }
 
-        # 4. Cache in Redis (non-blocking — don't let cache failures crash landing)
-        try:
-            if redis_client:
-                await redis_client.setex(
-                    LANDING_CACHE_KEY,
-                    LANDING_CACHE_TTL,
-                    json.dumps(response, default=str)
-                )
-                logger.info("Landing page cached in Redis")
-        except Exception as e:
-            logger.warning(f"Redis cache write failed (non-fatal): {e}")
-
-        return response
-
     # ── Cache Invalidation ────────────────────────────────────────────────
 
     @staticmethod
     async def _invalidate_landing_cache():
         """Delete the landing page cache so the next request rebuilds it."""
         try:
-            if redis_client:
-                await redis_client.delete(LANDING_CACHE_KEY)
+            if redis_db.redis_client:
+                await redis_db.redis_client.delete(LANDING_CACHE_KEY)
                 logger.info("Landing page cache invalidated")
         except Exception as e:
-            logger.warning(f"Redis cache invalidation failed (non-fatal): {e}")
+            logger.warning("Redis cache invalidation failed (non-fatal): %s", e)
 
     # ── Banner CRUD (Admin) ───────────────────────────────────────────────
 
@@ -14,7 +14,7 @@ from datetime import datetime
 from typing import Optional
 
 
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
 
 class OrderService:
 
@@ -155,7 +155,7 @@ class OrderService:
                 await increment_product_stock(products_collection(), dec_item["product_id"], dec_item["quantity"])
             # Cancel the order we just created
             await update_order_status_db(orders_collection(), order_id, user_id, OrderStatus.cancelled.value)
-            logger.error(f"Stock decrement failed during order {order_id}, rolled back: {e}")
+            logger.error("Stock decrement failed during order %s, rolled back: %s", order_id, e)
             raise HTTPException(status_code=400, detail="Order failed due to stock issue. Please try again.")
 
         # 7. Clear Cart
@@ -253,7 +253,7 @@ class OrderService:
             # Stock WAS deducted but something else failed — restore it
             await increment_product_stock(products_collection(), product_id, quantity)
             await update_order_status_db(orders_collection(), order_id, user_id, OrderStatus.cancelled.value)
-            logger.error(f"Stock decrement failed for buy_now order {order_id}: {e}")
+            logger.error("Stock decrement failed for buy_now order %s: %s", order_id, e)
             raise HTTPException(status_code=400, detail="Order failed due to stock issue. Please try again.")
 
         # Cart is intentionally NOT cleared — this was a direct purchase
@@ -415,7 +415,7 @@ class OrderService:
             if str(item["product_id"]) in cancel_id_set:
                 item["item_status"] = ItemStatus.cancelled.value
                 await increment_product_stock(products_collection(), str(item["product_id"]), item["quantity"])
-                logger.info(f"Stock restored for product {item['product_id']} due to cancellation")
+                logger.info("Stock restored for product %s due to cancellation", item['product_id'])
 
         # 3. Recompute overall order status
         new_order_status = compute_order_status(items)
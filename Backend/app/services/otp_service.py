@@ -1,11 +1,11 @@
+import math
 import uuid
 import logging
 from app.repo import otp_helpers
 from app.utils.otp import generate_otp_token
 from app.utils.email import send_otp_email
-from app.repo.otp_helpers import MAX_ATTEMPTS, MAX_RESEND_ATTEMPTS
 
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
 
 
 async def generate_and_store_otp(email: str) -> tuple[bool, str, str]:
@@ -13,41 +13,30 @@ async def generate_and_store_otp(email: str) -> tuple[bool, str, str]:
     Checks if email is blocked or in cooldown. If not, generates OTP, stores it,
     sends email, and returns (success, message, otp_token).
     """
-    # 1. Check if blocked
-    if await otp_helpers.is_blocked(email):
-        return False, "Account temporarily blocked due to too many failed attempts.", ""
-        
-    # 2. Check cooldown
-    if await otp_helpers.is_cooldown(email):
-        return False, f"Please wait {otp_helpers.RESEND_COOLDOWN} seconds before requesting a new OTP.", ""
+    otp = generate_otp_token()
+    otp_token = str(uuid.uuid4())
 
     try:
-        # 3. Check max resend attempts
-        resend_attempts = await otp_helpers.increment_resend_attempts(email)
-        if resend_attempts > MAX_RESEND_ATTEMPTS:
-            await otp_helpers.block_email(email)
+        # 1. Block, cooldown and resend checks + storing the OTP — one atomic script
+        result = await otp_helpers.issue_otp(email, otp_token, otp)
+        if result.status == "blocked":
+            return False, "Account temporarily blocked due to too many failed attempts.", ""
+        if result.status == "cooldown":
+            return False, f"Please wait {math.ceil(result.retry_after)} seconds before requesting a new OTP.", ""
+        if result.status == "resend_limit":
             return False, "Too many resend requests. Account temporarily blocked.", ""
 
-        # 4. Generate OTP & Token
-        otp = generate_otp_token()
-        otp_token = str(uuid.uuid4())
-
-        # 4. Store OTP data
-        await otp_helpers.set_otp_data(otp_token, email, otp)
-
-        # 5. Send email
+        # 2. Send email (outside the script); release the cooldown if it didn't go out
         email_sent = await send_otp_email(email, otp)
         if not email_sent:
-            logger.error(f"Failed to send OTP to {email}")
+            logger.error("Failed to send OTP to %s", email)
+            await otp_helpers.discard_otp(email, otp_token)
             return False, "Failed to send OTP email.", ""
 
-        # 6. Set cooldown
-        await otp_helpers.set_cooldown(email)
-
-        logger.info(f"OTP generated and sent to {email}")
+        logger.info("OTP generated and sent to %s", email)
         return True, "OTP sent successfully.", otp_token
     except Exception as e:
-        logger.error(f"Error in generate_and_store_otp for {email}: {e}")
+        logger.error("Error in generate_and_store_otp for %s: %s", email, e)
         return False, "An internal error occurred while processing OTP.", ""
 
 
@@ -57,37 +46,21 @@ async def verify_user_otp(otp_token: str, user_otp: str) -> tuple[bool, str, str
     Returns (is_valid, message, email).
     """
     try:
-        # 1. Retrieve OTP data
-        otp_data = await otp_helpers.get_otp_data(otp_token)
-        if not otp_data:
-            return False, "OTP expired or invalid token.", ""
-
-        email = otp_data["email"]
-        stored_otp = otp_data["otp"]
+        # Record lookup, then block check, compare, attempt count and cleanup in one atomic script
+        result = await otp_helpers.verify_otp(otp_token, user_otp)
+        email = result.email
 
-        # 2. Check if blocked
-        if await otp_helpers.is_blocked(email):
+        if result.status == "invalid":
+            return False, "OTP expired or invalid token.", ""
+        if result.status == "blocked":
             return False, "Account temporarily blocked due to too many failed attempts.", email
+        if result.status == "locked":
+            return False, "Too many failed attempts. Account temporarily blocked.", email
+        if result.status == "wrong":
+            return False, f"Invalid OTP. {result.remaining} attempts remaining.", email
 
-        # 3. Verify OTP
-        if stored_otp != user_otp:
-            attempts = await otp_helpers.increment_attempts(email)
-            if attempts >= MAX_ATTEMPTS:
-                await otp_helpers.block_email(email)
-                await otp_helpers.delete_otp_data(otp_token)
-                return False, "Too many failed attempts. Account temporarily blocked.", email
-            
-            remaining = MAX_ATTEMPTS - attempts
-            return False, f"Invalid OTP. {remaining} attempts remaining.", email
-
-        # 4. Success - clean up
-        await otp_helpers.delete_otp_data(otp_token)
-        await otp_helpers.reset_attempts(email)
-
-        logger.info(f"OTP verified successfully for {email}")
+        logger.info("OTP verified successfully for %s", email)
         return True, "OTP verified successfully.", email
     except Exception as e:
-        logger.error(f"Error in verify_user_otp for token {otp_token}: {e}")
+        logger.error("Error in verify_user_otp for token %s: %s", otp_token, e)
         return False, "An internal error occurred during OTP verification.", ""
-
-
@@ -4,8 +4,10 @@ from pymongo.errors import PyMongoError
 import logging
 from app.db.mongodb import products_collection
 from app.services.review_service import ReviewService
-from app.models.product_model import PaginatedProductResponse, ProductResponse
+from app.services.counter_service import ProductCounters
+from app.models.product_model import PaginatedProductResponse, PaginatedProductCardResponse, ProductResponse
 from app.repo.product_helpers import (
+    LISTING_CARD_PROJECTION,
     build_product_query,
     count_products,
     fetch_products,
@@ -18,7 +20,7 @@ from app.repo.landing_helpers import fetch_categories_with_subcategories
 from app.db.mongodb import sellers_collection
 from bson import ObjectId
 
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
 
 
 class ProductService:
@@ -45,7 +47,8 @@ class ProductService:
         sort_order: int = -1,
         page: int = 1,
         limit: int = 30,
-    ) -> PaginatedProductResponse:
+        view: str = "card",
+    ) -> PaginatedProductCardResponse | PaginatedProductResponse:
         
         # 1. Build Query Dictionary
         query = build_product_query(
@@ -64,22 +67,24 @@ class ProductService:
         # 2. Pagination Math
         skip = (page - 1) * limit
         
-        # 3. Fetch from DB
+        # 3. Fetch from DB — grid cards only carry the card fields unless view=full
+        projection = None if view == "full" else LISTING_CARD_PROJECTION
         collection = products_collection()
         try:
             total_items = await count_products(collection, query)
-            raw_products = await fetch_products(collection, query, sort_by, sort_order, skip, limit)
+            raw_products = await fetch_products(collection, query, sort_by, sort_order, skip, limit, projection)
         except PyMongoError as e:
-            logger.error(f"Error fetching products: {e}")
+            logger.error("Error fetching products: %s", e)
             raise HTTPException(status_code=500, detail="Database query failed")
         
         # 4. Serialize & Calculate Pages
         serialized_products = [ProductService.serialize(p) for p in raw_products]
         total_pages = math.ceil(total_items / limit) if limit > 0 else 0
 
-        logger.info(f"Fetched {len(serialized_products)} products for page {page}")
+        logger.info("Fetched %s products for page %s", len(serialized_products), page)
         # 5. Map to Model
-        return PaginatedProductResponse(
+        response_model = PaginatedProductResponse if view == "full" else PaginatedProductCardResponse
+        return response_model(
             items=serialized_products,
             total=total_items,
             page=page,
@@ -91,6 +96,7 @@ class ProductService:
     async def get_product_by_id(product_id: str):
         product = await fetch_product_by_id(products_collection(), product_id)
         if product:
+            await ProductCounters.incr("view_count", product_id)
             serialized_product = ProductService.serialize(product)
             
             # 1. Fetch last 5 reviews
@@ -116,6 +122,7 @@ class ProductService:
     async def get_product_by_slug(slug: str):
         product = await fetch_product_by_slug(products_collection(), slug)
         if product:
+            await ProductCounters.incr("view_count", str(product["_id"]))
             serialized_product = ProductService.serialize(product)
             reviews_data = await ReviewService.get_product_reviews(str(product["_id"]), page=1, limit=5)
             serialized_product["recent_reviews"] = reviews_data.get("reviews", [])
@@ -135,21 +142,21 @@ class ProductService:
 
     @staticmethod
     async def get_categories():
-        return await fetch_categories(products_collection())
+        return await fetch_categories(products_collection(analytics=True))
 
     # We keep search_products as a shorthand that just routes to get_products 
     # to not break existing strict search routes immediately, but it now benefits from the paginated model.
     @classmethod
-    async def search_products(cls, query: str, page: int = 1, limit: int = 30):
+    async def search_products(cls, query: str, page: int = 1, limit: int = 30, view: str = "card"):
         if not query or not query.strip():
             raise HTTPException(status_code=400, detail="Search query cannot be empty")
         
-        logger.info(f"Searching for products with query: {query}")
-        return await cls.get_products(search=query.strip(), page=page, limit=limit)
+        logger.info("Searching for products with query: %s", query)
+        return await cls.get_products(search=query.strip(), page=page, limit=limit, view=view)
 
     @classmethod
-    async def get_product_by_category(cls, category: str, page: int = 1, limit: int = 30):
-        return await cls.get_products(category=category, page=page, limit=limit)
+    async def get_product_by_category(cls, category: str, page: int = 1, limit: int = 30, view: str = "card"):
+        return await cls.get_products(category=category, page=page, limit=limit, view=view)
 
     @staticmethod
     async def get_product_facets(
@@ -164,9 +171,9 @@ class ProductService:
             min_discount=min_discount, min_rating=min_rating,
             is_featured=is_featured, in_stock=in_stock
         )
-        return await fetch_product_facets(products_collection(), query)
+        return await fetch_product_facets(products_collection(analytics=True), query)
 
     @staticmethod
     async def get_categories_with_subcategories():
         """Returns categories grouped with their subcategories, counts, and images."""
-        return await fetch_categories_with_subcategories(products_collection())
+        return await fetch_categories_with_subcategories(products_collection(analytics=True))
@@ -13,7 +13,7 @@ from app.db.mongodb import get_users_collection, profiles_collection
 from app.repo.profiles_helpers import create_empty_profile
 from app.db.mongodb import profiles_collection
 
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
 class ProfileService:
 
     @staticmethod
@@ -65,7 +65,7 @@ class ProfileService:
         try:
             await update_profile_db(profiles_collection(), user_id, update_data)
         except Exception as e:
-            logger.error(f"Failed to update profile for user {user_id}: {e}")
+            logger.error("Failed to update profile for user %s: %s", user_id, e)
             raise HTTPException(status_code=500, detail="Failed to update profile")
             
         return {"message": "Profile updated successfully"}
@@ -100,7 +100,7 @@ class ProfileService:
             
         success = await add_address_to_profile(profiles_collection(), user_id, address_data)
         if not success:
-            logger.error(f"Failed to add address for user {user_id}")
+            logger.error("Failed to add address for user %s", user_id)
             raise HTTPException(status_code=500, detail="Failed to add address")
             
         return {"message": "Address added successfully", "address_id": address_data["address_id"]}
@@ -130,7 +130,7 @@ class ProfileService:
                     
         success = await update_address_in_profile(profiles_collection(), user_id, address_id, update_data)
         if not success:
-            logger.error(f"Failed to update address {address_id} for user {user_id}")
+            logger.error("Failed to update address %s for user %s", address_id, user_id)
             raise HTTPException(status_code=500, detail="Failed to update address")
             
         return {"message": "Address updated successfully"}
@@ -150,7 +150,7 @@ class ProfileService:
             
         success = await delete_address_from_profile(profiles_collection(), user_id, address_id)
         if not success:
-            logger.error(f"Failed to delete address {address_id} for user {user_id}")
+            logger.error("Failed to delete address %s for user %s", address_id, user_id)
             raise HTTPException(status_code=500, detail="Failed to delete address")
             
         # If the deleted address was default, make the first available one default
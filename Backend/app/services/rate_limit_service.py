@@ -0,0 +1,35 @@
+"""
+Generic request throttling on top of rate_limit_helpers. A Redis outage must not take the API
+down with it, so checks fail open; THROTTLED and FAIL_OPEN count what happened per scope.
+"""
+
+import logging
+from collections import Counter
+
+from app.core.config import settings
+from app.db.redis import REDIS_ERRORS
+from app.repo import rate_limit_helpers
+from app.repo.rate_limit_helpers import RateLimitResult
+
+logger = logging.getLogger(__name__)
+
+THROTTLED: Counter = Counter()   # scope -> requests rejected with 429
+FAIL_OPEN: Counter = Counter()   # scope -> checks let through because Redis was unavailable
+
+
+async def check(scope: str, identity: str, limit: int, window: float, cost: int = 1) -> RateLimitResult:
+    """Consume `cost` hits for identity in scope; allowed=False means the caller should reject."""
+    if not settings.RATE_LIMIT_ENABLED:
+        return RateLimitResult(True, limit, 0)
+
+    try:
+        result = await rate_limit_helpers.hit(scope, identity, limit, window, cost)
+    except REDIS_ERRORS as e:
+        FAIL_OPEN[scope] += 1
+        logger.warning("Rate limiter unavailable for %s, allowing request: %s", scope, e)
+        return RateLimitResult(True, limit, 0)
+
+    if not result.allowed:
+        THROTTLED[scope] += 1
+        logger.info("Rate limited %s for %s (retry in %.0fs)", scope, identity, result.retry_after)
+    return result
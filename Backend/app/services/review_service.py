@@ -3,9 +3,9 @@ from bson import ObjectId
 from datetime import datetime
 import logging
 
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
 
-from app.repo.review_helpers import insert_review, get_reviews_by_product, get_review_count_by_product, check_existing_review
+from app.repo.review_helpers import insert_review, get_reviews_by_product, get_review_totals, check_existing_review, apply_rating_delta
 from app.repo.orders_helpers import get_order_by_id_db
 from app.repo.profiles_helpers import get_profile_by_user_id
 from app.repo.product_helpers import fetch_product_by_id
@@ -65,60 +65,63 @@ class ReviewService:
             "is_verified_purchase": True,
             "reviewed_at": utc_now()
         }
+        # Denormalized so seller/admin moderation feeds are a single (seller_id, reviewed_at) index scan
+        if target_item.get("seller_id"):
+            review_doc["seller_id"] = str(target_item["seller_id"])
 
         # 7. Insert review
         review_id = await insert_review(reviews_collection(), review_doc)
 
-        # 8. Update product avg_rating and review_count atomically
-        product = await fetch_product_by_id(products_collection(), product_id)
-        if product:
-            old_avg = float(product.get("avg_rating", 0))
-            old_count = int(product.get("review_count", 0))
-            new_count = old_count + 1
-            new_avg = round((old_avg * old_count + review_data["rating"]) / new_count, 2)
-
-            await products_collection().update_one(
-                {"_id": ObjectId(product_id)},
-                {"$set": {"avg_rating": new_avg, "review_count": new_count}}
-            )
-
-        logger.info(f"Review {review_id} written for product {product_id} by user {user_id}")
+        # 8. Fold the rating into the product aggregates ($inc only — safe under concurrent reviews)
+        await apply_rating_delta(products_collection(), product_id, review_data["rating"], reviews_col=reviews_collection())
+
+        logger.info("Review %s written for product %s by user %s", review_id, product_id, user_id)
         return {"message": "Review submitted successfully", "review_id": review_id}
 
     @staticmethod
-    async def get_product_reviews(product_id: str, page: int = 1, limit: int = 20):
-        """Get public reviews for a product."""
+    def _public_review(r: dict) -> dict:
+        """Public view of a review — no user_id or internal fields."""
+        return {
+            "_id": str(r.get("_id")),
+            "reviewer_name": r.get("name", "Anonymous"),
+            "quality": r.get("quality", ""),
+            "rating": r.get("rating"),
+            "comment": r.get("comment"),
+            "is_verified_purchase": r.get("is_verified_purchase", False),
+            "reviewed_at": r.get("reviewed_at")
+        }
 
+    @staticmethod
+    async def get_product_reviews(product_id: str, page: int = 1, limit: int = 20,
+                                  cursor: str | None = None, rating: int | None = None):
+        """
+        Get public reviews for a product, newest first.
+        Pass back `next_cursor` as `cursor` for the next page; `page` is kept for older clients.
+        `total` comes from the product's review aggregates, not a count_documents per call.
+        """
         if not ObjectId.is_valid(product_id):
             raise HTTPException(status_code=400, detail="Invalid product ID")
 
-        skip = (page - 1) * limit
-        reviews = await get_reviews_by_product(reviews_collection(), product_id, skip, limit)
-        total = await get_review_count_by_product(reviews_collection(), product_id)
-
-        # Format for public view — no user_id or internal fields
-        public_reviews = []
-        for r in reviews:
-            public_reviews.append({
-                "_id": str(r.get("_id")),
-                "reviewer_name": r.get("name", "Anonymous"),
-                "quality": r.get("quality", ""),
-                "rating": r.get("rating"),
-                "comment": r.get("comment"),
-                "is_verified_purchase": r.get("is_verified_purchase", False),
-                "reviewed_at": r.get("reviewed_at")
-            })
+        skip = 0 if cursor else (page - 1) * limit
+        reviews, next_cursor = await get_reviews_by_product(
+            reviews_collection(), product_id, skip, limit, cursor=cursor, rating=rating
+        )
+        totals = await get_review_totals(products_collection(), product_id)
+        total = totals["review_count"] if rating is None else totals["rating_histogram"].get(str(rating), 0)
 
         return {
             "product_id": product_id,
-            "reviews": public_reviews,
+            "reviews": [ReviewService._public_review(r) for r in reviews],
             "total": total,
+            "rating_histogram": totals["rating_histogram"],
             "page": page,
-            "limit": limit
+            "limit": limit,
+            "next_cursor": next_cursor
         }
 
     @staticmethod
-    async def get_seller_product_reviews(seller_id: str, product_id: str, page: int = 1, limit: int = 20):
+    async def get_seller_product_reviews(seller_id: str, product_id: str, page: int = 1, limit: int = 20,
+                                         cursor: str | None = None):
         """Seller view of reviews on their own product."""
         if not ObjectId.is_valid(product_id):
             raise HTTPException(status_code=400, detail="Invalid product ID")
@@ -130,28 +133,17 @@ class ReviewService:
         if str(product.get("seller_id")) != seller_id:
             raise HTTPException(status_code=403, detail="You can only view reviews for your own products")
 
-        skip = (page - 1) * limit
-        reviews = await get_reviews_by_product(reviews_collection(), product_id, skip, limit)
-        total = await get_review_count_by_product(reviews_collection(), product_id)
-
-        seller_reviews = []
-        for r in reviews:
-            seller_reviews.append({
-                "_id": str(r.get("_id")),
-                "reviewer_name": r.get("name", "Anonymous"),
-                "quality": r.get("quality", ""),
-                "rating": r.get("rating"),
-                "comment": r.get("comment"),
-                "is_verified_purchase": r.get("is_verified_purchase", False),
-                "reviewed_at": r.get("reviewed_at")
-            })
+        skip = 0 if cursor else (page - 1) * limit
+        reviews, next_cursor = await get_reviews_by_product(reviews_collection(), product_id, skip, limit, cursor=cursor)
 
         return {
             "product_id": product_id,
             "product_name": product.get("name", ""),
             "avg_rating": product.get("avg_rating", 0),
-            "review_count": total,
-            "reviews": seller_reviews,
+            "review_count": product.get("review_count", 0),
+            "rating_histogram": product.get("rating_histogram", {}),
+            "reviews": [ReviewService._public_review(r) for r in reviews],
             "page": page,
-            "limit": limit
+            "limit": limit,
+            "next_cursor": next_cursor
         }
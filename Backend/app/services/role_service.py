@@ -4,9 +4,11 @@ from app.db.mongodb import get_users_collection, sellers_collection
 from app.services.audit_service import log_action
 from app.repo.role_helpers import get_user_by_id, update_user_role
 from app.repo.admin_helpers import update_seller_by_user_id
+from app.services import session_service
+from app.services.denylist_service import TokenDenylist
 import logging
 
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
 
 async def promote_to_admin(user_id: str, performed_by: str):
     user = await get_user_by_id(get_users_collection(), user_id)
@@ -23,20 +25,22 @@ async def promote_to_admin(user_id: str, performed_by: str):
     if old_role == "admin":
         raise HTTPException(status_code=400, detail="User is already an admin")
 
-    logger.info(f"Promoting user {user_id} to admin by {performed_by}")
+    logger.info("Promoting user %s to admin by %s", user_id, performed_by)
     try:
         await update_user_role(get_users_collection(), user_id, "admin")
+        await session_service.sync_session_role(user_id, "admin")
         
         await log_action(
             action="promoted_to_admin",
             target_user_id=user_id,
             performed_by=performed_by,
             from_role=old_role,
-            to_role="admin"
+            to_role="admin",
+            target=user
         )
         return {"message": "User promoted to admin successfully"}
     except PyMongoError as e:
-        logger.error(f"Error promoting user {user_id} to admin: {e}")
+        logger.error("Error promoting user %s to admin: %s", user_id, e)
         raise HTTPException(status_code=500, detail="Database update failed")
 
 async def demote_user(user_id: str, performed_by: str):
@@ -51,9 +55,12 @@ async def demote_user(user_id: str, performed_by: str):
     if old_role == "super_admin":
         raise HTTPException(status_code=403, detail="Cannot demote a super admin")
 
-    logger.info(f"Demoting user {user_id} from {old_role} to user by {performed_by}")
+    logger.info("Demoting user %s from %s to user by %s", user_id, old_role, performed_by)
     try:
         await update_user_role(get_users_collection(), user_id, "user")
+        await session_service.sync_session_role(user_id, "user")
+        # Access tokens carry the role; void the elevated ones rather than wait out their exp
+        await TokenDenylist.revoke_user(user_id)
         
         # If demoting a seller, we must also suspend their seller profile
         if old_role == "seller":
@@ -64,11 +71,12 @@ async def demote_user(user_id: str, performed_by: str):
             target_user_id=user_id,
             performed_by=performed_by,
             from_role=old_role,
-            to_role="user"
+            to_role="user",
+            target=user
         )
         return {"message": f"User demoted from {old_role} to user successfully"}
     except PyMongoError as e:
-        logger.error(f"Error demoting user {user_id}: {e}")
+        logger.error("Error demoting user %s: %s", user_id, e)
         raise HTTPException(status_code=500, detail="Database update failed")
 
 async def ban_user(user_id: str, performed_by: str):
@@ -83,9 +91,11 @@ async def ban_user(user_id: str, performed_by: str):
     if user.get("is_banned", False):
         raise HTTPException(status_code=400, detail="User is already banned")
 
-    logger.info(f"Banning user {user_id} by {performed_by}")
+    logger.info("Banning user %s by %s", user_id, performed_by)
     try:
         await update_user_role(get_users_collection(), user_id, "user", is_banned=True)
+        await session_service.end_all_sessions(user_id)
+        await TokenDenylist.revoke_user(user_id)
         
         # If they were a seller, suspend their profile too
         if old_role == "seller":
@@ -96,9 +106,10 @@ async def ban_user(user_id: str, performed_by: str):
             target_user_id=user_id,
             performed_by=performed_by,
             from_role=old_role,
-            to_role="user"
+            to_role="user",
+            target=user
         )
         return {"message": "User banned successfully"}
     except PyMongoError as e:
-        logger.error(f"Error banning user {user_id}: {e}")
+        logger.error("Error banning user %s: %s", user_id, e)
         raise HTTPException(status_code=500, detail="Database update failed")
@@ -13,14 +13,16 @@ from app.repo.seller_helpers import (
 )
 from app.db.mongodb import products_collection, orders_collection, sellers_collection
 from app.repo.product_helpers import increment_product_stock
+from app.repo.review_helpers import RATING_STARS
 from app.core.time_utils import utc_now
+from app.ai.product_index import ProductIndexer
 from datetime import datetime
 from bson import ObjectId
 from app.utils.order_utils import compute_order_status, generate_slug, VALID_TRANSITION
 import logging
 
 
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
 
 class SellerService:
     
@@ -51,7 +53,8 @@ class SellerService:
                 success = await seller_helpers.update_seller_product(products_collection(), str(existing_product["_id"]), seller_id, data)
                 if not success:
                     raise HTTPException(status_code=500, detail="Failed to restore product")
-                
+                await ProductIndexer.mark_dirty(str(existing_product["_id"]))
+
                 return {
                     "message": "Product restored and waiting for approval",
                     "product_id": str(existing_product["_id"])
@@ -62,11 +65,14 @@ class SellerService:
         data["is_deleted"] = False
         data["avg_rating"] = 0.0
         data["review_count"] = 0
+        data["rating_sum"] = 0.0
+        data["rating_histogram"] = {star: 0 for star in RATING_STARS}
         data["created_at"] = utc_now()
         data["updated_at"] = data["created_at"]
 
         result = await seller_helpers.insert_seller_product(products_collection(), data)
         result["_id"] = str(result["_id"])
+        await ProductIndexer.mark_dirty(result["_id"])
         return {
             "message": "Product created successfully and waiting for approval",
             "product_id": str(result["_id"]),
@@ -116,7 +122,7 @@ class SellerService:
             new_discount_percent = update_data.get("discount_percent", existing_product.get("discount_percent", 0))
             update_data["price"] = calculate_discount_price(new_actual_price, new_discount_percent)
 
-        for field in ["is_approved", "is_deleted", "seller_id", "avg_rating", "review_count", "product_likes", "created_at", "updated_at", "_id", "id"]:
+        for field in ["is_approved", "is_deleted", "seller_id", "avg_rating", "review_count", "rating_sum", "rating_histogram", "product_likes", "created_at", "updated_at", "_id", "id"]:
             update_data.pop(field, None)
         
         # Ensure updated_at is always current
@@ -125,6 +131,7 @@ class SellerService:
         success = await seller_helpers.update_seller_product(products_collection(), product_id, seller_id, update_data)
         if not success:
             raise HTTPException(status_code=404, detail="No changes made")
+        await ProductIndexer.mark_dirty(product_id)
         return {"message": "Product updated successfully"}
 
     @staticmethod
@@ -139,6 +146,7 @@ class SellerService:
         success = await seller_helpers.update_seller_product(products_collection(), product_id, seller_id, {"is_active": toggle_data.is_active})
         if not success:
             raise HTTPException(status_code=404, detail="Product not found")
+        await ProductIndexer.mark_dirty(product_id)
         return {"message": "Product active status toggled"}
 
     @staticmethod
@@ -167,6 +175,7 @@ class SellerService:
         success = await seller_helpers.soft_delete_seller_product(products_collection(), product_id, seller_id)
         if not success:
             raise HTTPException(status_code=404, detail="Product not found")
+        await ProductIndexer.mark_dirty(product_id)
         return {"message": "Product deleted successfully"}
 
     @staticmethod
@@ -286,7 +295,7 @@ class SellerService:
         if new_status == ItemStatus.cancelled:
             quantity = target_item.get("quantity", 1)
             await increment_product_stock(products_collection(), product_id, quantity)
-            logger.info(f"Stock restored: product {product_id} +{quantity} (order item cancelled)")
+            logger.info("Stock restored: product %s +%s (order item cancelled)", product_id, quantity)
 
         # --- 7. Recompute aggregate order_status from ALL items ---
         full_order = await get_full_order_by_id(orders_collection(), order_id)
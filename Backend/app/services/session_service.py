@@ -0,0 +1,130 @@
+"""
+Refresh-token sessions. A refresh is one Redis round trip (a Lua compare-and-swap on the token's
+HMAC digest; the session id names its owner) — no bcrypt, no Mongo read. Every refresh rotates the secret; presenting
+an already-rotated secret is treated as token theft and revokes that device's session.
+"""
+
+import hmac
+import logging
+from fastapi import HTTPException
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.security import (
+    create_access_token, create_refresh_token, refresh_token_digest, session_owner, split_refresh_token,
+)
+from app.core.time_utils import utc_now
+from app.repo import session_helpers
+
+logger = logging.getLogger(__name__)
+
+
+def _session_ttl() -> int:
+    return settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+
+
+def _parse(refresh_token: str) -> tuple[str, str]:
+    parsed = split_refresh_token(refresh_token)
+    if not parsed:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    return parsed
+
+
+async def start_session(refresh_token: str, user_id: str, email: str, role: str, device: str | None = None):
+    """Register a freshly issued refresh token as a new device session."""
+    session_id, secret = _parse(refresh_token)
+    try:
+        await session_helpers.create_session(
+            session_id, str(user_id), email, role, refresh_token_digest(secret), _session_ttl(), device
+        )
+    except RedisError as e:
+        logger.error("Session store error creating session for %s: %s", email, e)
+        raise HTTPException(status_code=503, detail="Session store unavailable")
+
+
+async def rotate_session(refresh_token: str) -> dict:
+    """Exchange a refresh token for a new access token + rotated refresh token."""
+    session_id, secret = _parse(refresh_token)
+    new_refresh = create_refresh_token(session_id)
+    _, new_secret = split_refresh_token(new_refresh)
+    try:
+        result = await session_helpers.rotate_session(
+            session_id, refresh_token_digest(secret), refresh_token_digest(new_secret), _session_ttl(),
+            user_id=session_owner(session_id),
+        )
+    except RedisError as e:
+        logger.error("Session store error rotating session: %s", e)
+        raise HTTPException(status_code=503, detail="Session store unavailable")
+
+    status = int(result[0])
+    if status == -1:
+        logger.critical("Security Alert: Reused refresh token for user %s, session revoked", result[1])
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    if status != 1:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    user_id, email, role = result[1], result[2], result[3]
+    access_token = create_access_token({"_id": user_id, "email": email, "role": role, "iss": "Anozon", "aud": "Anozon", "iat": utc_now()})
+    return {"access_token": access_token, "refresh_token": new_refresh, "role": role, "token_type": "bearer"}
+
+
+async def end_session(refresh_token: str) -> bool:
+    """Revoke the device session a refresh token belongs to, if the token's secret is current."""
+    parsed = split_refresh_token(refresh_token)
+    if not parsed:
+        return False
+    session_id, secret = parsed
+    try:
+        data = await session_helpers.get_session(session_id)
+        if not data or not hmac.compare_digest(data.get("digest", ""), refresh_token_digest(secret)):
+            return False
+        await session_helpers.delete_session(session_id, data["user_id"])
+        return True
+    except RedisError as e:
+        logger.error("Session store error ending session: %s", e)
+        raise HTTPException(status_code=503, detail="Session store unavailable")
+
+
+async def end_all_sessions(user_id: str) -> int:
+    """Revoke every device session of a user (logout everywhere, password reset, ban)."""
+    try:
+        return await session_helpers.delete_user_sessions(str(user_id))
+    except RedisError as e:
+        logger.error("Session store error revoking sessions for user %s: %s", user_id, e)
+        return 0
+
+
+async def sync_session_role(user_id: str, role: str):
+    """Propagate a role change to live sessions so the next refresh issues the new role."""
+    try:
+        await session_helpers.set_user_sessions_role(str(user_id), role)
+    except RedisError as e:
+        logger.error("Session store error updating role for user %s: %s", user_id, e)
+
+
+async def list_sessions(user_id: str, current_refresh_token: str | None = None) -> list[dict]:
+    """The user's active device sessions (no digests)."""
+    parsed = split_refresh_token(current_refresh_token)
+    current = parsed[0] if parsed else None
+    sessions = []
+    for session_id in await session_helpers.get_user_session_ids(str(user_id)):
+        data = await session_helpers.get_session(session_id)
+        if not data:
+            continue
+        sessions.append({
+            "session_id": session_id,
+            "device": data.get("device") or None,
+            "created_at": int(data.get("created_at", 0)),
+            "last_refreshed_at": int(data.get("rotated_at", 0)),
+            "current": session_id == current,
+        })
+    return sorted(sessions, key=lambda s: s["last_refreshed_at"], reverse=True)
+
+
+async def revoke_user_session(user_id: str, session_id: str):
+    """Revoke one of the user's own sessions (sign out a device)."""
+    data = await session_helpers.get_session(session_id)
+    if not data or data.get("user_id") != str(user_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    await session_helpers.delete_session(session_id, str(user_id))
+    return {"message": "Session revoked"}
@@ -0,0 +1,96 @@
+"""
+Slow Mongo command log.
+CommandLatencyListener queues explainable commands slower than MONGO_SLOW_COMMAND_MS on
+SLOW_COMMANDS (driver threads can't await). A background task explains each one
+(queryPlanner only, so nothing is re-executed) and logs a warning with the winning plan.
+The same query shape is explained at most once per EXPLAIN_COOLDOWN_SECONDS; the latest
+entries are kept for /super-admin/debug/profiles.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+
+from app.core.config import settings
+from app.db.mongodb import SLOW_COMMANDS, get_database_client
+from app.repo.explain_helpers import explain_command, plan_summary
+
+logger = logging.getLogger(__name__)
+
+EXPLAIN_COOLDOWN_SECONDS = 300
+# Filter/query field names per command, used for the shape
+_SHAPE_FIELDS = {"find": "filter", "count": "query", "distinct": "query", "findAndModify": "query"}
+
+
+def command_shape(entry: dict) -> tuple:
+    command = entry["command"]
+    if entry["command_name"] == "aggregate":
+        keys = tuple(next(iter(stage), "") for stage in command.get("pipeline", []))
+    elif entry["command_name"] in ("update", "delete"):
+        statements = command.get("updates") or command.get("deletes") or [{}]
+        keys = tuple(sorted(statements[0].get("q", {})))
+    else:
+        keys = tuple(sorted(command.get(_SHAPE_FIELDS.get(entry["command_name"], "filter"), {})))
+    return entry["collection"], entry["command_name"], keys
+
+
+class SlowCommandExplainer:
+    recent: deque = deque(maxlen=50)
+    _explained_at: dict[tuple, float] = {}
+    _task: asyncio.Task | None = None
+
+    @staticmethod
+    async def explain_pending() -> int:
+        """Explain and log the queued slow commands. Returns how many were explained."""
+        explained = 0
+        while SLOW_COMMANDS:
+            entry = SLOW_COMMANDS.popleft()
+            shape = command_shape(entry)
+            now = time.monotonic()
+            if now - SlowCommandExplainer._explained_at.get(shape, -EXPLAIN_COOLDOWN_SECONDS) < EXPLAIN_COOLDOWN_SECONDS:
+                continue
+            SlowCommandExplainer._explained_at[shape] = now
+            try:
+                summary = plan_summary(await explain_command(get_database_client(), entry["database"], entry["command"]))
+            except Exception as e:
+                logger.warning("Slow mongo %s on %s took %.0f ms; explain failed: %s",
+                               entry["command_name"], entry["collection"], entry["duration_ms"], e)
+                continue
+            logger.warning("Slow mongo %s on %s took %.0f ms (request %s): plan %s, indexes %s%s%s",
+                           entry["command_name"], entry["collection"], entry["duration_ms"], entry["request_id"],
+                           summary["plan"], summary["indexes"] or "none",
+                           ", COLLSCAN" if summary["collscan"] else "", ", in-memory sort" if summary["in_memory_sort"] else "")
+            SlowCommandExplainer.recent.append({
+                key: entry[key] for key in ("collection", "command_name", "duration_ms", "request_id")
+            } | {"shape": list(shape[2]), **summary})
+            explained += 1
+        return explained
+
+    @staticmethod
+    async def _loop(interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await SlowCommandExplainer.explain_pending()
+            except Exception as e:
+                logger.error("Slow command explainer failed, will retry next interval: %s", e)
+
+    @staticmethod
+    def start(interval: float = 1.0):
+        """Start the explainer (called from app lifespan); off when MONGO_SLOW_COMMAND_MS is 0."""
+        if not settings.MONGO_SLOW_COMMAND_MS:
+            return
+        if SlowCommandExplainer._task is None or SlowCommandExplainer._task.done():
+            SlowCommandExplainer._task = asyncio.create_task(SlowCommandExplainer._loop(interval))
+            logger.info("Slow command explainer started (threshold %s ms)", settings.MONGO_SLOW_COMMAND_MS)
+
+    @staticmethod
+    async def stop():
+        task, SlowCommandExplainer._task = SlowCommandExplainer._task, None
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
@@ -3,7 +3,7 @@ from pymongo.errors import PyMongoError
 from bson import ObjectId
 import logging
 
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
 
 from app.repo.cart_helpers import (
     get_cart_by_user, 
@@ -14,7 +14,8 @@ from app.repo.cart_helpers import (
     update_user_wishlist
 )
 from app.repo.product_helpers import fetch_product_by_id, update_product_likes
-from app.db.mongodb import products_collection
+from app.db.mongodb import products_collection, product_likes_collection
+from app.services.counter_service import ProductCounters
 
 class UserService:
     
@@ -39,20 +40,22 @@ class UserService:
         try:
             if in_wishlist:
                 # REMOVE (Unlike)
-                logger.info(f"Removing product {product_id} from wishlist for user {user_id}")
+                logger.info("Removing product %s from wishlist for user %s", product_id, user_id)
                 await update_user_wishlist(cart_collection, user_id, product_id, 'remove')
-                # Also update product like count
-                await update_product_likes(products_collection(), product_id, user_id, action="unlike")
+                # Also update product like count (write-behind, only on a real unlike)
+                if await update_product_likes(product_likes_collection(), product_id, user_id, action="unlike"):
+                    await ProductCounters.incr("product_likes", product_id, -1)
                 return {"message": "Removed from wishlist", "is_favorite": False}
             else:
                 # ADD (Like)
-                logger.info(f"Adding product {product_id} to wishlist for user {user_id}")
+                logger.info("Adding product %s to wishlist for user %s", product_id, user_id)
                 await update_user_wishlist(cart_collection, user_id, product_id, 'add')
-                # Also update product like count
-                await update_product_likes(products_collection(), product_id, user_id, action="like")
+                # Also update product like count (write-behind, only on a real like)
+                if await update_product_likes(product_likes_collection(), product_id, user_id, action="like"):
+                    await ProductCounters.incr("product_likes", product_id, 1)
                 return {"message": "Added to wishlist", "is_favorite": True}
         except PyMongoError as e:
-            logger.error(f"Error toggling wishlist for user {user_id}: {e}")
+            logger.error("Error toggling wishlist for user %s: %s", user_id, e)
             raise HTTPException(status_code=500, detail="Database update failed")
 
     @staticmethod
@@ -117,14 +120,14 @@ class UserService:
         try:
             result = await add_item_to_cart(cart_collection, user_id, product_id, quantity)
         except PyMongoError as e:
-            logger.error(f"Error adding to cart for user {user_id}: {e}")
+            logger.error("Error adding to cart for user %s: %s", user_id, e)
             raise HTTPException(status_code=500, detail="Database update failed")
 
         if result.modified_count == 0 and result.upserted_id is None and result.matched_count == 0:
-             logger.error(f"Failed to update cart for user {user_id}")
+             logger.error("Failed to update cart for user %s", user_id)
              raise HTTPException(status_code=400, detail="Failed to update cart")
             
-        logger.info(f"Product {product_id} added to cart for user {user_id}")
+        logger.info("Product %s added to cart for user %s", product_id, user_id)
         return await UserService.get_calculated_cart(user_id, cart_collection)
 
     @staticmethod
@@ -138,14 +141,14 @@ class UserService:
         try:
             result = await remove_item_from_cart(cart_collection, user_id, product_id)
         except PyMongoError as e:
-            logger.error(f"Error removing from cart for user {user_id}: {e}")
+            logger.error("Error removing from cart for user %s: %s", user_id, e)
             raise HTTPException(status_code=500, detail="Database update failed")
         
         if result.modified_count == 0:
-            logger.error(f"Product {product_id} not found in cart for user {user_id}")
+            logger.error("Product %s not found in cart for user %s", product_id, user_id)
             raise HTTPException(status_code=404, detail="Product not found in cart")
             
-        logger.info(f"Product {product_id} removed from cart for user {user_id}")
+        logger.info("Product %s removed from cart for user %s", product_id, user_id)
         return await UserService.get_calculated_cart(user_id, cart_collection)
     
     @staticmethod
@@ -170,17 +173,17 @@ class UserService:
         try:
             result = await update_item_quantity(cart_collection, user_id, product_id, quantity)
         except PyMongoError as e:
-            logger.error(f"Error updating cart quantity for user {user_id}: {e}")
+            logger.error("Error updating cart quantity for user %s: %s", user_id, e)
             raise HTTPException(status_code=500, detail="Database update failed")
 
         if result.modified_count == 0:
-            logger.error(f"Product {product_id} not found in cart for user {user_id}")
+            logger.error("Product %s not found in cart for user %s", product_id, user_id)
             raise HTTPException(
                 status_code=404,
                 detail="Product not found in cart"
             )
 
-        logger.info(f"Cart quantity updated for product {product_id}, user {user_id}")
+        logger.info("Cart quantity updated for product %s, user %s", product_id, user_id)
         return await UserService.get_calculated_cart(user_id, cart_collection)
 
     @staticmethod
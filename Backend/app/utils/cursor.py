@@ -0,0 +1,43 @@
+"""
+Opaque keyset-pagination cursors.
+A cursor carries the sort-key values of the last document on a page; the next page is
+everything strictly after it in sort order. Always end the sort with _id so ties are stable.
+The sort itself is encoded too, so a cursor replayed under another order is rejected rather
+than silently read as keys of the wrong fields or direction.
+"""
+
+import base64
+from bson import json_util
+from fastapi import HTTPException
+
+
+def encode_cursor(doc: dict, sort: list[tuple[str, int]]) -> str:
+    """Encode the sort-key values of `doc` as a URL-safe cursor string."""
+    payload = {"sort": [[field, direction] for field, direction in sort], "values": [doc.get(field) for field, _ in sort]}
+    return base64.urlsafe_b64encode(json_util.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor: str, sort: list[tuple[str, int]]) -> list:
+    """Decode a cursor produced by encode_cursor for the same sort. Raises 400 if malformed or for another sort."""
+    try:
+        payload = json_util.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(payload, dict) or not isinstance(payload.get("values"), list) or len(payload["values"]) != len(sort):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if payload.get("sort") != [[field, direction] for field, direction in sort]:
+        raise HTTPException(status_code=400, detail="Cursor belongs to a different sort order")
+    return payload["values"]
+
+
+def keyset_filter(sort: list[tuple[str, int]], values: list) -> dict:
+    """
+    Mongo filter for documents strictly after `values` in `sort` order:
+    (a < x) OR (a == x AND b < y) OR (a == x AND b == y AND c < z) ...  (">" for ascending keys)
+    """
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {sort[j][0]: values[j] for j in range(i)}
+        clause[field] = {"$lt" if direction < 0 else "$gt": values[i]}
+        clauses.append(clause)
+    return {"$or": clauses}
@@ -1,51 +1,48 @@
+import asyncio
+import html
 import logging
+from string import Template
+from typing import NamedTuple
 from brevo import AsyncBrevo
-from brevo.transactional_emails import SendTransacEmailRequestSender, SendTransacEmailRequestToItem
+from brevo.transactional_emails import (
+    SendTransacEmailRequestSender,
+    SendTransacEmailRequestToItem,
+    SendTransacEmailRequestMessageVersionsItem,
+    SendTransacEmailRequestMessageVersionsItemToItem,
+)
 from app.core.config import settings
+from app.core.tracing import record_error, tracer
+from opentelemetry.trace import SpanKind
 
-logger = logging.getLogger("uvicorn.error")
+logger = logging.getLogger(__name__)
 
 # Configure Brevo API Client
 client = AsyncBrevo(api_key=settings.BREVO_API_KEY)
 
-async def send_email_via_brevo(subject: str, recipients: list[str], html_content: str) -> bool:
-    try:
-        sender = SendTransacEmailRequestSender(
-            name=settings.MAIL_FROM_APP,
-            email=settings.MAIL_FROM
-        )
-        
-        to_recipients = [
-            SendTransacEmailRequestToItem(email=email) 
-            for email in recipients
-        ]
-        
-        await client.transactional_emails.send_transac_email(
-            subject=subject,
-            html_content=html_content,
-            sender=sender,
-            to=to_recipients
-        )
-        return True
-    except Exception as e:
-        logger.error(f"Error sending email via Brevo: {e}")
-        return False
 
-async def send_otp_email(email: str, otp: str):
-    html_content = f"""
+class EmailMessage(NamedTuple):
+    to: str
+    subject: str
+    html: str
+
+
+# ── Templates ────────────────────────────────────────────────────────────────
+# The shared layout is assembled once at import; a send only substitutes the per-message values.
+
+_LAYOUT = """
         <!DOCTYPE html>
         <html>
         <head>
             <style>
-                .container {{
+                .container {
                     font-family: Arial, sans-serif;
                     padding: 20px;
                     border: 1px solid #ddd;
                     border-radius: 10px;
                     max-width: 600px;
                     margin: auto;
-                }}
-                .otp-box {{
+                }
+                .otp-box {
                     background-color: #f9f9f9;
                     padding: 15px;
                     border-radius: 5px;
@@ -53,68 +50,137 @@ async def send_otp_email(email: str, otp: str):
                     font-weight: bold;
                     display: inline-block;
                     letter-spacing: 5px;
-                }}
+                }
             </style>
         </head>
         <body>
             <div class="container">
-                <h2>One Time Password (OTP)</h2>
-                <p>Thank you for choosing Anozon! Please use the OTP below to verify your email:</p>
-                
-                <div class="otp-box">{otp}</div>
-                
-                <p>This OTP will expire in 5 minutes.</p>
-                <p>If you did not request this, please ignore this email.</p>
+                __BODY__
                 <br>
                 <p>Best regards,</p>
                 <p><strong>Anozon Team</strong></p>
             </div>
         </body>
         </html>
-    """
+"""
 
-    return await send_email_via_brevo("Verify Your Email", [email], html_content)
-    
-async def send_forget_password_email(email: str, token: str):
-    html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                .container {{
-                    font-family: Arial, sans-serif;
-                    padding: 20px;
-                    border: 1px solid #ddd;
-                    border-radius: 10px;
-                    max-width: 600px;
-                    margin: auto;
-                }}
-                .otp-box {{
-                    background-color: #f9f9f9;
-                    padding: 15px;
-                    border-radius: 5px;
-                    font-size: 24px;
-                    font-weight: bold;
-                    display: inline-block;
-                    letter-spacing: 5px;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <h2>Forget Password</h2>
+_BODIES = {
+    "otp": ("Verify Your Email", """<h2>One Time Password (OTP)</h2>
+                <p>Thank you for choosing Anozon! Please use the OTP below to verify your email:</p>
+
+                <div class="otp-box">$otp</div>
+
+                <p>This OTP will expire in 5 minutes.</p>
+                <p>If you did not request this, please ignore this email.</p>"""),
+    "forget_password": ("Forget Password", """<h2>Forget Password</h2>
                 <p>Thank you for choosing Anozon! </p>
                 <p>If you did not request this, please ignore this email.</p>
                 <br>
                 <p>Click the link below to reset your password:</p>
-                <a href="http://localhost:3000/reset-password?token={token}">Reset Password</a>
-                <p>This link will expire in 15 minutes.</p>
-                <br>
-                <p>Best regards,</p>
-                <p><strong>Anozon Team</strong></p>
-            </div>
-        </body>
-        </html>
-    """
+                <a href="http://localhost:3000/reset-password?token=$token">Reset Password</a>
+                <p>This link will expire in 15 minutes.</p>"""),
+}
+
+TEMPLATES: dict[str, tuple[str, Template]] = {
+    name: (subject, Template(_LAYOUT.replace("__BODY__", body)))
+    for name, (subject, body) in _BODIES.items()
+}
+
+
+def render_email(template: str, to: str, params: dict) -> EmailMessage:
+    subject, body = TEMPLATES[template]
+    return EmailMessage(to, subject, body.substitute({k: html.escape(str(v)) for k, v in params.items()}))
+
+
+# ── Providers ────────────────────────────────────────────────────────────────
+
+class BrevoEmailProvider:
+    """Sends a batch as one Brevo call: each message becomes a messageVersion."""
+
+    async def send_batch(self, messages: list[EmailMessage]) -> bool:
+        with tracer.start_as_current_span("brevo send_transac_email", kind=SpanKind.CLIENT,
+                                          attributes={"messaging.batch.message_count": len(messages)}) as span:
+            return await self._send(messages, span)
+
+    async def _send(self, messages: list[EmailMessage], span) -> bool:
+        try:
+            sender = SendTransacEmailRequestSender(name=settings.MAIL_FROM_APP, email=settings.MAIL_FROM)
+            if len(messages) == 1:
+                message = messages[0]
+                await client.transactional_emails.send_transac_email(
+                    subject=message.subject,
+                    html_content=message.html,
+                    sender=sender,
+                    to=[SendTransacEmailRequestToItem(email=message.to)]
+                )
+                return True
+
+            await client.transactional_emails.send_transac_email(
+                subject=messages[0].subject,
+                html_content=messages[0].html,
+                sender=sender,
+                message_versions=[
+                    SendTransacEmailRequestMessageVersionsItem(
+                        to=[SendTransacEmailRequestMessageVersionsItemToItem(email=m.to)],
+                        subject=m.subject,
+                        html_content=m.html,
+                    )
+                    for m in messages
+                ]
+            )
+            return True
+        except Exception as e:
+            record_error(span, e)
+            logger.error("Error sending %s email(s) via Brevo: %s", len(messages), e)
+            return False
+
+
+class FakeEmailProvider:
+    """In-process provider for tests, benchmarks and local development (EMAIL_PROVIDER=fake)."""
+
+    def __init__(self, latency: float = 0.0, fail_times: int = 0, reject: set[str] | None = None):
+        self.latency = latency
+        self.fail_times = fail_times
+        self.reject = reject or set()   # recipients that fail any call they are part of
+        self.sent: list[EmailMessage] = []
+        self.calls = 0
+
+    async def send_batch(self, messages: list[EmailMessage]) -> bool:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            return False
+        if any(message.to in self.reject for message in messages):
+            return False
+        self.sent.extend(messages)
+        return True
+
+
+_provider = None
+
+def get_email_provider():
+    global _provider
+    if _provider is None:
+        _provider = FakeEmailProvider() if settings.EMAIL_PROVIDER == "fake" else BrevoEmailProvider()
+    return _provider
+
+
+def set_email_provider(provider):
+    """Swap the provider (tests / benchmarks)."""
+    global _provider
+    _provider = provider
+
+
+# ── Entry points used by the services ────────────────────────────────────────
+# Both only enqueue; app.services.email_queue delivers in the background.
+
+async def send_otp_email(email: str, otp: str) -> bool:
+    from app.services.email_queue import EmailQueue
+    return await EmailQueue.enqueue("otp", email, {"otp": otp})
+
 
-    return await send_email_via_brevo("Forget Password", [email], html_content)
+async def send_forget_password_email(email: str, token: str) -> bool:
+    from app.services.email_queue import EmailQueue
+    return await EmailQueue.enqueue("forget_password", email, {"token": token})
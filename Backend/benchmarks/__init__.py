@@ -0,0 +1 @@
+"""Performance benchmarks for the Anozon backend. Run modules with `python -m benchmarks.<name>`."""
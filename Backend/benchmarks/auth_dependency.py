@@ -0,0 +1,68 @@
+"""
+Per-request cost of the auth dependency chain (get_current_user + require_permission).
+
+- uncached: the previous path — full JWT signature/claims verification on every request and a
+            set lookup built from ROLE_PERMISSIONS per call
+- cached:   verify_token_cached (LRU keyed by the token's SHA-256) + bloom-filter denylist
+            check + precomputed frozenset role check
+
+--tokens controls how many distinct bearer tokens are in rotation (simulating concurrent
+users); keep it under AUTH_TOKEN_CACHE_SIZE to measure the steady-state hit path.
+
+Run: python -m benchmarks.auth_dependency [--iterations 50000] [--tokens 1000]
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.core.security import create_access_token, verify_token, _token_cache
+from app.deps.roles import ROLE_PERMISSIONS, get_current_user, require_permission
+
+
+def _tokens(count: int) -> list[str]:
+    return [
+        create_access_token({"_id": f"{i:024x}", "email": f"user{i}@example.com", "role": "admin",
+                             "iss": "Anozon", "aud": "Anozon"})
+        for i in range(count)
+    ]
+
+
+async def bench_uncached(tokens: list[str], iterations: int) -> float:
+    started = time.perf_counter()
+    for i in range(iterations):
+        payload = verify_token(tokens[i % len(tokens)])
+        assert "user:ban" in set(ROLE_PERMISSIONS.get(payload["role"], set()))
+    return time.perf_counter() - started
+
+
+async def bench_cached(tokens: list[str], iterations: int) -> float:
+    checker = require_permission("user:ban")
+    for token in tokens:  # warm the LRU, as steady-state traffic would
+        await get_current_user(token)
+    started = time.perf_counter()
+    for i in range(iterations):
+        await checker(await get_current_user(tokens[i % len(tokens)]))
+    return time.perf_counter() - started
+
+
+async def run(args):
+    tokens = _tokens(args.tokens)
+    _token_cache.clear()
+    old = await bench_uncached(tokens, args.iterations)
+    new = await bench_cached(tokens, args.iterations)
+
+    print(f"tokens={args.tokens} iterations={args.iterations}")
+    print(f"uncached  {old / args.iterations * 1e6:>8.1f} µs/request")
+    print(f"cached    {new / args.iterations * 1e6:>8.1f} µs/request  x{old / new:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50_000)
+    parser.add_argument("--tokens", type=int, default=1_000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Mongo work done by one worker start, before and after versioned migrations.
+
+Against the database in MONGO_URL / DB_NAME (use a scratch one), times:
+- sequential: one create_index call per index, as startup did before migrations
+- migration:  the baseline index migration (one createIndexes per collection, in parallel)
+- check:      ensure_schema() once everything is applied — what each worker start now costs
+
+Indexes already exist after the first pass, so later rounds measure the no-op cost a
+rolling deploy pays. Run: python -m benchmarks.cold_start [--rounds 10]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.core.config import settings
+from app.db.migrations import INDEXES, apply_migrations, create_indexes, ensure_schema
+from app.db.mongodb import close_mongo_connection, connect_to_mongo, db_instance
+
+
+async def sequential_create_index():
+    db = db_instance.client[settings.DB_NAME]
+    for name, models in INDEXES.items():
+        for model in models:
+            document = dict(model.document)
+            keys = list(document.pop("key").items())
+            await db[name].create_index(keys, **document)
+
+
+async def _time(fn, rounds: int) -> str:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - started)
+    return f"median {statistics.median(samples) * 1000:8.2f} ms   max {max(samples) * 1000:8.2f} ms"
+
+
+async def run(args):
+    await connect_to_mongo()
+    try:
+        await apply_migrations()
+        indexes = sum(len(models) for models in INDEXES.values())
+        print(f"{settings.DB_NAME}: {indexes} indexes over {len(INDEXES)} collections, {args.rounds} rounds")
+        print(f"sequential  {await _time(sequential_create_index, args.rounds)}")
+        print(f"migration   {await _time(create_indexes, args.rounds)}")
+        print(f"check       {await _time(ensure_schema, args.rounds)}")
+    finally:
+        await close_mongo_connection()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=10)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Response compression benchmark.
+CPU cost vs bytes saved for a /products listing page, as grid cards (what is served) and as
+full documents, per installed encoding and level.
+
+- ratio: compressed / identity size
+- µs/req: compression time per response (what the middleware adds to each request)
+- saved/ms: bytes saved per millisecond of CPU, the number that picks a per-response level
+
+zstd and br rows only appear when the zstandard / brotli packages are installed.
+
+Run: python -m benchmarks.compression [--items 24] [--rounds 200]
+"""
+
+import argparse
+import random
+import time
+
+from app.core.compression import ENCODERS, LEVELS
+from app.models.product_model import (
+    ProductResponse, ProductCardResponse,
+    PaginatedProductResponse, PaginatedProductCardResponse,
+)
+from app.repo.product_helpers import LISTING_CARD_PROJECTION
+from benchmarks.listing_payload import apply_projection, make_product, serialize
+
+# Levels tried per encoding; the configured (per-response, precompress) pair is marked in the output
+SWEEP = {"gzip": (1, 4, 6, 9), "br": (1, 4, 6, 11), "zstd": (1, 3, 9, 19)}
+
+
+def bodies(items: int, seed: int) -> dict[str, bytes]:
+    rng = random.Random(seed)
+    docs = [make_product(0, rng) for _ in range(items)]
+    page = dict(total=items * 10, page=1, limit=items, pages=10)
+    cards = PaginatedProductCardResponse(
+        items=[ProductCardResponse(**serialize(apply_projection(d, LISTING_CARD_PROJECTION))) for d in docs], **page)
+    full = PaginatedProductResponse(items=[ProductResponse(**serialize(d)) for d in docs], **page)
+    return {
+        f"listing ({items} cards)": cards.model_dump_json(by_alias=True).encode(),
+        f"listing ({items} full)": full.model_dump_json(by_alias=True).encode(),
+    }
+
+
+def measure(encoder, body: bytes, level: int, rounds: int) -> tuple[int, float]:
+    size = len(encoder(body, level))
+    start = time.perf_counter()
+    for _ in range(rounds):
+        encoder(body, level)
+    return size, (time.perf_counter() - start) / rounds * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=24, help="products per page")
+    parser.add_argument("--rounds", type=int, default=200, help="compressions timed per encoding/level")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"encodings installed: {', '.join(ENCODERS)}")
+    for label, body in bodies(args.items, args.seed).items():
+        print(f"\n{label}: identity={len(body):,} B")
+        print(f"{'encoding':<10}{'level':>6}{'bytes':>10}{'ratio':>8}{'µs/req':>10}{'saved/ms':>12}")
+        for encoding, encoder in ENCODERS.items():
+            for level in SWEEP[encoding]:
+                size, micros = measure(encoder, body, level, args.rounds)
+                saved_per_ms = (len(body) - size) / (micros / 1000)
+                mark = {LEVELS[encoding][0]: "  per-response", LEVELS[encoding][1]: "  precompress"}.get(level, "")
+                print(f"{encoding:<10}{level:>6}{size:>10,}{size / len(body):>8.3f}{micros:>10.0f}{saved_per_ms:>12,.0f}{mark}")
+
+
+if __name__ == "__main__":
+    main()
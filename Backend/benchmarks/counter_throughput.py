@@ -0,0 +1,97 @@
+"""
+Write-behind counter benchmark.
+Fires product view events through ProductCounters.incr() for a fixed duration while the
+flusher runs, and reports sustained events/sec plus how many Mongo updates the flushes
+actually issued (events collapse into one $inc per product per interval).
+
+- local: Redis unreachable, increments land in the in-process buffer
+- redis: real Redis at REDIS_URL (HINCRBY + Lua batch claim)
+
+Mongo is replaced by an in-memory collection that counts bulk_write operations, so the
+numbers isolate the counter path itself.
+
+Run: python -m benchmarks.counter_throughput [--backend local|redis] [--seconds 5]
+     [--products 1000] [--concurrency 50] [--interval 1.0]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from unittest.mock import patch
+
+from bson import ObjectId
+
+from app.db import redis as redis_db
+from app.services.counter_service import ProductCounters
+
+
+class CountingCollection:
+    """Stands in for the Products collection; records bulk_write calls and ops."""
+
+    def __init__(self):
+        self.calls = 0
+        self.ops = 0
+        self.applied = 0
+
+    async def bulk_write(self, ops, ordered=True):
+        self.calls += 1
+        self.ops += len(ops)
+        self.applied += sum(op._doc["$inc"]["view_count"] for op in ops if "view_count" in op._doc["$inc"])
+
+        class Result:
+            modified_count = len(ops)
+        return Result()
+
+
+async def run(args):
+    if args.backend == "redis":
+        await redis_db.connect_redis()
+        if redis_db.redis_client is None:
+            raise SystemExit("Redis unavailable at REDIS_URL")
+    else:
+        redis_db.redis_client = None
+
+    rng = random.Random(args.seed)
+    products = [str(ObjectId()) for _ in range(args.products)]
+    collection = CountingCollection()
+    events = 0
+    deadline = time.perf_counter() + args.seconds
+
+    async def worker():
+        nonlocal events
+        while time.perf_counter() < deadline:
+            await ProductCounters.incr("view_count", rng.choice(products))
+            events += 1
+            await asyncio.sleep(0)  # yield like a request handler would, so the flusher runs
+
+    with patch("app.services.counter_service.products_collection", return_value=collection):
+        ProductCounters.start(args.interval)
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        await ProductCounters.stop()
+
+    if args.backend == "redis":
+        await redis_db.close_redis()
+
+    print(f"backend={args.backend} products={args.products} concurrency={args.concurrency} interval={args.interval}s")
+    print(f"view events        {events:>12,}  ({events / elapsed:,.0f}/s sustained over {elapsed:.1f}s)")
+    print(f"flushed to Mongo   {collection.applied:>12,}  (lost={events - collection.applied})")
+    print(f"Mongo update ops   {collection.ops:>12,}  in {collection.calls} bulk_write calls "
+          f"({events / max(collection.ops, 1):,.0f} events per write)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["local", "redis"], default="local")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""
+Deterministic benchmark dataset: users, approved sellers, products across categories, orders
+with items from several sellers, reviews (folded into the product rating aggregates), profiles
+with an address, carts, likes and a year of admin audit logs. The same --scale and --seed always give the same documents
+and ObjectIds, so scenarios can pick ids without reading them back.
+
+Start Mongo and Redis for benchmarking (ports 27018 / 6380, nothing else uses them):
+    docker compose -f benchmarks/docker-compose.yml up -d
+    export MONGO_URL=mongodb://localhost:27018 DB_NAME=anozon_bench REDIS_URL=redis://localhost:6380/0
+
+Load (drops the collections first; refuses a DB_NAME without "bench" unless --force):
+    python -m benchmarks.dataset --scale small [--seed 42]
+"""
+
+import argparse
+import asyncio
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+
+from app.core.config import settings
+from app.core.security import hash_password
+from app.models.orders_model import ItemStatus
+from app.utils.order_utils import compute_order_status, generate_slug
+
+SCALES = {
+    "tiny": {"users": 60, "sellers": 5, "products": 200, "orders": 150, "reviews": 200, "audit_logs": 300},
+    "small": {"users": 2_000, "sellers": 40, "products": 5_000, "orders": 8_000, "reviews": 10_000,
+              "audit_logs": 20_000},
+    "medium": {"users": 20_000, "sellers": 200, "products": 50_000, "orders": 80_000, "reviews": 100_000,
+               "audit_logs": 200_000},
+}
+
+CATEGORIES = {
+    "Electronics": ["Headphones", "Smartphones", "Laptops", "Cameras", "Smartwatches"],
+    "Fashion": ["T-Shirts", "Jeans", "Sneakers", "Jackets", "Watches"],
+    "Home": ["Cookware", "Bedding", "Lighting", "Storage", "Decor"],
+    "Sports": ["Fitness", "Cycling", "Running", "Yoga", "Camping"],
+    "Books": ["Fiction", "Business", "Science", "Children", "Comics"],
+    "Beauty": ["Skincare", "Haircare", "Makeup", "Fragrance", "Grooming"],
+}
+BRANDS = ["Acme", "Nimbus", "Zenith", "Orbit", "Lumen", "Vertex", "Pioneer", "Aurora", "Summit", "Nova"]
+WORDS = ["wireless", "premium", "lightweight", "durable", "classic", "smart", "compact", "organic",
+         "portable", "ergonomic", "vintage", "pro", "ultra", "eco", "deluxe", "essential"]
+REVIEW_QUALITY = {5: "Excellent", 4: "Good", 3: "Average", 2: "Poor", 1: "Poor"}
+# action -> module, as audit_service._infer_module files them; weights roughly follow admin traffic
+AUDIT_ACTIONS = {
+    "seller_approved": ("seller", 6), "seller_rejected": ("seller", 2), "seller_suspended": ("seller", 1),
+    "product_approved": ("product", 10), "product_rejected": ("product", 3), "user_banned": ("user", 1),
+    "user_unbanned": ("user", 1), "review_deleted": ("review", 2), "promoted_to_admin": ("role_management", 1),
+}
+
+BENCH_PASSWORD = "Bench@1234"
+# Products checkout scenarios buy from; their stock never runs out
+CHECKOUT_PRODUCTS = 50
+EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass
+class Dataset:
+    seed: int
+    collections: dict[str, list[dict]] = field(default_factory=dict)
+    # Ids the scenarios need
+    user_ids: list[str] = field(default_factory=list)
+    seller_ids: list[str] = field(default_factory=list)
+    product_ids: list[str] = field(default_factory=list)
+    checkout_product_ids: list[str] = field(default_factory=list)
+    admin_id: str = ""
+    categories: list[str] = field(default_factory=lambda: list(CATEGORIES))
+    brands: list[str] = field(default_factory=lambda: list(BRANDS))
+    search_terms: list[str] = field(default_factory=lambda: list(WORDS))
+
+    def address_id(self, user_id: str) -> str:
+        return f"addr-{user_id}"
+
+
+def _object_id(rng: random.Random, when: datetime) -> ObjectId:
+    return ObjectId(int(when.timestamp()).to_bytes(4, "big") + rng.randbytes(8))
+
+
+def _when(rng: random.Random, days: int = 365) -> datetime:
+    return EPOCH - timedelta(seconds=rng.randrange(days * 86400))
+
+
+def _user(rng, index: int, role: str, password_hash: str) -> dict:
+    created = _when(rng)
+    return {
+        "_id": _object_id(rng, created),
+        "username": f"{role}_{index}"[:15],
+        "email": f"{role}{index}@bench.anozon.test",
+        "hashed_password": password_hash,
+        "role": role,
+        "is_verified": True,
+        "is_banned": False,
+        "created_at": created,
+    }
+
+
+def _product(rng, seller_id: str, index: int) -> dict:
+    created = _when(rng)
+    category = rng.choice(list(CATEGORIES))
+    sub_category = rng.choice(CATEGORIES[category])
+    brand = rng.choice(BRANDS)
+    words = rng.sample(WORDS, 3)
+    name = f"{brand} {' '.join(words).title()} {sub_category} {index}"
+    actual_price = rng.randrange(199, 99_999)
+    discount = rng.choice([0, 0, 5, 10, 15, 20, 30, 50])
+    return {
+        "_id": _object_id(rng, created),
+        "seller_id": seller_id,
+        "name": name,
+        "slug": generate_slug(name),
+        "description": " ".join(rng.choice(WORDS) for _ in range(60)),
+        "category": category,
+        "sub_category": sub_category,
+        "brand": brand,
+        "actual_price": actual_price,
+        "discount_percent": discount,
+        "price": actual_price * (100 - discount) // 100,
+        "stock": rng.randrange(0, 500),
+        "image_urls": [f"https://cdn.example.com/p/{index}/{n}.webp" for n in range(4)],
+        "tags": words,
+        "specifications": {f"spec_{n}": f"value {rng.randrange(100)}" for n in range(8)},
+        "sku": f"{brand[:3].upper()}-{index:06d}",
+        "is_featured": rng.random() < 0.05,
+        "view_count": rng.randrange(10_000),
+        "search_keywords": [sub_category.lower(), brand.lower(), *words],
+        "is_active": rng.random() > 0.03,
+        "is_approved": rng.random() > 0.05,
+        "is_deleted": False,
+        "rating_sum": 0.0, "review_count": 0, "avg_rating": 0.0,
+        "rating_histogram": {star: 0 for star in "12345"},
+        "product_likes": 0,
+        "created_at": created, "updated_at": created,
+    }
+
+
+def generate(scale: str = "small", seed: int = 42) -> Dataset:
+    sizes = SCALES[scale]
+    rng = random.Random(seed)
+    data = Dataset(seed=seed)
+    password_hash = hash_password(BENCH_PASSWORD)   # one bcrypt call, shared by every account
+
+    users = [_user(rng, i, "user", password_hash) for i in range(sizes["users"])]
+    seller_users = [_user(rng, i, "seller", password_hash) for i in range(sizes["sellers"])]
+    admins = [_user(rng, 0, "admin", password_hash), _user(rng, 0, "super_admin", password_hash)]
+    data.user_ids = [str(user["_id"]) for user in users]
+    data.seller_ids = [str(user["_id"]) for user in seller_users]
+    data.admin_id = str(admins[0]["_id"])
+
+    sellers = [{
+        "_id": _object_id(rng, user["created_at"]),
+        "user_id": str(user["_id"]),
+        "email": user["email"],
+        "business_name": f"Bench Store {i}",
+        "business_type": "company",
+        "business_address": {"line1": f"{i} Market Road", "city": "Chennai", "state": "Tamil Nadu",
+                             "pincode": "600001", "country": "India"},
+        "application_status": "approved",
+        "total_products": 0, "total_orders": 0, "rating": 0.0,
+        "is_suspended": False,
+        "created_at": user["created_at"], "updated_at": user["created_at"],
+    } for i, user in enumerate(seller_users)]
+
+    # Sellers own products in skewed amounts, like a real marketplace
+    weights = [1 / (rank + 1) for rank in range(len(seller_users))]
+    products = [_product(rng, rng.choices(data.seller_ids, weights)[0], i) for i in range(sizes["products"])]
+    for product in products[:CHECKOUT_PRODUCTS]:
+        product.update(stock=10_000_000, is_active=True, is_approved=True)
+    listed = [p for p in products if p["is_active"] and p["is_approved"]]
+    data.product_ids = [str(p["_id"]) for p in listed]
+    data.checkout_product_ids = [str(p["_id"]) for p in products[:CHECKOUT_PRODUCTS]]
+
+    profiles = [{
+        "_id": _object_id(rng, user["created_at"]),
+        "user_id": user["_id"],
+        "email": user["email"],
+        "full_name": f"Bench User {i}",
+        "mobile": f"9{i:09d}",
+        "addresses": [{"address_id": data.address_id(str(user["_id"])), "label": "Home", "line1": f"{i} Main Street",
+                       "city": "Bengaluru", "state": "Karnataka", "pincode": "560001", "is_default": True}],
+        "updated_at": user["created_at"],
+    } for i, user in enumerate(users)]
+
+    statuses = [s.value for s in ItemStatus]
+    orders, delivered = [], []
+    for _ in range(sizes["orders"]):
+        user = rng.choice(users)
+        created = _when(rng, 180)
+        items = []
+        for product in rng.sample(listed, rng.randint(1, 4)):   # usually several sellers per order
+            quantity = rng.randint(1, 3)
+            items.append({
+                "product_id": product["_id"], "seller_id": ObjectId(product["seller_id"]),
+                "name": product["name"], "image": product["image_urls"][0],
+                "price": float(product["price"]), "quantity": quantity,
+                "item_total": float(product["price"] * quantity),
+                "item_status": rng.choices(statuses, [1, 2, 2, 6, 1])[0],
+            })
+        subtotal = sum(item["item_total"] for item in items)
+        order = {
+            "_id": _object_id(rng, created),
+            "user_id": user["_id"],
+            "items": items,
+            "shipping_address": {"full_name": "Bench User", "line1": "1 Main Street", "city": "Bengaluru",
+                                 "state": "Karnataka", "pincode": "560001", "mobile": "9000000000"},
+            "order_status": compute_order_status(items).value,
+            "summary": {"subtotal": subtotal, "gst_rate": 18, "gst_amount": round(subtotal * 0.18, 2),
+                        "delivery_charge": 0.0, "total": round(subtotal * 1.18, 2)},
+            "payment_status": "paid",
+            "payment_method": rng.choice(["cod", "online"]),
+            "created_at": created, "updated_at": created,
+        }
+        orders.append(order)
+        delivered += [(order, item) for item in items if item["item_status"] == ItemStatus.delivered.value]
+
+    by_id = {p["_id"]: p for p in products}
+    reviews, reviewed = [], set()
+    for order, item in rng.sample(delivered, min(sizes["reviews"], len(delivered))):
+        key = (item["product_id"], order["user_id"])
+        if key in reviewed:
+            continue
+        reviewed.add(key)
+        rating = rng.choices([1, 2, 3, 4, 5], [1, 1, 2, 4, 5])[0]
+        reviewed_at = order["created_at"] + timedelta(days=rng.randint(3, 30))
+        reviews.append({
+            "_id": _object_id(rng, reviewed_at),
+            "product_id": str(item["product_id"]), "user_id": str(order["user_id"]),
+            "seller_id": str(item["seller_id"]), "name": "Bench",
+            "quality": REVIEW_QUALITY[rating], "rating": float(rating),
+            "comment": " ".join(rng.choice(WORDS) for _ in range(12)),
+            "is_verified_purchase": True, "reviewed_at": reviewed_at,
+        })
+        product = by_id[item["product_id"]]
+        product["rating_sum"] += rating
+        product["review_count"] += 1
+        product["rating_histogram"][str(rating)] += 1
+    for product in products:
+        if product["review_count"]:
+            product["avg_rating"] = round(product["rating_sum"] / product["review_count"], 2)
+
+    likes = []
+    for user in rng.sample(users, len(users) // 2):
+        for product in rng.sample(listed, 3):
+            likes.append({"_id": _object_id(rng, EPOCH), "product_id": product["_id"], "user_id": user["_id"],
+                          "liked_at": EPOCH})
+            product["product_likes"] += 1
+
+    carts = [{
+        "_id": _object_id(rng, EPOCH),
+        "user_id": user["_id"],
+        "items": [{"product_id": str(p["_id"]), "quantity": rng.randint(1, 2)} for p in rng.sample(listed, 3)],
+        "wishlist": [],
+        "updated_at": EPOCH,
+    } for user in users]
+
+    # Drawn last so adding them left every other collection unchanged for a given seed
+    actions = list(AUDIT_ACTIONS)
+    action_weights = [weight for _, weight in AUDIT_ACTIONS.values()]
+    audit_logs = []
+    for _ in range(sizes["audit_logs"]):
+        performer, target = rng.choice(admins), rng.choice(users + seller_users)
+        action = rng.choices(actions, action_weights)[0]
+        timestamp = _when(rng, 365)
+        audit_logs.append({
+            "_id": _object_id(rng, timestamp),
+            "performed_by": {"user_id": str(performer["_id"]), "name": performer["username"],
+                             "email": performer["email"], "role": performer["role"]},
+            "target": {"user_id": str(target["_id"]), "name": target["username"], "email": target["email"],
+                       "role_before": target["role"], "role_after": None},
+            "action": action,
+            "module": AUDIT_ACTIONS[action][0],
+            "description": f"{action.replace('_', ' ').capitalize()} by {performer['username']}",
+            "reason": None,
+            "timestamp": timestamp,
+        })
+
+    data.collections = {
+        "Users": users + seller_users + admins, "Sellers": sellers, "Products": products,
+        "Profiles": profiles, "Orders": orders, "Reviews": reviews, "ProductLikes": likes, "Cart": carts,
+        "AuditLogs": audit_logs,
+    }
+    return data
+
+
+async def load(data: Dataset, batch_size: int = 2_000, flush_redis: bool = True):
+    """Drop and refill the dataset collections, re-apply every migration (indexes) and, unless told not to, empty Redis."""
+    from app.db import redis as redis_db
+    from app.db.migrations import apply_migrations
+    from app.db.mongodb import close_mongo_connection, connect_to_mongo, db_instance
+
+    try:
+        await connect_to_mongo()
+        db = db_instance.client[settings.DB_NAME]
+        for name, docs in data.collections.items():
+            await db[name].drop()
+            for start in range(0, len(docs), batch_size):
+                await db[name].insert_many(docs[start:start + batch_size], ordered=False)
+            print(f"{name:13s} {len(docs):>8,d} documents")
+        await db["SchemaMigrations"].drop()   # dropping collections dropped their indexes too
+        await apply_migrations()
+        if flush_redis:
+            await redis_db.connect_redis()
+            await redis_db.redis_client.flushdb()
+            await redis_db.close_redis()
+    finally:
+        await close_mongo_connection()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--force", action="store_true", help="allow a DB_NAME without 'bench' in it")
+    args = parser.parse_args()
+
+    if "bench" not in settings.DB_NAME and not args.force:
+        parser.error(f"refusing to drop collections in {settings.DB_NAME!r}; use a *bench* database or --force")
+    data = generate(args.scale, args.seed)
+    asyncio.run(load(data))
+    print(f"Loaded scale={args.scale} seed={args.seed} into {settings.DB_NAME}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Email delivery benchmark against the fake provider (fixed per-call latency, like a slow API).
+
+- request path: inline provider call (previous behaviour) vs EmailQueue.enqueue
+- drain:        emails/s for one worker with EMAIL_BATCH_SIZE=1 vs the configured batch size
+
+--backend local uses fakeredis (pip install "fakeredis[lua]"); --backend redis uses REDIS_URL.
+
+Run: python -m benchmarks.email_queue [--backend local|redis] [--emails 200] [--latency 0.25]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from unittest.mock import patch
+
+from app.core.config import settings
+from app.db import redis as redis_db
+from app.repo import email_queue_helpers
+from app.services.email_queue import EmailQueue
+from app.utils.email import FakeEmailProvider, render_email, set_email_provider
+
+
+async def _connect(backend: str):
+    if backend == "redis":
+        await redis_db.connect_redis()
+    else:
+        import fakeredis
+        redis_db.redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    await redis_db.redis_client.delete(email_queue_helpers.JOBS_STREAM)
+    await email_queue_helpers.ensure_group()
+
+
+async def request_path(emails: int, latency: float) -> tuple[list[float], list[float]]:
+    provider = FakeEmailProvider(latency=latency)
+    set_email_provider(provider)
+    inline, queued = [], []
+    for i in range(emails):
+        started = time.perf_counter()
+        await provider.send_batch([render_email("otp", f"inline{i}@example.com", {"otp": f"{i:06d}"})])
+        inline.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await EmailQueue.enqueue("otp", f"queued{i}@example.com", {"otp": f"{i:06d}"})
+        queued.append(time.perf_counter() - started)
+    return inline, queued
+
+
+async def drain(emails: int, latency: float, batch_size: int) -> float:
+    provider = FakeEmailProvider(latency=latency)
+    set_email_provider(provider)
+    with patch.object(settings, "EMAIL_BATCH_SIZE", batch_size):
+        started = time.perf_counter()
+        while len(provider.sent) < emails:
+            await EmailQueue.drain_once("bench-0", block_ms=10)
+    return emails / (time.perf_counter() - started)
+
+
+async def run(args):
+    await _connect(args.backend)
+    inline, queued = await request_path(args.emails, args.latency)
+    await redis_db.redis_client.delete(email_queue_helpers.JOBS_STREAM)
+    await email_queue_helpers.ensure_group()
+
+    rates = {}
+    for batch_size in (1, settings.EMAIL_BATCH_SIZE):
+        for i in range(args.emails):
+            await EmailQueue.enqueue("otp", f"drain{batch_size}-{i}@example.com", {"otp": f"{i:06d}"})
+        rates[batch_size] = await drain(args.emails, args.latency, batch_size)
+
+    ms = lambda xs: statistics.median(xs) * 1000
+    print(f"backend={args.backend} emails={args.emails} provider latency={args.latency * 1000:.0f} ms")
+    print(f"request path  inline p50 {ms(inline):8.1f} ms   queued p50 {ms(queued):6.2f} ms")
+    for batch_size, rate in rates.items():
+        print(f"drain         batch={batch_size:<3} {rate:8.1f} emails/s (one worker)")
+    if args.backend == "redis":
+        await redis_db.close_redis()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["local", "redis"], default="local")
+    parser.add_argument("--emails", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.25)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
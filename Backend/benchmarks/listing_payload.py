@@ -0,0 +1,114 @@
+"""
+Listing payload benchmark.
+Compares a 100-item /products page served as full documents vs compact grid cards.
+
+- JSON bytes: what the client downloads (response body, before compression)
+- BSON bytes: what Mongo returns over the wire for the find() (after projection)
+
+Run: python -m benchmarks.listing_payload [--items 100] [--likers 500]
+"""
+
+import argparse
+import json
+import random
+from datetime import datetime, timezone
+
+from bson import BSON, ObjectId
+
+from app.models.product_model import (
+    ProductResponse, ProductCardResponse,
+    PaginatedProductResponse, PaginatedProductCardResponse,
+)
+from app.repo.product_helpers import LISTING_CARD_PROJECTION
+
+
+def make_product(likers: int, rng: random.Random) -> dict:
+    """A realistic seeded product document (as stored in the Products collection)."""
+    now = datetime.now(timezone.utc)
+    name = f"Product {rng.randint(1, 10**6)}"
+    return {
+        "_id": ObjectId(),
+        "seller_id": str(ObjectId()),
+        "name": name,
+        "slug": name.lower().replace(" ", "-"),
+        "description": " ".join(rng.choice(["fast", "durable", "premium", "lightweight", "wireless"]) for _ in range(120)),
+        "category": "Electronics",
+        "sub_category": "Headphones",
+        "brand": "Acme",
+        "actual_price": 2999,
+        "discount_percent": 20,
+        "price": 2399,
+        "stock": rng.randint(0, 50),
+        "image_urls": [f"https://cdn.example.com/p/{ObjectId()}.webp" for _ in range(5)],
+        "tags": ["audio", "bluetooth", "noise-cancelling", "travel"],
+        "specifications": {f"spec_{i}": f"value {i}" for i in range(15)},
+        "weight": 0.35,
+        "dimensions": {"length": 18.0, "width": 16.0, "height": 8.0},
+        "sku": "ACM-HP-001",
+        "variants": ["Black", "White", "Blue"],
+        "meta_title": name,
+        "meta_desc": "Premium wireless headphones with long battery life.",
+        "is_featured": False,
+        "view_count": rng.randint(0, 10**5),
+        "search_keywords": ["headphones", "earphones", "audio", "wireless"],
+        "is_active": True, "is_approved": True, "is_deleted": False,
+        "avg_rating": 4.3, "review_count": 120,
+        "product_likes": likers,
+        "liked_by": [str(ObjectId()) for _ in range(likers)],
+        "created_at": now, "updated_at": now,
+    }
+
+
+def apply_projection(doc: dict, projection: dict) -> dict:
+    """Mimic Mongo's inclusion projection (+ $slice) on an in-memory document."""
+    out = {}
+    for field, spec in projection.items():
+        if field not in doc:
+            continue
+        if isinstance(spec, dict) and "$slice" in spec:
+            out[field] = doc[field][:spec["$slice"]]
+        elif spec:
+            out[field] = doc[field]
+    return out
+
+
+def serialize(doc: dict) -> dict:
+    doc = dict(doc)
+    doc["_id"] = str(doc["_id"])
+    return doc
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--likers", type=int, default=500, help="liked_by entries per product")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    docs = [make_product(args.likers, rng) for _ in range(args.items)]
+    cards = [apply_projection(d, LISTING_CARD_PROJECTION) for d in docs]
+
+    bson_full = sum(len(BSON.encode(d)) for d in docs)
+    bson_card = sum(len(BSON.encode(c)) for c in cards)
+
+    page = dict(total=args.items, page=1, limit=args.items, pages=1)
+    full_body = PaginatedProductResponse(items=[ProductResponse(**serialize(d)) for d in docs], **page)
+    card_body = PaginatedProductCardResponse(items=[ProductCardResponse(**serialize(c)) for c in cards], **page)
+    json_full = len(full_body.model_dump_json(by_alias=True))
+    json_card = len(card_body.model_dump_json(by_alias=True))
+
+    # ProductResponse drops liked_by, but the raw dicts the service used to build it still carried it
+    raw_json_full = len(json.dumps([serialize(d) for d in docs], default=str))
+
+    def pct(a, b):
+        return f"{(1 - b / a) * 100:.1f}%"
+
+    print(f"items={args.items} likers/product={args.likers}")
+    print(f"Mongo wire (BSON)   full={bson_full:>10,} B  card={bson_card:>8,} B  reduction={pct(bson_full, bson_card)}")
+    print(f"Response JSON body  full={json_full:>10,} B  card={json_card:>8,} B  reduction={pct(json_full, json_card)}")
+    print(f"Service-side dicts  full={raw_json_full:>10,} B  (decoded + validated per request before this change)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Request throughput with an INFO log line per request (app/core/logger.py).
+
+- before: f-string message, StreamHandler writing on the event loop thread (the old setup)
+- after: %-style args, QueueHandler + QueueListener thread, JSON lines
+- after, sampled: the same with LOG_SAMPLING keeping 10% of the route's INFO records
+The sink stands in for stdout; --sink-delay-us makes each write block, like a container's
+stdout pipe under backpressure. "dropped" counts records lost to a full queue.
+
+Run: python -m benchmarks.logging_throughput [--requests 5000] [--sink-delay-us 0 200]
+"""
+
+import argparse
+import asyncio
+import io
+import logging
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.core import logger as app_logging
+from app.core.config import settings
+
+log = logging.getLogger("app.benchmarks.logging_throughput")
+
+
+class SlowSink(io.TextIOBase):
+    def __init__(self, delay_us: float):
+        self.delay = delay_us / 1e6
+
+    def write(self, text: str) -> int:
+        if self.delay:
+            time.sleep(self.delay)
+        return len(text)
+
+
+def _app(lazy: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/products/{product_id}")
+    async def product(product_id: str):
+        if lazy:
+            log.info("Fetched product %s for page %s", product_id, 1)
+        else:
+            log.info(f"Fetched product {product_id} for page {1}")
+        return {"id": product_id, "name": "Steel water bottle", "price": 499}
+
+    return app
+
+
+async def _requests_per_second(app: FastAPI, requests: int) -> float:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        started = time.perf_counter()
+        for i in range(requests):
+            await client.get(f"/products/{i}")
+        return requests / (time.perf_counter() - started)
+
+
+def _before(requests: int, sink: SlowSink) -> float:
+    handler = logging.StreamHandler(sink)
+    handler.setFormatter(logging.Formatter(app_logging.TEXT_FORMAT, app_logging.TEXT_DATEFMT))
+    root = logging.getLogger(app_logging.APP_LOGGER)
+    root.setLevel(logging.INFO)
+    root.addHandler(handler)
+    try:
+        return asyncio.run(_requests_per_second(_app(lazy=False), requests))
+    finally:
+        root.removeHandler(handler)
+
+
+def _after(requests: int, sink: SlowSink, sampling: str) -> tuple[float, int]:
+    settings.LOG_SAMPLING = sampling
+    dropped = app_logging.LOG_STATS["dropped"]
+    app_logging.configure_logging(sink)
+    try:
+        rate = asyncio.run(_requests_per_second(_app(lazy=True), requests))
+    finally:
+        app_logging.shutdown_logging()
+    return rate, app_logging.LOG_STATS["dropped"] - dropped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--sink-delay-us", type=float, nargs="+", default=[0, 200])
+    args = parser.parse_args()
+
+    logging.getLogger().handlers.clear()   # nothing but the handlers under test
+    logging.getLogger().addHandler(logging.NullHandler())
+    for delay in args.sink_delay_us:
+        before = _before(args.requests, SlowSink(delay))
+        after, dropped = _after(args.requests, SlowSink(delay), "")
+        sampled, sampled_dropped = _after(args.requests, SlowSink(delay), f"{log.name}=0.1")
+        print(f"sink delay {delay:5.0f} us   before {before:7.0f} req/s   after {after:7.0f} req/s "
+              f"(dropped {dropped})   after, sampled {sampled:7.0f} req/s (dropped {sampled_dropped})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Login storm benchmark.
+Measures /products latency (p50/p99) on one worker while a burst of /auth/login requests
+runs concurrently, with bcrypt either inline on the event loop (the old behaviour) or on
+the bounded hash pool.
+
+The app runs in-process over httpx's ASGI transport; Mongo calls are replaced with
+in-memory stubs so only CPU contention on the loop is measured. bcrypt is real.
+
+Run: python -m benchmarks.login_storm [--mode pool|inline|both] [--logins 40]
+     [--probes 200] [--concurrency 8] [--probe-interval 20]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+from bson import ObjectId
+
+from app.core import security
+from app.core.security import hash_password, verify_password
+from app.db.mongodb import get_users_collection
+from app.main import app
+
+
+def _product():
+    return {
+        "_id": ObjectId(), "name": "Phone", "slug": "phone", "image_urls": ["a.png"],
+        "price": 900, "actual_price": 1000, "discount_percent": 10, "avg_rating": 4.2,
+        "review_count": 3, "product_likes": 7, "brand": "Acme", "category": "Electronics",
+        "sub_category": "Phones", "is_featured": False, "stock": 5,
+    }
+
+
+async def _inline_verify(plain, hashed):
+    return verify_password(plain, hashed)
+
+
+async def _inline_hash(password):
+    return hash_password(password)
+
+
+def _percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+async def run_mode(mode: str, args, user: dict) -> dict:
+    patches = [
+        patch("app.services.auth_service.get_user_by_email", new_callable=AsyncMock, return_value=user),
+        patch("app.services.auth_service.generate_tokens", new_callable=AsyncMock, return_value=("access", "refresh")),
+        patch("app.services.auth_service.update_user", new_callable=AsyncMock),
+        patch("app.services.product_service.products_collection", return_value=MagicMock()),
+        patch("app.services.product_service.count_products", new_callable=AsyncMock, return_value=30),
+        patch("app.services.product_service.fetch_products", new_callable=AsyncMock, return_value=[_product() for _ in range(30)]),
+    ]
+    if mode == "inline":
+        patches += [
+            patch("app.services.auth_service.verify_password_async", _inline_verify),
+            patch("app.services.auth_service.hash_password_async", _inline_hash),
+        ]
+
+    for p in patches:
+        p.start()
+    app.dependency_overrides[get_users_collection] = lambda: MagicMock()
+    security.shutdown_hash_pool()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            # Baseline: /products with no login traffic
+            idle = []
+            for _ in range(args.probes // 4):
+                started = time.perf_counter()
+                await client.get("/products")
+                idle.append((time.perf_counter() - started) * 1000)
+
+            storm_done = asyncio.Event()
+            semaphore = asyncio.Semaphore(args.concurrency)
+
+            async def login():
+                async with semaphore:
+                    await client.post("/auth/login", data={"username": user["email"], "password": "s3cret-pass"})
+
+            async def storm():
+                await asyncio.gather(*(login() for _ in range(args.logins)))
+                storm_done.set()
+
+            # Open-loop probes on a fixed schedule; latency is measured from the scheduled send
+            # time so a stalled loop shows up as latency (no coordinated omission)
+            busy = []
+            storm_task = asyncio.create_task(storm())
+            started_storm = time.perf_counter()
+            while not storm_done.is_set() and len(busy) < args.probes:
+                scheduled = started_storm + len(busy) * args.probe_interval / 1000
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                await client.get("/products")
+                busy.append((time.perf_counter() - scheduled) * 1000)
+            await storm_task
+            storm_seconds = time.perf_counter() - started_storm
+    finally:
+        for p in patches:
+            p.stop()
+        app.dependency_overrides.pop(get_users_collection, None)
+        security.shutdown_hash_pool()
+
+    return {
+        "mode": mode,
+        "idle_p50": statistics.median(idle), "idle_p99": _percentile(idle, 99),
+        "storm_p50": statistics.median(busy), "storm_p99": _percentile(busy, 99),
+        "probes": len(busy), "logins_per_s": args.logins / storm_seconds,
+    }
+
+
+async def main_async(args):
+    user = {
+        "_id": ObjectId(), "email": "storm@example.com", "role": "user",
+        "is_verified": True, "is_banned": False, "hashed_password": hash_password("s3cret-pass"),
+    }
+    modes = ["inline", "pool"] if args.mode == "both" else [args.mode]
+    print(f"logins={args.logins} concurrency={args.concurrency} hash_workers={security.settings.PASSWORD_HASH_WORKERS or 'auto'}")
+    for mode in modes:
+        r = await run_mode(mode, args, user)
+        print(f"{r['mode']:>6}: /products idle p50={r['idle_p50']:.1f}ms p99={r['idle_p99']:.1f}ms | "
+              f"during storm p50={r['storm_p50']:.1f}ms p99={r['storm_p99']:.1f}ms "
+              f"({r['probes']} probes, {r['logins_per_s']:.1f} logins/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["pool", "inline", "both"], default="both")
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--probes", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8, help="in-flight logins")
+    parser.add_argument("--probe-interval", type=float, default=20.0, help="ms between /products probes")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Cost of the Prometheus instrumentation (app/core/metrics.py, app/db/mongodb.py).
+
+- middleware: the same FastAPI route served in-process (httpx ASGITransport) with and
+  without MetricsMiddleware; the difference is what each request pays
+- mongo listener: one started + succeeded event pair, i.e. the cost added to every command
+
+Run: python -m benchmarks.metrics_overhead [--requests 20000]
+"""
+
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.metrics import MetricsMiddleware
+from app.db.mongodb import CommandLatencyListener
+
+
+def _app(instrumented: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/products/{product_id}")
+    async def product(product_id: str):
+        return {"id": product_id, "name": "Steel water bottle", "price": 499}
+
+    if instrumented:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def _per_request_us(app: FastAPI, requests: int) -> float:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for i in range(200):
+            await client.get(f"/products/{i}")
+        started = time.perf_counter()
+        for i in range(requests):
+            await client.get(f"/products/{i}")
+        return (time.perf_counter() - started) / requests * 1e6
+
+
+def _listener_pair_us(rounds: int) -> float:
+    listener = CommandLatencyListener()
+    started_event = SimpleNamespace(command_name="find", database_name="anozon", command={"find": "Products"},
+                                    request_id=1, connection_id=("h", 1))
+    done_event = SimpleNamespace(command_name="find", duration_micros=800, request_id=1, connection_id=("h", 1))
+    started = time.perf_counter()
+    for _ in range(rounds):
+        listener.started(started_event)
+        listener.succeeded(done_event)
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+
+    plain = asyncio.run(_per_request_us(_app(False), args.requests))
+    instrumented = asyncio.run(_per_request_us(_app(True), args.requests))
+    print(f"middleware      plain {plain:7.1f} us/req   instrumented {instrumented:7.1f} us/req   "
+          f"overhead {instrumented - plain:5.1f} us ({(instrumented / plain - 1) * 100:4.1f}%)")
+    print(f"mongo listener  {_listener_pair_us(100_000):5.2f} us per command")
+
+
+if __name__ == "__main__":
+    main()
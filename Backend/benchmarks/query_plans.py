@@ -0,0 +1,334 @@
+"""
+Query-plan regression harness for the repository layer.
+
+Seeds a scratch database with benchmarks.dataset, runs each repository function in CASES
+against it while a command listener records what the driver sends, then explains every
+recorded command with executionStats (explain never executes writes). A command passes when
+its winning plan uses an index (no COLLSCAN), has no blocking SORT stage, and examines at most
+`max_docs_per_result` documents per document returned. Cases with a `known` reason are
+documented gaps: reported, but not failures.
+
+Writes a Markdown report of every query shape with its winning plan. tests/query_plan_test.py
+runs the same cases when QUERY_PLAN_MONGO_URL is set.
+
+Run: python -m benchmarks.query_plans [--mongo-url URL] [--db anozon_query_plans] [--scale small]
+     [--skip-load] [--report benchmarks/results/query_plans.md]
+"""
+
+import argparse
+import asyncio
+import sys
+from collections import Counter
+from datetime import timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Awaitable, Callable, NamedTuple
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+from app.core.config import settings
+from app.repo import (
+    admin_helpers, ai_index_helpers, audit_helpers, auth_helpers, cart_helpers, landing_helpers, orders_helpers,
+    product_helpers, profiles_helpers, review_helpers, seller_helpers,
+)
+from app.repo.audit_helpers import build_audit_query
+from app.repo.explain_helpers import EXPLAINABLE_COMMANDS, explain_command, plan_summary
+from app.repo.product_helpers import LISTING_CARD_PROJECTION, build_product_query
+from benchmarks.dataset import EPOCH, Dataset, generate, load
+
+DEFAULT_REPORT = Path(__file__).parent / "results" / "query_plans.md"
+# Stages that read through an index (EXPRESS_* are 8.0's single-document fast paths)
+INDEX_STAGES = {"IXSCAN", "IDHACK", "COUNT_SCAN", "DISTINCT_SCAN", "TEXT_OR", "TEXT_MATCH"}
+
+
+class QueryCase(NamedTuple):
+    name: str
+    run: Callable[[object, SimpleNamespace], Awaitable[object]]
+    max_docs_per_result: float = 5.0
+    known: str | None = None
+
+
+CASES: list[QueryCase] = [
+    # Products: storefront
+    QueryCase("products.listing_newest", lambda db, ids: product_helpers.fetch_products(
+        db.Products, build_product_query(category=ids.category), "created_at", -1, 0, 20, LISTING_CARD_PROJECTION),
+        known="category is a case-insensitive regex and no listing index ends in created_at"),
+    QueryCase("products.listing_price", lambda db, ids: product_helpers.fetch_products(
+        db.Products, build_product_query(category=ids.category), "price", 1, 0, 20, LISTING_CARD_PROJECTION),
+        known="no index serves the price sort"),
+    QueryCase("products.listing_count", lambda db, ids: product_helpers.count_products(
+        db.Products, build_product_query(category=ids.category))),
+    QueryCase("products.search", lambda db, ids: product_helpers.fetch_products(
+        db.Products, build_product_query(search=ids.search_term), "created_at", -1, 0, 20, LISTING_CARD_PROJECTION),
+        known="substring $regex across six fields; no index can serve it"),
+    QueryCase("products.facets", lambda db, ids: product_helpers.fetch_product_facets(
+        db.Products, build_product_query(category=ids.category))),
+    QueryCase("products.by_id", lambda db, ids: product_helpers.fetch_product_by_id(db.Products, ids.product_id)),
+    QueryCase("products.by_slug", lambda db, ids: product_helpers.fetch_product_by_slug(db.Products, ids.slug)),
+    QueryCase("products.categories", lambda db, ids: product_helpers.fetch_categories(db.Products)),
+    QueryCase("products.decrement_stock", lambda db, ids: product_helpers.decrement_product_stock(
+        db.Products, ids.checkout_product_id, 1)),
+    QueryCase("products.like_toggle", lambda db, ids: _like_toggle(db, ids)),
+    # Landing
+    QueryCase("landing.categories", lambda db, ids: landing_helpers.fetch_categories_with_subcategories(db.Products),
+              max_docs_per_result=1.5),
+    QueryCase("landing.flash_deals", lambda db, ids: landing_helpers.fetch_flash_deals(db.Products)),
+    QueryCase("landing.top_products", lambda db, ids: landing_helpers.fetch_top_products(db.Products)),
+    QueryCase("landing.new_arrivals", lambda db, ids: landing_helpers.fetch_new_arrivals(db.Products),
+              known="no Products index leads with created_at"),
+    QueryCase("landing.featured", lambda db, ids: landing_helpers.fetch_featured_products(db.Products),
+              known="featured index has no rating suffix; the few featured products are sorted in memory"),
+    # AI index
+    QueryCase("ai_index.visible_cards", lambda db, ids: ai_index_helpers.get_visible_cards(
+        db.Products, ids.product_ids, LISTING_CARD_PROJECTION)),
+    QueryCase("ai_index.rebuild_batch", lambda db, ids: anext(ai_index_helpers.iter_indexable_products(db.Products, 500))),
+    # Seller
+    QueryCase("seller.products", lambda db, ids: seller_helpers.get_seller_products(db.Products, ids.seller_id)),
+    QueryCase("seller.product", lambda db, ids: seller_helpers.get_seller_product_by_id(
+        db.Products, ids.seller_product_id, ids.seller_id)),
+    QueryCase("seller.orders", lambda db, ids: seller_helpers.get_seller_orders(db.Orders, ids.seller_id),
+              known="$sort on created_at follows $addFields, so it runs in the pipeline over all the seller's orders"),
+    QueryCase("seller.order", lambda db, ids: seller_helpers.get_seller_order_by_id(db.Orders, ids.order_id, ids.order_seller_id)),
+    QueryCase("seller.item_status", lambda db, ids: seller_helpers.update_seller_order_item_status(
+        db.Orders, ids.order_id, ids.order_seller_id, "delivered")),
+    QueryCase("seller.dashboard", lambda db, ids: seller_helpers.get_seller_dashboard_stats(
+        db.Products, db.Orders, db.Sellers, ids.seller_id),
+        known="recent orders sort by created_at with only an items.seller_id index"),
+    QueryCase("seller.by_user", lambda db, ids: seller_helpers.get_seller_by_user_id(db.Sellers, ids.seller_id)),
+    # Orders, cart, profile
+    QueryCase("orders.user_list", lambda db, ids: orders_helpers.get_user_orders_from_db(db.Orders, ids.user_id)),
+    QueryCase("orders.user_list_by_status", lambda db, ids: orders_helpers.get_user_orders_from_db(
+        db.Orders, ids.user_id, status="delivered")),
+    QueryCase("orders.by_id", lambda db, ids: orders_helpers.get_order_by_id_db(db.Orders, ids.order_id, ids.order_user_id)),
+    QueryCase("cart.by_user", lambda db, ids: cart_helpers.get_cart_by_user(db.Cart, ids.user_id)),
+    QueryCase("cart.add_item", lambda db, ids: cart_helpers.add_item_to_cart(db.Cart, ids.user_id, ids.product_id, 1)),
+    QueryCase("profiles.by_user", lambda db, ids: profiles_helpers.get_profile_by_user_id(db.Profiles, ids.user_id)),
+    QueryCase("users.by_email", lambda db, ids: auth_helpers.get_user_by_email(db.Users, ids.email)),
+    # Reviews
+    QueryCase("reviews.product_feed", lambda db, ids: review_helpers.get_reviews_by_product(db.Reviews, ids.reviewed_product_id)),
+    QueryCase("reviews.product_feed_by_rating", lambda db, ids: review_helpers.get_reviews_by_product(
+        db.Reviews, ids.reviewed_product_id, rating=5.0)),
+    QueryCase("reviews.product_count", lambda db, ids: review_helpers.get_review_count_by_product(
+        db.Reviews, ids.reviewed_product_id)),
+    QueryCase("reviews.existing", lambda db, ids: review_helpers.check_existing_review(
+        db.Reviews, ids.reviewed_product_id, ids.user_id)),
+    QueryCase("reviews.totals", lambda db, ids: review_helpers.get_review_totals(db.Products, ids.reviewed_product_id)),
+    QueryCase("reviews.admin_by_seller", lambda db, ids: admin_helpers.get_all_reviews(db.Reviews, seller_id=ids.seller_id)),
+    QueryCase("reviews.admin_by_rating", lambda db, ids: admin_helpers.get_all_reviews(db.Reviews, sort_rating="desc"),
+              known="no index leads with rating for the unfiltered rating sort"),
+    QueryCase("reviews.admin_search", lambda db, ids: admin_helpers.get_all_reviews(db.Reviews, search=ids.search_term),
+              known="$text results are sorted by reviewed_at in memory"),
+    # Admin
+    QueryCase("admin.dashboard_stats", lambda db, ids: admin_helpers.get_dashboard_stats(
+        db.Users, db.Sellers, db.Products, db.Orders),
+        known="platform totals count by role and payment_status, which are not indexed"),
+    QueryCase("admin.users", lambda db, ids: admin_helpers.get_all_users(db.Users, role="user"),
+              known="no Users index on role or created_at"),
+    QueryCase("admin.admins", lambda db, ids: admin_helpers.get_all_admins(db.Users),
+              known="no Users index on role"),
+    QueryCase("admin.sellers", lambda db, ids: admin_helpers.get_all_sellers(db.Sellers, status="approved"),
+              known="application_status index has no created_at suffix"),
+    QueryCase("admin.approved_sellers", lambda db, ids: admin_helpers.get_approved_sellers_list(db.Sellers),
+              known="application_status index has no business_name suffix"),
+    QueryCase("admin.pending_sellers", lambda db, ids: admin_helpers.get_pending_sellers(db.Sellers)),
+    QueryCase("admin.recent_pending_sellers", lambda db, ids: admin_helpers.get_recent_pending_sellers(db.Sellers),
+              known="application_status index has no created_at suffix"),
+    QueryCase("admin.pending_products", lambda db, ids: admin_helpers.get_pending_products(db.Products)),
+    QueryCase("admin.recent_pending_products", lambda db, ids: admin_helpers.get_recent_pending_products(db.Products),
+              known="moderation queue is sorted by created_at in memory"),
+    QueryCase("admin.products", lambda db, ids: admin_helpers.get_all_products(db.Products, category=ids.category),
+              known="category index has no created_at suffix"),
+    QueryCase("admin.seller_performance", lambda db, ids: admin_helpers.get_seller_performance(db.Products, db.Sellers)),
+    # Audit logs: one (filter, timestamp, _id) index per filter; pages fetch limit + 1
+    QueryCase("audit.feed", lambda db, ids: audit_helpers.fetch_audit_logs(db.AuditLogs, build_audit_query({}), limit=21)),
+    *(QueryCase(f"audit.feed_by_{name}", lambda db, ids, field=field: audit_helpers.fetch_audit_logs(
+        db.AuditLogs, build_audit_query({field: ids.audit_filters[field]}), limit=21))
+      for name, field in (("module", "module"), ("action", "action"), ("performer", "performed_by.email"),
+                          ("target", "target.email"))),
+    QueryCase("audit.feed_by_module_keyset", lambda db, ids: audit_helpers.fetch_audit_logs(
+        db.AuditLogs, build_audit_query({"module": ids.audit_filters["module"]}), limit=21, after=ids.audit_after)),
+    QueryCase("audit.feed_by_module_date_range", lambda db, ids: audit_helpers.fetch_audit_logs(
+        db.AuditLogs, build_audit_query({"module": ids.audit_filters["module"]}, *ids.audit_range), limit=21)),
+    QueryCase("audit.count_by_module", lambda db, ids: audit_helpers.count_audit_logs(
+        db.AuditLogs, build_audit_query({"module": ids.audit_filters["module"]}))),
+    QueryCase("audit.count_date_range", lambda db, ids: audit_helpers.count_audit_logs(
+        db.AuditLogs, build_audit_query({}, *ids.audit_range))),
+    QueryCase("audit.count_all", lambda db, ids: audit_helpers.count_audit_logs(db.AuditLogs, build_audit_query({})),
+              known="count_documents({}) on the unfiltered first page scans the collection"),
+    QueryCase("audit.archive_batch", lambda db, ids: audit_helpers.fetch_audit_logs_before(
+        db.AuditLogs, ids.audit_cutoff, 1000)),
+]
+
+
+async def _like_toggle(db, ids):
+    await product_helpers.update_product_likes(db.ProductLikes, ids.product_id, ids.user_id, "like")
+    await product_helpers.update_product_likes(db.ProductLikes, ids.product_id, ids.user_id, "unlike")
+
+
+class CommandRecorder(monitoring.CommandListener):
+    """Keeps the explainable commands sent while `recording` is set."""
+
+    def __init__(self):
+        self.recording = False
+        self.commands: list[tuple[str, dict]] = []
+
+    def started(self, event):
+        if self.recording and event.command_name in EXPLAINABLE_COMMANDS:
+            self.commands.append((event.database_name, dict(event.command)))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def sample_ids(data: Dataset) -> SimpleNamespace:
+    """Ids the cases query for, picked so that every query has something to return."""
+    collections = data.collections
+    products = collections["Products"]
+    order = next(order for order in collections["Orders"] if len(order["items"]) > 1)
+    reviewed_product_id, _ = Counter(r["product_id"] for r in collections["Reviews"]).most_common(1)[0]
+    review = next(r for r in collections["Reviews"] if r["product_id"] == reviewed_product_id)
+    seller_id, _ = Counter(p["seller_id"] for p in products).most_common(1)[0]
+    user = next(user for user in collections["Users"] if str(user["_id"]) == review["user_id"])
+    audit_logs = collections["AuditLogs"]
+    audit_log = audit_logs[0]
+    module_feed = sorted((log for log in audit_logs if log["module"] == audit_log["module"]),
+                         key=lambda log: (log["timestamp"], log["_id"]), reverse=True)
+    after = module_feed[min(20, len(module_feed)) - 1]
+    return SimpleNamespace(
+        category=data.categories[0],
+        search_term=data.search_terms[0],
+        product_id=data.product_ids[0],
+        product_ids=data.product_ids[:20],
+        checkout_product_id=data.checkout_product_ids[0],
+        slug=next(p["slug"] for p in products if str(p["_id"]) == data.product_ids[0]),
+        seller_id=seller_id,
+        seller_product_id=next(str(p["_id"]) for p in products if p["seller_id"] == seller_id),
+        order_id=str(order["_id"]),
+        order_user_id=str(order["user_id"]),
+        order_seller_id=str(order["items"][0]["seller_id"]),
+        reviewed_product_id=reviewed_product_id,
+        user_id=review["user_id"],
+        email=user["email"],
+        audit_filters={"module": audit_log["module"], "action": audit_log["action"],
+                       "performed_by.email": audit_log["performed_by"]["email"],
+                       "target.email": audit_log["target"]["email"]},
+        audit_after=[after["timestamp"], after["_id"]],   # end of the first page
+        audit_range=(EPOCH - timedelta(days=60), EPOCH - timedelta(days=30)),
+        audit_cutoff=EPOCH - timedelta(days=180),
+    )
+
+
+def check(summary: dict, case: QueryCase) -> list[str]:
+    problems = []
+    stages = summary["plan"].split(" > ")
+    if summary["collscan"] or not any(stage in INDEX_STAGES or stage.startswith("EXPRESS") for stage in stages):
+        problems.append("no index used")
+    if summary["blocking_sort"]:
+        problems.append("in-memory sort")
+    if summary["docs_per_result"] is not None and summary["docs_per_result"] > case.max_docs_per_result:
+        problems.append(f"{summary['docs_per_result']:.1f} docs examined per result (max {case.max_docs_per_result})")
+    return problems
+
+
+def _blocking_sort(explain: dict, stages: list[str]) -> bool:
+    """A SORT plan stage, or a pipeline $sort over documents (one after $group/$facet sorts groups)."""
+    if "SORT" in stages:
+        return True
+    for stage in explain.get("stages", []):
+        if "$sort" in stage:
+            return True
+        if {"$group", "$facet", "$bucket", "$count"} & stage.keys():
+            return False
+    return False
+
+
+async def explain_case(client, case: QueryCase, recorder: CommandRecorder, ids: SimpleNamespace) -> list[dict]:
+    recorder.commands.clear()
+    recorder.recording = True
+    try:
+        await case.run(client[settings.DB_NAME], ids)
+    finally:
+        recorder.recording = False
+
+    results = []
+    for database, command in list(recorder.commands):
+        explain = await explain_command(client, database, command, "executionStats")
+        summary = plan_summary(explain)
+        stages = summary["plan"].split(" > ")
+        # With grouping pushed into the query (SBE), nReturned counts groups, not documents
+        grouped = "GROUP" in stages
+        summary["blocking_sort"] = _blocking_sort(explain, stages)
+        summary["docs_per_result"] = (
+            None if grouped or summary["docs_examined"] is None
+            else summary["docs_examined"] / max(summary["returned"] or 0, 1)
+        )
+        name = next(iter(command))
+        summary.update(case=case.name, command=name, collection=command[name], known=case.known)
+        summary["problems"] = check(summary, case)
+        results.append(summary)
+    return results
+
+
+async def run_cases(mongo_url: str, db_name: str, scale: str = "small", seed: int = 42,
+                    skip_load: bool = False, cases: list[QueryCase] = CASES) -> dict[str, list[dict]]:
+    """Seed (unless skip_load), then explain every case. Returns {case name: [command summaries]}."""
+    url, name = settings.MONGO_URL, settings.DB_NAME
+    settings.MONGO_URL, settings.DB_NAME = mongo_url, db_name
+    recorder = CommandRecorder()
+    client = AsyncIOMotorClient(mongo_url, event_listeners=[recorder], serverSelectionTimeoutMS=3000)
+    try:
+        data = generate(scale, seed)
+        if not skip_load:
+            await load(data, flush_redis=False)
+        ids = sample_ids(data)
+        return {case.name: await explain_case(client, case, recorder, ids) for case in cases}
+    finally:
+        client.close()
+        settings.MONGO_URL, settings.DB_NAME = url, name
+
+
+def write_report(results: dict[str, list[dict]], path: Path):
+    lines = [
+        "# Repository query plans", "",
+        "| Case | Command | Plan | Indexes | Docs examined / returned | Problems |",
+        "|---|---|---|---|---|---|",
+    ]
+    for case, summaries in results.items():
+        for s in summaries:
+            problems = ", ".join(s["problems"]) or "ok"
+            if s["problems"] and s["known"]:
+                problems += f" (known: {s['known']})"
+            ratio = "n/a" if s["docs_per_result"] is None else f"{s['docs_examined']} / {s['returned']}"
+            lines.append(f"| {case} | {s['collection']}.{s['command']} | {s['plan']} | "
+                         f"{', '.join(s['indexes']) or '-'} | {ratio} | {problems} |")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(lines) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-url", default=settings.MONGO_URL)
+    parser.add_argument("--db", default="anozon_query_plans")
+    parser.add_argument("--scale", default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-load", action="store_true", help="reuse an already seeded database")
+    parser.add_argument("--report", type=Path, default=DEFAULT_REPORT)
+    args = parser.parse_args()
+    if "bench" not in args.db and "query_plans" not in args.db:
+        parser.error(f"refusing to reseed {args.db!r}; use a scratch database")
+
+    results = asyncio.run(run_cases(args.mongo_url, args.db, args.scale, args.seed, args.skip_load))
+    write_report(results, args.report)
+    failures = [(case, s) for case, summaries in results.items() for s in summaries if s["problems"] and not s["known"]]
+    for case, s in failures:
+        print(f"FAIL {case}: {s['collection']}.{s['command']} {s['plan']} — {', '.join(s['problems'])}")
+    print(f"{sum(map(len, results.values()))} commands over {len(results)} cases; report written to {args.report}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Refresh-token throughput benchmark (single process = one core).
+
+- bcrypt:  the previous path — JWT refresh token decoded, bcrypt verify against the stored
+           hash, new token pair, bcrypt hash of the new refresh token
+- session: the opaque-token path — HMAC digests + rotate_session (Lua CAS) + new access JWT
+
+--backend local replaces the Redis round trip with an in-memory CAS so the numbers show the
+app-side CPU cost; --backend redis runs the real Lua script against REDIS_URL.
+
+Run: python -m benchmarks.refresh_throughput [--backend local|redis] [--seconds 3]
+"""
+
+import argparse
+import asyncio
+import time
+from unittest.mock import patch
+
+from jose import jwt
+
+from app.core.config import settings
+from app.core.security import (
+    create_access_token, create_refresh_token, hash_password, verify_password, verify_token,
+)
+from app.core.time_utils import utc_now
+from app.db import redis as redis_db
+from app.services import session_service
+
+
+class InMemorySessions:
+    """Same contract as session_helpers.rotate_session, without the network hop."""
+
+    def __init__(self):
+        self.sessions = {}
+
+    async def create_session(self, session_id, user_id, email, role, digest, ttl, device=None):
+        self.sessions[session_id] = {"user_id": user_id, "email": email, "role": role, "digest": digest}
+
+    async def rotate_session(self, session_id, presented_digest, new_digest, ttl):
+        s = self.sessions.get(session_id)
+        if not s or s["digest"] != presented_digest:
+            return [0]
+        s["prev_digest"], s["digest"] = s["digest"], new_digest
+        return [1, s["user_id"], s["email"], s["role"]]
+
+
+def _claims():
+    return {"_id": "507f1f77bcf86cd799439011", "email": "bench@example.com", "role": "user",
+            "iss": "Anozon", "aud": "Anozon", "iat": utc_now()}
+
+
+def bench_bcrypt(seconds: float) -> tuple[int, float]:
+    def jwt_refresh():
+        return jwt.encode({**_claims(), "exp": int(time.time()) + 3600}, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+
+    token = jwt_refresh()
+    stored = hash_password(token)
+    done, started = 0, time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        verify_token(token)
+        assert verify_password(token, stored)
+        create_access_token(_claims())
+        token = jwt_refresh()
+        stored = hash_password(token)
+        done += 1
+    return done, time.perf_counter() - started
+
+
+async def bench_session(seconds: float) -> tuple[int, float]:
+    token = create_refresh_token()
+    await session_service.start_session(token, "507f1f77bcf86cd799439011", "bench@example.com", "user")
+    done, started = 0, time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        token = (await session_service.rotate_session(token))["refresh_token"]
+        done += 1
+    return done, time.perf_counter() - started
+
+
+async def run(args):
+    old_done, old_elapsed = bench_bcrypt(args.seconds)
+
+    if args.backend == "redis":
+        await redis_db.connect_redis()
+        if redis_db.redis_client is None:
+            raise SystemExit("Redis unavailable at REDIS_URL")
+        new_done, new_elapsed = await bench_session(args.seconds)
+        await redis_db.close_redis()
+    else:
+        store = InMemorySessions()
+        with patch("app.services.session_service.session_helpers.create_session", store.create_session), \
+             patch("app.services.session_service.session_helpers.rotate_session", store.rotate_session):
+            new_done, new_elapsed = await bench_session(args.seconds)
+
+    old_rate, new_rate = old_done / old_elapsed, new_done / new_elapsed
+    print(f"backend={args.backend} (single core)")
+    print(f"bcrypt  refreshes/s {old_rate:>10,.1f}  ({old_elapsed / old_done * 1000:.1f} ms CPU each)")
+    print(f"session refreshes/s {new_rate:>10,.1f}  ({new_elapsed / new_done * 1000:.3f} ms each)  x{new_rate / old_rate:,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["local", "redis"], default="local")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Request mixes for benchmarks.suite, against a database loaded by benchmarks.dataset.
+Each scenario is an async callable (client, ctx, rng) -> httpx.Response; anything below
+400 counts as a success. Ids come from the regenerated dataset (same --scale/--seed as the
+load), so nothing is read back from Mongo to build requests.
+"""
+
+import random
+from dataclasses import dataclass
+
+import httpx
+
+from app.core.security import create_access_token
+from app.core.time_utils import utc_now
+from benchmarks.dataset import Dataset
+
+SORTS = [("created_at", -1), ("price", 1), ("price", -1), ("avg_rating", -1), ("discount_percent", -1)]
+# Users a run mints tokens for; checkout spreads its writes over them
+TOKEN_POOL = 200
+
+
+def _token(user: dict) -> str:
+    return create_access_token({
+        "_id": str(user["_id"]), "email": user["email"], "role": user["role"],
+        "iss": "Anozon", "aud": "Anozon", "iat": utc_now(),
+    })
+
+
+@dataclass
+class Context:
+    data: Dataset
+    user_tokens: list[tuple[str, str]]   # (user_id, bearer header value)
+    seller_tokens: list[str]
+    admin_token: str
+
+    @classmethod
+    def build(cls, data: Dataset) -> "Context":
+        users = {str(user["_id"]): user for user in data.collections["Users"]}
+        return cls(
+            data=data,
+            user_tokens=[(user_id, f"Bearer {_token(users[user_id])}") for user_id in data.user_ids[:TOKEN_POOL]],
+            seller_tokens=[f"Bearer {_token(users[seller_id])}" for seller_id in data.seller_ids],
+            admin_token=f"Bearer {_token(users[data.admin_id])}",
+        )
+
+
+async def listing(client: httpx.AsyncClient, ctx: Context, rng: random.Random):
+    sort_by, sort_order = rng.choice(SORTS)
+    params = {"page": rng.randint(1, 5), "limit": 20, "sort_by": sort_by, "sort_order": sort_order}
+    if rng.random() < 0.7:
+        params["category"] = rng.choice(ctx.data.categories)
+    return await client.get("/products", params=params)
+
+
+async def facets(client, ctx, rng):
+    return await client.get("/products/facets", params={"category": rng.choice(ctx.data.categories)})
+
+
+async def search(client, ctx, rng):
+    return await client.get("/products/search", params={"q": rng.choice(ctx.data.search_terms), "limit": 20})
+
+
+async def product_detail(client, ctx, rng):
+    return await client.get(f"/products/{rng.choice(ctx.data.product_ids)}")
+
+
+async def cart(client, ctx, rng):
+    _, token = rng.choice(ctx.user_tokens)
+    headers = {"Authorization": token}
+    added = await client.post("/users/cart", headers=headers,
+                              json={"product_id": rng.choice(ctx.data.product_ids), "quantity": 1})
+    if added.status_code >= 400:
+        return added
+    return await client.get("/users/cart", headers=headers)
+
+
+async def checkout(client, ctx, rng):
+    user_id, token = rng.choice(ctx.user_tokens)
+    return await client.post("/users/orders/buy-now", headers={"Authorization": token}, json={
+        "product_id": rng.choice(ctx.data.checkout_product_ids), "quantity": 1,
+        "address_id": ctx.data.address_id(user_id), "payment_method": "cod",
+    })
+
+
+async def seller_dashboard(client, ctx, rng):
+    return await client.get("/seller/dashboard", headers={"Authorization": rng.choice(ctx.seller_tokens)})
+
+
+async def admin_dashboard(client, ctx, rng):
+    return await client.get("/admin/dashboard", headers={"Authorization": ctx.admin_token})
+
+
+SCENARIOS = {
+    "listing": listing,
+    "facets": facets,
+    "search": search,
+    "product_detail": product_detail,
+    "cart": cart,
+    "checkout": checkout,
+    "seller_dashboard": seller_dashboard,
+    "admin_dashboard": admin_dashboard,
+}
@@ -0,0 +1,98 @@
+"""
+Throughput of the production server (server.py, ENVIRONMENT=production) as workers go 1 → N.
+
+For each worker count it starts the server on --port, waits for /health, then drives --path
+with --clients load-generator processes (each keeping --concurrency requests in flight) for
+--seconds, and reports requests/s and latency. The server then gets SIGTERM, the same
+graceful shutdown a deploy uses. Needs the usual .env (Mongo, Redis) with some products seeded.
+
+Run: python -m benchmarks.server_scaling [--max-workers 4] [--path "/products?limit=30"]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+async def _drive(url: str, seconds: float, concurrency: int) -> list[float]:
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    async with httpx.AsyncClient(timeout=30, limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def loop():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.get(url)
+                if response.status_code == 200:
+                    latencies.append(time.perf_counter() - started)
+        await asyncio.gather(*(loop() for _ in range(concurrency)))
+    return latencies
+
+
+def _client(url: str, seconds: float, concurrency: int, results):
+    results.put(asyncio.run(_drive(url, seconds, concurrency)))
+
+
+def _wait_healthy(base: str, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError("server did not become healthy")
+
+
+def measure(workers: int, args) -> tuple[float, list[float]]:
+    env = {**os.environ, "ENVIRONMENT": "production", "WEB_CONCURRENCY": str(workers), "SERVER_PORT": str(args.port)}
+    server = subprocess.Popen([sys.executable, "server.py"], env=env, stdout=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{args.port}"
+    try:
+        _wait_healthy(base)
+        asyncio.run(_drive(base + args.path, 2, args.concurrency))   # warm pools and caches
+        results = multiprocessing.Queue()
+        clients = [multiprocessing.Process(target=_client, args=(base + args.path, args.seconds, args.concurrency, results))
+                   for _ in range(args.clients)]
+        for client in clients:
+            client.start()
+        latencies = [lat for _ in clients for lat in results.get()]
+        for client in clients:
+            client.join()
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+    return len(latencies) / args.seconds, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--path", default="/products?limit=30")
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--port", type=int, default=8099)
+    args = parser.parse_args()
+
+    baseline = None
+    print(f"GET {args.path}  {args.clients} clients x {args.concurrency} in flight, {args.seconds:.0f}s per run")
+    for workers in sorted({1, 2, 4, 8, args.max_workers} & set(range(1, args.max_workers + 1))):
+        rps, latencies = measure(workers, args)
+        baseline = baseline or rps or 1
+        ordered = sorted(latencies) or [0.0]
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        print(f"workers={workers:<3} {rps:9.0f} req/s  x{rps / baseline:4.1f}   "
+              f"p50 {statistics.median(ordered) * 1000:7.1f} ms   p99 {p99 * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Scenario benchmark suite: product listing, facets, search, product detail, cart, checkout,
+seller dashboard and admin dashboard against a dataset loaded with benchmarks.dataset.
+
+Each scenario gets a warmup, then --requests requests from --concurrency workers; p50/p95/p99
+latency, throughput and error rate go to a JSON results file. With a baseline (default
+benchmarks/baselines/local.json, if present) the run exits 1 when any scenario's p95 grows,
+or its throughput drops, by more than --threshold, or more than 1% of its requests fail.
+
+By default the app runs in-process (lifespan + httpx ASGI transport, rate limits off) using
+MONGO_URL / DB_NAME / REDIS_URL; --base-url targets a running server instead (start it with
+RATE_LIMIT_ENABLED=false). Use the same --scale/--seed as the load.
+
+Run: python -m benchmarks.suite [--scale small] [--scenarios listing,search] [--requests 500]
+     [--concurrency 16] [--baseline PATH] [--save-baseline] [--threshold 0.15]
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import httpx
+
+from app.core.config import settings
+from app.core.time_utils import utc_now
+from benchmarks.dataset import SCALES, generate
+from benchmarks.scenarios import SCENARIOS, Context
+
+HERE = Path(__file__).parent
+DEFAULT_BASELINE = HERE / "baselines" / "local.json"
+RESULTS_DIR = HERE / "results"
+MAX_ERROR_RATE = 0.01
+
+
+def summarize(latencies_ms: list[float], errors: int, elapsed: float) -> dict:
+    total = len(latencies_ms)
+    cuts = statistics.quantiles(latencies_ms, n=100, method="inclusive") if total > 1 else latencies_ms * 99
+    return {
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(cuts[49], 2),
+        "p95_ms": round(cuts[94], 2),
+        "p99_ms": round(cuts[98], 2),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Regressions of `results` against `baseline` (both {"scenarios": {name: summary}}); empty when fine."""
+    problems = []
+    for name, current in results["scenarios"].items():
+        if current["error_rate"] > MAX_ERROR_RATE:
+            problems.append(f"{name}: error rate {current['error_rate']:.1%}")
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + threshold):
+            problems.append(f"{name}: p95 {current['p95_ms']} ms vs baseline {previous['p95_ms']} ms")
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - threshold):
+            problems.append(f"{name}: {current['throughput_rps']} req/s vs baseline {previous['throughput_rps']} req/s")
+    return problems
+
+
+async def run_scenario(client, ctx: Context, name: str, args) -> dict:
+    scenario = SCENARIOS[name]
+    rng = random.Random(f"{args.seed}-{name}")
+    for _ in range(args.warmup):
+        await scenario(client, ctx, rng)
+
+    latencies, errors = [], 0
+    remaining = args.requests
+
+    async def worker(worker_id: int):
+        nonlocal remaining, errors
+        worker_rng = random.Random(f"{args.seed}-{name}-{worker_id}")
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                failed = (await scenario(client, ctx, worker_rng)).status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append((time.perf_counter() - started) * 1000)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+@asynccontextmanager
+async def _client(args):
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=30) as client:
+            yield client
+        return
+    from app.main import app, lifespan
+
+    settings.RATE_LIMIT_ENABLED = False
+    async with lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30) as client:
+            yield client
+
+
+async def run(args) -> dict:
+    ctx = Context.build(generate(args.scale, args.seed))
+    results = {
+        "created_at": utc_now().isoformat(),
+        "scale": args.scale,
+        "seed": args.seed,
+        "target": args.base_url or "in-process",
+        "concurrency": args.concurrency,
+        "python": platform.python_version(),
+        "scenarios": {},
+    }
+    async with _client(args) as client:
+        for name in args.scenarios:
+            summary = await run_scenario(client, ctx, name, args)
+            results["scenarios"][name] = summary
+            print(f"{name:17s} p50 {summary['p50_ms']:8.2f} ms  p95 {summary['p95_ms']:8.2f} ms  "
+                  f"p99 {summary['p99_ms']:8.2f} ms  {summary['throughput_rps']:8.1f} req/s  "
+                  f"errors {summary['errors']}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma separated subset")
+    parser.add_argument("--requests", type=int, default=500, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--base-url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--output", type=Path, help="results file (default benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write these results as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed p95/throughput regression")
+    args = parser.parse_args()
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results = asyncio.run(run(args))
+
+    output = args.output or RESULTS_DIR / f"{utc_now():%Y%m%dT%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2))
+        print(f"Baseline saved to {args.baseline}")
+    elif args.baseline.exists():
+        problems = compare(results, json.loads(args.baseline.read_text()), args.threshold)
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        if problems:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline} (threshold {args.threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Top-k latency of the AI product index (VectorIndex) at catalogue scale.
+
+Builds an index of --products random L2-normalised vectors (dim --dim) in a temp directory,
+then times, through a read-only mapping like a worker would use:
+- naive:   full matmul + full argsort (the obvious implementation)
+- search:  one query at a time — matmul + argpartition
+- batched: search_many over --batch queries, reported per query
+
+Run: python -m benchmarks.vector_search [--products 100000] [--dim 384] [--k 10] [--queries 200]
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from app.ai.embeddings import normalize_rows
+from app.ai.vector_index import VectorIndex
+
+
+def _percentiles(samples: list[float]) -> str:
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return f"p50 {statistics.median(ordered) * 1000:7.2f} ms   p99 {p99 * 1000:7.2f} ms"
+
+
+def build(path: str, products: int, dim: int) -> float:
+    rng = np.random.default_rng(0)
+    started = time.perf_counter()
+    index = VectorIndex.create(path, "bench", dim, capacity=products)
+    for start in range(0, products, 10_000):
+        n = min(10_000, products - start)
+        index.upsert([f"{i:024x}" for i in range(start, start + n)], normalize_rows(rng.standard_normal((n, dim), dtype=np.float32)))
+    index.commit()
+    return time.perf_counter() - started
+
+
+def run(args):
+    queries = normalize_rows(np.random.default_rng(1).standard_normal((args.queries, args.dim), dtype=np.float32))
+    with tempfile.TemporaryDirectory() as path:
+        build_seconds = build(path, args.products, args.dim)
+        index = VectorIndex.open(path)
+        vectors = index._vectors[:args.products]
+
+        naive, single = [], []
+        for query in queries:
+            started = time.perf_counter()
+            np.argsort(-(vectors @ query))[:args.k]
+            naive.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            index.refresh()
+            index.search(query, args.k)
+            single.append(time.perf_counter() - started)
+
+        batched = []
+        for start in range(0, args.queries, args.batch):
+            chunk = queries[start:start + args.batch]
+            started = time.perf_counter()
+            index.search_many(chunk, args.k)
+            batched.append((time.perf_counter() - started) / len(chunk))
+
+    print(f"products={args.products} dim={args.dim} k={args.k} queries={args.queries} (build {build_seconds:.1f}s)")
+    print(f"naive    {_percentiles(naive)}")
+    print(f"search   {_percentiles(single)}")
+    print(f"batched  {_percentiles(batched)}   per query, batch={args.batch}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=32)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Apply database migrations (app/db/migrations.py). Run before starting a new release.
+
+python migrate.py            apply everything pending
+python migrate.py --to 2     apply up to version 2
+python migrate.py --status   list versions and when they were applied
+"""
+
+import argparse
+import asyncio
+import logging
+
+from app.db.migrations import apply_migrations, migration_status
+from app.db.mongodb import close_mongo_connection, connect_to_mongo
+
+
+async def main(args):
+    await connect_to_mongo()
+    try:
+        if args.status:
+            for row in await migration_status():
+                record = row["record"] or {}
+                state = record.get("status", "pending")
+                when = f" {record['applied_at']:%Y-%m-%d %H:%M} ({record['duration_ms']} ms)" if state == "applied" else ""
+                print(f"{row['version']:>4}  {state:<8}{when}  {row['name']}")
+            return
+        applied = await apply_migrations(args.to)
+        print(f"Applied migrations: {applied}" if applied else "Nothing to apply")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--to", type=int, help="highest version to apply")
+    parser.add_argument("--status", action="store_true", help="show applied and pending versions")
+    asyncio.run(main(parser.parse_args()))
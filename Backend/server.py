@@ -1,24 +1,60 @@
 import os
+import shutil
 import uvicorn
 
+from app.core.config import settings
+
+
+def worker_count() -> int:
+    """WEB_CONCURRENCY, or the CPUs this process may run on (respects container CPU pinning)."""
+    if settings.WEB_CONCURRENCY > 0:
+        return settings.WEB_CONCURRENCY
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:   # not available on macOS/Windows
+        return os.cpu_count() or 1
+
+
 if __name__ == "__main__":
     # HOST MUST BE 0.0.0.0 for Docker/Cloud
-    
-    # Logic: Default to "development" (Reload = True). 
+
+    # Logic: Default to "development" (Reload = True).
     # Only disable it if we explicitly say "production".
     env_state = os.getenv("ENVIRONMENT", "development")
     is_prod = env_state == "production"
 
     if is_prod:
-        print("🚀 Starting in PRODUCTION mode (No Reload)")
-    else:
-        print("🛠️ Starting in DEVELOPMENT mode (Hot Reload Enabled)")
+        # Multi-worker Prometheus metrics live in PROMETHEUS_MULTIPROC_DIR; drop the last run's files
+        metrics_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+        if metrics_dir:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+            os.makedirs(metrics_dir)
 
-    uvicorn.run(
-        "app.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=not is_prod # True in dev, False in prod
-    )
+        # Import once in the supervisor so a broken build or missing setting fails here,
+        # not in N workers that the supervisor would keep restarting
+        import app.main  # noqa: F401
 
-    
\ No newline at end of file
+        workers = worker_count()
+        print(f"🚀 Starting in PRODUCTION mode ({workers} workers)")
+        # SIGTERM: each worker stops accepting, finishes in-flight requests for up to
+        # SERVER_GRACEFUL_TIMEOUT_SECONDS, then runs the lifespan shutdown that flushes
+        # counters, audit logs and queues. Workers exiting after SERVER_MAX_REQUESTS are respawned.
+        uvicorn.run(
+            "app.main:app",
+            host="0.0.0.0",
+            port=settings.SERVER_PORT,
+            workers=workers,
+            loop="uvloop",
+            http="httptools",
+            limit_max_requests=settings.SERVER_MAX_REQUESTS or None,
+            limit_max_requests_jitter=settings.SERVER_MAX_REQUESTS_JITTER,
+            timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+        )
+    else:
+        print("🛠️ Starting in DEVELOPMENT mode (Hot Reload Enabled)")
+        uvicorn.run(
+            "app.main:app",
+            host="0.0.0.0",
+            port=settings.SERVER_PORT,
+            reload=True,
+        )
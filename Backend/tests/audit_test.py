@@ -0,0 +1,367 @@
+import asyncio
+import pytest
+from datetime import datetime
+from bson import ObjectId
+from unittest.mock import AsyncMock, MagicMock, patch
+from pymongo.errors import AutoReconnect
+
+from app.core.time_utils import utc_now
+from app.repo import audit_archive_helpers
+from app.services import audit_service
+from app.services.audit_archive import AuditArchiver
+from app.services.audit_service import AuditWriter, get_all_logs, log_action
+
+ADMIN_ID = str(ObjectId())
+USER_ID = str(ObjectId())
+USERS = {
+    ADMIN_ID: {"_id": ObjectId(ADMIN_ID), "username": "root", "email": "root@example.com", "role": "admin"},
+    USER_ID: {"_id": ObjectId(USER_ID), "username": "asha", "email": "asha@example.com", "role": "user"},
+}
+
+
+def _audit_collection(fail_times=0):
+    collection = MagicMock()
+    collection.written = []
+    calls = {"n": 0}
+
+    async def insert_many(docs, ordered=True):
+        calls["n"] += 1
+        if calls["n"] <= fail_times:
+            raise AutoReconnect("primary stepped down")
+        collection.written.extend(docs)
+        return MagicMock(inserted_ids=[d["_id"] for d in docs])
+
+    collection.insert_many = AsyncMock(side_effect=insert_many)
+    return collection
+
+
+def _users_collection():
+    collection = MagicMock()
+
+    def find(query, projection=None):
+        cursor = MagicMock()
+        cursor.to_list = AsyncMock(return_value=[USERS[str(i)] for i in query["_id"]["$in"] if str(i) in USERS])
+        return cursor
+
+    collection.find = MagicMock(side_effect=find)
+    return collection
+
+
+@pytest.fixture
+def stores():
+    audit, users = _audit_collection(), _users_collection()
+    AuditWriter._buffer = []
+    audit_service._user_cache.clear()
+    with patch("app.services.audit_service.audit_logs_collection", return_value=audit), \
+         patch("app.services.audit_service.get_users_collection", return_value=users):
+        yield audit, users
+    AuditWriter._buffer = []
+
+
+async def _ban(i=0):
+    await log_action(action="user_banned", target_user_id=USER_ID, performed_by=ADMIN_ID,
+                     from_role="user", to_role="user", reason=f"spam {i}")
+
+
+def _event():
+    return {"_id": ObjectId(), "action": "user_banned", "module": "user", "description": None, "reason": None,
+            "performed_by": ADMIN_ID, "target_user_id": USER_ID, "from_role": "user", "to_role": "user",
+            "timestamp": utc_now(), "performer": None, "target": None}
+
+
+# -------------------------------
+# AuditWriter tests
+# -------------------------------
+
+@pytest.mark.asyncio
+async def test_log_action_returns_before_anything_is_written(stores):
+
+    # Arrange
+    audit, _ = stores
+    AuditWriter.start(interval_ms=60_000)
+
+    # Act
+    await _ban()
+    buffered = len(AuditWriter._buffer)
+    await AuditWriter.stop()
+
+    # Assert
+    assert buffered == 1
+    assert len(audit.written) == 1
+    assert audit.written[0]["description"] == "Banned user asha (asha@example.com)"
+
+
+@pytest.mark.asyncio
+async def test_events_are_batched_into_insert_many(stores):
+
+    # Arrange
+    audit, users = stores
+    with patch("app.services.audit_service.settings.AUDIT_BATCH_SIZE", 10):
+        AuditWriter.start(interval_ms=60_000)
+
+        # Act
+        for i in range(25):
+            await _ban(i)
+        await asyncio.sleep(0.01)   # the size trigger wakes the flusher
+        await AuditWriter.stop()
+
+    # Assert
+    assert [len(call.args[0]) for call in audit.insert_many.call_args_list] == [10, 10, 5]
+    assert len({doc["_id"] for doc in audit.written}) == 25
+    assert users.find.call_count == 1   # later batches hit the user cache
+
+
+@pytest.mark.asyncio
+async def test_no_events_lost_on_graceful_shutdown(stores):
+
+    # Arrange
+    audit, _ = stores
+    AuditWriter.start(interval_ms=60_000)
+
+    # Act
+    await asyncio.gather(*(_ban(i) for i in range(250)))
+    await AuditWriter.stop()
+
+    # Assert
+    assert sorted(doc["reason"] for doc in audit.written) == sorted(f"spam {i}" for i in range(250))
+    assert AuditWriter._buffer == []
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_kept_and_retried(stores):
+
+    # Arrange
+    audit = _audit_collection(fail_times=1)
+    with patch("app.services.audit_service.audit_logs_collection", return_value=audit):
+        AuditWriter.submit({**_event(), "reason": "first"})
+
+        # Act
+        first = await AuditWriter.flush()
+        second = await AuditWriter.flush()
+
+    # Assert
+    assert (first, second) == (0, 1)
+    assert audit.written[0]["reason"] == "first"
+
+
+# -------------------------------
+# User context tests
+# -------------------------------
+
+@pytest.mark.parametrize(
+    "action,target_doc,expected_lookups",
+    [
+        ("user_banned", None, {ADMIN_ID, USER_ID}),
+        ("user_banned", USERS[USER_ID], {ADMIN_ID}),
+        ("product_approved", None, {ADMIN_ID}),
+    ],
+    ids=["happy-resolves-both", "happy-caller-passed-target", "edge-product-target-not-looked-up"],
+)
+@pytest.mark.asyncio
+async def test_only_unknown_users_are_looked_up(stores, action, target_doc, expected_lookups):
+
+    # Arrange
+    audit, users = stores
+
+    # Act
+    await log_action(action=action, target_user_id=USER_ID, performed_by=ADMIN_ID,
+                     from_role="admin", to_role="user", target=target_doc)
+
+    # Assert
+    queried = {str(i) for i in users.find.call_args.args[0]["_id"]["$in"]}
+    assert queried == expected_lookups
+    assert audit.written[0]["performed_by"]["name"] == "root"
+
+
+@pytest.mark.asyncio
+async def test_unknown_user_gets_placeholder_context(stores):
+
+    # Arrange
+    audit, _ = stores
+    ghost = str(ObjectId())
+
+    # Act
+    await log_action(action="user_unbanned", target_user_id=ghost, performed_by=ADMIN_ID, from_role="user")
+
+    # Assert
+    assert audit.written[0]["target"]["name"] == "Unknown"
+    assert audit.written[0]["target"]["role_before"] == "user"
+
+
+# -------------------------------
+# Archive + keyset query tests
+# -------------------------------
+
+def _log(day: datetime, module="user", email="root@example.com"):
+    return {"_id": ObjectId(), "timestamp": day, "module": module, "action": "user_banned",
+            "performed_by": {"email": email}, "target": {"email": "asha@example.com"}}
+
+
+def _live_fetch(live):
+    """Stand-in for audit_helpers.fetch_audit_logs over an in-memory list (no filters)."""
+    async def fetch(collection, query, limit=20, skip=0, after=None):
+        docs = sorted(live, key=lambda d: (d["timestamp"], d["_id"]), reverse=True)
+        if after:
+            docs = [d for d in docs if (d["timestamp"], d["_id"]) < (after[0], after[1])]
+        return [dict(d) for d in docs[skip:skip + limit]]
+    return fetch
+
+
+@pytest.fixture
+def archive_dir(tmp_path):
+    with patch("app.services.audit_service.settings.AUDIT_ARCHIVE_DIR", str(tmp_path)), \
+         patch("app.services.audit_archive.settings.AUDIT_ARCHIVE_DIR", str(tmp_path)):
+        yield str(tmp_path)
+
+
+@pytest.mark.asyncio
+async def test_archive_moves_old_logs_into_monthly_files(archive_dir):
+
+    # Arrange
+    old = [_log(datetime(2024, 1, 5)), _log(datetime(2024, 1, 20)), _log(datetime(2024, 2, 1))]
+    batches = [old, []]
+    deleted = []
+
+    async def delete(collection, ids):
+        deleted.extend(ids)
+        return len(ids)
+
+    with patch("app.services.audit_archive.fetch_audit_logs_before", new_callable=AsyncMock, side_effect=batches), \
+         patch("app.services.audit_archive.delete_audit_logs", side_effect=delete), \
+         patch("app.services.audit_archive.audit_logs_collection"):
+
+        # Act
+        moved = await AuditArchiver.archive(datetime(2024, 6, 1))
+
+    # Assert
+    assert moved == 3
+    assert deleted == [d["_id"] for d in old]
+    assert audit_archive_helpers.list_months(archive_dir) == ["2024-02", "2024-01"]
+    assert [d["_id"] for d in audit_archive_helpers.read_month(archive_dir, "2024-01")] == [old[1]["_id"], old[0]["_id"]]
+
+
+@pytest.mark.asyncio
+async def test_archive_refuses_to_delete_without_archive_dir():
+
+    # Arrange
+    with patch("app.services.audit_archive.settings.AUDIT_ARCHIVE_DIR", ""), \
+         patch("app.services.audit_archive.fetch_audit_logs_before", new_callable=AsyncMock) as mock_fetch, \
+         patch("app.services.audit_archive.delete_audit_logs", new_callable=AsyncMock) as mock_delete:
+
+        # Act
+        moved = await AuditArchiver.archive(datetime(2024, 6, 1))
+
+    # Assert
+    assert moved == 0
+    mock_fetch.assert_not_awaited()
+    mock_delete.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_archive_run_is_skipped_without_the_redis_lock():
+
+    # Arrange
+    with patch("app.services.audit_archive.claim_archive_run", new_callable=AsyncMock,
+               side_effect=AttributeError("redis_client is None")):
+
+        # Act
+        claimed = await AuditArchiver._claim(3600)
+
+    # Assert
+    assert claimed is False
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_run_from_live_logs_into_the_archive(archive_dir):
+
+    # Arrange
+    live = [_log(datetime(2024, 7, day)) for day in range(1, 5)]
+    archived = [_log(datetime(2024, month, 10)) for month in (1, 2, 3)]
+    for doc in archived:
+        audit_archive_helpers.append_month(archive_dir, audit_archive_helpers.month_of(doc["timestamp"]), [doc])
+    audit_archive_helpers.append_month(archive_dir, "2024-02", [archived[1]])   # crash replay duplicate
+
+    with patch("app.services.audit_service.fetch_audit_logs", side_effect=_live_fetch(live)), \
+         patch("app.services.audit_service.count_audit_logs", new_callable=AsyncMock, return_value=len(live)), \
+         patch("app.services.audit_service.audit_logs_collection"):
+
+        # Act
+        pages, cursor = [], None
+        while True:
+            page = await get_all_logs(limit=3, cursor=cursor)
+            pages.append(page)
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+
+    # Assert
+    expected = sorted(live + archived, key=lambda d: d["timestamp"], reverse=True)
+    assert [log["_id"] for page in pages for log in page["logs"]] == [str(d["_id"]) for d in expected]
+    assert pages[0]["total"] == 7
+    assert pages[1]["total"] is None
+
+
+@pytest.mark.asyncio
+async def test_page_number_beyond_live_logs_continues_in_archive(archive_dir):
+
+    # Arrange
+    live = [_log(datetime(2024, 7, day)) for day in range(1, 5)]
+    archived = [_log(datetime(2024, 3, day)) for day in range(1, 4)]
+    audit_archive_helpers.append_month(archive_dir, "2024-03", archived)
+
+    with patch("app.services.audit_service.fetch_audit_logs", side_effect=_live_fetch(live)), \
+         patch("app.services.audit_service.count_audit_logs", new_callable=AsyncMock, return_value=len(live)), \
+         patch("app.services.audit_service.audit_logs_collection"):
+
+        # Act
+        page = await get_all_logs(skip=6, limit=3)
+
+    # Assert
+    assert [log["_id"] for log in page["logs"]] == [str(archived[0]["_id"])]
+    assert page["next_cursor"] is None
+
+
+@pytest.mark.parametrize(
+    "filters,date_from,date_to,expected",
+    [
+        ({"module": "seller"}, None, None, [1]),
+        ({"performed_by.email": "ops@example.com"}, None, None, [2]),
+        ({}, datetime(2024, 2, 1), datetime(2024, 2, 28), [1]),
+        ({"module": "user"}, datetime(2025, 1, 1), None, []),
+    ],
+    ids=["happy-module", "happy-performer-email", "edge-date-range-one-month", "edge-range-after-archive"],
+)
+def test_archive_query_applies_the_same_filters(archive_dir, filters, date_from, date_to, expected):
+
+    # Arrange
+    docs = [_log(datetime(2024, 1, 10)), _log(datetime(2024, 2, 10), module="seller"),
+            _log(datetime(2024, 3, 10), email="ops@example.com")]
+    for doc in docs:
+        audit_archive_helpers.append_month(archive_dir, audit_archive_helpers.month_of(doc["timestamp"]), [doc])
+    match = audit_archive_helpers.matcher(filters, date_from, date_to)
+
+    # Act
+    found = audit_archive_helpers.query_archive(archive_dir, match, 10, date_from=date_from, date_to=date_to)
+
+    # Assert
+    assert [d["_id"] for d in found] == [docs[i]["_id"] for i in expected]
+    assert audit_archive_helpers.count_archive(archive_dir, filters, date_from, date_to) == len(expected)
+
+
+def test_archive_total_uses_month_counts_without_parsing_months_again(archive_dir):
+
+    # Arrange
+    docs = [_log(datetime(2024, month, 10), module=module) for month in (1, 2, 3) for module in ("user", "seller")]
+    for doc in docs:
+        audit_archive_helpers.append_month(archive_dir, audit_archive_helpers.month_of(doc["timestamp"]), [doc])
+    audit_archive_helpers.append_month(archive_dir, "2024-02", [docs[2]])   # crash replay duplicate
+    audit_archive_helpers._read_month.cache_clear()
+    audit_archive_helpers._month_summary.cache_clear()
+
+    # Act
+    totals = [audit_archive_helpers.count_archive(archive_dir, {"module": "seller"}) for _ in range(3)]
+
+    # Assert
+    assert totals == [3, 3, 3]
+    assert audit_archive_helpers._read_month.cache_info().currsize == 0
+    assert audit_archive_helpers._month_summary.cache_info().misses == 3
@@ -0,0 +1,254 @@
+import time
+import pytest
+from unittest.mock import AsyncMock, patch
+from fastapi import HTTPException
+
+from app.core.auth_cache import TokenCache, BloomFilter
+from app.core.security import create_access_token, verify_token_cached, _token_cache
+from app.deps.roles import get_current_user, require_permission, get_user_permissions
+from app.services.denylist_service import TokenDenylist
+
+
+@pytest.fixture(autouse=True)
+def fresh_auth_state():
+    _token_cache.clear()
+    TokenDenylist._bloom = BloomFilter()
+    TokenDenylist._local_adds = {}
+    yield
+    _token_cache.clear()
+    TokenDenylist._bloom = BloomFilter()
+    TokenDenylist._local_adds = {}
+
+
+def _token(role="user", user_id="507f1f77bcf86cd799439011"):
+    return create_access_token({"_id": user_id, "email": "a@b.c", "role": role, "iss": "Anozon", "aud": "Anozon"})
+
+
+# -------------------------------
+# TokenCache / BloomFilter tests
+# -------------------------------
+
+def test_token_cache_evicts_least_recently_used():
+
+    # Arrange
+    cache = TokenCache(max_size=2)
+    exp = time.time() + 60
+    cache.put("a", {"exp": exp, "n": 1})
+    cache.put("b", {"exp": exp, "n": 2})
+
+    # Act
+    cache.get("a")
+    cache.put("c", {"exp": exp, "n": 3})
+
+    # Assert
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a")["n"] == 1
+    assert cache.get("c")["n"] == 3
+
+
+@pytest.mark.parametrize(
+    "claims,expect_cached",
+    [
+        ({"exp": time.time() + 60}, True),
+        ({"exp": time.time() - 1}, False),
+        ({}, False),
+    ],
+    ids=["happy-live-token", "edge-expired-token", "edge-no-exp"],
+)
+def test_token_cache_honours_exp(claims, expect_cached):
+
+    # Arrange
+    cache = TokenCache()
+
+    # Act
+    cache.put("token", claims)
+
+    # Assert
+    assert (cache.get("token") is not None) is expect_cached
+
+
+def test_bloom_filter_has_no_false_negatives():
+
+    # Arrange
+    bloom = BloomFilter(size_bits=1 << 12)
+    members = [f"jti:{i}" for i in range(200)]
+
+    # Act
+    for m in members:
+        bloom.add(m)
+
+    # Assert
+    assert all(m in bloom for m in members)
+    assert "jti:never-added" not in BloomFilter()
+
+
+# -------------------------------
+# verify_token_cached tests
+# -------------------------------
+
+def test_verify_token_cached_skips_signature_check_on_hit():
+
+    # Arrange
+    token = _token()
+    first = verify_token_cached(token)
+
+    with patch("app.core.security.verify_token") as mock_verify:
+
+        # Act
+        second = verify_token_cached(token)
+
+    # Assert
+    assert second == first
+    assert first["jti"]
+    mock_verify.assert_not_called()
+
+
+def test_verify_token_cached_does_not_cache_failures():
+
+    # Act
+    result = verify_token_cached("not-a-jwt")
+
+    # Assert
+    assert result is None
+    assert len(_token_cache) == 0
+
+
+# -------------------------------
+# TokenDenylist tests
+# -------------------------------
+
+@pytest.mark.asyncio
+async def test_is_revoked_skips_redis_on_bloom_miss():
+
+    # Arrange
+    claims = {"_id": "u1", "jti": "j1", "iat": time.time()}
+
+    with patch("app.services.denylist_service.denylist_helpers.is_jti_denied", new_callable=AsyncMock) as mock_jti, \
+         patch("app.services.denylist_service.denylist_helpers.get_user_cutoff", new_callable=AsyncMock) as mock_cutoff:
+
+        # Act
+        revoked = await TokenDenylist.is_revoked(claims)
+
+    # Assert
+    assert revoked is False
+    mock_jti.assert_not_awaited()
+    mock_cutoff.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_revoke_token_denies_that_jti_only():
+
+    # Arrange
+    with patch("app.services.denylist_service.denylist_helpers.add_jti", new_callable=AsyncMock), \
+         patch("app.services.denylist_service.denylist_helpers.is_jti_denied", new_callable=AsyncMock, return_value=True):
+        await TokenDenylist.revoke_token("j1", time.time() + 60)
+
+        # Act
+        revoked = await TokenDenylist.is_revoked({"_id": "u1", "jti": "j1"})
+        other = await TokenDenylist.is_revoked({"_id": "u1", "jti": "j2"})
+
+    # Assert
+    assert revoked is True
+    assert other is False
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "iat_offset,expected",
+    [(-5, True), (5, False)],
+    ids=["happy-token-issued-before-cutoff", "edge-token-issued-after-cutoff"],
+)
+async def test_revoke_user_uses_issued_at_cutoff(iat_offset, expected):
+
+    # Arrange
+    cutoff = time.time()
+    with patch("app.services.denylist_service.denylist_helpers.add_user_cutoff", new_callable=AsyncMock):
+        await TokenDenylist.revoke_user("u1")
+
+    with patch("app.services.denylist_service.denylist_helpers.get_user_cutoff", new_callable=AsyncMock, return_value=cutoff):
+
+        # Act
+        revoked = await TokenDenylist.is_revoked({"_id": "u1", "jti": "j1", "iat": cutoff + iat_offset})
+
+    # Assert
+    assert revoked is expected
+
+
+@pytest.mark.asyncio
+async def test_is_revoked_fails_closed_when_redis_is_down():
+
+    # Arrange
+    TokenDenylist._bloom.add("jti:j1")
+
+    with patch("app.services.denylist_service.denylist_helpers.is_jti_denied", new_callable=AsyncMock, side_effect=AttributeError):
+
+        # Act
+        revoked = await TokenDenylist.is_revoked({"_id": "u1", "jti": "j1"})
+
+    # Assert
+    assert revoked is True
+
+
+@pytest.mark.asyncio
+async def test_sync_rebuilds_bloom_and_keeps_recent_local_revocations():
+
+    # Arrange
+    TokenDenylist._add_local("jti:local")
+    TokenDenylist._bloom.add("jti:stale")
+
+    with patch("app.services.denylist_service.denylist_helpers.get_active_entries", new_callable=AsyncMock, return_value=["user:u9"]):
+
+        # Act
+        await TokenDenylist.sync()
+
+    # Assert
+    assert "user:u9" in TokenDenylist._bloom
+    assert "jti:local" in TokenDenylist._bloom
+    assert "jti:stale" not in TokenDenylist._bloom
+
+
+# -------------------------------
+# get_current_user / permission tests
+# -------------------------------
+
+@pytest.mark.asyncio
+async def test_get_current_user_rejects_revoked_token():
+
+    # Arrange
+    token = _token()
+
+    with patch("app.deps.roles.TokenDenylist.is_revoked", new_callable=AsyncMock, return_value=True):
+
+        # Act
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user(token)
+
+    # Assert
+    assert exc_info.value.status_code == 401
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "role,permission,allowed",
+    [
+        ("admin", "user:ban", True),
+        ("seller", "user:ban", False),
+        ("ghost", "product:read", False),
+    ],
+    ids=["happy-admin-has-permission", "error-seller-lacks-permission", "edge-unknown-role"],
+)
+async def test_require_permission_checks_precomputed_roles(role, permission, allowed):
+
+    # Arrange
+    current_user = await get_current_user(_token(role=role))
+    checker = require_permission(permission)
+
+    # Act / Assert
+    if allowed:
+        assert await checker(current_user) == current_user
+    else:
+        with pytest.raises(HTTPException) as exc_info:
+            await checker(current_user)
+        assert exc_info.value.status_code == 403
+    assert isinstance(get_user_permissions(role), frozenset)
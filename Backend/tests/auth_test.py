@@ -144,7 +144,7 @@ async def test_generate_tokens_happy(user_id, email, role):
             "iat": 1234567890,
         }
         mock_access.assert_called_once_with(expected_payload)
-        mock_refresh.assert_called_once_with(expected_payload)
+        mock_refresh.assert_called_once_with(user_id=str(user_id))
 
 
 @pytest.mark.parametrize(
@@ -185,7 +185,7 @@ async def test_generate_tokens_edge_cases(user_id, email, role):
             "iat": 0,
         }
         mock_access.assert_called_once_with(expected_payload)
-        mock_refresh.assert_called_once_with(expected_payload)
+        mock_refresh.assert_called_once_with(user_id=str(user_id))
 
 
 @pytest.mark.asyncio
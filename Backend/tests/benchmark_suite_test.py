@@ -0,0 +1,57 @@
+import pytest
+
+from benchmarks.dataset import generate
+from benchmarks.suite import compare, summarize
+
+
+def _results(p95=10.0, rps=100.0, error_rate=0.0):
+    return {"scenarios": {"listing": {"p95_ms": p95, "throughput_rps": rps, "error_rate": error_rate}}}
+
+
+# -------------------------------
+# Dataset tests
+# -------------------------------
+
+def test_dataset_is_deterministic_and_consistent():
+
+    # Act
+    first, second = generate("tiny", seed=7), generate("tiny", seed=7)
+
+    # Assert
+    assert first.product_ids == second.product_ids
+    assert first.collections["Orders"][0] == second.collections["Orders"][0]
+    for product in first.collections["Products"]:
+        assert product["review_count"] == sum(product["rating_histogram"].values())
+    assert generate("tiny", seed=8).product_ids != first.product_ids
+
+
+# -------------------------------
+# Regression gate tests
+# -------------------------------
+
+@pytest.mark.parametrize(
+    "current,problems",
+    [
+        (_results(p95=11.0, rps=95.0), 0),
+        (_results(p95=13.0, rps=80.0), 2),
+        (_results(error_rate=0.05), 1),
+    ],
+    ids=["happy-within-threshold", "error-slower-and-fewer-requests", "edge-errors-fail-without-slowdown"],
+)
+def test_compare_against_baseline(current, problems):
+
+    # Act
+    found = compare(current, _results(), threshold=0.15)
+
+    # Assert
+    assert len(found) == problems
+
+
+def test_summarize_percentiles():
+
+    # Act
+    summary = summarize([float(ms) for ms in range(1, 101)], errors=2, elapsed=2.0)
+
+    # Assert
+    assert (summary["p50_ms"], summary["p95_ms"], summary["p99_ms"]) == (50.5, 95.05, 99.01)
+    assert summary["throughput_rps"] == 50.0 and summary["error_rate"] == 0.02
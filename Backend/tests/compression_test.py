@@ -0,0 +1,186 @@
+import gzip
+import json
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, negotiate, precompress, variant_response
+from app.core.config import settings
+from app.services.landing_service import LANDING_CACHE_KEY, LandingService
+
+PAYLOAD = {"products": [{"name": f"Product {i}", "price": i * 10, "category": "Electronics"} for i in range(200)]}
+
+
+def _client():
+    app = FastAPI()
+
+    @app.get("/big")
+    async def big():
+        return PAYLOAD
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/image")
+    async def image():
+        return Response(b"\x89PNG" * 1000, media_type="image/png")
+
+    @app.get("/stream")
+    async def stream():
+        return StreamingResponse((b"x" * 2000 for _ in range(3)), media_type="text/plain")
+
+    @app.get("/no-transform")
+    async def no_transform():
+        return PlainTextResponse("y" * 5000, headers={"Cache-Control": "no-transform"})
+
+    app.add_middleware(CompressionMiddleware)
+    return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def gzip_only(monkeypatch):
+    monkeypatch.setattr(settings, "COMPRESSION_ENCODINGS", "gzip")
+    monkeypatch.setattr(settings, "COMPRESSION_MIN_BYTES", 1024)
+
+
+# -------------------------------
+# Negotiation tests
+# -------------------------------
+
+@pytest.mark.parametrize(
+    "accept,expected",
+    [
+        ("gzip, deflate, br, zstd", "zstd"),
+        ("gzip;q=1.0, br;q=0.5", "gzip"),
+        ("identity", None),
+        ("*;q=0.1, zstd;q=0", "br"),
+    ],
+    ids=["happy-server-preference-wins-ties", "happy-client-quality-wins", "error-nothing-acceptable",
+         "edge-wildcard-with-refused-encoding"],
+)
+def test_negotiate(accept, expected):
+
+    # Act / Assert
+    assert negotiate(accept, ("zstd", "br", "gzip")) == expected
+
+
+# -------------------------------
+# Middleware tests
+# -------------------------------
+
+def test_large_json_is_gzipped():
+
+    # Act
+    response = _client().get("/big", headers={"Accept-Encoding": "gzip"})
+
+    # Assert
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(json.dumps(PAYLOAD)) / 4
+    assert response.json() == PAYLOAD   # the test client decodes gzip
+
+
+@pytest.mark.parametrize(
+    "path,accept",
+    [
+        ("/small", "gzip"),
+        ("/image", "gzip"),
+        ("/stream", "gzip"),
+        ("/no-transform", "gzip"),
+        ("/big", "br"),
+    ],
+    ids=["edge-below-min-size", "edge-type-not-allowlisted", "edge-streamed-response", "edge-no-transform",
+         "error-client-accepts-no-enabled-encoding"],
+)
+def test_responses_left_uncompressed(path, accept):
+
+    # Act
+    response = _client().get(path, headers={"Accept-Encoding": accept})
+
+    # Assert
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+
+
+# -------------------------------
+# Precompressed landing cache tests
+# -------------------------------
+
+def test_variant_response_picks_stored_encoding():
+
+    # Arrange
+    variants = precompress(json.dumps(PAYLOAD).encode())
+
+    # Act
+    gzipped = variant_response(variants, "gzip, br")
+    plain = variant_response(variants, "")
+
+    # Assert
+    assert gzipped.headers["content-encoding"] == "gzip" and gzip.decompress(gzipped.body) == variants["identity"]
+    assert "content-encoding" not in plain.headers and plain.body == variants["identity"]
+
+
+@pytest.mark.asyncio
+async def test_landing_cache_hit_serves_stored_variants_without_rebuilding():
+
+    # Arrange
+    stored = {b"identity": b"{}", b"gzip": gzip.compress(b"{}")}
+    redis = MagicMock()
+    redis.execute_command = AsyncMock(return_value=stored)
+
+    # Act
+    with patch("app.services.landing_service.redis_db.redis_client", redis), \
+         patch.object(LandingService, "build_landing_page", new_callable=AsyncMock) as build:
+        variants = await LandingService.get_landing_variants()
+
+    # Assert
+    assert variants == {"identity": b"{}", "gzip": stored[b"gzip"]}
+    redis.execute_command.assert_awaited_once_with("HGETALL", LANDING_CACHE_KEY, NEVER_DECODE=True)
+    build.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_landing_cache_miss_stores_precompressed_variants():
+
+    # Arrange
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    redis = MagicMock()
+    redis.execute_command = AsyncMock(return_value={})
+    redis.pipeline.return_value.__aenter__ = AsyncMock(return_value=pipe)
+    redis.pipeline.return_value.__aexit__ = AsyncMock(return_value=False)
+
+    # Act
+    with patch("app.services.landing_service.redis_db.redis_client", redis), \
+         patch.object(LandingService, "build_landing_page", new_callable=AsyncMock, return_value=PAYLOAD):
+        variants = await LandingService.get_landing_variants()
+
+    # Assert
+    assert json.loads(gzip.decompress(variants["gzip"])) == PAYLOAD
+    pipe.hset.assert_called_once_with(LANDING_CACHE_KEY, mapping=variants)
+    pipe.expire.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_landing_body_matches_fastapi_json_encoding():
+
+    # Arrange
+    page = {"banners": [{"title": "Sale", "created_at": datetime(2025, 1, 2, 3, 4, 5)}]}
+    redis = MagicMock()
+    redis.execute_command = AsyncMock(return_value={})
+    redis.pipeline.return_value.__aenter__ = AsyncMock(return_value=MagicMock(execute=AsyncMock()))
+    redis.pipeline.return_value.__aexit__ = AsyncMock(return_value=False)
+
+    # Act
+    with patch("app.services.landing_service.redis_db.redis_client", redis), \
+         patch.object(LandingService, "build_landing_page", new_callable=AsyncMock, return_value=page):
+        variants = await LandingService.get_landing_variants()
+
+    # Assert
+    assert variants["identity"] == JSONResponse(jsonable_encoder(page)).body
+    assert json.loads(variants["identity"])["banners"][0]["created_at"] == "2025-01-02T03:04:05"
@@ -0,0 +1,199 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from collections import Counter, defaultdict
+from bson import ObjectId
+
+from app.db import redis as redis_db
+from app.repo.counter_helpers import (
+    claim_counter_batch, apply_counter_deltas, incr_pending_counter, release_counter_batch,
+    APPLIED_BATCHES_KEPT, BATCH_FIELD, FLUSHING_KEY,
+)
+from app.services.counter_service import ProductCounters
+
+
+PRODUCT_ID = str(ObjectId())
+
+
+@pytest.fixture(autouse=True)
+def reset_local_buffer():
+    ProductCounters._local = defaultdict(Counter)
+    yield
+    ProductCounters._local = defaultdict(Counter)
+
+
+# -------------------------------
+# counter_helpers tests
+# -------------------------------
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "raw,expected",
+    [
+        ([BATCH_FIELD, "b1", PRODUCT_ID, "3"], ("b1", {PRODUCT_ID: 3})),
+        ([BATCH_FIELD, "old", PRODUCT_ID, "2"], ("old", {PRODUCT_ID: 2})),
+        ([], (None, {})),
+    ],
+    ids=[
+        "happy-new-batch",
+        "edge-replays-in-flight-batch",
+        "edge-nothing-pending",
+    ],
+)
+async def test_claim_counter_batch_parses_script_result(raw, expected):
+
+    # Arrange
+    script = AsyncMock(return_value=raw)
+    mock_redis = MagicMock()
+    mock_redis.register_script.return_value = script
+
+    with patch("app.repo.counter_helpers.redis_db.redis_client", mock_redis):
+
+        # Act
+        result = await claim_counter_batch("view_count", "b1")
+
+    # Assert
+    assert result == expected
+
+
+@pytest.mark.asyncio
+async def test_apply_counter_deltas_guards_updates_with_batch_id():
+
+    # Arrange
+    collection = AsyncMock()
+    collection.bulk_write.return_value = MagicMock(modified_count=1)
+
+    # Act
+    modified = await apply_counter_deltas(collection, "view_count", {PRODUCT_ID: 5, "bad-id": 1}, batch_id="b1")
+
+    # Assert
+    assert modified == 1
+    ops = collection.bulk_write.await_args.args[0]
+    assert len(ops) == 1
+    assert ops[0]._filter == {"_id": ObjectId(PRODUCT_ID), "counter_batches.view_count": {"$nin": ["b1"]}}
+    stage = ops[0]._doc[0]["$set"]
+    assert stage["view_count"] == {"$add": [{"$ifNull": ["$view_count", 0]}, 5]}
+    applied, keep = stage["counter_batches.view_count"]["$slice"]
+    assert applied["$concatArrays"][1] == [{"$literal": "b1"}]
+    assert keep == -APPLIED_BATCHES_KEPT   # older batch ids stay, so a late replay of any of them is skipped
+
+
+@pytest.mark.asyncio
+async def test_apply_counter_deltas_without_batch_is_plain_inc():
+
+    # Arrange
+    collection = AsyncMock()
+    collection.bulk_write.return_value = MagicMock(modified_count=1)
+
+    # Act
+    await apply_counter_deltas(collection, "view_count", {PRODUCT_ID: 2})
+
+    # Assert
+    op = collection.bulk_write.await_args.args[0][0]
+    assert op._filter == {"_id": ObjectId(PRODUCT_ID)}
+    assert op._doc == {"$inc": {"view_count": 2}}
+
+
+# -------------------------------
+# ProductCounters tests
+# -------------------------------
+
+@pytest.mark.asyncio
+async def test_incr_buffers_in_process_when_redis_fails():
+
+    # Arrange
+    with patch("app.services.counter_service.incr_pending_counter", new_callable=AsyncMock, side_effect=ConnectionError("down")):
+
+        # Act
+        await ProductCounters.incr("view_count", PRODUCT_ID)
+        await ProductCounters.incr("view_count", PRODUCT_ID)
+
+    # Assert
+    assert ProductCounters._local["view_count"][PRODUCT_ID] == 2
+
+
+@pytest.mark.asyncio
+async def test_incr_rejects_unknown_field():
+
+    # Act / Assert
+    with pytest.raises(ValueError):
+        await ProductCounters.incr("price", PRODUCT_ID)
+
+
+@pytest.mark.asyncio
+async def test_flush_applies_batch_then_releases_it():
+
+    # Arrange
+    claims = {"view_count": ("b1", {PRODUCT_ID: 4}), "product_likes": (None, {})}
+
+    async def fake_claim(field, batch_id):
+        return claims[field]
+
+    with patch("app.services.counter_service.claim_counter_batch", side_effect=fake_claim), \
+         patch("app.services.counter_service.products_collection", return_value=MagicMock()), \
+         patch("app.services.counter_service.apply_counter_deltas", new_callable=AsyncMock, return_value=1) as mock_apply, \
+         patch("app.services.counter_service.release_counter_batch", new_callable=AsyncMock) as mock_release:
+
+        # Act
+        modified = await ProductCounters.flush()
+
+    # Assert
+    assert modified == 1
+    assert mock_apply.await_args.args[1:] == ("view_count", {PRODUCT_ID: 4}, "b1")
+    mock_release.assert_awaited_once_with("view_count", "b1")
+
+
+@pytest.mark.asyncio
+async def test_flush_keeps_batch_for_retry_when_mongo_fails():
+
+    # Arrange
+    ProductCounters._local["product_likes"][PRODUCT_ID] = 1
+
+    with patch("app.services.counter_service.claim_counter_batch", new_callable=AsyncMock, return_value=("b1", {PRODUCT_ID: 4})), \
+         patch("app.services.counter_service.products_collection", return_value=MagicMock()), \
+         patch("app.services.counter_service.apply_counter_deltas", new_callable=AsyncMock, side_effect=Exception("down")), \
+         patch("app.services.counter_service.release_counter_batch", new_callable=AsyncMock) as mock_release:
+
+        # Act
+        modified = await ProductCounters.flush()
+
+    # Assert
+    assert modified == 0
+    mock_release.assert_not_awaited()
+    assert ProductCounters._local["product_likes"][PRODUCT_ID] == 1
+
+
+# -------------------------------
+# Multi-worker batch tests (Lua scripts run against fakeredis)
+# -------------------------------
+
+@pytest.fixture
+def fake_redis():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    previous = redis_db.redis_client
+    redis_db.redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    yield redis_db.redis_client
+    redis_db.redis_client = previous
+
+
+@pytest.mark.asyncio
+async def test_slow_worker_release_keeps_newer_batch(fake_redis):
+
+    # Arrange: workers 1 and 2 both claim in-flight batch A; worker 2 applies and releases it
+    await incr_pending_counter("view_count", PRODUCT_ID, 3)
+    batch_a, _ = await claim_counter_batch("view_count", "A")
+    assert (await claim_counter_batch("view_count", "ignored"))[0] == batch_a == "A"
+    assert await release_counter_batch("view_count", "A") is True
+
+    # ...new views arrive and a later flush claims them as batch B
+    await incr_pending_counter("view_count", PRODUCT_ID, 5)
+    batch_b, deltas_b = await claim_counter_batch("view_count", "B")
+
+    # Act: worker 1 finally finishes A
+    released = await release_counter_batch("view_count", "A")
+
+    # Assert
+    assert released is False
+    assert (batch_b, deltas_b) == ("B", {PRODUCT_ID: 5})
+    assert await fake_redis.hget(FLUSHING_KEY.format(field="view_count"), BATCH_FIELD) == "B"
+    assert await claim_counter_batch("view_count", "C") == ("B", {PRODUCT_ID: 5})
@@ -0,0 +1,171 @@
+import json
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.db import redis as redis_db
+from app.repo import email_queue_helpers
+from app.services.email_queue import EmailQueue, retry_delay
+from app.utils.email import FakeEmailProvider, render_email, send_otp_email, set_email_provider
+
+# Stream + Lua operations run for real against fakeredis
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+
+@pytest.fixture
+def fake_redis():
+    previous = redis_db.redis_client
+    redis_db.redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    yield redis_db.redis_client
+    redis_db.redis_client = previous
+
+
+@pytest.fixture
+def provider():
+    fake = FakeEmailProvider()
+    set_email_provider(fake)
+    yield fake
+    set_email_provider(None)
+
+
+async def _drain(consumer="test-0"):
+    await email_queue_helpers.ensure_group()
+    return await EmailQueue.drain_once(consumer, block_ms=10)
+
+
+# -------------------------------
+# Template tests
+# -------------------------------
+
+def test_render_email_substitutes_and_escapes_params():
+
+    # Act
+    message = render_email("otp", "a@b.c", {"otp": "<b>123456</b>"})
+
+    # Assert
+    assert message.subject == "Verify Your Email"
+    assert "&lt;b&gt;123456&lt;/b&gt;" in message.html
+    assert "Anozon Team" in message.html
+
+
+# -------------------------------
+# Queue tests
+# -------------------------------
+
+@pytest.mark.asyncio
+async def test_send_otp_email_is_queued_then_delivered_in_one_batch(fake_redis, provider):
+
+    # Arrange
+    for i in range(3):
+        assert await send_otp_email(f"user{i}@example.com", f"10000{i}") is True
+    assert provider.sent == []
+
+    # Act
+    sent = await _drain()
+
+    # Assert
+    assert sent == 3
+    assert provider.calls == 1
+    assert [m.to for m in provider.sent] == ["user0@example.com", "user1@example.com", "user2@example.com"]
+    assert await fake_redis.xlen(email_queue_helpers.JOBS_STREAM) == 0
+
+
+@pytest.mark.asyncio
+async def test_enqueue_drops_duplicates_within_ttl(fake_redis, provider):
+
+    # Arrange
+    await EmailQueue.enqueue("otp", "a@b.c", {"otp": "123456"})
+    await EmailQueue.enqueue("otp", "a@b.c", {"otp": "123456"})
+    await EmailQueue.enqueue("otp", "a@b.c", {"otp": "654321"})
+
+    # Act
+    sent = await _drain()
+
+    # Assert
+    assert sent == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_with_backoff(fake_redis, provider):
+
+    # Arrange
+    provider.fail_times = 1
+    await EmailQueue.enqueue("otp", "a@b.c", {"otp": "123456"})
+
+    # Act
+    first = await _drain()
+    retry = json.loads((await fake_redis.zrange(email_queue_helpers.RETRY_KEY, 0, -1))[0])
+    await fake_redis.zadd(email_queue_helpers.RETRY_KEY, {json.dumps(retry): 0}, xx=True)   # make it due now
+    second = await _drain()
+
+    # Assert
+    assert first == 0
+    assert retry["attempts"] == 1
+    assert second == 1
+    assert provider.sent[0].to == "a@b.c"
+
+
+@pytest.mark.asyncio
+async def test_failing_message_does_not_fail_the_rest_of_its_batch(fake_redis, provider):
+
+    # Arrange
+    provider.reject = {"bad@example.com"}
+    for to in ("a@example.com", "bad@example.com", "c@example.com"):
+        await EmailQueue.enqueue("otp", to, {"otp": "123456"})
+
+    # Act
+    sent = await _drain()
+
+    # Assert
+    retries = [json.loads(job) for job in await fake_redis.zrange(email_queue_helpers.RETRY_KEY, 0, -1)]
+    assert sent == 2
+    assert sorted(m.to for m in provider.sent) == ["a@example.com", "c@example.com"]
+    assert [(job["to"], job["attempts"]) for job in retries] == [("bad@example.com", 1)]
+    assert provider.calls == 4   # the batch, then one call per message
+
+
+@pytest.mark.asyncio
+async def test_job_is_dead_lettered_after_max_attempts(fake_redis, provider):
+
+    # Arrange
+    provider.fail_times = 1
+    await EmailQueue.enqueue("otp", "a@b.c", {"otp": "123456"})
+
+    with patch("app.services.email_queue.settings.EMAIL_MAX_ATTEMPTS", 1):
+
+        # Act
+        await _drain()
+
+    # Assert
+    dead = [json.loads(job) for job in await fake_redis.lrange(email_queue_helpers.DEAD_KEY, 0, -1)]
+    assert [job["to"] for job in dead] == ["a@b.c"]
+    assert await fake_redis.zcard(email_queue_helpers.RETRY_KEY) == 0
+
+
+@pytest.mark.asyncio
+async def test_enqueue_sends_inline_when_redis_is_unavailable(provider):
+
+    # Arrange
+    with patch("app.services.email_queue.email_queue_helpers.enqueue_job", new_callable=AsyncMock,
+               side_effect=AttributeError("redis_client is None")):
+
+        # Act
+        result = await EmailQueue.enqueue("forget_password", "a@b.c", {"token": "tok"})
+
+    # Assert
+    assert result is True
+    assert "reset-password?token=tok" in provider.sent[0].html
+
+
+@pytest.mark.parametrize(
+    "attempts,low,high",
+    [(1, 1.6, 2.4), (3, 6.4, 9.6), (20, 240, 360)],
+    ids=["happy-first-retry", "happy-third-retry", "edge-capped"],
+)
+def test_retry_delay_grows_exponentially_with_jitter(attempts, low, high):
+
+    # Act
+    delay = retry_delay(attempts)
+
+    # Assert
+    assert low <= delay <= high
@@ -0,0 +1,148 @@
+import io
+import json
+import logging
+import queue
+import pytest
+
+from app.core import logger as app_logging
+from app.core.config import settings
+from app.core.logger import (
+    LOG_STATS, NonBlockingQueueHandler, SamplingFilter, configure_logging, parse_sampling, shutdown_logging,
+)
+from app.core.tracing import request_id_var
+
+
+@pytest.fixture
+def output(monkeypatch):
+    monkeypatch.setattr(settings, "LOG_FORMAT", "json")
+    monkeypatch.setattr(settings, "LOG_SAMPLING", "")
+    shutdown_logging()
+    stream = io.StringIO()
+
+    def lines():
+        shutdown_logging()   # drains the queue
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    configure_logging(stream)
+    yield lines
+    shutdown_logging()
+
+
+def _record(name, level=logging.INFO):
+    return logging.LogRecord(name, level, __file__, 1, "msg", None, None)
+
+
+# -------------------------------
+# Pipeline tests
+# -------------------------------
+
+def test_app_records_are_written_as_json_lines(output):
+
+    # Arrange
+    token = request_id_var.set("req-42")
+    log = logging.getLogger("app.services.cart_test")
+
+    # Act
+    log.info("Product %s added to cart for user %s", "p1", "u1")
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        log.exception("Checkout failed")
+    request_id_var.reset(token)
+
+    # Assert
+    info, error = output()
+    assert info["message"] == "Product p1 added to cart for user u1"
+    assert info["request_id"] == "req-42" and info["logger"] == "app.services.cart_test"
+    assert error["level"] == "ERROR" and "ValueError: boom" in error["exc"]
+
+
+def test_uvicorn_loggers_share_the_queue_and_get_their_handlers_back(output):
+
+    # Arrange
+    access = logging.getLogger("uvicorn.access")
+
+    # Act
+    access.warning("%s - GET %s", "127.0.0.1", "/products")
+
+    # Assert
+    assert output()[0]["message"] == "127.0.0.1 - GET /products"
+    assert not any(isinstance(h, NonBlockingQueueHandler) for h in access.handlers)
+
+
+def test_message_is_built_when_logged_not_when_written():
+
+    # Arrange
+    handler = NonBlockingQueueHandler(queue.Queue())
+    items = ["a"]
+    record = logging.LogRecord("app.x", logging.INFO, __file__, 1, "items %s", (items,), None)
+
+    # Act
+    handler.handle(record)
+    items.append("b")   # mutated after the call returned, before the listener runs
+
+    # Assert
+    assert handler.queue.get_nowait().getMessage() == "items ['a']"
+
+
+def test_full_queue_drops_instead_of_blocking():
+
+    # Arrange
+    handler = NonBlockingQueueHandler(queue.Queue(1))
+    before = LOG_STATS["dropped"]
+
+    # Act
+    for _ in range(3):
+        handler.handle(_record("app.x"))
+
+    # Assert
+    assert LOG_STATS["dropped"] - before == 2
+
+
+# -------------------------------
+# Sampling tests
+# -------------------------------
+
+@pytest.mark.parametrize(
+    "name,level,rate",
+    [
+        ("app.services.product_service", logging.INFO, 0.0),
+        ("app.services.product_service.sub", logging.DEBUG, 0.0),
+        ("app.services.product_service", logging.WARNING, 1.0),
+        ("app.services.product_service_v2", logging.INFO, 1.0),
+        ("app.services", logging.INFO, 0.5),
+    ],
+    ids=["happy-module-sampled", "happy-child-logger-inherits", "edge-warnings-always-kept",
+         "edge-prefix-must-match-a-whole-name", "happy-longest-prefix-wins"],
+)
+def test_sampling_filter(monkeypatch, name, level, rate):
+
+    # Arrange
+    sampler = SamplingFilter({"app.services": 0.5, "app.services.product_service": 0.0})
+    monkeypatch.setattr(app_logging.random, "random", lambda: 0.49)
+
+    # Act
+    kept = sampler.filter(_record(name, level))
+
+    # Assert
+    assert kept == (rate > 0.49)
+
+
+@pytest.mark.parametrize(
+    "spec,expected",
+    [
+        ("app.services.product_service=0.1, uvicorn.access=0", {"app.services.product_service": 0.1, "uvicorn.access": 0.0}),
+        ("", {}),
+        ("app.services=2", ValueError),
+        ("app.services", ValueError),
+    ],
+    ids=["happy-two-entries", "edge-empty", "error-rate-above-one", "error-missing-rate"],
+)
+def test_parse_sampling(spec, expected):
+
+    # Act / Assert
+    if expected is ValueError:
+        with pytest.raises(ValueError):
+            parse_sampling(spec)
+    else:
+        assert parse_sampling(spec) == expected
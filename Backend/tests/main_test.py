@@ -18,7 +18,7 @@ async def test_lifespan_calls_startup_and_shutdown_functions():
     # Arrange
     with patch("app.main.connect_to_mongo", new_callable=AsyncMock) as mock_connect_mongo, \
          patch("app.main.connect_redis", new_callable=AsyncMock) as mock_connect_redis, \
-         patch("app.main.create_indexes", new_callable=AsyncMock) as mock_create_indexes, \
+         patch("app.main.ensure_schema", new_callable=AsyncMock) as mock_ensure_schema, \
          patch("app.main.close_mongo_connection", new_callable=AsyncMock) as mock_close_mongo, \
          patch("app.main.close_redis", new_callable=AsyncMock) as mock_close_redis:
 
@@ -28,7 +28,7 @@ async def test_lifespan_calls_startup_and_shutdown_functions():
             # Inside lifespan context (startup completed, shutdown not yet)
             mock_connect_mongo.assert_awaited_once()
             mock_connect_redis.assert_awaited_once()
-            mock_create_indexes.assert_awaited_once()
+            mock_ensure_schema.assert_awaited_once()
             mock_close_mongo.assert_not_awaited()
             mock_close_redis.assert_not_awaited()
 
@@ -57,7 +57,7 @@ async def test_lifespan_error_paths(startup_side_effect, shutdown_side_effect, e
     # Arrange
     with patch("app.main.connect_to_mongo", new_callable=AsyncMock) as mock_connect_mongo, \
          patch("app.main.connect_redis", new_callable=AsyncMock) as mock_connect_redis, \
-         patch("app.main.create_indexes", new_callable=AsyncMock) as mock_create_indexes, \
+         patch("app.main.ensure_schema", new_callable=AsyncMock) as mock_ensure_schema, \
          patch("app.main.close_mongo_connection", new_callable=AsyncMock) as mock_close_mongo, \
          patch("app.main.close_redis", new_callable=AsyncMock) as mock_close_redis:
 
@@ -86,7 +86,7 @@ async def test_lifespan_error_paths(startup_side_effect, shutdown_side_effect, e
         else:
             mock_connect_mongo.assert_awaited_once()
             mock_connect_redis.assert_awaited_once()
-            mock_create_indexes.assert_awaited_once()
+            mock_ensure_schema.assert_awaited_once()
             mock_close_mongo.assert_awaited_once()
 
 
@@ -251,6 +251,5 @@ def test_unhandled_exception_triggers_global_exception_handler():
     
     # Assert
     assert response.status_code == 500
-    assert response.json() == {
-        "message": "Internal Server Error. Our team has been notified."
-    }
+    assert response.json()["message"] == "Internal Server Error. Our team has been notified."
+    assert "request_id" in response.json()
@@ -0,0 +1,182 @@
+import asyncio
+import time
+import pytest
+from types import SimpleNamespace
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY, Counter
+
+from app.core.metrics import LoopLagMonitor, MetricsMiddleware, StatsExporter, metrics_response
+from app.db.mongodb import CommandLatencyListener
+from app.services import rate_limit_service
+
+
+def _sample(name, labels=None):
+    return REGISTRY.get_sample_value(name, labels or {}) or 0
+
+
+def _client():
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str):
+        if item_id == "missing":
+            raise HTTPException(status_code=404)
+        return {"id": item_id}
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    app.add_api_route("/metrics", metrics_response, methods=["GET"])
+    app.add_middleware(MetricsMiddleware)
+    return TestClient(app, raise_server_exceptions=False)
+
+
+# -------------------------------
+# Middleware tests
+# -------------------------------
+
+@pytest.mark.parametrize(
+    "paths,route,status",
+    [
+        (["/items/1", "/items/2", "/items/3"], "/items/{item_id}", "200"),
+        (["/items/missing"], "/items/{item_id}", "404"),
+        (["/nope/1", "/nope/2"], "unmatched", "404"),
+        (["/boom"], "/boom", "500"),
+    ],
+    ids=["happy-template-label", "error-handled-404", "edge-unmatched-paths-share-label", "error-unhandled-exception"],
+)
+def test_requests_are_counted_by_route_template(paths, route, status):
+
+    # Arrange
+    client = _client()
+    labels = {"method": "GET", "route": route, "status": status}
+    before = _sample("http_requests_total", labels)
+
+    # Act
+    for path in paths:
+        client.get(path)
+
+    # Assert
+    assert _sample("http_requests_total", labels) - before == len(paths)
+    if route != paths[0]:   # the raw URL never becomes a label
+        assert _sample("http_requests_total", {"method": "GET", "route": paths[0], "status": status}) == 0
+
+
+def test_metrics_endpoint_exports_module_stats():
+
+    # Arrange
+    rate_limit_service.THROTTLED["metrics_test"] += 2
+
+    # Act
+    body = _client().get("/metrics").text
+
+    # Assert
+    assert 'rate_limit_throttled_total{scope="metrics_test"} 2.0' in body
+    assert "http_request_duration_seconds_bucket" in body
+
+
+def test_stats_exporter_advances_counters_by_the_change_since_last_sync():
+
+    # Arrange
+    rate_limit_service.FAIL_OPEN["metrics_sync_test"] += 3
+    StatsExporter.sync()
+    rate_limit_service.FAIL_OPEN["metrics_sync_test"] += 2
+
+    # Act
+    StatsExporter.sync()
+    StatsExporter.sync()
+
+    # Assert
+    assert _sample("rate_limit_fail_open_total", {"scope": "metrics_sync_test"}) == 5
+    assert isinstance(StatsExporter._metrics["rate_limit_fail_open"], Counter)   # aggregated by multiprocess mode
+
+
+# -------------------------------
+# Mongo / Redis / loop lag tests
+# -------------------------------
+
+def test_mongo_listener_labels_by_collection_and_command():
+
+    # Arrange
+    listener = CommandLatencyListener()
+    labels = {"collection": "Products", "command": "find"}
+    before = _sample("mongo_command_duration_seconds_count", labels)
+    get_more_before = _sample("mongo_command_duration_seconds_count", {"collection": "Products", "command": "getMore"})
+
+    # Act
+    listener.started(SimpleNamespace(command_name="find", database_name="anozon", command={"find": "Products"},
+                                     request_id=1, connection_id=("h", 1)))
+    listener.succeeded(SimpleNamespace(command_name="find", duration_micros=1500, request_id=1, connection_id=("h", 1)))
+    listener.started(SimpleNamespace(command_name="getMore", database_name="anozon", command={"getMore": 99, "collection": "Products"},
+                                     request_id=2, connection_id=("h", 1)))
+    listener.succeeded(SimpleNamespace(command_name="getMore", duration_micros=200, request_id=2, connection_id=("h", 1)))
+
+    # Assert
+    assert _sample("mongo_command_duration_seconds_count", labels) - before == 1
+    assert _sample("mongo_command_duration_seconds_count", {"collection": "Products", "command": "getMore"}) - get_more_before == 1
+    assert listener._pending == {}
+
+
+@pytest.mark.asyncio
+async def test_redis_commands_are_timed():
+
+    # Arrange
+    pytest.importorskip("fakeredis")
+    from fakeredis import FakeServer
+    from fakeredis.aioredis import FakeConnection
+    from redis.asyncio import ConnectionPool
+    from app.db.redis import InstrumentedRedis
+
+    client = InstrumentedRedis(connection_pool=ConnectionPool(connection_class=FakeConnection, server=FakeServer()))
+    before = _sample("redis_command_duration_seconds_count", {"command": "SET"})
+
+    # Act
+    await client.set("k", "v")
+    value = await client.get("k")
+
+    # Assert
+    assert value == b"v"
+    assert _sample("redis_command_duration_seconds_count", {"command": "SET"}) - before == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_pipelines_are_timed_per_round_trip():
+
+    # Arrange
+    pytest.importorskip("fakeredis")
+    from fakeredis import FakeServer
+    from fakeredis.aioredis import FakeConnection
+    from redis.asyncio import ConnectionPool
+    from app.db.redis import InstrumentedRedis
+
+    client = InstrumentedRedis(connection_pool=ConnectionPool(connection_class=FakeConnection, server=FakeServer()))
+    before = _sample("redis_command_duration_seconds_count", {"command": "PIPELINE"})
+
+    # Act
+    async with client.pipeline(transaction=False) as pipe:
+        pipe.set("k", "v")
+        pipe.get("k")
+        results = await pipe.execute()
+
+    # Assert
+    assert results == [True, b"v"]
+    assert _sample("redis_command_duration_seconds_count", {"command": "PIPELINE"}) - before == 1
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_monitor_sees_a_blocked_loop():
+
+    # Arrange
+    before_sum = _sample("event_loop_lag_seconds_sum")
+    LoopLagMonitor.start(interval=0.01)
+    await asyncio.sleep(0)
+
+    # Act
+    time.sleep(0.05)   # blocks the loop the monitor runs on
+    await asyncio.sleep(0.03)
+    await LoopLagMonitor.stop()
+
+    # Assert
+    assert _sample("event_loop_lag_seconds_sum") - before_sum >= 0.03
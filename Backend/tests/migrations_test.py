@@ -0,0 +1,214 @@
+import pytest
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from pymongo.errors import DuplicateKeyError
+
+from app.core.time_utils import utc_now
+from app.db import migrations
+from app.db.migrations import INDEXES, Migration, apply_migrations, ensure_schema
+
+
+class _SchemaMigrations:
+    """Just enough of a Motor collection for migration_helpers."""
+
+    def __init__(self, docs=None):
+        self.docs = {doc["_id"]: doc for doc in docs or []}
+
+    def _matches(self, doc, query):
+        for field, expected in query.items():
+            if isinstance(expected, dict):
+                if not doc.get(field) < expected["$lt"]:
+                    return False
+            elif doc.get(field) != expected:
+                return False
+        return True
+
+    async def insert_one(self, doc):
+        if doc["_id"] in self.docs:
+            raise DuplicateKeyError("E11000")
+        self.docs[doc["_id"]] = dict(doc)
+
+    async def update_one(self, query, update):
+        doc = self.docs.get(query["_id"])
+        if doc is None or not self._matches(doc, query):
+            return SimpleNamespace(modified_count=0)
+        doc.update(update["$set"])
+        return SimpleNamespace(modified_count=1)
+
+    async def delete_one(self, query):
+        if query["_id"] in self.docs and self._matches(self.docs[query["_id"]], query):
+            del self.docs[query["_id"]]
+
+    async def find_one(self, query, projection=None, sort=None):
+        applied = [v for v, doc in self.docs.items() if self._matches(doc, query)]
+        return {"_id": max(applied)} if applied else None
+
+    def find(self, query):
+        docs = [self.docs[v] for v in sorted(self.docs)]
+
+        class _Cursor:
+            def sort(self, *args):
+                return self
+
+            async def __aiter__(self):
+                for doc in docs:
+                    yield doc
+
+        return _Cursor()
+
+
+@pytest.fixture
+def registry():
+    calls = []
+
+    def step(version):
+        async def apply():
+            calls.append(version)
+        return apply
+
+    fake = [Migration(v, f"step {v}", step(v)) for v in (1, 2, 3)]
+    store = _SchemaMigrations()
+    with patch.object(migrations, "MIGRATIONS", fake), \
+         patch.object(migrations, "LATEST_VERSION", 3), \
+         patch("app.db.migrations.schema_migrations_collection", return_value=store):
+        yield store, calls
+
+
+# -------------------------------
+# Runner tests
+# -------------------------------
+
+@pytest.mark.asyncio
+async def test_pending_migrations_apply_in_order_exactly_once(registry):
+
+    # Arrange
+    store, calls = registry
+
+    # Act
+    first = await apply_migrations()
+    second = await apply_migrations()
+
+    # Assert
+    assert first == [1, 2, 3]
+    assert second == []
+    assert calls == [1, 2, 3]
+    assert {doc["status"] for doc in store.docs.values()} == {"applied"}
+
+
+@pytest.mark.asyncio
+async def test_target_version_stops_early(registry):
+
+    # Arrange
+    _, calls = registry
+
+    # Act
+    applied = await apply_migrations(target=2)
+
+    # Assert
+    assert applied == [1, 2]
+    assert calls == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_failed_migration_is_released_and_retried(registry):
+
+    # Arrange
+    store, calls = registry
+    broken = AsyncMock(side_effect=[RuntimeError("boom"), None])
+    migrations.MIGRATIONS[1] = Migration(2, "flaky", broken)
+
+    # Act
+    with pytest.raises(RuntimeError):
+        await apply_migrations()
+    after_failure = sorted(store.docs)
+    retried = await apply_migrations()
+
+    # Assert
+    assert after_failure == [1]
+    assert retried == [2, 3]
+
+
+@pytest.mark.parametrize(
+    "claim_age,expected_applied",
+    [
+        (timedelta(minutes=5), [1]),
+        (timedelta(hours=2), [1, 2, 3]),
+    ],
+    ids=["edge-held-by-live-runner", "edge-stale-claim-taken-over"],
+)
+@pytest.mark.asyncio
+async def test_running_claims_block_or_expire(registry, claim_age, expected_applied):
+
+    # Arrange
+    store, _ = registry
+    store.docs[2] = {"_id": 2, "name": "step 2", "status": "running", "started_at": utc_now() - claim_age}
+
+    # Act
+    applied = await apply_migrations()
+
+    # Assert
+    assert applied == expected_applied
+
+
+# -------------------------------
+# Startup check tests
+# -------------------------------
+
+@pytest.mark.parametrize(
+    "recorded,auto_migrate,expected_calls",
+    [
+        ([1, 2, 3], True, []),
+        ([1], False, []),
+        ([1], True, [2, 3]),
+    ],
+    ids=["happy-up-to-date", "edge-behind-without-auto-migrate", "happy-behind-auto-migrates"],
+)
+@pytest.mark.asyncio
+async def test_ensure_schema_only_migrates_when_behind(registry, recorded, auto_migrate, expected_calls):
+
+    # Arrange
+    store, calls = registry
+    for version in recorded:
+        store.docs[version] = {"_id": version, "status": "applied"}
+
+    # Act
+    with patch("app.db.migrations.settings.AUTO_MIGRATE", auto_migrate):
+        await ensure_schema()
+
+    # Assert
+    assert calls == expected_calls
+
+
+# -------------------------------
+# Index migration tests
+# -------------------------------
+
+@pytest.mark.asyncio
+async def test_index_migration_sends_one_command_per_collection():
+
+    # Arrange
+    collections = {}
+
+    def collection(name):
+        coll = collections.setdefault(name, MagicMock(name=name))
+        coll.create_indexes = AsyncMock()
+        coll.index_information = AsyncMock(return_value={"_id_": {}, "timestamp_1": {}, "product_id_1_reviewed_at_-1": {}})
+        coll.drop_index = AsyncMock()
+        return coll
+
+    db = MagicMock()
+    db.__getitem__.side_effect = lambda name: collections.get(name) or collection(name)
+    client = MagicMock()
+    client.__getitem__.return_value = db
+
+    with patch.object(migrations.db_instance, "client", client):
+
+        # Act
+        await migrations.create_indexes()
+
+    # Assert
+    for name, models in INDEXES.items():
+        collections[name].create_indexes.assert_awaited_once_with(models)
+    collections["AuditLogs"].drop_index.assert_awaited_once_with("timestamp_1")
+    collections["Reviews"].drop_index.assert_awaited_once_with("product_id_1_reviewed_at_-1")
@@ -0,0 +1,97 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.read_preferences import Primary, SecondaryPreferred
+
+from app.db import mongodb
+from app.db.mongodb import POOL_STATS, PoolStatsListener, client_options
+
+
+@pytest.fixture
+def connected():
+    client = AsyncIOMotorClient("mongodb://localhost:27017", connect=False)
+    with patch.object(mongodb.db_instance, "client", client), \
+         patch("app.db.mongodb.settings.DB_NAME", "anozon_test"):
+        mongodb._cache_collections()
+        yield client
+    mongodb.db_instance.collections, mongodb.db_instance.analytics = {}, {}
+    client.close()
+
+
+# -------------------------------
+# Client options tests
+# -------------------------------
+
+@pytest.mark.parametrize(
+    "compressors,idle_ms,expected_compressors,expected_idle",
+    [
+        ("zstd, zlib", 300_000, "zstd,zlib", 300_000),
+        ("", 300_000, None, 300_000),
+        ("", 0, None, None),
+    ],
+    ids=["happy-compressors", "edge-no-compression", "edge-zero-means-no-idle-limit"],
+)
+def test_client_options_follow_settings(compressors, idle_ms, expected_compressors, expected_idle):
+
+    # Arrange
+    with patch("app.db.mongodb.settings.MONGO_COMPRESSORS", compressors), \
+         patch("app.db.mongodb.settings.MONGO_MAX_IDLE_TIME_MS", idle_ms), \
+         patch("app.db.mongodb.settings.MONGO_MAX_POOL_SIZE", 40):
+
+        # Act
+        options = client_options()
+
+    # Assert
+    assert options["maxPoolSize"] == 40
+    assert options.get("compressors") == expected_compressors
+    assert options["maxIdleTimeMS"] == expected_idle
+    assert isinstance(options["event_listeners"][0], PoolStatsListener)
+
+
+# -------------------------------
+# Collection handle tests
+# -------------------------------
+
+def test_collection_handles_are_built_once(connected):
+
+    # Act
+    first, second = mongodb.products_collection(), mongodb.products_collection()
+
+    # Assert
+    assert first is second
+    assert first.name == "Products"
+
+
+def test_analytics_handles_use_the_analytics_read_preference(connected):
+
+    # Act
+    primary = mongodb.orders_collection()
+    analytics = mongodb.orders_collection(analytics=True)
+
+    # Assert
+    assert isinstance(primary.read_preference, Primary)
+    assert isinstance(analytics.read_preference, SecondaryPreferred)
+
+
+# -------------------------------
+# Pool metrics tests
+# -------------------------------
+
+def test_pool_listener_counts_checkouts_and_wait_time():
+
+    # Arrange
+    POOL_STATS.clear()
+    listener = PoolStatsListener()
+
+    # Act
+    listener.connection_checked_out(SimpleNamespace(duration=0.002))
+    listener.connection_checked_out(SimpleNamespace(duration=0.004))
+    listener.connection_checked_in(SimpleNamespace())
+    listener.connection_check_out_failed(SimpleNamespace(duration=0.5))
+
+    # Assert
+    assert POOL_STATS["checkouts"] == 2
+    assert POOL_STATS["checked_out"] == 1
+    assert POOL_STATS["checkout_failures"] == 1
+    assert POOL_STATS["checkout_wait_ms"] == pytest.approx(506)
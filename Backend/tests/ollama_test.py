@@ -0,0 +1,162 @@
+import asyncio
+import httpx
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.ai import ollama
+from app.ai.ollama_client import OllamaClient, STATS, cache_key
+from app.ai.ollama_stub import create_stub_app
+
+
+@pytest.fixture
+def stub():
+    app = create_stub_app()
+    OllamaClient._client = None
+    OllamaClient.start(transport=httpx.ASGITransport(app=app))
+    STATS.clear()
+    yield app
+    OllamaClient._client = None   # ASGITransport holds no sockets
+
+
+@pytest.fixture
+def no_cache():
+    with patch("app.ai.ollama_client.settings.OLLAMA_CACHE_TTL_SECONDS", 0):
+        yield
+
+
+def _memory_redis():
+    store = {}
+    redis = MagicMock()
+    redis.get = AsyncMock(side_effect=store.get)
+    redis.set = AsyncMock(side_effect=lambda key, value, ex=None: store.__setitem__(key, value))
+    return redis
+
+
+# -------------------------------
+# OllamaClient.chat tests
+# -------------------------------
+
+@pytest.mark.asyncio
+async def test_chat_returns_completion_and_records_timings(stub, no_cache):
+
+    # Act
+    result = await OllamaClient.chat("hello there")
+
+    # Assert
+    assert ollama.response_cleaner(result)["response"] == "stub reply: hello there"
+    assert STATS["requests"] == 1
+    assert STATS["eval_count"] == 4
+    assert STATS["total_duration_ms"] > 0
+
+
+@pytest.mark.asyncio
+async def test_chat_serves_repeat_prompts_from_cache(stub):
+
+    # Arrange
+    with patch("app.ai.ollama_client.redis_db.redis_client", _memory_redis()):
+
+        # Act
+        first = await OllamaClient.chat("What is   Anozon?")
+        second = await OllamaClient.chat("what is anozon?")
+
+    # Assert
+    assert second == first
+    assert stub.state.calls == 1
+    assert STATS["cache_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_chat_works_without_redis(stub):
+
+    # Arrange
+    with patch("app.ai.ollama_client.redis_db.redis_client", None):
+
+        # Act
+        result = await OllamaClient.chat("hi")
+
+    # Assert
+    assert result["done"] is True
+
+
+@pytest.mark.parametrize(
+    "a,b,same",
+    [
+        (("m", "  Hello   World ", {"top_k": 3}), ("m", "hello world", {"top_k": 3}), True),
+        (("m", "hello", {"top_k": 3}), ("other", "hello", {"top_k": 3}), False),
+        (("m", "hello", {"top_k": 3}), ("m", "hello", {"top_k": 4}), False),
+    ],
+    ids=["happy-normalized-prompt", "edge-different-model", "edge-different-options"],
+)
+def test_cache_key_normalizes_prompt_only(a, b, same):
+
+    # Act / Assert
+    assert (cache_key(*a) == cache_key(*b)) is same
+
+
+# -------------------------------
+# Concurrency limit tests
+# -------------------------------
+
+@pytest.mark.asyncio
+async def test_concurrent_chats_are_capped(no_cache):
+
+    # Arrange
+    app = create_stub_app(delay=0.005)
+    with patch("app.ai.ollama_client.settings.OLLAMA_MAX_CONCURRENCY", 2):
+        OllamaClient._client = None
+        OllamaClient.start(transport=httpx.ASGITransport(app=app))
+
+        # Act
+        results = await asyncio.gather(*(OllamaClient.chat(f"prompt {i}") for i in range(6)))
+        await OllamaClient.stop()
+
+    # Assert
+    assert len(results) == 6
+    assert app.state.max_active == 2
+
+
+@pytest.mark.asyncio
+async def test_chat_returns_503_when_queue_wait_times_out(no_cache):
+
+    # Arrange
+    app = create_stub_app(delay=0.05)
+    with patch("app.ai.ollama_client.settings.OLLAMA_MAX_CONCURRENCY", 1), \
+         patch("app.ai.ollama_client.settings.OLLAMA_QUEUE_TIMEOUT_SECONDS", 0.01):
+        OllamaClient._client = None
+        OllamaClient.start(transport=httpx.ASGITransport(app=app))
+
+        # Act
+        results = await asyncio.gather(OllamaClient.chat("slow one"), OllamaClient.chat("slow two"), return_exceptions=True)
+        await OllamaClient.stop()
+
+    # Assert
+    errors = [r for r in results if isinstance(r, HTTPException)]
+    assert len(errors) == 1
+    assert errors[0].status_code == 503
+
+
+# -------------------------------
+# Streaming route tests
+# -------------------------------
+
+def test_stream_route_forwards_tokens_as_sse(stub):
+
+    # Arrange
+    app = FastAPI()
+    app.include_router(ollama.router)
+    client = TestClient(app)
+
+    with patch("app.services.rate_limit_service.rate_limit_helpers.hit", new_callable=AsyncMock,
+               side_effect=AttributeError("redis_client is None")):
+
+        # Act
+        response = client.get("/ollama/ai/chat/stream", params={"message": "two words"})
+
+    # Assert
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [block for block in response.text.split("\n\n") if block]
+    assert events[:2] == ['data: {"token": "stub"}', 'data: {"token": " reply:"}']
+    assert events[-1].startswith("event: done\ndata: ")
+    assert len(events) == 5
@@ -0,0 +1,190 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.db import redis as redis_db
+from app.repo import otp_helpers
+from app.services.otp_service import generate_and_store_otp, verify_user_otp
+
+# The OTP flows are server-side Lua scripts; run them for real against fakeredis' Lua engine
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+EMAIL = "shopper@example.com"
+
+
+@pytest.fixture
+def fake_redis():
+    previous = redis_db.redis_client
+    redis_db.redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    yield redis_db.redis_client
+    redis_db.redis_client = previous
+
+
+async def _store_otp(client, otp_token="tok", otp="123456"):
+    await client.set(otp_helpers.OTP_DATA_KEY.format(otp_token=otp_token), json.dumps({"email": EMAIL, "otp": otp}))
+
+
+# -------------------------------
+# generate_and_store_otp tests
+# -------------------------------
+
+@pytest.mark.asyncio
+async def test_generate_otp_stores_payload_and_starts_cooldown(fake_redis):
+
+    # Arrange
+    with patch("app.services.otp_service.send_otp_email", new_callable=AsyncMock, return_value=True):
+
+        # Act
+        first = await generate_and_store_otp(EMAIL)
+        second = await generate_and_store_otp(EMAIL)
+
+    # Assert
+    assert first[0] is True
+    data = json.loads(await fake_redis.get(otp_helpers.OTP_DATA_KEY.format(otp_token=first[2])))
+    assert data["email"] == EMAIL
+    assert second[0] is False
+    assert "Please wait" in second[1]
+
+
+@pytest.mark.asyncio
+async def test_generate_otp_releases_cooldown_when_email_fails(fake_redis):
+
+    # Arrange
+    with patch("app.services.otp_service.send_otp_email", new_callable=AsyncMock, side_effect=[False, True]):
+
+        # Act
+        failed = await generate_and_store_otp(EMAIL)
+        retried = await generate_and_store_otp(EMAIL)
+
+    # Assert
+    assert failed == (False, "Failed to send OTP email.", "")
+    assert retried[0] is True
+    assert len(await fake_redis.keys("otp_data:*")) == 1
+
+
+@pytest.mark.asyncio
+async def test_generate_otp_blocks_after_max_resends(fake_redis):
+
+    # Arrange
+    results = []
+    with patch("app.services.otp_service.send_otp_email", new_callable=AsyncMock, return_value=True):
+        for _ in range(otp_helpers.MAX_RESEND_ATTEMPTS + 1):
+            await fake_redis.delete(otp_helpers.rate_limit_helpers.rate_limit_key("otp_cooldown", EMAIL))
+
+            # Act
+            results.append(await generate_and_store_otp(EMAIL))
+
+    # Assert
+    assert [ok for ok, _, _ in results] == [True] * otp_helpers.MAX_RESEND_ATTEMPTS + [False]
+    assert results[-1][1] == "Too many resend requests. Account temporarily blocked."
+    assert await fake_redis.exists(otp_helpers.OTP_BLOCKED_KEY.format(email=EMAIL))
+
+
+@pytest.mark.asyncio
+async def test_parallel_generate_sends_exactly_one_otp(fake_redis):
+
+    # Arrange
+    with patch("app.services.otp_service.send_otp_email", new_callable=AsyncMock, return_value=True) as mock_send:
+
+        # Act
+        results = await asyncio.gather(*(generate_and_store_otp(EMAIL) for _ in range(20)))
+
+    # Assert
+    assert sum(ok for ok, _, _ in results) == 1
+    assert mock_send.await_count == 1
+
+
+# -------------------------------
+# verify_user_otp tests
+# -------------------------------
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "otp_token,user_otp,expected",
+    [
+        ("tok", "123456", (True, "OTP verified successfully.", EMAIL)),
+        ("tok", "000000", (False, f"Invalid OTP. {otp_helpers.MAX_ATTEMPTS - 1} attempts remaining.", EMAIL)),
+        ("missing", "123456", (False, "OTP expired or invalid token.", "")),
+    ],
+    ids=["happy-correct-otp", "error-wrong-otp", "error-unknown-token"],
+)
+async def test_verify_otp_outcomes(fake_redis, otp_token, user_otp, expected):
+
+    # Arrange
+    await _store_otp(fake_redis)
+
+    # Act
+    result = await verify_user_otp(otp_token, user_otp)
+
+    # Assert
+    assert result == expected
+
+
+@pytest.mark.asyncio
+async def test_verify_otp_is_single_use(fake_redis):
+
+    # Arrange
+    await _store_otp(fake_redis)
+
+    # Act
+    first = await verify_user_otp("tok", "123456")
+    second = await verify_user_otp("tok", "123456")
+
+    # Assert
+    assert first[0] is True
+    assert second == (False, "OTP expired or invalid token.", "")
+
+
+@pytest.mark.asyncio
+async def test_parallel_wrong_guesses_cannot_exceed_attempt_limit(fake_redis):
+
+    # Arrange
+    await _store_otp(fake_redis)
+    guesses = [f"{n:06d}" for n in range(50)]
+
+    # Act
+    results = await asyncio.gather(*(verify_user_otp("tok", guess) for guess in guesses))
+    after_lock = await verify_user_otp("tok", "123456")
+
+    # Assert
+    messages = [message for _, message, _ in results]
+    assert sum(message.startswith("Invalid OTP.") for message in messages) == otp_helpers.MAX_ATTEMPTS - 1
+    assert messages.count("Too many failed attempts. Account temporarily blocked.") == 1
+    assert not any(ok for ok, _, _ in results)
+    assert after_lock == (False, "OTP expired or invalid token.", "")
+    assert await fake_redis.exists(otp_helpers.OTP_BLOCKED_KEY.format(email=EMAIL))
+
+
+@pytest.mark.asyncio
+async def test_verify_otp_declares_every_key_it_touches(fake_redis):
+
+    # Arrange
+    await _store_otp(fake_redis)
+    call = MagicMock(side_effect=fake_redis.register_script(otp_helpers.VERIFY_OTP_LUA))
+
+    # Act
+    with patch.object(fake_redis, "register_script", return_value=call):
+        await otp_helpers.verify_otp("tok", "000000")
+
+    # Assert
+    assert call.call_args.kwargs["keys"] == [
+        otp_helpers.OTP_DATA_KEY.format(otp_token="tok"),
+        otp_helpers.OTP_BLOCKED_KEY.format(email=EMAIL),
+        otp_helpers.rate_limit_helpers.rate_limit_key("otp_attempts", EMAIL),
+    ]
+    assert await fake_redis.exists(otp_helpers.rate_limit_helpers.rate_limit_key("otp_attempts", EMAIL))
+
+
+@pytest.mark.asyncio
+async def test_verify_otp_reports_internal_error_when_redis_is_down():
+
+    # Arrange
+    with patch("app.services.otp_service.otp_helpers.verify_otp", new_callable=AsyncMock, side_effect=ConnectionError("down")):
+
+        # Act
+        result = await verify_user_otp("tok", "123456")
+
+    # Assert
+    assert result == (False, "An internal error occurred during OTP verification.", "")
@@ -0,0 +1,152 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from fastapi import HTTPException
+
+from app.repo.product_helpers import update_product_likes, migrate_liked_by_arrays
+
+
+PRODUCT_ID = str(ObjectId())
+USER_ID = str(ObjectId())
+
+
+# -------------------------------
+# update_product_likes tests
+# -------------------------------
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "upserted_id,expected_changed",
+    [
+        (ObjectId(), True),
+        (None, False),
+    ],
+    ids=[
+        "happy-like-new",
+        "edge-like-already-liked",
+    ],
+)
+async def test_like_reports_only_real_state_change(upserted_id, expected_changed):
+
+    # Arrange
+    likes_col = AsyncMock()
+    likes_col.update_one.return_value = MagicMock(upserted_id=upserted_id)
+
+    # Act
+    changed = await update_product_likes(likes_col, PRODUCT_ID, USER_ID, "like")
+
+    # Assert
+    assert changed is expected_changed
+    likes_col.update_one.assert_awaited_once()
+    assert likes_col.update_one.await_args.kwargs["upsert"] is True
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "deleted_count,expected_changed",
+    [
+        (1, True),
+        (0, False),
+    ],
+    ids=[
+        "happy-unlike-existing",
+        "edge-unlike-not-liked",
+    ],
+)
+async def test_unlike_reports_only_real_state_change(deleted_count, expected_changed):
+
+    # Arrange
+    likes_col = AsyncMock()
+    likes_col.delete_one.return_value = MagicMock(deleted_count=deleted_count)
+
+    # Act
+    changed = await update_product_likes(likes_col, PRODUCT_ID, USER_ID, "unlike")
+
+    # Assert
+    assert changed is expected_changed
+
+
+@pytest.mark.asyncio
+async def test_like_duplicate_key_race_is_not_a_state_change():
+
+    # Arrange
+    likes_col = AsyncMock()
+    likes_col.update_one.side_effect = DuplicateKeyError("dup")
+
+    # Act
+    changed = await update_product_likes(likes_col, PRODUCT_ID, USER_ID, "like")
+
+    # Assert
+    assert changed is False
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "product_id,user_id,side_effect,expected_status",
+    [
+        ("bad-id", USER_ID, None, 400),
+        (PRODUCT_ID, "bad-id", None, 400),
+        (PRODUCT_ID, USER_ID, PyMongoError("down"), 500),
+    ],
+    ids=[
+        "error-invalid-product-id",
+        "error-invalid-user-id",
+        "error-db-failure",
+    ],
+)
+async def test_update_product_likes_errors(product_id, user_id, side_effect, expected_status):
+
+    # Arrange
+    likes_col = AsyncMock()
+    likes_col.update_one.side_effect = side_effect
+
+    # Act
+    with pytest.raises(HTTPException) as exc_info:
+        await update_product_likes(likes_col, product_id, user_id, "like")
+
+    # Assert
+    assert exc_info.value.status_code == expected_status
+
+
+# -------------------------------
+# migrate_liked_by_arrays tests
+# -------------------------------
+
+class _AsyncCursor:
+    def __init__(self, docs):
+        self._docs = iter(docs)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._docs)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+@pytest.mark.asyncio
+async def test_migrate_moves_arrays_recounts_and_unsets():
+
+    # Arrange
+    pid = ObjectId()
+    likers = [str(ObjectId()) for _ in range(3)] + ["not-an-object-id"]
+    products_col = MagicMock()
+    products_col.find.return_value = _AsyncCursor([{"_id": pid, "liked_by": likers}])
+    products_col.update_one = AsyncMock()
+    likes_col = MagicMock()
+    likes_col.bulk_write = AsyncMock()
+    likes_col.count_documents = AsyncMock(return_value=3)
+
+    # Act
+    result = await migrate_liked_by_arrays(products_col, likes_col, batch_size=2)
+
+    # Assert
+    assert result == {"products": 1, "likes": 3}
+    assert likes_col.bulk_write.await_count == 2
+    products_col.update_one.assert_awaited_once_with(
+        {"_id": pid},
+        {"$set": {"product_likes": 3}, "$unset": {"liked_by": ""}}
+    )
@@ -0,0 +1,115 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from bson import ObjectId
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.product_service import ProductService
+from app.repo.product_helpers import LISTING_CARD_PROJECTION
+from app.models.product_model import PaginatedProductCardResponse, PaginatedProductResponse
+
+
+def _card_doc():
+    return {
+        "_id": ObjectId(), "name": "Phone", "slug": "phone", "image_urls": ["a.png"],
+        "price": 900, "actual_price": 1000, "discount_percent": 10,
+        "avg_rating": 4.2, "review_count": 3, "product_likes": 7, "brand": "Acme",
+        "category": "Electronics", "sub_category": "Phones", "is_featured": False, "stock": 5,
+    }
+
+
+def _full_doc():
+    now = datetime.now(timezone.utc)
+    return {
+        **_card_doc(), "image_urls": ["a.png", "b.png"], "seller_id": str(ObjectId()),
+        "description": "A phone", "specifications": {"ram": "8GB"}, "tags": ["5g"],
+        "is_active": True, "is_approved": True, "is_deleted": False,
+        "created_at": now, "updated_at": now,
+    }
+
+
+# -------------------------------
+# ProductService.get_products view tests
+# -------------------------------
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "view,doc_factory,expected_projection,expected_model",
+    [
+        ("card", _card_doc, LISTING_CARD_PROJECTION, PaginatedProductCardResponse),
+        ("full", _full_doc, None, PaginatedProductResponse),
+    ],
+    ids=[
+        "happy-default-card-view",
+        "happy-full-view-opt-in",
+    ],
+)
+async def test_get_products_view_selects_projection_and_model(view, doc_factory, expected_projection, expected_model):
+
+    # Arrange
+    with patch("app.services.product_service.products_collection", return_value=MagicMock()), \
+         patch("app.services.product_service.count_products", new_callable=AsyncMock, return_value=1), \
+         patch("app.services.product_service.fetch_products", new_callable=AsyncMock, return_value=[doc_factory()]) as mock_fetch:
+
+        # Act
+        result = await ProductService.get_products(page=1, limit=30, view=view)
+
+    # Assert
+    assert mock_fetch.await_args.args[-1] == expected_projection
+    assert isinstance(result, expected_model)
+    assert result.total == 1
+
+
+def test_listing_projection_slices_images_and_excludes_heavy_fields():
+
+    # Assert
+    assert LISTING_CARD_PROJECTION["image_urls"] == {"$slice": 1}
+    for heavy_field in ("description", "specifications", "liked_by", "tags", "search_keywords"):
+        assert heavy_field not in LISTING_CARD_PROJECTION
+
+
+# -------------------------------
+# /products route serialization tests
+# -------------------------------
+
+@pytest.mark.parametrize(
+    "query,doc_factory,expect_description",
+    [
+        ("", _card_doc, False),
+        ("?view=full", _full_doc, True),
+    ],
+    ids=[
+        "happy-route-card",
+        "happy-route-full",
+    ],
+)
+def test_products_route_serializes_requested_view(query, doc_factory, expect_description):
+
+    # Arrange
+    client = TestClient(app)
+    with patch("app.services.product_service.products_collection", return_value=MagicMock()), \
+         patch("app.services.product_service.count_products", new_callable=AsyncMock, return_value=1), \
+         patch("app.services.product_service.fetch_products", new_callable=AsyncMock, return_value=[doc_factory()]):
+
+        # Act
+        response = client.get(f"/products{query}")
+
+    # Assert
+    assert response.status_code == 200
+    item = response.json()["items"][0]
+    assert "_id" in item
+    assert ("description" in item) is expect_description
+
+
+def test_products_route_rejects_unknown_view():
+
+    # Arrange
+    client = TestClient(app)
+
+    # Act
+    response = client.get("/products?view=everything")
+
+    # Assert
+    assert response.status_code == 422
@@ -0,0 +1,195 @@
+import asyncio
+import pstats
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import profiling
+from app.core.config import settings
+from app.core.profiling import ProfilingMiddleware, create_profile_token
+from app.core.security import create_access_token
+from app.db import mongodb
+from app.deps.roles import get_current_user
+from app.repo.explain_helpers import plan_summary
+from app.routes import super_admin_routes
+from app.services.slow_command_service import SlowCommandExplainer
+
+
+def _client(role="super_admin"):
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str):
+        await asyncio.sleep(0)
+        return {"id": item_id}
+
+    app.include_router(super_admin_routes.router)
+    app.dependency_overrides[get_current_user] = lambda: {"_id": "admin-1", "email": "root@example.com", "role": role}
+    app.add_middleware(ProfilingMiddleware)
+    return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def clean_buffers(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_RATE", 0.0)
+    monkeypatch.setattr(settings, "PROFILE_SLOW_MS", 1000)
+    profiling.PROFILES.clear()
+    SlowCommandExplainer.recent.clear()
+    SlowCommandExplainer._explained_at.clear()
+    mongodb.SLOW_COMMANDS.clear()
+
+
+# -------------------------------
+# Middleware tests
+# -------------------------------
+
+@pytest.mark.parametrize(
+    "token,kept",
+    [
+        (lambda: create_profile_token("admin-1"), 1),
+        (lambda: "not-a-token", 0),
+        (lambda: create_access_token({"_id": "u1", "email": "a@b.c", "role": "super_admin", "iss": "Anozon", "aud": "Anozon"}), 0),
+    ],
+    ids=["happy-signed-header", "error-garbage-header", "error-access-token-is-not-a-profile-token"],
+)
+def test_debug_header_profiles_the_request(token, kept):
+
+    # Act
+    _client().get("/items/1", headers={"X-Debug-Profile": token()})
+
+    # Assert
+    assert len(profiling.PROFILES) == kept
+    if kept:
+        assert profiling.PROFILES[0]["reason"] == "requested" and profiling.PROFILES[0]["route"] == "/items/{item_id}"
+
+
+@pytest.mark.parametrize(
+    "slow_ms,kept",
+    [(0, 1), (60_000, 0)],
+    ids=["happy-slow-sample-kept", "edge-fast-sample-discarded"],
+)
+def test_sampled_requests_are_kept_only_when_slow(monkeypatch, slow_ms, kept):
+
+    # Arrange
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "PROFILE_SLOW_MS", slow_ms)
+
+    # Act
+    _client().get("/items/1")
+
+    # Assert
+    assert len(profiling.PROFILES) == kept
+
+
+# -------------------------------
+# Route tests
+# -------------------------------
+
+def test_profiles_can_be_listed_and_downloaded(tmp_path):
+
+    # Arrange
+    client = _client()
+    token = client.post("/super-admin/debug/profile-token").json()["token"]
+    client.get("/items/7", headers={"X-Debug-Profile": token})
+
+    # Act
+    listed = client.get("/super-admin/debug/profiles").json()["profiles"]
+    text = client.get(f"/super-admin/debug/profiles/{listed[0]['id']}").text
+    dump = client.get(f"/super-admin/debug/profiles/{listed[0]['id']}", params={"format": "pstats"})
+
+    # Assert
+    assert listed[0]["path"] == "/items/7" and "profile" not in listed[0]
+    assert "cumulative" in text
+    (tmp_path / "p.prof").write_bytes(dump.content)
+    assert pstats.Stats(str(tmp_path / "p.prof")).total_calls > 0
+
+
+@pytest.mark.parametrize(
+    "role,path,status",
+    [
+        ("admin", "/super-admin/debug/profiles", 403),
+        ("super_admin", "/super-admin/debug/profiles/unknown", 404),
+    ],
+    ids=["error-admin-is-not-super-admin", "error-unknown-profile"],
+)
+def test_profile_routes_errors(role, path, status):
+
+    # Act
+    response = _client(role).get(path)
+
+    # Assert
+    assert response.status_code == status
+
+
+# -------------------------------
+# Slow Mongo command tests
+# -------------------------------
+
+@pytest.mark.parametrize(
+    "explain,expected",
+    [
+        ({"queryPlanner": {"winningPlan": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "category_1"}}},
+          "executionStats": {"totalDocsExamined": 20, "totalKeysExamined": 20, "nReturned": 20}},
+         {"plan": "FETCH > IXSCAN", "indexes": ["category_1"], "collscan": False, "in_memory_sort": False, "docs_examined": 20}),
+        ({"queryPlanner": {"winningPlan": {"queryPlan": {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}}}},
+         {"plan": "SORT > COLLSCAN", "indexes": [], "collscan": True, "in_memory_sort": True, "docs_examined": None}),
+        ({"stages": [{"$cursor": {"queryPlanner": {"winningPlan": {"stage": "IXSCAN", "indexName": "seller_id_1"}}}},
+                     {"$group": {"_id": "$status"}}, {"$sort": {"_id": 1}}]},
+         {"plan": "IXSCAN", "indexes": ["seller_id_1"], "collscan": False, "in_memory_sort": True, "docs_examined": None}),
+    ],
+    ids=["happy-index-scan", "error-collscan-with-sort", "edge-aggregate-cursor-stage"],
+)
+def test_plan_summary(explain, expected):
+
+    # Act
+    summary = plan_summary(explain)
+
+    # Assert
+    assert {key: summary[key] for key in expected} == expected
+
+
+def _slow_find(filter_doc, duration_ms=450):
+    return {"database": "anozon", "collection": "Products", "command_name": "find", "duration_ms": duration_ms,
+            "command": {"find": "Products", "filter": filter_doc, "lsid": {"id": 1}, "$db": "anozon"}, "request_id": "r1"}
+
+
+@pytest.mark.asyncio
+async def test_slow_commands_are_explained_once_per_shape(caplog):
+
+    # Arrange
+    explain = {"queryPlanner": {"winningPlan": {"stage": "COLLSCAN"}}}
+    client = MagicMock()
+    client.__getitem__.return_value.command = AsyncMock(return_value=explain)
+    mongodb.SLOW_COMMANDS.extend([_slow_find({"brand": "a"}), _slow_find({"brand": "b"}), _slow_find({"price": 1})])
+
+    # Act
+    with patch("app.services.slow_command_service.get_database_client", return_value=client):
+        explained = await SlowCommandExplainer.explain_pending()
+
+    # Assert
+    assert explained == 2   # {"brand": ...} twice is one shape
+    sent = client.__getitem__.return_value.command.await_args_list[0].args[0]
+    assert sent == {"explain": {"find": "Products", "filter": {"brand": "a"}}, "verbosity": "queryPlanner"}
+    assert SlowCommandExplainer.recent[0]["collscan"] is True
+    assert any("COLLSCAN" in record.getMessage() for record in caplog.records)
+
+
+def test_listener_queues_only_slow_explainable_commands(monkeypatch):
+
+    # Arrange
+    from types import SimpleNamespace
+    monkeypatch.setattr(settings, "MONGO_SLOW_COMMAND_MS", 100)
+    listener = mongodb.CommandLatencyListener()
+    commands = [("find", {"find": "Products", "filter": {}}, 150_000), ("find", {"find": "Products"}, 5_000),
+                ("getMore", {"getMore": 1, "collection": "Products"}, 900_000)]
+
+    # Act
+    for request_id, (name, command, micros) in enumerate(commands):
+        listener.started(SimpleNamespace(command_name=name, database_name="anozon", command=command,
+                                         request_id=request_id, connection_id=("h", 1)))
+        listener.succeeded(SimpleNamespace(command_name=name, duration_micros=micros, request_id=request_id,
+                                           connection_id=("h", 1)))
+
+    # Assert
+    assert [entry["duration_ms"] for entry in mongodb.SLOW_COMMANDS] == [150]
@@ -0,0 +1,102 @@
+import asyncio
+import os
+import pytest
+from types import SimpleNamespace
+
+from pymongo.errors import ServerSelectionTimeoutError
+
+from benchmarks.query_plans import CASES, CommandRecorder, QueryCase, _blocking_sort, check, run_cases, write_report
+
+MONGO_URL = os.environ.get("QUERY_PLAN_MONGO_URL")
+
+
+def _summary(plan, docs=20, returned=20, blocking_sort=False):
+    stages = plan.split(" > ")
+    return {"plan": plan, "collscan": "COLLSCAN" in stages, "blocking_sort": blocking_sort,
+            "docs_per_result": docs / max(returned, 1)}
+
+
+# -------------------------------
+# Harness tests
+# -------------------------------
+
+@pytest.mark.parametrize(
+    "summary,problems",
+    [
+        (_summary("LIMIT > FETCH > IXSCAN"), []),
+        (_summary("SORT > COLLSCAN", docs=5000, blocking_sort=True),
+         ["no index used", "in-memory sort", "250.0 docs examined per result (max 5.0)"]),
+        (_summary("EXPRESS_IXSCAN", docs=1, returned=1), []),
+    ],
+    ids=["happy-index-scan", "error-collscan-sort-and-ratio", "edge-express-single-document"],
+)
+def test_check(summary, problems):
+
+    # Act
+    found = check(summary, QueryCase("case", None))
+
+    # Assert
+    assert found == problems
+
+
+@pytest.mark.parametrize(
+    "stages,blocking",
+    [
+        ([{"$cursor": {}}, {"$group": {}}, {"$sort": {"count": -1}}], False),
+        ([{"$cursor": {}}, {"$addFields": {}}, {"$sort": {"created_at": -1}}, {"$limit": 10}], True),
+    ],
+    ids=["happy-sort-of-groups", "error-sort-of-documents"],
+)
+def test_pipeline_sort_is_blocking_only_before_grouping(stages, blocking):
+
+    # Act / Assert
+    assert _blocking_sort({"stages": stages}, ["IXSCAN"]) is blocking
+
+
+def test_recorder_keeps_explainable_commands_while_recording():
+
+    # Arrange
+    recorder = CommandRecorder()
+    event = lambda name: SimpleNamespace(command_name=name, database_name="db", command={name: "Products"})
+
+    # Act
+    recorder.started(event("find"))
+    recorder.recording = True
+    for name in ("find", "getMore", "aggregate", "insert"):
+        recorder.started(event(name))
+
+    # Assert
+    assert [command for _, command in recorder.commands] == [{"find": "Products"}, {"aggregate": "Products"}]
+
+
+# -------------------------------
+# Live plan tests (QUERY_PLAN_MONGO_URL, e.g. the benchmarks/docker-compose.yml Mongo)
+# -------------------------------
+
+@pytest.fixture(scope="module")
+def plans(tmp_path_factory):
+    if not MONGO_URL:
+        pytest.skip("QUERY_PLAN_MONGO_URL not set")
+    try:
+        results = asyncio.run(run_cases(MONGO_URL, "anozon_query_plans", scale="small"))
+    except ServerSelectionTimeoutError:
+        pytest.skip(f"Mongo not reachable at {MONGO_URL}")
+    write_report(results, tmp_path_factory.mktemp("plans") / "query_plans.md")
+    return results
+
+
+@pytest.mark.parametrize(
+    "case",
+    # strict: once a known gap is fixed the XPASS fails, so its `known` note gets removed
+    [pytest.param(case, marks=pytest.mark.xfail(reason=case.known, strict=True)) if case.known else case
+     for case in CASES],
+    ids=[case.name for case in CASES],
+)
+def test_repository_query_plans(plans, case):
+
+    # Act
+    summaries = plans[case.name]
+
+    # Assert
+    assert summaries, "case sent no explainable command"
+    assert {f"{s['collection']}.{s['command']} {s['plan']}": s["problems"] for s in summaries if s["problems"]} == {}
@@ -0,0 +1,177 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.core.security import create_access_token
+from app.deps.rate_limit import rate_limit
+from app.repo import seller_redis_helpers
+from app.repo.rate_limit_helpers import RateLimitResult, rate_limit_key
+from app.services import rate_limit_service
+
+
+def _client(per="ip"):
+    app = FastAPI()
+
+    @app.post("/limited", dependencies=[Depends(rate_limit("test_scope", 2, 60, per=per))])
+    async def limited():
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+# -------------------------------
+# rate_limit_service tests
+# -------------------------------
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "hit_result,side_effect,expected_allowed,throttled,fail_open",
+    [
+        (RateLimitResult(True, 4, 0), None, True, 0, 0),
+        (RateLimitResult(False, 0, 12.5), None, False, 1, 0),
+        (None, RedisConnectionError("down"), True, 0, 1),
+        (None, AttributeError("redis_client is None"), True, 0, 1),
+    ],
+    ids=["happy-allowed", "error-throttled", "edge-redis-down-fails-open", "edge-redis-not-connected-fails-open"],
+)
+async def test_check_counts_throttles_and_fails_open(hit_result, side_effect, expected_allowed, throttled, fail_open):
+
+    # Arrange
+    rate_limit_service.THROTTLED.clear()
+    rate_limit_service.FAIL_OPEN.clear()
+
+    with patch("app.services.rate_limit_service.rate_limit_helpers.hit", new_callable=AsyncMock,
+               return_value=hit_result, side_effect=side_effect):
+
+        # Act
+        result = await rate_limit_service.check("search", "ip:1.2.3.4", 5, 60)
+
+    # Assert
+    assert result.allowed is expected_allowed
+    assert rate_limit_service.THROTTLED["search"] == throttled
+    assert rate_limit_service.FAIL_OPEN["search"] == fail_open
+
+
+@pytest.mark.asyncio
+async def test_check_skips_redis_when_disabled():
+
+    # Arrange
+    with patch("app.services.rate_limit_service.settings.RATE_LIMIT_ENABLED", False), \
+         patch("app.services.rate_limit_service.rate_limit_helpers.hit", new_callable=AsyncMock) as mock_hit:
+
+        # Act
+        result = await rate_limit_service.check("search", "ip:1.2.3.4", 5, 60)
+
+    # Assert
+    assert result.allowed is True
+    mock_hit.assert_not_awaited()
+
+
+# -------------------------------
+# rate_limit dependency tests
+# -------------------------------
+
+def test_rate_limit_dependency_returns_429_with_retry_after():
+
+    # Arrange
+    client = _client()
+    with patch("app.services.rate_limit_service.rate_limit_helpers.hit", new_callable=AsyncMock,
+               return_value=RateLimitResult(False, 0, 7.2)):
+
+        # Act
+        response = client.post("/limited")
+
+    # Assert
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "8"
+
+
+def test_rate_limit_dependency_sets_remaining_header():
+
+    # Arrange
+    client = _client()
+    with patch("app.services.rate_limit_service.rate_limit_helpers.hit", new_callable=AsyncMock,
+               return_value=RateLimitResult(True, 1, 0)) as mock_hit:
+
+        # Act
+        response = client.post("/limited")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.headers["x-ratelimit-remaining"] == "1"
+    assert mock_hit.await_args.args[:4] == ("test_scope", "ip:testclient", 2, 60)
+
+
+@pytest.mark.parametrize(
+    "per,request_kwargs,expected_identity",
+    [
+        ("email", {"data": {"username": "Shopper@Example.com", "password": "x"}}, "email:shopper@example.com"),
+        ("email", {"json": {"email": "a@b.c"}}, "email:a@b.c"),
+        ("email", {"json": {}}, "ip:testclient"),
+        ("user", {"headers": {"Authorization": "Bearer not-a-jwt"}}, "ip:testclient"),
+    ],
+    ids=["happy-login-form", "happy-json-body", "edge-no-email-falls-back-to-ip", "edge-bad-token-falls-back-to-ip"],
+)
+def test_rate_limit_dependency_resolves_identity(per, request_kwargs, expected_identity):
+
+    # Arrange
+    client = _client(per=per)
+    with patch("app.services.rate_limit_service.rate_limit_helpers.hit", new_callable=AsyncMock,
+               return_value=RateLimitResult(True, 1, 0)) as mock_hit:
+
+        # Act
+        client.post("/limited", **request_kwargs)
+
+    # Assert
+    assert mock_hit.await_args.args[1] == expected_identity
+
+
+def test_rate_limit_dependency_keys_by_user_for_bearer_tokens():
+
+    # Arrange
+    client = _client(per="user")
+    token = create_access_token({"_id": "507f1f77bcf86cd799439011", "email": "a@b.c", "role": "user",
+                                 "iss": "Anozon", "aud": "Anozon"})
+    with patch("app.services.rate_limit_service.rate_limit_helpers.hit", new_callable=AsyncMock,
+               return_value=RateLimitResult(True, 1, 0)) as mock_hit:
+
+        # Act
+        client.post("/limited", headers={"Authorization": f"Bearer {token}"})
+
+    # Assert
+    assert mock_hit.await_args.args[1] == "user:507f1f77bcf86cd799439011"
+
+
+# -------------------------------
+# Ported helper tests
+# -------------------------------
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "hit_result,expected_count",
+    [
+        (RateLimitResult(True, 2, 0), 1),
+        (RateLimitResult(True, 0, 0), 3),
+        (RateLimitResult(False, 0, 3600), 4),
+    ],
+    ids=["happy-first-reapply", "edge-last-allowed-reapply", "error-window-full"],
+)
+async def test_increment_seller_apply_count_maps_limiter_result(hit_result, expected_count):
+
+    # Arrange
+    with patch("app.repo.seller_redis_helpers.rate_limit_helpers.hit", new_callable=AsyncMock, return_value=hit_result) as mock_hit:
+
+        # Act
+        count = await seller_redis_helpers.increment_seller_apply_count("u1")
+
+    # Assert
+    assert count == expected_count
+    assert mock_hit.await_args.args == ("seller_apply", "u1", 3, seller_redis_helpers.WINDOW_SECONDS)
+
+
+def test_rate_limit_key_is_namespaced_per_scope_and_identity():
+
+    # Act / Assert
+    assert rate_limit_key("login_email", "email:a@b.c") == "ratelimit:login_email:email:a@b.c"
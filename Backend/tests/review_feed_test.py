@@ -0,0 +1,224 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from datetime import datetime, timedelta
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.utils.cursor import encode_cursor, decode_cursor, keyset_filter
+from app.repo.review_helpers import fetch_review_page, get_reviews_by_product, REVIEW_FEED_SORT
+from app.repo.admin_helpers import get_all_reviews
+from app.services.review_service import ReviewService
+
+
+PRODUCT_ID = str(ObjectId())
+
+
+def _reviews(n):
+    # Naive UTC, as Motor returns them (client is not tz_aware)
+    now = datetime(2026, 1, 1)
+    return [{"_id": ObjectId(), "product_id": PRODUCT_ID, "rating": 4, "reviewed_at": now - timedelta(minutes=i)} for i in range(n)]
+
+
+def _collection(docs, count=0):
+    collection = MagicMock()
+    find = collection.find.return_value
+    find.sort.return_value = find
+    find.skip.return_value = find
+    find.limit.return_value = find
+    find.to_list = AsyncMock(return_value=docs)
+    collection.count_documents = AsyncMock(return_value=count)
+    return collection
+
+
+# -------------------------------
+# cursor util tests
+# -------------------------------
+
+def test_cursor_round_trips_datetime_and_object_id():
+
+    # Arrange
+    doc = _reviews(1)[0]
+
+    # Act
+    values = decode_cursor(encode_cursor(doc, REVIEW_FEED_SORT), REVIEW_FEED_SORT)
+
+    # Assert
+    assert values == [doc["reviewed_at"], doc["_id"]]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    ["not-base64!!", "W10="],
+    ids=["error-garbage", "error-wrong-arity"],
+)
+def test_decode_cursor_rejects_malformed(cursor):
+
+    # Act
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(cursor, REVIEW_FEED_SORT)
+
+    # Assert
+    assert exc_info.value.status_code == 400
+
+
+def test_decode_cursor_rejects_cursor_from_another_sort():
+
+    # Arrange
+    doc = {"rating": 4, **_reviews(1)[0]}
+    cursor = encode_cursor(doc, [("rating", 1), *REVIEW_FEED_SORT])
+
+    # Act
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(cursor, [("rating", -1), *REVIEW_FEED_SORT])
+
+    # Assert
+    assert exc_info.value.status_code == 400
+
+
+def test_keyset_filter_builds_tie_break_chain():
+
+    # Act
+    result = keyset_filter([("rating", 1), ("reviewed_at", -1), ("_id", -1)], [4, "t", "id"])
+
+    # Assert
+    assert result == {"$or": [
+        {"rating": {"$gt": 4}},
+        {"rating": 4, "reviewed_at": {"$lt": "t"}},
+        {"rating": 4, "reviewed_at": "t", "_id": {"$lt": "id"}},
+    ]}
+
+
+# -------------------------------
+# fetch_review_page tests
+# -------------------------------
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "fetched,expect_next",
+    [
+        (3, True),
+        (2, False),
+    ],
+    ids=[
+        "happy-more-pages",
+        "edge-last-page",
+    ],
+)
+async def test_fetch_review_page_returns_cursor_only_when_more(fetched, expect_next):
+
+    # Arrange
+    docs = _reviews(fetched)
+    collection = _collection(docs)
+
+    # Act
+    reviews, next_cursor = await fetch_review_page(collection, {"product_id": PRODUCT_ID}, limit=2)
+
+    # Assert
+    assert len(reviews) == 2
+    assert (next_cursor is not None) is expect_next
+    collection.find.return_value.limit.assert_called_once_with(3)
+    if expect_next:
+        assert decode_cursor(next_cursor, REVIEW_FEED_SORT) == [docs[1]["reviewed_at"], docs[1]["_id"]]
+
+
+@pytest.mark.asyncio
+async def test_fetch_review_page_with_cursor_uses_keyset_not_skip():
+
+    # Arrange
+    last = _reviews(1)[0]
+    collection = _collection([])
+
+    # Act
+    await fetch_review_page(collection, {"product_id": PRODUCT_ID}, limit=2,
+                            cursor=encode_cursor(last, REVIEW_FEED_SORT), skip=40)
+
+    # Assert
+    query = collection.find.call_args.args[0]
+    assert query["$and"][0] == {"product_id": PRODUCT_ID}
+    assert query["$and"][1]["$or"][0] == {"reviewed_at": {"$lt": last["reviewed_at"]}}
+    collection.find.return_value.skip.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_star_filter_matches_fractional_ratings_in_that_bucket():
+
+    # Arrange
+    collection = _collection([])
+
+    # Act
+    await get_reviews_by_product(collection, PRODUCT_ID, rating=4)
+
+    # Assert
+    assert collection.find.call_args.args[0] == {"product_id": PRODUCT_ID, "rating": {"$gte": 3.5, "$lt": 4.5}}
+
+
+# -------------------------------
+# ReviewService.get_product_reviews tests
+# -------------------------------
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "rating,expected_total",
+    [
+        (None, 7),
+        (5, 4),
+        (2, 0),
+    ],
+    ids=[
+        "happy-all-ratings",
+        "happy-star-filter",
+        "edge-empty-star",
+    ],
+)
+async def test_get_product_reviews_totals_come_from_aggregates(rating, expected_total):
+
+    # Arrange
+    totals = {"review_count": 7, "rating_histogram": {"4": 3, "5": 4}}
+    with patch("app.services.review_service.reviews_collection"), \
+         patch("app.services.review_service.products_collection"), \
+         patch("app.services.review_service.get_reviews_by_product", new_callable=AsyncMock, return_value=(_reviews(1), "next")) as mock_page, \
+         patch("app.services.review_service.get_review_totals", new_callable=AsyncMock, return_value=totals):
+
+        # Act
+        result = await ReviewService.get_product_reviews(PRODUCT_ID, limit=1, rating=rating)
+
+    # Assert
+    assert result["total"] == expected_total
+    assert result["next_cursor"] == "next"
+    assert "user_id" not in result["reviews"][0]
+    assert mock_page.await_args.kwargs["rating"] == rating
+
+
+# -------------------------------
+# Admin get_all_reviews tests
+# -------------------------------
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "cursor,expect_count",
+    [
+        (None, True),
+        ("cursor", False),
+    ],
+    ids=[
+        "happy-first-page-counts",
+        "happy-cursor-page-skips-count",
+    ],
+)
+async def test_admin_reviews_filter_by_denormalized_seller(cursor, expect_count):
+
+    # Arrange
+    seller_id = str(ObjectId())
+    collection = MagicMock()
+    collection.count_documents = AsyncMock(return_value=5)
+
+    with patch("app.repo.admin_helpers.fetch_review_page", new_callable=AsyncMock, return_value=(_reviews(1), None)) as mock_page:
+
+        # Act
+        result = await get_all_reviews(collection, seller_id=seller_id, search="broken", cursor=cursor)
+
+    # Assert
+    query = mock_page.await_args.args[1]
+    assert query == {"seller_id": seller_id, "$text": {"$search": "broken"}}
+    assert (result["total"] == 5) is expect_count
+    assert collection.count_documents.await_count == int(expect_count)
@@ -0,0 +1,256 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from bson import ObjectId
+
+from app.repo.review_helpers import (
+    rating_star, rating_star_range, apply_rating_delta, recompute_product_ratings, AVG_RATING_PIPELINE,
+)
+from app.repo.admin_helpers import delete_review_by_id
+from app.services.review_service import ReviewService
+
+
+PRODUCT_ID = str(ObjectId())
+
+
+class _AsyncCursor:
+    def __init__(self, docs):
+        self._docs = iter(docs)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._docs)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class InMemoryProducts:
+    """One product document; update_one yields to the loop first, like a real round trip."""
+
+    def __init__(self):
+        self.doc = {"_id": ObjectId(PRODUCT_ID), "rating_sum": 0.0, "review_count": 0, "avg_rating": 0.0}
+
+    async def update_one(self, query, update):
+        await asyncio.sleep(0)
+        if update == AVG_RATING_PIPELINE:
+            count = self.doc["review_count"]
+            self.doc["avg_rating"] = round(self.doc["rating_sum"] / count, 2) if count else 0.0
+            return SimpleNamespace(matched_count=1)
+        for path, delta in update["$inc"].items():
+            if path.startswith("rating_histogram."):
+                histogram = self.doc.setdefault("rating_histogram", {})
+                star = path.split(".", 1)[1]
+                histogram[star] = histogram.get(star, 0) + delta
+            else:
+                self.doc[path] = self.doc.get(path, 0) + delta
+        return SimpleNamespace(matched_count=1)
+
+
+# -------------------------------
+# rating_star / apply_rating_delta tests
+# -------------------------------
+
+@pytest.mark.parametrize(
+    "rating,expected",
+    [
+        (5, "5"),
+        (4.5, "5"),
+        (4.4, "4"),
+        (1, "1"),
+    ],
+    ids=[
+        "happy-whole-star",
+        "edge-half-rounds-up",
+        "edge-rounds-down",
+        "edge-minimum",
+    ],
+)
+def test_rating_star_buckets(rating, expected):
+
+    # Act / Assert
+    assert rating_star(rating) == expected
+
+
+@pytest.mark.parametrize("star", [1, 2, 3, 4, 5], ids=["edge-min", "happy-2", "happy-3", "happy-4", "edge-max"])
+def test_rating_star_range_matches_histogram_bucket(star):
+
+    # Arrange
+    bounds = rating_star_range(star)
+    ratings = [1 + step / 10 for step in range(41)]
+
+    # Act
+    in_range = [r for r in ratings
+                if r >= bounds.get("$gte", float("-inf")) and r < bounds.get("$lt", float("inf"))]
+
+    # Assert
+    assert in_range == [r for r in ratings if rating_star(r) == str(star)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "direction,expected_inc",
+    [
+        (1, {"rating_sum": 4, "review_count": 1, "rating_histogram.4": 1}),
+        (-1, {"rating_sum": -4, "review_count": -1, "rating_histogram.4": -1}),
+    ],
+    ids=[
+        "happy-add-review",
+        "happy-remove-review",
+    ],
+)
+async def test_apply_rating_delta_uses_inc_then_pipeline(direction, expected_inc):
+
+    # Arrange
+    collection = AsyncMock()
+
+    # Act
+    await apply_rating_delta(collection, PRODUCT_ID, 4, direction)
+
+    # Assert
+    first, second = collection.update_one.await_args_list
+    assert first.args[0]["rating_sum"] == {"$exists": True}
+    assert first.args[1] == {"$inc": expected_inc}
+    assert second.args[1] == AVG_RATING_PIPELINE
+
+
+@pytest.mark.asyncio
+async def test_apply_rating_delta_recomputes_unseeded_product_instead_of_inc():
+
+    # Arrange
+    collection = AsyncMock()
+    collection.update_one.return_value = SimpleNamespace(matched_count=0)   # no rating_sum yet
+    reviews_col = MagicMock()
+
+    with patch("app.repo.review_helpers.recompute_product_ratings", new_callable=AsyncMock) as mock_recompute:
+
+        # Act
+        await apply_rating_delta(collection, PRODUCT_ID, 5, reviews_col=reviews_col)
+
+    # Assert
+    assert collection.update_one.await_count == 1   # no average refresh over a zero-based sum
+    mock_recompute.assert_awaited_once_with(reviews_col, collection, product_ids=[PRODUCT_ID])
+
+
+# -------------------------------
+# Concurrency: 100 parallel reviews
+# -------------------------------
+
+@pytest.mark.asyncio
+async def test_parallel_reviews_do_not_lose_updates():
+
+    # Arrange
+    products = InMemoryProducts()
+    ratings = [(i % 5) + 1 for i in range(100)]
+    order = {"items": [{"product_id": ObjectId(PRODUCT_ID), "item_status": "delivered"}]}
+
+    with patch("app.services.review_service.get_order_by_id_db", new_callable=AsyncMock, return_value=order), \
+         patch("app.services.review_service.check_existing_review", new_callable=AsyncMock, return_value=False), \
+         patch("app.services.review_service.get_profile_by_user_id", new_callable=AsyncMock, return_value=None), \
+         patch("app.services.review_service.insert_review", new_callable=AsyncMock, return_value=str(ObjectId())), \
+         patch("app.services.review_service.orders_collection"), \
+         patch("app.services.review_service.profiles_collection"), \
+         patch("app.services.review_service.reviews_collection"), \
+         patch("app.services.review_service.products_collection", return_value=products):
+
+        # Act
+        await asyncio.gather(*(
+            ReviewService.write_review(str(ObjectId()), {
+                "order_id": str(ObjectId()), "product_id": PRODUCT_ID,
+                "quality": "Good", "rating": rating, "comment": "ok",
+            })
+            for rating in ratings
+        ))
+
+    # Assert
+    assert products.doc["review_count"] == 100
+    assert products.doc["rating_sum"] == sum(ratings)
+    assert products.doc["avg_rating"] == 3.0
+    assert products.doc["rating_histogram"] == {"1": 20, "2": 20, "3": 20, "4": 20, "5": 20}
+
+
+# -------------------------------
+# delete_review_by_id tests
+# -------------------------------
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "deleted_review,expected_result,expected_delta_calls",
+    [
+        ({"_id": ObjectId(), "product_id": PRODUCT_ID, "rating": 3}, True, 1),
+        (None, False, 0),
+    ],
+    ids=[
+        "happy-delete-reverses-rating",
+        "edge-already-deleted",
+    ],
+)
+async def test_delete_review_reverses_rating_once(deleted_review, expected_result, expected_delta_calls):
+
+    # Arrange
+    reviews_col = AsyncMock()
+    reviews_col.find_one_and_delete.return_value = deleted_review
+    products_col = AsyncMock()
+
+    with patch("app.repo.admin_helpers.apply_rating_delta", new_callable=AsyncMock) as mock_delta:
+
+        # Act
+        result = await delete_review_by_id(reviews_col, products_col, str(ObjectId()))
+
+    # Assert
+    assert result is expected_result
+    assert mock_delta.await_count == expected_delta_calls
+    if expected_delta_calls:
+        assert mock_delta.await_args.args[1:] == (PRODUCT_ID, 3)
+        assert mock_delta.await_args.kwargs == {"direction": -1, "reviews_col": reviews_col}
+
+
+# -------------------------------
+# recompute_product_ratings tests
+# -------------------------------
+
+@pytest.mark.asyncio
+async def test_recompute_rebuilds_aggregates_and_zeroes_orphans():
+
+    # Arrange
+    orphan_id = ObjectId()
+    reviews_col = MagicMock()
+    reviews_col.aggregate.return_value = _AsyncCursor([{
+        "_id": PRODUCT_ID, "rating_sum": 9.0, "review_count": 2,
+        "star_1": 0, "star_2": 0, "star_3": 0, "star_4": 1, "star_5": 1,
+    }])
+    products_col = MagicMock()
+    products_col.find.return_value = _AsyncCursor([{"_id": ObjectId(PRODUCT_ID)}, {"_id": orphan_id}])
+    products_col.bulk_write = AsyncMock(return_value=MagicMock(modified_count=2))
+
+    # Act
+    result = await recompute_product_ratings(reviews_col, products_col)
+
+    # Assert
+    assert result == {"products": 2, "reviews": 2}
+    ops = products_col.bulk_write.await_args.args[0]
+    assert [op._filter["_id"] for op in ops] == [ObjectId(PRODUCT_ID), orphan_id]
+    assert ops[0]._doc["$set"]["avg_rating"] == 4.5
+    assert ops[0]._doc["$set"]["rating_histogram"] == {"1": 0, "2": 0, "3": 0, "4": 1, "5": 1}
+    assert ops[1]._doc["$set"]["review_count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_recompute_can_be_limited_to_some_products():
+
+    # Arrange
+    reviews_col = MagicMock()
+    reviews_col.aggregate.return_value = _AsyncCursor([])
+    products_col = MagicMock()
+    products_col.find.return_value = _AsyncCursor([{"_id": ObjectId(PRODUCT_ID)}])
+    products_col.bulk_write = AsyncMock(return_value=MagicMock(modified_count=1))
+
+    # Act
+    await recompute_product_ratings(reviews_col, products_col, product_ids=[PRODUCT_ID])
+
+    # Assert
+    assert reviews_col.aggregate.call_args.args[0][0] == {"$match": {"product_id": {"$in": [PRODUCT_ID]}}}
+    assert products_col.find.call_args.args[0]["_id"] == {"$in": [ObjectId(PRODUCT_ID)]}
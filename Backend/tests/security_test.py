@@ -0,0 +1,100 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+from fastapi import HTTPException
+
+from app.core import security
+from app.core.security import hash_password, hash_password_async, verify_password_async
+from app.services.auth_service import AuthService
+
+
+@pytest.fixture
+def fresh_pool():
+    security.shutdown_hash_pool()
+    yield
+    security.shutdown_hash_pool()
+
+
+# -------------------------------
+# bcrypt pool tests
+# -------------------------------
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "candidate,expected",
+    [
+        ("s3cret-pass", True),
+        ("wrong-pass", False),
+    ],
+    ids=[
+        "happy-correct-password",
+        "error-wrong-password",
+    ],
+)
+async def test_async_hash_and_verify_round_trip(fresh_pool, candidate, expected):
+
+    # Arrange
+    hashed = await hash_password_async("s3cret-pass")
+
+    # Act
+    result = await verify_password_async(candidate, hashed)
+
+    # Assert
+    assert result is expected
+
+
+@pytest.mark.asyncio
+async def test_verify_does_not_block_event_loop(fresh_pool):
+
+    # Arrange
+    hashed = hash_password("s3cret-pass")
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.005)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+
+    # Act
+    await verify_password_async("s3cret-pass", hashed)
+    task.cancel()
+
+    # Assert: bcrypt takes tens of ms; the loop kept serving the ticker meanwhile
+    assert ticks >= 2
+
+
+@pytest.mark.asyncio
+async def test_pool_size_comes_from_settings(fresh_pool):
+
+    # Arrange
+    with patch.object(security.settings, "PASSWORD_HASH_WORKERS", 3):
+
+        # Act
+        pool = security._get_hash_pool()
+
+    # Assert
+    assert pool._max_workers == 3
+
+
+# -------------------------------
+# AuthService.login uses the pool
+# -------------------------------
+
+@pytest.mark.asyncio
+async def test_login_rejects_bad_password_via_async_verify():
+
+    # Arrange
+    user = {"_id": "1", "email": "a@b.c", "hashed_password": "x", "role": "user", "is_verified": True}
+    with patch("app.services.auth_service.get_user_by_email", new_callable=AsyncMock, return_value=user), \
+         patch("app.services.auth_service.verify_password_async", new_callable=AsyncMock, return_value=False) as mock_verify:
+
+        # Act
+        with pytest.raises(HTTPException) as exc_info:
+            await AuthService.login("a@b.c", "nope", user_col=None)
+
+    # Assert
+    assert exc_info.value.status_code == 401
+    mock_verify.assert_awaited_once_with("nope", "x")
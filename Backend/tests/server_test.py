@@ -0,0 +1,26 @@
+import pytest
+from unittest.mock import patch
+
+import server
+
+
+@pytest.mark.parametrize(
+    "configured,affinity,expected",
+    [
+        (3, {0, 1, 2, 3, 4, 5}, 3),
+        (0, {0, 1, 2, 3, 4, 5}, 6),
+        (0, {2}, 1),
+    ],
+    ids=["happy-explicit-web-concurrency", "happy-defaults-to-cpus", "edge-pinned-to-one-cpu"],
+)
+def test_worker_count(configured, affinity, expected):
+
+    # Arrange
+    with patch("server.settings.WEB_CONCURRENCY", configured), \
+         patch("server.os.sched_getaffinity", return_value=affinity, create=True):
+
+        # Act
+        workers = server.worker_count()
+
+    # Assert
+    assert workers == expected
@@ -0,0 +1,277 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+from fastapi import HTTPException
+
+from app.core.security import create_refresh_token, session_owner, split_refresh_token, refresh_token_digest, verify_token
+from app.db import redis as redis_db
+from app.repo import session_helpers
+from app.services import session_service
+from app.services.auth_service import AuthService
+
+
+# -------------------------------
+# Opaque refresh token tests
+# -------------------------------
+
+def test_refresh_token_rotation_keeps_session_id():
+
+    # Arrange
+    token = create_refresh_token()
+    session_id, secret = split_refresh_token(token)
+
+    # Act
+    rotated_session_id, rotated_secret = split_refresh_token(create_refresh_token(session_id))
+
+    # Assert
+    assert rotated_session_id == session_id
+    assert rotated_secret != secret
+    assert refresh_token_digest(secret) != refresh_token_digest(rotated_secret)
+    assert len(refresh_token_digest(secret)) == 64
+
+
+@pytest.mark.parametrize(
+    "user_id,expected_owner",
+    [("507f1f77bcf86cd799439011", "507f1f77bcf86cd799439011"), (None, None)],
+    ids=["happy-owner-in-session-id", "edge-no-owner"],
+)
+def test_new_session_id_names_its_owner(user_id, expected_owner):
+
+    # Act
+    session_id, _ = split_refresh_token(create_refresh_token(user_id=user_id))
+
+    # Assert
+    assert session_owner(session_id) == expected_owner
+
+
+@pytest.mark.parametrize(
+    "token",
+    [None, "", "no-separator", ".secret", "session."],
+    ids=["edge-none", "edge-empty", "error-no-dot", "error-no-session", "error-no-secret"],
+)
+def test_split_refresh_token_rejects_malformed(token):
+
+    # Act / Assert
+    assert split_refresh_token(token) is None
+
+
+# -------------------------------
+# session_service tests
+# -------------------------------
+
+@pytest.mark.asyncio
+async def test_start_session_stores_digest_not_secret():
+
+    # Arrange
+    token = create_refresh_token()
+    session_id, secret = split_refresh_token(token)
+
+    with patch("app.services.session_service.session_helpers.create_session", new_callable=AsyncMock) as mock_create:
+
+        # Act
+        await session_service.start_session(token, "u1", "a@b.c", "user", device="Firefox")
+
+    # Assert
+    args = mock_create.await_args.args
+    assert args[0] == session_id
+    assert args[4] == refresh_token_digest(secret)
+    assert secret not in args
+    assert args[6] == "Firefox"
+
+
+@pytest.mark.asyncio
+async def test_rotate_session_issues_new_tokens():
+
+    # Arrange
+    token = create_refresh_token()
+    session_id, _ = split_refresh_token(token)
+
+    with patch("app.services.session_service.session_helpers.rotate_session", new_callable=AsyncMock,
+               return_value=[1, "507f1f77bcf86cd799439011", "a@b.c", "seller"]):
+
+        # Act
+        result = await session_service.rotate_session(token)
+
+    # Assert
+    assert result["role"] == "seller"
+    assert split_refresh_token(result["refresh_token"])[0] == session_id
+    assert result["refresh_token"] != token
+    assert verify_token(result["access_token"])["email"] == "a@b.c"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "token,script_result,expect_alert",
+    [
+        (create_refresh_token(), [0], False),
+        (create_refresh_token(), [-1, "u1"], True),
+        ("not-a-token", None, False),
+    ],
+    ids=[
+        "error-unknown-session",
+        "error-reused-token-revokes",
+        "error-malformed-token",
+    ],
+)
+async def test_rotate_session_rejects(token, script_result, expect_alert):
+
+    # Arrange
+    with patch("app.services.session_service.session_helpers.rotate_session", new_callable=AsyncMock, return_value=script_result), \
+         patch("app.services.session_service.logger") as mock_logger:
+
+        # Act
+        with pytest.raises(HTTPException) as exc_info:
+            await session_service.rotate_session(token)
+
+    # Assert
+    assert exc_info.value.status_code == 401
+    assert mock_logger.critical.called is expect_alert
+
+
+# -------------------------------
+# AuthService.logout tests
+# -------------------------------
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "refresh_cookie,expect_single,expect_all",
+    [
+        (create_refresh_token(), True, False),
+        (None, False, True),
+    ],
+    ids=[
+        "happy-logout-this-device",
+        "happy-logout-everywhere-without-cookie",
+    ],
+)
+async def test_logout_revokes_device_or_all_sessions(refresh_cookie, expect_single, expect_all):
+
+    # Arrange
+    with patch("app.services.auth_service.session_service.end_session", new_callable=AsyncMock, return_value=True) as mock_end, \
+         patch("app.services.auth_service.session_service.end_all_sessions", new_callable=AsyncMock) as mock_end_all, \
+         patch("app.services.auth_service.verify_token", return_value={"_id": "u1", "email": "a@b.c"}):
+
+        # Act
+        result = await AuthService.logout("access", user_col=None, refresh_token=refresh_cookie)
+
+    # Assert
+    assert result == {"message": "Logged out"}
+    assert mock_end.await_count == int(expect_single)
+    assert mock_end_all.await_count == int(expect_all)
+
+
+@pytest.mark.asyncio
+async def test_logout_with_stale_cookie_is_rejected_without_signing_out_everywhere():
+
+    # Arrange
+    with patch("app.services.auth_service.session_service.end_session", new_callable=AsyncMock, return_value=False), \
+         patch("app.services.auth_service.session_service.end_all_sessions", new_callable=AsyncMock) as mock_end_all, \
+         patch("app.services.auth_service.verify_token", return_value={"_id": "u1", "email": "a@b.c"}):
+
+        # Act
+        with pytest.raises(HTTPException) as exc_info:
+            await AuthService.logout("access", user_col=None, refresh_token=create_refresh_token())
+
+    # Assert
+    assert exc_info.value.status_code == 401
+    mock_end_all.assert_not_awaited()
+
+
+# -------------------------------
+# Session store tests (Lua scripts run against fakeredis)
+# -------------------------------
+
+@pytest.fixture
+def fake_redis():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    previous = redis_db.redis_client
+    redis_db.redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    yield redis_db.redis_client
+    redis_db.redis_client = previous
+
+
+async def _login(token: str, ttl: int):
+    session_id, secret = split_refresh_token(token)
+    await session_helpers.create_session(session_id, "u1", "a@b.c", "user", refresh_token_digest(secret), ttl)
+    return session_id, secret
+
+
+@pytest.mark.asyncio
+async def test_rotation_keeps_user_index_alive_past_login_ttl(fake_redis):
+
+    # Arrange
+    session_id, secret = await _login(create_refresh_token(), ttl=1)
+    _, new_secret = split_refresh_token(create_refresh_token(session_id))
+    result = await session_helpers.rotate_session(session_id, refresh_token_digest(secret), refresh_token_digest(new_secret), 1000)
+    await asyncio.sleep(1.1)   # past the TTL the index got at login
+
+    # Act
+    revoked = await session_helpers.delete_user_sessions("u1")
+
+    # Assert
+    assert int(result[0]) == 1
+    assert revoked == 1
+    assert not await fake_redis.exists(session_helpers.SESSION_KEY.format(session_id=session_id))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "owner,expected_status",
+    [("u1", 1), ("u2", 0)],
+    ids=["happy-owner-from-session-id", "error-forged-owner-rejected"],
+)
+async def test_rotation_is_one_round_trip_when_session_id_names_owner(fake_redis, owner, expected_status):
+
+    # Arrange
+    session_id, secret = await _login(create_refresh_token(user_id="u1"), ttl=1000)
+    _, new_secret = split_refresh_token(create_refresh_token(session_id))
+
+    # Act
+    with patch.object(fake_redis, "hget", new_callable=AsyncMock) as mock_hget:
+        result = await session_helpers.rotate_session(
+            session_id, refresh_token_digest(secret), refresh_token_digest(new_secret), 1000, user_id=owner,
+        )
+
+    # Assert
+    assert int(result[0]) == expected_status
+    mock_hget.assert_not_awaited()
+    assert (session_id in await session_helpers.get_user_session_ids(owner)) is (expected_status == 1)
+
+
+@pytest.mark.asyncio
+async def test_reused_token_revokes_session_and_index_entry(fake_redis):
+
+    # Arrange
+    session_id, secret = await _login(create_refresh_token(), ttl=1000)
+    _, new_secret = split_refresh_token(create_refresh_token(session_id))
+    await session_helpers.rotate_session(session_id, refresh_token_digest(secret), refresh_token_digest(new_secret), 1000)
+    await fake_redis.hset(session_helpers.SESSION_KEY.format(session_id=session_id), "rotated_at", 0)   # grace over
+
+    # Act
+    result = await session_helpers.rotate_session(session_id, refresh_token_digest(secret), "unused", 1000)
+
+    # Assert
+    assert [int(result[0]), result[1]] == [-1, "u1"]
+    assert await session_helpers.get_user_session_ids("u1") == set()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "use_real_secret,expected",
+    [(True, True), (False, False)],
+    ids=["happy-current-secret-revokes", "error-forged-secret-ignored"],
+)
+async def test_end_session_requires_current_secret(fake_redis, use_real_secret, expected):
+
+    # Arrange
+    token = create_refresh_token()
+    session_id, _ = await _login(token, ttl=1000)
+    presented = token if use_real_secret else f"{session_id}.forged"
+
+    # Act
+    ended = await session_service.end_session(presented)
+
+    # Assert
+    assert ended is expected
+    assert await fake_redis.exists(session_helpers.SESSION_KEY.format(session_id=session_id)) == int(not expected)
@@ -0,0 +1,174 @@
+import json
+import logging
+import pytest
+from types import SimpleNamespace
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import SpanKind
+
+from app.core import tracing
+from app.core.tracing import JsonFileSpanExporter, TracingMiddleware, current_request_id
+from app.db.mongodb import CommandLatencyListener
+
+TRACEPARENT = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+
+
+@pytest.fixture(scope="module")
+def exporter():
+    exporter = InMemorySpanExporter()
+    tracing.configure_tracing(exporter)
+    yield exporter
+
+
+@pytest.fixture
+def spans(exporter):
+    exporter.clear()
+
+    def finished():
+        tracing.shutdown_tracing()
+        return exporter.get_finished_spans()
+    return finished
+
+
+def _client():
+    app = FastAPI()
+    listener = CommandLatencyListener()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str):
+        logging.getLogger("uvicorn.error").info("loading item")
+        # What Motor does for one find: started/succeeded on the caller's context
+        listener.started(SimpleNamespace(command_name="find", database_name="anozon", command={"find": "Products"},
+                                         request_id=7, connection_id=("h", 1)))
+        listener.succeeded(SimpleNamespace(command_name="find", duration_micros=900, request_id=7, connection_id=("h", 1)))
+        return {"request_id": current_request_id()}
+
+    app.add_middleware(TracingMiddleware)
+    return TestClient(app)
+
+
+# -------------------------------
+# Request id tests
+# -------------------------------
+
+@pytest.mark.parametrize(
+    "headers,expected",
+    [
+        ({"X-Request-ID": "checkout-123"}, "checkout-123"),
+        ({"traceparent": TRACEPARENT}, "4bf92f3577b34da6a3ce929d0e0e4736"),
+        ({"X-Request-ID": "bad id\nwith newline", "traceparent": TRACEPARENT}, "4bf92f3577b34da6a3ce929d0e0e4736"),
+    ],
+    ids=["happy-incoming-id-kept", "happy-trace-id-from-traceparent", "edge-unsafe-id-replaced"],
+)
+def test_request_id_is_propagated_and_echoed(headers, expected):
+
+    # Act
+    response = _client().get("/items/1", headers=headers)
+
+    # Assert
+    assert response.json()["request_id"] == expected
+    assert response.headers["x-request-id"] == expected
+
+
+def test_request_id_is_generated_when_absent():
+
+    # Act
+    response = _client().get("/items/1")
+
+    # Assert
+    request_id = response.headers["x-request-id"]
+    assert len(request_id) == 32 and request_id == response.json()["request_id"]
+
+
+def test_log_records_carry_the_request_id(caplog):
+
+    # Arrange
+    caplog.set_level("INFO")
+
+    # Act
+    _client().get("/items/1", headers={"X-Request-ID": "trace-me"})
+
+    # Assert
+    record = next(r for r in caplog.records if r.getMessage() == "loading item")
+    assert record.request_id == "trace-me"
+
+
+# -------------------------------
+# Span tests
+# -------------------------------
+
+def test_mongo_command_span_is_a_child_of_the_request_span(spans):
+
+    # Act
+    _client().get("/items/42")
+
+    # Assert
+    finished = spans()
+    servers = [span for span in finished if span.kind == SpanKind.SERVER]
+    mongo = next(span for span in finished if span.name == "mongo find Products")
+    assert len(servers) == 1   # one trace per request, even when FastAPI opens its own server span
+    assert servers[0].name == "GET /items/{item_id}"
+    assert mongo.context.trace_id == servers[0].context.trace_id
+    assert servers[0].attributes["app.request_id"] == format(mongo.context.trace_id, "032x")
+
+@pytest.mark.asyncio
+async def test_redis_commands_get_client_spans(spans):
+
+    # Arrange
+    pytest.importorskip("fakeredis")
+    from fakeredis import FakeServer
+    from fakeredis.aioredis import FakeConnection
+    from redis.asyncio import ConnectionPool
+    from app.db.redis import InstrumentedRedis
+
+    client = InstrumentedRedis(connection_pool=ConnectionPool(connection_class=FakeConnection, server=FakeServer()))
+
+    # Act
+    with tracing.tracer.start_as_current_span("parent") as parent:
+        await client.set("k", "v")
+
+    # Assert
+    redis_span = next(span for span in spans() if span.name == "redis SET")
+    assert redis_span.parent.span_id == parent.get_span_context().span_id
+
+
+@pytest.mark.asyncio
+async def test_redis_pipeline_gets_one_client_span(spans):
+
+    # Arrange
+    pytest.importorskip("fakeredis")
+    from fakeredis import FakeServer
+    from fakeredis.aioredis import FakeConnection
+    from redis.asyncio import ConnectionPool
+    from app.db.redis import InstrumentedRedis
+
+    client = InstrumentedRedis(connection_pool=ConnectionPool(connection_class=FakeConnection, server=FakeServer()))
+
+    # Act
+    async with client.pipeline(transaction=True) as pipe:
+        pipe.set("k", "v")
+        pipe.expire("k", 60)
+        await pipe.execute()
+
+    # Assert
+    pipeline_span = next(span for span in spans() if span.name == "redis MULTI")
+    assert pipeline_span.attributes["db.operation.batch.size"] == 2
+
+
+def test_json_exporter_writes_one_span_per_line(tmp_path):
+
+    # Arrange
+    provider = TracerProvider()
+    span = provider.get_tracer("test").start_span("work")
+    span.end()
+    path = tmp_path / "traces" / "spans.jsonl"
+
+    # Act
+    JsonFileSpanExporter(str(path)).export([span, span])
+
+    # Assert
+    lines = path.read_text().splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[0])["name"] == "work"
@@ -0,0 +1,338 @@
+import numpy as np
+import pytest
+from bson import ObjectId
+from unittest.mock import AsyncMock, patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.ai import assistant
+from app.ai.embeddings import HashingEmbedder, normalize_rows
+from app.ai.product_index import ProductIndexer, WriterLeaseLost
+from app.ai.vector_index import VectorIndex
+
+DIM = 16
+
+
+def _ids(n, start=0):
+    return [f"{i:024x}" for i in range(start, start + n)]
+
+
+def _vectors(n, seed=0):
+    return normalize_rows(np.random.default_rng(seed).standard_normal((n, DIM)).astype(np.float32))
+
+
+def _brute_force(ids, vectors, query, k):
+    scores = vectors @ query
+    return [ids[i] for i in np.argsort(-scores, kind="stable")[:k]]
+
+
+@pytest.fixture
+def indexer(tmp_path):
+    with patch("app.ai.product_index.settings.AI_INDEX_DIR", str(tmp_path)), \
+         patch("app.ai.product_index.ai_index_helpers.clear_dirty", new_callable=AsyncMock), \
+         patch("app.ai.product_index.ai_index_helpers.pop_dirty", new_callable=AsyncMock, return_value=[]), \
+         patch("app.ai.product_index.ai_index_helpers.extend_writer", new_callable=AsyncMock, return_value=True):
+        ProductIndexer._embedder = HashingEmbedder(64)
+        ProductIndexer._index = ProductIndexer._writer = None
+        ProductIndexer._local_dirty = set()
+        yield ProductIndexer
+    ProductIndexer._embedder = ProductIndexer._index = ProductIndexer._writer = None
+
+
+def _product(name, description):
+    return {"_id": ObjectId(), "name": name, "brand": "Acme", "category": "Home", "description": description}
+
+
+# -------------------------------
+# VectorIndex tests
+# -------------------------------
+
+@pytest.mark.parametrize("k", [1, 5, 50], ids=["happy-top1", "happy-top5", "edge-k-exceeds-size"])
+def test_search_matches_brute_force(tmp_path, k):
+
+    # Arrange
+    ids, vectors = _ids(40), _vectors(40)
+    index = VectorIndex.create(str(tmp_path), "test", DIM)
+    index.upsert(ids, vectors)
+    index.commit()
+    query = _vectors(1, seed=7)[0]
+
+    # Act
+    hits = index.search(query, k)
+
+    # Assert
+    assert [pid for pid, _ in hits] == _brute_force(ids, vectors, query, k)
+
+
+def test_removed_and_replaced_rows_are_searched_correctly(tmp_path):
+
+    # Arrange
+    ids, vectors = _ids(30), _vectors(30)
+    index = VectorIndex.create(str(tmp_path), "test", DIM)
+    index.upsert(ids, vectors)
+    query = vectors[3]
+
+    # Act
+    index.remove([ids[3], "not-indexed"])
+    index.upsert([ids[5]], query[None, :])   # now ids[5] is the exact match
+    index.upsert(_ids(1, start=100), _vectors(1, seed=3))   # reuses the freed row
+    index.commit()
+
+    # Assert
+    hits = index.search(query, 30)
+    assert hits[0][0] == ids[5]
+    assert ids[3] not in [pid for pid, _ in hits]
+    assert len(index) == 30
+    assert index.meta["count"] == 30
+
+
+def test_index_grows_and_reopens_from_disk(tmp_path):
+
+    # Arrange
+    ids, vectors = _ids(3000), _vectors(3000)
+    index = VectorIndex.create(str(tmp_path), "test", DIM)
+
+    # Act
+    index.upsert(ids, vectors)
+    index.commit()
+    reopened = VectorIndex.open(str(tmp_path), writable=True)
+
+    # Assert
+    assert index.meta["capacity"] >= 3000
+    assert len(list(tmp_path.glob("vectors-*.f32"))) == 1   # the outgrown generation was removed
+    assert len(reopened) == 3000 and ids[2999] in reopened
+    assert reopened.search(vectors[2999], 1)[0][0] == ids[2999]
+
+
+def test_reader_sees_writer_commits_only(tmp_path):
+
+    # Arrange
+    ids, vectors = _ids(10), _vectors(10)
+    writer = VectorIndex.create(str(tmp_path), "test", DIM)
+    writer.upsert(ids[:5], vectors[:5])
+    writer.commit()
+    reader = VectorIndex.open(str(tmp_path))
+
+    # Act
+    writer.upsert(ids[5:], vectors[5:])
+    before = reader.search(vectors[9], 1)
+    writer.commit()
+    reader.refresh()
+    after = reader.search(vectors[9], 1)
+
+    # Assert
+    assert before[0][0] != ids[9]
+    assert after[0][0] == ids[9]
+
+
+def test_search_many_matches_single_searches(tmp_path):
+
+    # Arrange
+    ids, vectors = _ids(200), _vectors(200)
+    index = VectorIndex.create(str(tmp_path), "test", DIM)
+    index.upsert(ids, vectors)
+    queries = _vectors(100, seed=11)
+
+    # Act
+    batched = index.search_many(queries, 5)
+
+    # Assert
+    single = [index.search(q, 5) for q in queries]
+    assert [[pid for pid, _ in hits] for hits in batched] == [[pid for pid, _ in hits] for hits in single]
+
+
+def test_upsert_rejects_wrong_dimension(tmp_path):
+
+    # Arrange
+    index = VectorIndex.create(str(tmp_path), "test", DIM)
+
+    # Act / Assert
+    with pytest.raises(ValueError):
+        index.upsert(_ids(2), np.ones((2, DIM + 1), dtype=np.float32))
+
+
+# -------------------------------
+# ProductIndexer tests
+# -------------------------------
+
+@pytest.mark.asyncio
+async def test_rebuild_then_search_finds_relevant_product(indexer):
+
+    # Arrange
+    products = [
+        _product("Steel water bottle", "insulated bottle keeps drinks cold"),
+        _product("Cotton bedsheet", "double bed sheet with pillow covers"),
+        _product("Running shoes", "lightweight shoes for jogging"),
+    ]
+
+    async def batches(collection, batch_size):
+        yield products
+
+    with patch("app.ai.product_index.ai_index_helpers.iter_indexable_products", batches), \
+         patch("app.ai.product_index.products_collection"):
+
+        # Act
+        await indexer.sync()
+        hits = await indexer.search("cold water bottle", 1)
+
+    # Assert
+    assert hits[0][0] == str(products[0]["_id"])
+
+
+@pytest.mark.asyncio
+async def test_sync_dirty_upserts_visible_and_removes_hidden(indexer, tmp_path):
+
+    # Arrange
+    kept, hidden = _product("Desk lamp", "led lamp"), _product("Old lamp", "lamp")
+    indexer._writer = VectorIndex.create(str(tmp_path), indexer._embedder.name, 64)
+    indexer._writer.upsert([str(hidden["_id"])], await indexer._embedder.embed(["old lamp"]))
+    indexer._local_dirty = {str(kept["_id"]), str(hidden["_id"])}
+
+    with patch("app.ai.product_index.ai_index_helpers.get_indexable_products", new_callable=AsyncMock, return_value=[kept]), \
+         patch("app.ai.product_index.products_collection"):
+
+        # Act
+        processed = await indexer.sync_dirty()
+
+    # Assert
+    assert processed == 2
+    assert str(kept["_id"]) in indexer._writer
+    assert str(hidden["_id"]) not in indexer._writer
+
+
+@pytest.mark.asyncio
+async def test_mark_dirty_falls_back_to_local_set_without_redis(indexer):
+
+    # Arrange
+    with patch("app.ai.product_index.ai_index_helpers.mark_dirty", new_callable=AsyncMock,
+               side_effect=AttributeError("redis_client is None")):
+
+        # Act
+        await indexer.mark_dirty("abc")
+
+    # Assert
+    assert indexer._local_dirty == {"abc"}
+
+
+@pytest.mark.asyncio
+async def test_no_worker_writes_the_index_without_the_writer_lock(indexer):
+
+    # Arrange
+    with patch("app.ai.product_index.ai_index_helpers.acquire_writer", new_callable=AsyncMock,
+               side_effect=AttributeError("redis_client is None")):
+
+        # Act
+        held = await indexer._hold_writer_lock(30)
+
+    # Assert
+    assert held is False
+
+
+@pytest.mark.asyncio
+async def test_rebuild_stops_before_commit_once_the_lease_is_lost(indexer, tmp_path):
+
+    # Arrange
+    products = [_product("Desk lamp", "led lamp"), _product("Steel bottle", "cold drinks")]
+
+    async def batches(collection, batch_size):
+        yield products[:1]
+        yield products[1:]
+
+    with patch("app.ai.product_index.ai_index_helpers.iter_indexable_products", batches), \
+         patch("app.ai.product_index.products_collection"), \
+         patch("app.ai.product_index.ai_index_helpers.extend_writer", new_callable=AsyncMock,
+               side_effect=[True, False]) as extend:
+
+        # Act
+        with pytest.raises(WriterLeaseLost):
+            await indexer.rebuild()
+
+    # Assert
+    assert extend.await_count == 2   # checked after each embedding batch, stopped at the second
+    assert indexer._writer is None
+    assert VectorIndex.open(str(tmp_path)) is None   # nothing published
+    assert list(tmp_path.iterdir()) == []            # the abandoned generation was removed
+
+
+@pytest.mark.asyncio
+async def test_sync_dirty_hands_ids_back_when_the_lease_is_lost(indexer, tmp_path):
+
+    # Arrange
+    product = _product("Desk lamp", "led lamp")
+    indexer._writer = VectorIndex.create(str(tmp_path), indexer._embedder.name, 64)
+    indexer._local_dirty = {str(product["_id"])}
+
+    with patch("app.ai.product_index.ai_index_helpers.get_indexable_products", new_callable=AsyncMock,
+               return_value=[product]), \
+         patch("app.ai.product_index.products_collection"), \
+         patch("app.ai.product_index.ai_index_helpers.extend_writer", new_callable=AsyncMock, return_value=False), \
+         patch("app.ai.product_index.ai_index_helpers.mark_dirty", new_callable=AsyncMock) as mark_dirty:
+
+        # Act
+        with pytest.raises(WriterLeaseLost):
+            await indexer.sync_dirty()
+        await indexer._requeue_local_dirty()
+
+    # Assert
+    assert str(product["_id"]) not in indexer._writer
+    mark_dirty.assert_awaited_once_with(str(product["_id"]))
+    assert indexer._local_dirty == set()
+
+
+@pytest.mark.asyncio
+async def test_search_returns_nothing_before_first_build(indexer):
+
+    # Act / Assert
+    assert await indexer.search("anything") == []
+
+
+# -------------------------------
+# /ai/products/ask route tests
+# -------------------------------
+
+def _ask_client():
+    app = FastAPI()
+    app.include_router(assistant.router)
+    return TestClient(app)
+
+
+def test_ask_grounds_prompt_in_retrieved_products():
+
+    # Arrange
+    card = {"_id": ObjectId(), "name": "Steel water bottle", "slug": "steel-water-bottle", "price": 499,
+            "actual_price": 599, "discount_percent": 16, "brand": "Acme", "category": "Kitchen", "stock": 3}
+    chat = AsyncMock(return_value={"message": {"content": "Try the Steel water bottle."}, "model": "m"})
+    with patch("app.services.rate_limit_service.rate_limit_helpers.hit", new_callable=AsyncMock,
+               side_effect=AttributeError("redis_client is None")), \
+         patch("app.ai.assistant.ProductIndexer.search", new_callable=AsyncMock, return_value=[(str(card["_id"]), 0.9)]), \
+         patch("app.ai.assistant.get_visible_cards", new_callable=AsyncMock, return_value=[card]), \
+         patch("app.ai.assistant.products_collection"), \
+         patch("app.ai.assistant.OllamaClient.chat", chat):
+
+        # Act
+        response = _ask_client().post("/ai/products/ask", json={"question": "a bottle for cold water?"})
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json()["answer"] == "Try the Steel water bottle."
+    assert response.json()["products"][0]["id"] == str(card["_id"])
+    prompt = chat.call_args.args[0]
+    assert "Steel water bottle" in prompt and "a bottle for cold water?" in prompt
+
+
+def test_ask_skips_llm_when_nothing_matches():
+
+    # Arrange
+    chat = AsyncMock()
+    with patch("app.services.rate_limit_service.rate_limit_helpers.hit", new_callable=AsyncMock,
+               side_effect=AttributeError("redis_client is None")), \
+         patch("app.ai.assistant.ProductIndexer.search", new_callable=AsyncMock, return_value=[]), \
+         patch("app.ai.assistant.products_collection"), \
+         patch("app.ai.assistant.OllamaClient.chat", chat):
+
+        # Act
+        response = _ask_client().post("/ai/products/ask", json={"question": "spaceship parts"})
+
+    # Assert
+    assert response.json() == {"answer": assistant.NO_MATCH_ANSWER, "products": [], "model": None}
+    chat.assert_not_called()